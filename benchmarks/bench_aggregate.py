@@ -0,0 +1,73 @@
+"""Benchmark: peak memory of daily counts per summary, grouping the JSON output vs. the aggregate output.
+
+Usage: python -m benchmarks.bench_aggregate [number of occurrences (default: 200000)]
+"""
+
+import os
+import sys
+import tempfile
+from collections import Counter
+from datetime import datetime, timedelta
+
+from benchmarks.bench_memory import NUM_SERIES, build_series_calendar, measure_peak
+from benchmarks.util_benchmark import build_config, write_calendar
+from icalendar_events_cli.icalendar import filter_events, parse_calendar, recurring_calendar
+from icalendar_events_cli.jsoncodec import loads
+from icalendar_events_cli.output import output_events
+
+# ---- Benchmark -------------------------------------------------------------------------------------------------------
+
+
+def group_json(calendar: object, config: dict) -> None:
+    """Write the JSON output and group the exported events per day and summary.
+
+    Arguments:
+        calendar: Parsed calendar.
+        config: Configuration hierarchy of the 'json' output.
+    """
+    output_events(calendar, filter_events(recurring_calendar(calendar, config.filter), config.filter), config)
+    with open(config.output.file, encoding="utf-8") as file:
+        events = loads(file.read())["events"]
+    Counter((event["start-date"][:10], event["summary"]) for event in events)
+
+
+def aggregate(calendar: object, config: dict) -> None:
+    """Write the aggregate output.
+
+    Arguments:
+        calendar: Parsed calendar.
+        config: Configuration hierarchy of the 'aggregate' output.
+    """
+    output_events(calendar, filter_events(recurring_calendar(calendar, config.filter), config.filter), config)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    num_occurrences = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    start = datetime(2025, 1, 1, 8, 0, 0)
+    end = start + timedelta(days=num_occurrences // NUM_SERIES)
+    calendar = parse_calendar(build_series_calendar(NUM_SERIES, start))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        calendar_url = write_calendar(os.path.join(tmp_dir, "calendar.ics"), "")
+        cli_args = (
+            f"--calendar.url {calendar_url} --filter.start-date {start.isoformat()}+01:00"
+            + f" --filter.end-date {end.isoformat()}+01:00 --output.file {os.path.join(tmp_dir, 'output.json')}"
+        )
+        json_config = build_config(f"{cli_args} --output.format json")
+        aggregate_config = build_config(
+            f"{cli_args} --output.format aggregate --output.aggregate-group 'Team meeting \\d'"
+        )
+
+        print(f"Daily counts per summary of {num_occurrences} occurrences ({NUM_SERIES} daily series):")
+        results = {
+            "json output grouped": measure_peak(lambda: group_json(calendar, json_config)),
+            "aggregate output": measure_peak(lambda: aggregate(calendar, aggregate_config)),
+        }
+        baseline = results["json output grouped"][1]
+        for name, (duration, peak) in results.items():
+            print(f"  {name: <30} {peak / 2**20:10.1f} MiB peak   x{baseline / peak:6.1f}   {duration:8.1f} s")
+
+
+if __name__ == "__main__":
+    main()
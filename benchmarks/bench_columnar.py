@@ -0,0 +1,73 @@
+"""Benchmark: sorting, window clipping and duration filtering of expanded occurrences, per object vs columnar."""
+
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import recurring_ical_events
+from icalendar import Calendar
+from recurring_ical_events.adapters.event import EventAdapter
+from recurring_ical_events.occurrence import Occurrence
+
+from benchmarks.util_benchmark import build_calendar, measure, print_results
+from icalendar_events_cli.columnar import AVAILABLE_BACKENDS, OccurrenceColumns, get_backend, set_backend
+from icalendar_events_cli.icalendar import get_event_dtstart, get_event_period
+
+# ---- Benchmark -------------------------------------------------------------------------------------------------------
+
+BERLIN = ZoneInfo("Europe/Berlin")
+WINDOW = (datetime(2025, 3, 1, tzinfo=BERLIN), datetime(2025, 9, 1, tzinfo=BERLIN))
+MIN_DURATION = 3000
+
+
+def _per_object(events: list) -> None:
+    """Sort, clip and filter the occurrences one by one (date-time objects).
+
+    Arguments:
+        events: Expanded occurrences.
+    """
+    sorted(events, key=get_event_dtstart)
+    [event for event in events if Occurrence(EventAdapter(event)).is_in_span(*WINDOW)]
+    [event for event in events if _duration(event) >= MIN_DURATION]
+
+
+def _columnar(events: list) -> None:
+    """Sort, clip and filter the occurrences over columns.
+
+    Arguments:
+        events: Expanded occurrences.
+    """
+    columns = OccurrenceColumns(events)
+    columns.sorted()
+    columns.in_window(*WINDOW)
+    columns.filtered(min_duration=MIN_DURATION)
+
+
+def _duration(event: object) -> float:
+    """Get the duration of an occurrence.
+
+    Arguments:
+        event: Occurrence.
+
+    Returns:
+        float: Duration in seconds.
+    """
+    start, end = get_event_period(event)
+    return (end - start).total_seconds()
+
+
+def main() -> None:
+    """Run the benchmark."""
+    calendar = Calendar.from_ical(build_calendar(num_events=8000, num_series=40))
+    events = list(recurring_ical_events.of(calendar).between(datetime(2025, 1, 1), datetime(2025, 12, 31)))
+
+    results = {"per object": measure(lambda: _per_object(events))}
+    active_backend = get_backend()
+    for backend in AVAILABLE_BACKENDS:
+        set_backend(backend)
+        results[f"columnar ({backend.value})"] = measure(lambda: _columnar(events))
+    set_backend(active_backend)
+    print_results(f"Sort, clip and filter {len(events)} occurrences:", results, "per object")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Benchmark: 'count' and 'exists' output formats compared to a full JSON query."""
+
+import tempfile
+
+from benchmarks.util_benchmark import (
+    build_calendar,
+    build_config,
+    measure,
+    print_results,
+    run_cli_silent,
+    run_query_silent,
+    write_calendar,
+)
+from icalendar_events_cli.icalendar import parse_calendar
+
+# ---- Benchmark -------------------------------------------------------------------------------------------------------
+
+OUTPUT_FORMATS = ["json", "count", "exists"]
+
+
+def main() -> None:
+    """Run the benchmark."""
+    calendar_string = build_calendar(num_events=3000, num_series=20)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        calendar_url = write_calendar(f"{tmp_dir}/calendar.ics", calendar_string)
+        query = (
+            f"--calendar.url {calendar_url} --filter.start-date 2025-01-01T00:00:00+01:00"
+            + " --filter.end-date 2027-12-31T23:59:59+01:00"
+        )
+
+        # End-to-end incl. download and parsing
+        results = {
+            output_format: measure(
+                lambda output_format=output_format: run_cli_silent(f"{query} --output.format {output_format}")
+            )
+            for output_format in OUTPUT_FORMATS
+        }
+        print_results("End-to-end CLI run (3000 events, 20 daily series, 3 years):", results, "json")
+
+        # Query only on an already parsed calendar (daemon / cached setups)
+        calendar = parse_calendar(calendar_string)
+        configs = {
+            output_format: build_config(f"{query} --output.format {output_format}") for output_format in OUTPUT_FORMATS
+        }
+        results = {
+            output_format: measure(lambda config=config: run_query_silent(calendar, config))
+            for output_format, config in configs.items()
+        }
+        print_results("Query on parsed calendar (expansion, filtering, output):", results, "json")
+
+
+if __name__ == "__main__":
+    main()
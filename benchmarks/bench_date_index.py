@@ -0,0 +1,51 @@
+"""Benchmark: repeated date range queries on a parsed calendar with and without the date index."""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.util_benchmark import build_calendar, measure, print_results
+from icalendar_events_cli.dateindex import DateIndex
+from icalendar_events_cli.icalendar import parse_calendar, recurring_calendar
+
+# ---- Benchmark -------------------------------------------------------------------------------------------------------
+
+NUM_QUERIES = 50
+
+
+class _FilterConfig:
+    """Date range of a query (no text filters)."""
+
+    def __init__(self, start_date: datetime) -> None:
+        """Construct.
+
+        Arguments:
+            start_date: Start of the one day date range.
+        """
+        self.start_date = start_date
+        self.end_date = start_date + timedelta(days=1)
+        self.summary = self.description = self.location = None
+
+
+def main() -> None:
+    """Run the benchmark."""
+    calendar = parse_calendar(build_calendar(num_events=10000, num_series=20))
+    first_day = datetime(2025, 3, 1, tzinfo=timezone.utc)
+    configs = [_FilterConfig(first_day + timedelta(days=7 * index)) for index in range(NUM_QUERIES)]
+
+    begin = time.perf_counter()
+    date_index = DateIndex(calendar)
+    print(f"Date index build (10000 events, 20 daily series): {(time.perf_counter() - begin) * 1000:.1f} ms")
+
+    results = {
+        "expansion": measure(
+            lambda: [list(recurring_calendar(calendar, config)) for config in configs],
+        ),
+        "date index": measure(
+            lambda: [list(recurring_calendar(calendar, config, date_index=date_index)) for config in configs],
+        ),
+    }
+    print_results(f"{NUM_QUERIES} one-day queries on the parsed calendar:", results, "expansion")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Benchmark: jCal fast path (pre-selection of non-recurring events) compared to the regular parsing."""
+
+import tempfile
+
+from icalendar import Calendar
+
+from benchmarks.util_benchmark import (
+    build_calendar,
+    build_config,
+    measure,
+    print_results,
+    run_cli_silent,
+    run_query_silent,
+    write_calendar,
+)
+from icalendar_events_cli.icalendar import parse_calendar
+
+# ---- Benchmark -------------------------------------------------------------------------------------------------------
+
+WINDOWS = {
+    "one week": " --filter.start-date 2025-06-02T00:00:00+02:00 --filter.end-date 2025-06-09T00:00:00+02:00",
+    "one year": " --filter.start-date 2025-01-01T00:00:00+01:00 --filter.end-date 2026-01-01T00:00:00+01:00",
+}
+
+
+def main() -> None:
+    """Run the benchmark."""
+    calendar_string = build_calendar(num_events=10000, num_series=20)
+    jcal_string = Calendar.from_ical(calendar_string).to_json()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        ics_url = write_calendar(f"{tmp_dir}/calendar.ics", calendar_string)
+        jcal_url = write_calendar(f"{tmp_dir}/calendar.json", jcal_string)
+
+        for window, filter_args in WINDOWS.items():
+            # End-to-end incl. download and parsing
+            results = {
+                "iCalendar": measure(
+                    lambda filter_args=filter_args: run_cli_silent(f"--calendar.url {ics_url}{filter_args}")
+                ),
+                "jCal (fast path)": measure(
+                    lambda filter_args=filter_args: run_cli_silent(f"--calendar.url {jcal_url}{filter_args}")
+                ),
+            }
+            print_results(f"End-to-end CLI run (10000 events, 20 daily series, {window}):", results, "iCalendar")
+
+            # Parsing and query, with and without the pre-selection
+            config = build_config(f"--calendar.url {jcal_url}{filter_args} --output.format json")
+            results = {
+                "jCal (regular)": measure(lambda config=config: run_query_silent(parse_calendar(jcal_string), config)),
+                "jCal (fast path)": measure(
+                    lambda config=config: run_query_silent(parse_calendar(jcal_string, config.filter), config)
+                ),
+            }
+            print_results(f"Parsing and query ({window}):", results, "jCal (regular)")
+
+
+if __name__ == "__main__":
+    main()
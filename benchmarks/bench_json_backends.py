@@ -0,0 +1,51 @@
+"""Benchmark: JSON backends (stdlib json / orjson) for jCal input and the JSON based outputs."""
+
+from benchmarks.util_benchmark import build_calendar, build_config, measure, print_results, run_query_silent
+from icalendar_events_cli.icalendar import get_event_dtend, get_event_dtstart, get_event_summary, parse_calendar
+from icalendar_events_cli.jsoncodec import AVAILABLE_BACKENDS, JsonBackend, dumps, get_backend, loads, set_backend
+
+# ---- Benchmark -------------------------------------------------------------------------------------------------------
+
+QUERY = (
+    "--calendar.url file:///unused --filter.start-date 2025-01-01T00:00:00+01:00"
+    + " --filter.end-date 2027-12-31T23:59:59+01:00"
+)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    calendar = parse_calendar(build_calendar(num_events=5000))
+    jcal_string = calendar.to_json()
+    configs = {
+        output_format: build_config(f"{QUERY} --output.format {output_format}") for output_format in ["json", "jcal"]
+    }
+
+    records = [
+        {
+            "start-date": get_event_dtstart(event),
+            "end-date": get_event_dtend(event),
+            "summary": get_event_summary(event),
+        }
+        for event in calendar.walk("VEVENT")
+    ]
+
+    default_backend = get_backend()
+    try:
+        for title, benchmark in [
+            ("JSON decoding of the jCal string only:", lambda: loads(jcal_string)),
+            ("JSON encoding of the event records only:", lambda: dumps(records)),
+            ("jCal input parsing (5000 events):", lambda: parse_calendar(jcal_string)),
+            ("Output format 'json' (5000 events):", lambda: run_query_silent(calendar, configs["json"])),
+            ("Output format 'jcal' (5000 events):", lambda: run_query_silent(calendar, configs["jcal"])),
+        ]:
+            results = {}
+            for backend in AVAILABLE_BACKENDS:
+                set_backend(backend)
+                results[backend.value] = measure(benchmark)
+            print_results(title, results, JsonBackend.json.value)
+    finally:
+        set_backend(default_backend)
+
+
+if __name__ == "__main__":
+    main()
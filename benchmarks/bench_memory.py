@@ -0,0 +1,127 @@
+"""Benchmark: peak memory of the JSON output with full event components vs. compact occurrences.
+
+Usage: python -m benchmarks.bench_memory [number of occurrences (default: 1000000)]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from benchmarks.util_benchmark import build_config, write_calendar
+from icalendar_events_cli.icalendar import filter_events, parse_calendar, recurring_calendar
+from icalendar_events_cli.jsoncodec import dumps
+from icalendar_events_cli.output import _json_event, _json_filters, _sort_events, output_events
+
+# ---- Benchmark -------------------------------------------------------------------------------------------------------
+
+NUM_SERIES = 100
+LOCATIONS = [f"Building {index}, Main Campus, Room {index * 100}" for index in range(5)]
+DESCRIPTION = "Please read the attached agenda and join the meeting on time. " * 20
+
+
+def build_series_calendar(num_series: int, start: datetime) -> str:
+    """Build a calendar of daily series repeating the same long texts.
+
+    Arguments:
+        num_series: Number of daily series.
+        start: Start of all series.
+
+    Returns:
+        iCalendar content string.
+    """
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//icalendar-events-cli//benchmark//EN"]
+    for index in range(num_series):
+        series_start = start + timedelta(minutes=index)
+        lines.extend(
+            [
+                "BEGIN:VEVENT",
+                f"UID:benchmark-series-{index}",
+                "DTSTAMP:20250101T000000Z",
+                f"DTSTART;TZID=Europe/Berlin:{series_start.strftime('%Y%m%dT%H%M%S')}",
+                f"DTEND;TZID=Europe/Berlin:{(series_start + timedelta(hours=1)).strftime('%Y%m%dT%H%M%S')}",
+                f"SUMMARY:Team meeting {index % 10}",
+                f"DESCRIPTION:{DESCRIPTION}",
+                f"LOCATION:{LOCATIONS[index % len(LOCATIONS)]}",
+                "CATEGORIES:Meeting,Team",
+                "ORGANIZER:mailto:organizer@example.org",
+                "RRULE:FREQ=DAILY",
+                "END:VEVENT",
+            ]
+        )
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(lines) + "\r\n"
+
+
+def output_components(calendar: object, config: dict) -> None:
+    """Previous JSON output: sorted event components, list of all JSON records and the complete output string.
+
+    Arguments:
+        calendar: Parsed calendar.
+        config: Configuration hierarchy.
+    """
+    events = _sort_events(filter_events(recurring_calendar(calendar, config.filter), config.filter))
+    output = dumps({"filter": _json_filters(config), "events": [_json_event(event) for event in events]})
+    with open(config.output.file, "w", encoding="utf-8") as file:
+        file.write(output)
+
+
+def output_compact(calendar: object, config: dict) -> None:
+    """Current JSON output: compact occurrences, records serialized one by one.
+
+    Arguments:
+        calendar: Parsed calendar.
+        config: Configuration hierarchy.
+    """
+    events = filter_events(recurring_calendar(calendar, config.filter), config.filter)
+    output_events(calendar, events, config)
+
+
+def measure_peak(function: Callable[[], object]) -> tuple[float, int]:
+    """Measure duration and peak memory allocation of a function.
+
+    Arguments:
+        function: Function to be measured.
+
+    Returns:
+        tuple[float, int]: Duration in seconds and peak allocated memory in bytes.
+    """
+    tracemalloc.start()
+    begin = time.perf_counter()
+    function()
+    duration = time.perf_counter() - begin
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duration, peak
+
+
+def main() -> None:
+    """Run the benchmark."""
+    num_occurrences = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    start = datetime(2025, 1, 1, 8, 0, 0)
+    end = start + timedelta(days=num_occurrences // NUM_SERIES)
+    calendar = parse_calendar(build_series_calendar(NUM_SERIES, start))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        calendar_url = write_calendar(os.path.join(tmp_dir, "calendar.ics"), "")
+        config = build_config(
+            f"--calendar.url {calendar_url} --filter.start-date {start.isoformat()}+01:00"
+            + f" --filter.end-date {end.isoformat()}+01:00 --output.format json"
+            + f" --output.file {os.path.join(tmp_dir, 'events.json')}"
+        )
+
+        print(f"JSON output of {num_occurrences} occurrences ({NUM_SERIES} daily series):")
+        results = {
+            "event components": measure_peak(lambda: output_components(calendar, config)),
+            "compact occurrences": measure_peak(lambda: output_compact(calendar, config)),
+        }
+        baseline = results["event components"][1]
+        for name, (duration, peak) in results.items():
+            print(f"  {name: <30} {peak / 2**20:10.1f} MiB peak   x{baseline / peak:6.1f}   {duration:8.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Benchmark: time-to-result of a large calendar served by a throttled server, sequential vs pipelined download."""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.util_benchmark import build_calendar, measure, print_results, run_cli_silent
+
+# ---- Benchmark -------------------------------------------------------------------------------------------------------
+
+BANDWIDTH = 512 * 1024  # Bandwidth of the throttled server in bytes per second
+CHUNK_SIZE = 16 * 1024
+CALENDAR = build_calendar(num_events=10000).encode("utf-8")
+
+
+class ThrottledCalendarHandler(BaseHTTPRequestHandler):
+    """Request handler serving the calendar with a limited bandwidth."""
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name;reason=Name defined by BaseHTTPRequestHandler
+        """Serve the calendar chunk by chunk."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/calendar; charset=utf-8")
+        self.send_header("Content-Length", str(len(CALENDAR)))
+        self.end_headers()
+        for index in range(0, len(CALENDAR), CHUNK_SIZE):
+            self.wfile.write(CALENDAR[index : index + CHUNK_SIZE])
+            self.wfile.flush()
+            time.sleep(CHUNK_SIZE / BANDWIDTH)
+
+    def log_message(self, *_: object) -> None:
+        """Suppress the request logging."""
+
+
+def main() -> None:
+    """Run the benchmark."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ThrottledCalendarHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    cli_args = (
+        f"--calendar.url http://127.0.0.1:{server.server_port}/calendar.ics --output.format count"
+        + " --filter.start-date 2025-01-01T00:00:00 --filter.end-date 2025-01-31T23:59:59"
+    )
+
+    results = {
+        "sequential": measure(lambda: run_cli_silent(cli_args), repeat=2),
+        "pipelined": measure(lambda: run_cli_silent(f"{cli_args} --calendar.pipelined true"), repeat=2),
+    }
+    server.shutdown()
+    print_results(
+        f"Time-to-result of {len(CALENDAR) / 1024 / 1024:.1f} MiB served at {BANDWIDTH / 1024:.0f} KiB/s:",
+        results,
+        "sequential",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Benchmark: periodic (e.g. cron) queries of an unchanged calendar with and without the result cache."""
+
+import tempfile
+from datetime import datetime, timedelta
+
+from benchmarks.util_benchmark import build_calendar, measure, print_results, run_cli_silent, write_calendar
+
+# ---- Benchmark -------------------------------------------------------------------------------------------------------
+
+NUM_QUERIES = 10
+
+
+def _queries(calendar_url: str, start_step: timedelta, cache_args: str = "") -> None:
+    """Run the periodic queries of the rest of the year.
+
+    Arguments:
+        calendar_url: URL of the calendar.
+        start_step: Step of the start date between the queries.
+        cache_args: Cache command line arguments.
+    """
+    first_start = datetime(2025, 3, 1, 8, 0, 0)
+    for index in range(NUM_QUERIES):
+        start_date = (first_start + index * start_step).isoformat()
+        run_cli_silent(
+            f"--calendar.url {calendar_url} --output.format json --filter.start-date {start_date}"
+            + f" --filter.end-date 2025-12-31T23:59:59{cache_args}"
+        )
+
+
+def _compare(calendar_url: str, cache_dir: str, title: str, start_step: timedelta) -> None:
+    """Compare the periodic queries without cache, with cache and with snapped cache.
+
+    Arguments:
+        calendar_url: URL of the calendar.
+        cache_dir: Base directory of the caches.
+        title: Title of the results.
+        start_step: Step of the start date between the queries.
+    """
+    results = {
+        "no cache": measure(lambda: _queries(calendar_url, start_step), repeat=1),
+        "cache": measure(lambda: _queries(calendar_url, start_step, f" --cache.dir {cache_dir}/exact"), repeat=1),
+        "cache, snapped (1 h)": measure(
+            lambda: _queries(calendar_url, start_step, f" --cache.dir {cache_dir}/snap --cache.snap 3600"), repeat=1
+        ),
+    }
+    print_results(f"{NUM_QUERIES} queries, {title}:", results, "no cache")
+
+
+def main() -> None:
+    """Run the benchmark."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        calendar_url = write_calendar(f"{tmp_dir}/calendar.ics", build_calendar(num_events=3000, num_series=20))
+        _compare(calendar_url, f"{tmp_dir}/same", "same start date", timedelta(0))
+        _compare(calendar_url, f"{tmp_dir}/moving", "start date moving by one minute", timedelta(minutes=1))
+
+
+if __name__ == "__main__":
+    main()
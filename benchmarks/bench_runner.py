@@ -0,0 +1,71 @@
+"""Benchmark: many configuration files using a few calendars, run as separate processes or by the 'run' command."""
+
+import json
+import shutil
+import subprocess
+import tempfile
+
+from benchmarks.util_benchmark import build_calendar, measure, print_results, write_calendar
+
+# ---- Benchmark -------------------------------------------------------------------------------------------------------
+
+NUM_CALENDARS = 4
+NUM_CONFIGS = 40
+NUM_WORKERS = 4  # The speedup of multiple workers depends on the number of CPUs
+
+
+def _write_configs(tmp_dir: str) -> list[str]:
+    """Write the configuration files: Each calendar is used by the same number of configurations.
+
+    Arguments:
+        tmp_dir: Directory of the calendars and configuration files.
+
+    Returns:
+        list[str]: Paths of the configuration files.
+    """
+    calendar_urls = [
+        write_calendar(f"{tmp_dir}/calendar{index}.ics", build_calendar(num_events=3000, num_series=20))
+        for index in range(NUM_CALENDARS)
+    ]
+    paths = []
+    for index in range(NUM_CONFIGS):
+        config = {
+            "calendar": {"url": calendar_urls[index % NUM_CALENDARS]},
+            "filter": {
+                "start_date": "2025-03-01T00:00:00+01:00",
+                "end_date": "2025-06-30T23:59:59+02:00",
+                "summary": f"Event {index}.*",
+            },
+            "output": {"format": "json", "file": f"{tmp_dir}/output{index}.json"},
+        }
+        paths.append(f"{tmp_dir}/config{index}.json")
+        with open(paths[-1], "w", encoding="utf-8") as file:
+            json.dump(config, file)
+    return paths
+
+
+def _run(*args: str) -> None:
+    """Run the command line util in a separate process.
+
+    Arguments:
+        args: Command line arguments.
+    """
+    subprocess.run([shutil.which("icalendar-events-cli"), *args], check=True, capture_output=True)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = _write_configs(tmp_dir)
+        results = {
+            "separate processes": measure(lambda: [_run("--config", path) for path in paths], repeat=1),
+            "run, 1 worker": measure(lambda: _run("run", "--workers", "1", *paths), repeat=1),
+            f"run, {NUM_WORKERS} workers": measure(
+                lambda: _run("run", "--workers", str(NUM_WORKERS), *paths), repeat=1
+            ),
+        }
+        print_results(f"{NUM_CONFIGS} configurations using {NUM_CALENDARS} calendars:", results, "separate processes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Benchmark: latency of queries of a slow calendar server with and without stale-while-revalidate copies."""
+
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.util_benchmark import build_calendar, measure, print_results, run_cli_silent
+
+# ---- Benchmark -------------------------------------------------------------------------------------------------------
+
+SERVER_DELAY = 2.0  # Response delay of the calendar server in seconds
+CALENDAR = build_calendar(num_events=500, num_series=5).encode("utf-8")
+
+
+class SlowCalendarHandler(BaseHTTPRequestHandler):
+    """Request handler serving the calendar after a delay."""
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name;reason=Name defined by BaseHTTPRequestHandler
+        """Serve the calendar."""
+        time.sleep(SERVER_DELAY)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/calendar")
+        self.send_header("Content-Length", str(len(CALENDAR)))
+        self.end_headers()
+        self.wfile.write(CALENDAR)
+
+    def log_message(self, *_: object) -> None:
+        """Suppress the request logging."""
+
+
+def main() -> None:
+    """Run the benchmark."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowCalendarHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    cli_args = (
+        f"--calendar.url http://127.0.0.1:{server.server_port}/calendar.ics --output.format count"
+        + " --filter.start-date 2025-01-01T00:00:00 --filter.end-date 2025-01-31T23:59:59"
+    )
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        stale_args = f"{cli_args} --cache.dir {cache_dir} --cache.max-stale 3600"
+        run_cli_silent(stale_args)  # Initial copy
+
+        results = {
+            "download": measure(lambda: run_cli_silent(cli_args)),
+            "stale copy, refresh deferred": measure(lambda: run_cli_silent(f"{stale_args} --cache.refresh-budget 0")),
+            "stale copy, refresh awaited": measure(lambda: run_cli_silent(stale_args)),
+        }
+    server.shutdown()
+    print_results(f"Query latency, calendar server responding after {SERVER_DELAY} s:", results, "download")
+
+
+if __name__ == "__main__":
+    main()
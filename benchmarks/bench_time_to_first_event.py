@@ -0,0 +1,56 @@
+"""Benchmark: time until the first event of a bulk JSON export is written, by order of the output events."""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+from benchmarks.util_benchmark import build_calendar, print_results, write_calendar
+
+# ---- Benchmark -------------------------------------------------------------------------------------------------------
+
+ORDERS = ["start", "series", "none"]
+
+
+def _export(calendar_url: str, order: str) -> tuple[float, float]:
+    """Run a JSON export in a separate process and read its output as a consuming tool would.
+
+    Arguments:
+        calendar_url: URL of the calendar.
+        order: Order of the output events.
+
+    Returns:
+        tuple[float, float]: Durations in seconds until the first event was read and until the export finished.
+    """
+    args = [
+        shutil.which("icalendar-events-cli"),
+        f"--calendar.url={calendar_url}",
+        "--filter.start-date=2025-01-01T00:00:00+01:00",
+        "--filter.end-date=2025-12-31T23:59:59+01:00",
+        "--output.format=json",
+        f"--output.order={order}",
+    ]
+    first_event = None
+    begin = time.perf_counter()
+    # Unbuffered stdout: Each event is visible to the consumer as soon as it is written
+    with subprocess.Popen(args, stdout=subprocess.PIPE, env={**os.environ, "PYTHONUNBUFFERED": "1"}) as process:
+        for line in process.stdout:
+            if first_event is None and line.startswith(b"    {"):  # First line of the first event record
+                first_event = time.perf_counter() - begin
+    return first_event, time.perf_counter() - begin
+
+
+def main() -> None:
+    """Run the benchmark."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        calendar_url = write_calendar(f"{tmp_dir}/calendar.ics", build_calendar(num_events=8000, num_series=20))
+        durations = {f"order {order}": _export(calendar_url, order) for order in ORDERS}
+        first_events = {name: first_event for name, (first_event, _) in durations.items()}
+        print_results("JSON export of 8000 events and 20 daily series, first event:", first_events, "order start")
+        totals = {name: total for name, (_, total) in durations.items()}
+        print_results("JSON export of 8000 events and 20 daily series, total:", totals, "order start")
+
+
+if __name__ == "__main__":
+    main()
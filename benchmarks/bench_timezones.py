@@ -0,0 +1,99 @@
+"""Benchmark: calendar with many custom VTIMEZONE components (e.g. Exchange / Outlook) and long transition lists."""
+
+import tempfile
+from datetime import date
+from zoneinfo import ZoneInfo
+
+from icalendar import Timezone
+
+import icalendar_events_cli.timezones as timezones_module
+from benchmarks.util_benchmark import measure, print_results, run_cli_silent, write_calendar
+
+# ---- Benchmark -------------------------------------------------------------------------------------------------------
+
+TIMEZONE_NAMES = ["Europe/Berlin", "America/New_York", "Australia/Sydney", "Europe/London", "America/Chicago"]
+NUM_TIMEZONES = 30
+NUM_EVENTS = 3000
+
+
+def _build_calendar() -> str:
+    """Build a calendar with custom VTIMEZONE components (transitions 1970 - 2030), single events and daily series.
+
+    Returns:
+        iCalendar content string.
+    """
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//icalendar-events-cli//benchmark//EN"]
+    for index in range(NUM_TIMEZONES):
+        timezone = Timezone.from_tzinfo(
+            ZoneInfo(TIMEZONE_NAMES[index % len(TIMEZONE_NAMES)]),
+            tzid=f"Custom {index}",
+            first_date=date(1970, 1, 1),
+            last_date=date(2030, 1, 1),
+        )
+        lines.extend(timezone.to_ical().decode("utf-8").splitlines())
+    for index in range(NUM_EVENTS):
+        day = f"2025{index % 12 + 1:02d}{index % 28 + 1:02d}"
+        lines.extend(
+            [
+                "BEGIN:VEVENT",
+                f"UID:benchmark-event-{index}",
+                "DTSTAMP:20250101T000000Z",
+                f"DTSTART;TZID=Custom {index % NUM_TIMEZONES}:{day}T100000",
+                f"DTEND;TZID=Custom {index % NUM_TIMEZONES}:{day}T110000",
+                f"SUMMARY:Benchmark Event {index % 10}",
+                "END:VEVENT",
+            ]
+        )
+    for index in range(NUM_TIMEZONES):
+        lines.extend(
+            [
+                "BEGIN:VEVENT",
+                f"UID:benchmark-series-{index}",
+                "DTSTAMP:20250101T000000Z",
+                f"DTSTART;TZID=Custom {index}:20200106T090000",
+                f"DTEND;TZID=Custom {index}:20200106T093000",
+                f"SUMMARY:Benchmark Series {index}",
+                "RRULE:FREQ=DAILY",
+                "END:VEVENT",
+            ]
+        )
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(lines) + "\r\n"
+
+
+def _query(calendar_url: str, summary: str, cache_args: str = "") -> None:
+    """Run a query as a new process would (no timezones created yet).
+
+    Arguments:
+        calendar_url: URL of the calendar.
+        summary: Summary filter. Differs between the queries: Results are never served from the result cache.
+        cache_args: Cache command line arguments.
+    """
+    timezones_module._provider._timezones.clear()  # pylint: disable=protected-access
+    run_cli_silent(
+        f"--calendar.url {calendar_url} --output.format json --filter.summary '{summary}'"
+        + f" --filter.start-date 2025-01-01T00:00:00 --filter.end-date 2025-12-31T23:59:59{cache_args}"
+    )
+
+
+def main() -> None:
+    """Run the benchmark."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        calendar_url = write_calendar(f"{tmp_dir}/calendar.ics", _build_calendar())
+        cache_args = f" --cache.dir {tmp_dir}/cache"
+        _query(calendar_url, "Warm-up", cache_args)  # Writes the timezones to the cache
+
+        results = {"dateutil timezones": measure(lambda: _query(calendar_url, "Benchmark.*"), repeat=1)}
+        results["transition tables, created"] = measure(
+            lambda: _query(calendar_url, "Benchmark.*", f" --cache.dir {tmp_dir}/created"), repeat=1
+        )
+        results["transition tables, cached"] = measure(
+            lambda: _query(calendar_url, "Benchmark .*", cache_args), repeat=1
+        )
+        print_results(
+            f"{NUM_EVENTS} events and daily series in {NUM_TIMEZONES} custom timezones:", results, "dateutil timezones"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Utilities for the benchmarks: synthetic calendars and timing."""
+
+import contextlib
+import io
+import os
+import shlex
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from icalendar_events_cli.__main__ import cli
+from icalendar_events_cli.argparse import parse_config
+from icalendar_events_cli.icalendar import filter_events, recurring_calendar
+from icalendar_events_cli.output import output_events
+
+# ---- Synthetic Calendars ---------------------------------------------------------------------------------------------
+
+
+def build_calendar(num_events: int, num_series: int = 0, start: datetime = datetime(2025, 1, 1, 8, 0, 0)) -> str:
+    """Build a synthetic iCalendar string.
+
+    Arguments:
+        num_events: Number of non-recurring events. One event every hour beginning at start.
+        num_series: Number of daily recurring series (unbounded).
+        start: Start date/time of the first event.
+
+    Returns:
+        iCalendar content string.
+    """
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//icalendar-events-cli//benchmark//EN", "CALSCALE:GREGORIAN"]
+    for index in range(num_events):
+        event_start = start + timedelta(hours=index)
+        event_end = event_start + timedelta(minutes=45)
+        lines.extend(
+            [
+                "BEGIN:VEVENT",
+                f"UID:benchmark-event-{index}",
+                "DTSTAMP:20250101T000000Z",
+                f"DTSTART;TZID=Europe/Berlin:{event_start.strftime('%Y%m%dT%H%M%S')}",
+                f"DTEND;TZID=Europe/Berlin:{event_end.strftime('%Y%m%dT%H%M%S')}",
+                f"SUMMARY:Benchmark Event {index % 10}",
+                f"DESCRIPTION:Description of benchmark event {index}",
+                f"LOCATION:Room {index % 5}",
+                "END:VEVENT",
+            ]
+        )
+    for index in range(num_series):
+        lines.extend(
+            [
+                "BEGIN:VEVENT",
+                f"UID:benchmark-series-{index}",
+                "DTSTAMP:20250101T000000Z",
+                f"DTSTART;TZID=Europe/Berlin:{start.strftime('%Y%m%dT%H%M%S')}",
+                f"DTEND;TZID=Europe/Berlin:{(start + timedelta(hours=1)).strftime('%Y%m%dT%H%M%S')}",
+                f"SUMMARY:Benchmark Series {index}",
+                "RRULE:FREQ=DAILY",
+                "END:VEVENT",
+            ]
+        )
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(lines) + "\r\n"
+
+
+def write_calendar(path: str, calendar_string: str) -> str:
+    """Write a calendar string to a file.
+
+    Arguments:
+        path: Path of the calendar file.
+        calendar_string: Calendar content.
+
+    Returns:
+        file:// URL of the written calendar file.
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(calendar_string)
+    return f"file://{os.path.abspath(path)}"
+
+
+# ---- Timing ----------------------------------------------------------------------------------------------------------
+
+
+def measure(function: Callable[[], object], repeat: int = 3) -> float:
+    """Measure the best wall-clock time of multiple runs.
+
+    Arguments:
+        function: Function to be measured.
+        repeat: Number of runs.
+
+    Returns:
+        Best run duration in seconds.
+    """
+    durations = []
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - begin)
+    return min(durations)
+
+
+def run_cli_silent(cli_args: str) -> int:
+    """Run the command line util with suppressed stdout.
+
+    Arguments:
+        cli_args: The command line arguments string passed.
+
+    Returns:
+        Numeric exit code
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        return cli(shlex.split(cli_args))
+
+
+def build_config(cli_args: str) -> dict:
+    """Parse a configuration hierarchy from command line arguments.
+
+    Arguments:
+        cli_args: The command line arguments string.
+
+    Returns:
+        Parsed configuration hierarchy.
+    """
+    return parse_config(prog="benchmark", version="", copy_right="", author="", arg_list=shlex.split(cli_args))
+
+
+def run_query_silent(calendar: object, config: dict) -> int:
+    """Run expansion, filtering and output on an already parsed calendar with suppressed stdout.
+
+    Arguments:
+        calendar: Parsed calendar.
+        config: Configuration hierarchy.
+
+    Returns:
+        Numeric exit code
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        events = recurring_calendar(calendar, config.filter)
+        events = filter_events(events, config.filter)
+        return output_events(calendar, events, config)
+
+
+def print_results(title: str, results: dict[str, float], baseline: str) -> None:
+    """Print benchmark results relative to a baseline.
+
+    Arguments:
+        title: Title of the benchmark.
+        results: Measured durations in seconds per benchmark case.
+        baseline: Name of the benchmark case used as baseline.
+    """
+    print(title)
+    for name, duration in results.items():
+        print(f"  {name: <30} {duration * 1000:10.1f} ms   x{results[baseline] / duration:6.1f}")
@@ -3,11 +3,12 @@
 # ---- Imports --------------------------------------------------------------------------------------------------------
 import importlib.metadata
 import os
+import sys
+from functools import partial
 
-from .argparse import parse_config
-from .downloader import download_calendar
-from .icalendar import filter_events, parse_calendar, recurring_calendar
-from .output import output_events
+from .argparse import RUN_COMMAND, parse_config
+from .query import download_and_query, run_with_metrics
+from .runner import run_configs
 
 # ---- Module Meta-Data ------------------------------------------------------------------------------------------------
 __prog__ = "icalendar-events-cli"
@@ -28,15 +29,18 @@ def cli(arg_list: list[str] | None = None) -> int:
     Returns:
         Numeric exit code
     """
+    arg_list = sys.argv[1:] if arg_list is None else arg_list
+    version = importlib.metadata.version(__dist_name__)
     try:
+        if arg_list[:1] == [RUN_COMMAND]:
+            return run_configs(
+                prog=__prog__, version=version, copy_right=__copyright__, author=__author__, arg_list=arg_list[1:]
+            )
+
         config = parse_config(
-            prog=__prog__,
-            version=importlib.metadata.version(__dist_name__),
-            copy_right=__copyright__,
-            author=__author__,
-            arg_list=arg_list,
+            prog=__prog__, version=version, copy_right=__copyright__, author=__author__, arg_list=arg_list
         )
-        return _main_logic(config)
+        return _main_logic(config, version)
 
     except SystemExit as e:
         return e.code
@@ -49,19 +53,14 @@ def cli(arg_list: list[str] | None = None) -> int:
         return 1
 
 
-def _main_logic(config: dict) -> int:
+def _main_logic(config: dict, version: str) -> int:
     """Main program logic.
 
     Arguments:
         config: Configuration hierarchy
+        version: Program version
 
     Returns:
         Numeric exit code
     """
-    calendar_string = download_calendar(config.calendar)
-    calendar = parse_calendar(calendar_string)
-    events = recurring_calendar(calendar, config.filter)
-    events = filter_events(events, config.filter)
-    output_events(calendar, events, config)
-
-    return os.EX_OK
+    return run_with_metrics(config, partial(download_and_query, config, version=version))
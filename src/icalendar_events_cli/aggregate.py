@@ -0,0 +1,150 @@
+"""Aggregation of streamed events into buckets by time period and / or summary group."""
+
+# ---- Imports ---------------------------------------------------------------------------------------------------------
+import re
+from collections.abc import Iterable
+from datetime import date, datetime, timedelta, tzinfo
+from enum import Enum
+
+from .icalendar import Event, get_event_period, get_event_summary
+
+# ---- Classes ---------------------------------------------------------------------------------------------------------
+
+
+class AggregateBucket(Enum):
+    """All possible time periods of the aggregate buckets."""
+
+    none = "none"  # pylint: disable=invalid-name;reason=camel_case style wanted for cli param
+    day = "day"  # pylint: disable=invalid-name;reason=camel_case style wanted for cli param
+    week = "week"  # pylint: disable=invalid-name;reason=camel_case style wanted for cli param
+    month = "month"  # pylint: disable=invalid-name;reason=camel_case style wanted for cli param
+
+
+# ---- Functions -------------------------------------------------------------------------------------------------------
+
+
+def aggregate_events(
+    events: Iterable[Event], bucket: AggregateBucket, timezone: tzinfo, group_pattern: str | None = None
+) -> list[dict]:
+    """Count the events and sum up their durations per bucket.
+
+    The events are consumed as a stream. Only the totals of the buckets are kept in memory.
+
+    Arguments:
+        events: Calendar events (any order).
+        bucket: Time period of the buckets. Each event is counted in the period of its start date.
+        timezone: Timezone of the periods. Dates of full-day and floating events are taken as they are.
+        group_pattern: Optional RegEx grouping the events by their summary (anchored at the start like re.match):
+                       first capture group or the whole match. Events not matching (or without summary) are grouped
+                       as None.
+
+    Returns:
+        list[dict]: Buckets sorted by period and group: period (label and start date), group, count and total
+                    duration in seconds. Buckets without events are omitted.
+    """
+    regex = None if group_pattern is None else re.compile(group_pattern)
+    totals = {}  # (period start date, group) -> [count, duration]
+    for event in events:
+        start, end = get_event_period(event)
+        period_start = None if bucket == AggregateBucket.none else _period_start(_start_date(event, timezone), bucket)
+        group = None if regex is None else _group(regex, get_event_summary(event))
+        total = totals.setdefault((period_start, group), [0, 0])
+        total[0] += 1
+        total[1] += int((end - start).total_seconds())
+
+    buckets = []
+    for (period_start, group), (count, duration) in sorted(totals.items(), key=_bucket_order):
+        record = {}
+        if period_start is not None:
+            record["period"] = _period_label(period_start, bucket)
+            record["start-date"] = period_start
+        if regex is not None:
+            record["group"] = group
+        record["count"] = count
+        record["duration"] = duration
+        buckets.append(record)
+    return buckets
+
+
+def _start_date(event: Event, timezone: tzinfo) -> date:
+    """Get the start date of an event in a timezone.
+
+    Arguments:
+        event: Calendar event.
+        timezone: Timezone.
+
+    Returns:
+        date: Start date. Dates of full-day and floating events as they are.
+    """
+    start = event.decoded("DTSTART")
+    if not isinstance(start, datetime):
+        return start
+    if start.tzinfo is None:
+        return start.date()
+    return start.astimezone(timezone).date()
+
+
+def _period_start(start_date: date, bucket: AggregateBucket) -> date:
+    """Get the first day of the period of a date.
+
+    Arguments:
+        start_date: Date.
+        bucket: Time period.
+
+    Returns:
+        date: First day of the period (ISO weeks start on Monday).
+    """
+    if bucket == AggregateBucket.week:
+        return start_date - timedelta(days=start_date.weekday())
+    if bucket == AggregateBucket.month:
+        return start_date.replace(day=1)
+    return start_date
+
+
+def _period_label(period_start: date, bucket: AggregateBucket) -> str:
+    """Get the label of a period.
+
+    Arguments:
+        period_start: First day of the period.
+        bucket: Time period.
+
+    Returns:
+        str: ISO 8601 label: 2025-01-31 (day), 2025-W05 (ISO week) or 2025-01 (month).
+    """
+    if bucket == AggregateBucket.week:
+        iso_year, iso_week, _ = period_start.isocalendar()
+        return f"{iso_year}-W{iso_week:02d}"
+    if bucket == AggregateBucket.month:
+        return period_start.strftime("%Y-%m")
+    return period_start.isoformat()
+
+
+def _group(regex: re.Pattern, summary: str | None) -> str | None:
+    """Get the group of a summary.
+
+    Arguments:
+        regex: Group RegEx.
+        summary: Event summary. None if the event has no summary.
+
+    Returns:
+        str | None: First capture group (whole match if the RegEx has no groups) or None if not matching.
+    """
+    if summary is None:
+        return None
+    match = regex.match(summary)
+    if match is None:
+        return None
+    return match.group(1 if regex.groups else 0)
+
+
+def _bucket_order(item: tuple) -> tuple:
+    """Sort key of the buckets: period, then group (events not matching the group RegEx first).
+
+    Arguments:
+        item: ((period start, group), totals)
+
+    Returns:
+        tuple: Sort key.
+    """
+    (period_start, group), _ = item
+    return (period_start or date.min, group is not None, group or "")
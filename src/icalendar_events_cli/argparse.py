@@ -5,6 +5,7 @@ import re
 import sys
 from argparse import ArgumentTypeError
 from datetime import datetime
+from typing import Literal
 
 import pytz
 from jsonargparse import ArgumentParser, DefaultHelpFormatter
@@ -12,10 +13,15 @@ from pydantic import SecretStr
 from rich_argparse import RawTextRichHelpFormatter
 from tzlocal import get_localzone
 
-from .output import OutputFormat
+from .aggregate import AggregateBucket
+from .downloader import CalendarSource
+from .merge import Deduplication
+from .output import EVENT_FIELDS, FreeBusyFormat, OutputFormat, OutputOrder, OutputTarget, output_targets
 
 # ---- Globals ---------------------------------------------------------------------------------------------------------
 
+RUN_COMMAND = "run"  # Command running multiple configuration files
+
 _local_timezone = pytz.timezone(get_localzone().key)
 
 
@@ -41,6 +47,7 @@ def parse_config(prog: str, version: str, copy_right: str, author: str, arg_list
         prog=prog,
         description="Command-line tool to read and filter events from iCalendar (RFC 5545) or "
         + "jCal (RFC 7265) calendars."
+        + f" Run multiple configuration files at once with '{prog} {RUN_COMMAND} <config files>'."
         + f" | Version {version} | {copy_right}",
         version=f"| Version {version}\n{copy_right} {author}",
         default_config_files=["./config.json"],
@@ -59,6 +66,15 @@ def parse_config(prog: str, version: str, copy_right: str, author: str, arg_list
         required=True,
         help="""URL of the calendar (iCalendar or jCal format).
 Also URLs to local files with schema file://<absolute path to local file> are supported.""",
+    )
+    arg_parser.add_argument(
+        "--calendar.source",
+        type=CalendarSource,
+        default=CalendarSource.download,
+        help="""Type of the calendar source:
+- download: Download the complete calendar file (HTTP(S) or local file).
+- caldav: Query a CalDAV calendar collection (HTTP(S)). The server only returns the events within the filtered date
+  range and, if supported, matching the summary / location filters (calendar-query REPORT).""",
     )
     arg_parser.add_argument(
         "--calendar.verify-url",
@@ -76,6 +92,63 @@ Also URLs to local files with schema file://<absolute path to local file> are su
         type=SecretStr,
         help="Password for calendar URL HTTP authentication (basic authentication)",
     )
+    arg_parser.add_argument(
+        "--calendar.connect-timeout",
+        type=float,
+        default=10.0,
+        help="Timeout in seconds for establishing the connection to the calendar server.",
+    )
+    arg_parser.add_argument(
+        "--calendar.read-timeout",
+        type=float,
+        default=30.0,
+        help="Timeout in seconds waiting for data from the calendar server (between two received packets).",
+    )
+    arg_parser.add_argument(
+        "--calendar.total-timeout",
+        type=float | None,
+        default=None,
+        help="""Timeout in seconds of the complete download incl. retries (e.g. a server trickling the data slower than
+the read timeout). Not applied to CalDAV sources. If not set, the total duration of the download is not limited.""",
+    )
+    arg_parser.add_argument(
+        "--calendar.retries",
+        type=int,
+        default=2,
+        help="""Number of retries of failed requests (connection errors, timeouts and the transient error responses
+429, 500, 502, 503 and 504).""",
+    )
+    arg_parser.add_argument(
+        "--calendar.retry-backoff",
+        type=float,
+        default=0.5,
+        help="""Backoff factor in seconds of the retries: the n-th retry waits backoff * 2^(n-1) seconds (no wait before
+the first retry). Retry-After headers are ignored.""",
+    )
+    arg_parser.add_argument(
+        "--calendar.pipelined",
+        type=bool,
+        default=False,
+        help="""Stream the downloads and parse the calendar components (iCalendar format) while later parts of the
+calendars are still downloaded. Shortens the time-to-result of large calendars on slow links. Not applied to CalDAV
+sources, calendar copies (--cache.max-stale) and the 'run' command.""",
+    )
+    arg_parser.add_argument(
+        "--calendar.merge-urls",
+        type=list[str],
+        default=[],
+        help="""URLs of further calendars merged into the calendar (e.g. overlapping regional holiday feeds).
+The same SSL verification and authentication settings are used for all URLs.""",
+    )
+    arg_parser.add_argument(
+        "--calendar.deduplicate",
+        type=Deduplication,
+        default=Deduplication.uid,
+        help="""De-duplication of the (merged) calendar events:
+- uid: Events with the same UID and RECURRENCE-ID. The copy with the highest SEQUENCE is kept.
+- content: Additionally event series with different UIDs but the same dates, recurrence rules and texts
+  (whitespace and case normalized).""",
+    )
 
     # ---- Filtering ----
 
@@ -119,6 +192,69 @@ Also URLs to local files with schema file://<absolute path to local file> are su
         help="RegEx to filter calendar events based on the location attribute.",
     )
 
+    arg_parser.add_argument(
+        "--filter.text-index",
+        type=bool,
+        default=False,
+        help="""Build a trigram index of the event texts to skip the expansion of all series which cannot match
+the summary / description / location filters. Pays off for large calendars with many recurring series.""",
+    )
+
+    arg_parser.add_argument(
+        "--filter.date-index",
+        type=bool,
+        default=False,
+        help="""Build a sorted start / end date index of all non-recurring events. Only recurring series are expanded,
+non-recurring events are looked up by bisection. Pays off if the parsed calendar is queried multiple times.""",
+    )
+
+    arg_parser.add_argument(
+        "--filter.max-occurrences",
+        type=int | None,
+        default=None,
+        help="""Maximum number of expanded event occurrences of all series. If reached, the expansion stops and the
+truncated series are reported (exit code 3).""",
+    )
+
+    arg_parser.add_argument(
+        "--filter.max-series-occurrences",
+        type=int | None,
+        default=None,
+        help="""Maximum number of expanded occurrences per series. Protects against unbounded FREQ=MINUTELY /
+FREQ=SECONDLY series. If reached, the remaining occurrences of the series are skipped and the truncated series are
+reported (exit code 3).""",
+    )
+
+    arg_parser.add_argument(
+        "--filter.time-budget",
+        type=float | None,
+        default=None,
+        help="""Maximum wall-clock duration of the expansion of the events in seconds. If exceeded, the expansion stops
+and the truncated series are reported (exit code 3).""",
+    )
+
+    arg_parser.add_argument(
+        "--filter.min-duration",
+        type=float | None,
+        default=None,
+        help="""Minimum duration of the event occurrences in seconds (inclusive). Full-day events last until midnight
+of the following day.""",
+    )
+
+    arg_parser.add_argument(
+        "--filter.max-duration",
+        type=float | None,
+        default=None,
+        help="Maximum duration of the event occurrences in seconds (inclusive).",
+    )
+
+    arg_parser.add_argument(
+        "--filter.all-day",
+        type=bool | None,
+        default=None,
+        help="Only full-day event occurrences (true) or only event occurrences with start time (false).",
+    )
+
     # ---- Output ----
     arg_parser.add_argument(
         "--output.format",
@@ -127,11 +263,131 @@ Also URLs to local files with schema file://<absolute path to local file> are su
         help="Output format.",
     )
 
+    arg_parser.add_argument(
+        "--output.order",
+        type=OutputOrder | None,
+        default=None,
+        help="""Order of the events: 'start' (by start date), 'series' (series by series in the order of the calendar,
+the events of each series by start date) or 'none' (in the order of the expansion). With 'none' and 'series' the
+'json' and 'ics' outputs write the events as soon as they are produced (the events of a series). Default: 'start',
+'none' for 'ics'. Not applied to 'count', 'exists', 'sqlite', 'aggregate' (unordered), 'freebusy' and
+'conflicts' (by start date).""",
+    )
+
+    arg_parser.add_argument(
+        "--output.freebusy-format",
+        default=FreeBusyFormat.json,
+        type=FreeBusyFormat,
+        help="""Format of the 'freebusy' output: JSON busy intervals or iCalendar VFREEBUSY component.""",
+    )
+
+    arg_parser.add_argument(
+        "--output.aggregate-bucket",
+        default=AggregateBucket.day,
+        type=AggregateBucket,
+        help="""Time period of the 'aggregate' output buckets: 'day', 'week' (ISO week starting on Monday), 'month' or
+'none' (no grouping by time). Each event is counted in the period of its start date.""",
+    )
+
+    arg_parser.add_argument(
+        "--output.aggregate-timezone",
+        type=timezone_type,
+        default=None,
+        help="""Timezone of the 'aggregate' output periods (e.g. 'Europe/Berlin'). Dates of full-day and floating
+events are taken as they are. Default: local timezone""",
+    )
+
+    arg_parser.add_argument(
+        "--output.aggregate-group",
+        type=regex_type,
+        default=None,
+        help="""RegEx grouping the events of the 'aggregate' output by their summary: The first capture group (or the
+whole match) is the group name. Events not matching (or without summary) are grouped as null. Default: no
+grouping by summary""",
+    )
+
+    arg_parser.add_argument(
+        "--output.fields",
+        type=list[Literal[EVENT_FIELDS]] | None,
+        default=None,
+        help="""Ordered list of the event fields of the JSON based outputs ('json', 'conflicts').
+Only the requested event properties are decoded and written.
+Default: start-date, end-date, summary, description, location""",
+    )
+
     arg_parser.add_argument(
         "-o",
         "--output.file",
         type=str | None,
-        help="Path of output file. If not set the output is written to console / stdout",
+        help="""Path of output file. If not set the output is written to console / stdout.
+Required for the 'sqlite' output format (path of the database file).""",
+    )
+
+    arg_parser.add_argument(
+        "--output.targets",
+        type=list[OutputTarget] | None,
+        default=None,
+        help="""List of output targets {"format": <output format>, "file": <optional path of output file>}.
+All targets are written from a single run: The events are expanded, filtered and ordered only once.
+If set, --output.format and --output.file are ignored.""",
+    )
+
+    # ---- Cache ----
+    arg_parser.add_argument(
+        "--cache.dir",
+        type=str | None,
+        default=None,
+        help="""Directory of the result cache. If set, the rendered results are cached by the calendar contents, the
+filters and the output settings and reused by subsequent runs (not for 'sqlite' and multiple output targets). The
+timezones of custom VTIMEZONE components are cached as well.""",
+    )
+    arg_parser.add_argument(
+        "--cache.max-size",
+        type=int,
+        default=64 * 1024 * 1024,
+        help="Maximum total size of the result cache in bytes. Least recently used results are evicted first.",
+    )
+    arg_parser.add_argument(
+        "--cache.snap",
+        type=int | None,
+        default=None,
+        help="""Snap the start date down to a granularity in seconds (e.g. 3600). The events of the snapped date range
+are cached and trimmed to the queried date range: Periodic queries with a moving start date (e.g. 'now') hit the
+cache. Not supported by the 'jcal' and 'ics' output formats (cached by the exact start date).""",
+    )
+
+    arg_parser.add_argument(
+        "--cache.max-stale",
+        type=float | None,
+        default=None,
+        help="""Maximum age in seconds of the calendar copies kept in the cache directory (stale-while-revalidate).
+A copy younger than the maximum age is used right away and refreshed in the background within the refresh budget.
+Older or missing copies are downloaded. Only for calendar.source 'download'.""",
+    )
+    arg_parser.add_argument(
+        "--cache.refresh-after",
+        type=float,
+        default=60.0,
+        help="""Minimum age in seconds of a used calendar copy before it is refreshed in the background. Younger copies
+are used without any request to the calendar server.""",
+    )
+    arg_parser.add_argument(
+        "--cache.refresh-budget",
+        type=float,
+        default=5.0,
+        help="""Time in seconds the run waits for the background refresh of the used calendar copies. Refreshes not
+finished in time are deferred to the next run.""",
+    )
+
+    # ---- Metrics ----
+    arg_parser.add_argument(
+        "--metrics.file",
+        type=str | None,
+        default=None,
+        help="""Path of a metrics file in the Prometheus text exposition format (e.g. '<textfile collector
+directory>/icalendar_events_cli.prom' of the node_exporter). The metrics of each run are merged into the file:
+counters (suffix '_total') are accumulated, the gauges of the last run replaced. Concurrent runs are serialized by a
+lock file ('<path>.lock').""",
     )
 
     # ---- Finally parse the inputs  ----
@@ -143,6 +399,53 @@ Also URLs to local files with schema file://<absolute path to local file> are su
     return config
 
 
+def parse_runner_config(
+    prog: str, version: str, copy_right: str, author: str, arg_list: list[str] | None = None
+) -> dict:
+    """Parse the configuration of the 'run' command (run of multiple configuration files).
+
+    Arguments:
+        prog: Program name.
+        version: Program version.
+        copy_right: Copyright info.
+        author: Author info.
+        arg_list: Optional command line arguments list (without the command).
+
+    Returns:
+        Dict: Parsed configuration options.
+    """
+    arg_parser = ArgumentParser(
+        prog=f"{prog} {RUN_COMMAND}",
+        description="Run the queries of multiple JSON configuration files. Each calendar is downloaded and parsed "
+        + "once for all configurations using it, the queries are spread across worker processes."
+        + f" | Version {version} | {copy_right}",
+        version=f"| Version {version}\n{copy_right} {author}",
+        print_config=None,
+        formatter_class=HelpFormatter,
+    )
+
+    arg_parser.add_argument(
+        "configs",
+        nargs="+",
+        help="""Paths of the JSON configuration files (see --config). The output of each configuration is written to its
+configured output targets. Outputs to stdout are written in the order of the configuration files.""",
+    )
+    arg_parser.add_argument(
+        "--workers",
+        type=int | None,
+        default=None,
+        help="""Number of worker processes running the queries. Default: number of CPUs. With 1 worker all queries
+are run in the main process.""",
+    )
+
+    config = arg_parser.parse_args(args=arg_list)
+
+    if config.workers is not None and config.workers <= 0:
+        _report_config_issues([f"workers must be greater than 0 (configured: {config.workers})"])
+
+    return config
+
+
 def datetime_isoformat(arg: str) -> datetime:
     """Convert isoformat cli argument to datetime.
 
@@ -184,6 +487,25 @@ def regex_type(arg: str) -> str:
     return arg
 
 
+def timezone_type(arg: str) -> str:
+    """Check if a string is a valid timezone name.
+
+    Arguments:
+        arg: cli argument to be checked
+
+    Returns:
+        unmodified string argument
+
+    Raises:
+        ArgumentTypeError: in case the timezone is unknown
+    """
+    try:
+        pytz.timezone(arg)
+    except pytz.UnknownTimeZoneError:
+        raise ArgumentTypeError(f"unknown timezone '{arg}'") from None
+    return arg
+
+
 def _validate_config(config: dict) -> None:
     """Validate the configuration.
 
@@ -198,7 +520,79 @@ def _validate_config(config: dict) -> None:
             + f" (configured: {config.filter.start_date} -> {config.filter.end_date})"
         )
 
+    for option_name in ("max_size", "snap", "max_stale"):
+        option = getattr(config.cache, option_name)
+        if option is not None and option <= 0:
+            found_config_issues.append(
+                f"cache.{option_name.replace('_', '-')} must be greater than 0 (configured: {option})"
+            )
+    if config.cache.max_stale is not None and config.cache.dir is None:
+        found_config_issues.append("cache.dir is required for cache.max-stale")
+    for option_name in ("refresh_after", "refresh_budget"):
+        option = getattr(config.cache, option_name)
+        if option < 0:
+            found_config_issues.append(
+                f"cache.{option_name.replace('_', '-')} must not be negative (configured: {option})"
+            )
+
+    for option_name in ("connect_timeout", "read_timeout"):
+        option = getattr(config.calendar, option_name)
+        if option <= 0:
+            found_config_issues.append(
+                f"calendar.{option_name.replace('_', '-')} must be greater than 0 (configured: {option})"
+            )
+    if config.calendar.total_timeout is not None and config.calendar.total_timeout <= 0:
+        found_config_issues.append(
+            f"calendar.total-timeout must be greater than 0 (configured: {config.calendar.total_timeout})"
+        )
+    for option_name in ("retries", "retry_backoff"):
+        option = getattr(config.calendar, option_name)
+        if option < 0:
+            found_config_issues.append(
+                f"calendar.{option_name.replace('_', '-')} must not be negative (configured: {option})"
+            )
+
+    for url in [config.calendar.url, *config.calendar.merge_urls]:
+        if config.calendar.source is CalendarSource.caldav and not url.startswith(("http://", "https://")):
+            found_config_issues.append(f"calendar.source 'caldav' requires HTTP(S) URLs (configured: {url})")
+
+    for limit_name in ("max_occurrences", "max_series_occurrences", "time_budget"):
+        limit = getattr(config.filter, limit_name)
+        if limit is not None and limit <= 0:
+            found_config_issues.append(
+                f"filter.{limit_name.replace('_', '-')} must be greater than 0 (configured: {limit})"
+            )
+
+    for duration_name in ("min_duration", "max_duration"):
+        duration = getattr(config.filter, duration_name)
+        if duration is not None and duration < 0:
+            found_config_issues.append(
+                f"filter.{duration_name.replace('_', '-')} must not be negative (configured: {duration})"
+            )
+    if (
+        config.filter.min_duration is not None
+        and config.filter.max_duration is not None
+        and config.filter.min_duration > config.filter.max_duration
+    ):
+        found_config_issues.append(
+            "filter.max-duration must not be less than filter.min-duration"
+            + f" (configured: {config.filter.min_duration} -> {config.filter.max_duration})"
+        )
+
+    for target in output_targets(config):
+        if target.format == OutputFormat.sqlite and target.file is None:
+            found_config_issues.append("output.file (path of the database file) is required for output.format 'sqlite'")
+
     # Finally report all found issues
+    _report_config_issues(found_config_issues)
+
+
+def _report_config_issues(found_config_issues: list[str]) -> None:
+    """Report the found configuration issues and exit.
+
+    Arguments:
+        found_config_issues: Found issues. Nothing is reported if empty.
+    """
     if found_config_issues:
         print("ERROR: invalid configuration / parameters:", file=sys.stderr)
         for found_config_issue in found_config_issues:
@@ -0,0 +1,353 @@
+"""On-disk cache of rendered query results shared by multiple runs (e.g. periodic cron queries)."""
+
+# ---- Imports ---------------------------------------------------------------------------------------------------------
+import contextlib
+import hashlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterable
+from datetime import datetime, timezone
+
+from icalendar import Calendar, Timezone
+from icalendar.cal import Event
+from tzlocal import get_localzone
+
+from .columnar import OccurrenceColumns
+from .limits import ExpansionLimits
+from .metrics import RunMetrics
+from .output import EXIT_CODE_NO_MATCH, OutputFormat, event_tzids, output_events
+
+# ---- Globals ---------------------------------------------------------------------------------------------------------
+
+# Formats rendered only from the events: They can be rendered from a cached superset of the events.
+# The jcal and ics formats also render the properties and timezones of the calendar.
+SNAPPABLE_FORMATS = (
+    OutputFormat.human_readable,
+    OutputFormat.json,
+    OutputFormat.count,
+    OutputFormat.exists,
+    OutputFormat.freebusy,
+    OutputFormat.conflicts,
+    OutputFormat.aggregate,
+)
+
+_ENTRY_SUFFIX = ".entry"
+_TEMPORARY_SUFFIX = ".tmp"
+_TEMPORARY_MAX_AGE = 3600  # Temporary files older than this (seconds) are left over by killed writers
+_CACHEABLE_EXIT_CODES = (os.EX_OK, EXIT_CODE_NO_MATCH)
+
+# ---- Classes ---------------------------------------------------------------------------------------------------------
+
+
+class ResultCache:
+    """Directory of cached results with LRU eviction by total size.
+
+    Each entry is a single file written atomically (safe for concurrent runs). The modification time of an entry is
+    updated on every hit and used as LRU order.
+    """
+
+    def __init__(self, directory: str, max_size: int) -> None:
+        """Construct.
+
+        Arguments:
+            directory: Cache directory. Created if not existing.
+            max_size: Maximum total size of all entries in bytes.
+        """
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+
+    def get(self, key: str) -> bytes | None:
+        """Get a cached entry.
+
+        Arguments:
+            key: Entry key.
+
+        Returns:
+            bytes | None: Cached value or None if not cached.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                value = file.read()
+            os.utime(path)
+        except FileNotFoundError:  # Not cached or evicted by a concurrent run
+            return None
+        return value
+
+    def put(self, key: str, value: bytes) -> None:
+        """Store an entry and evict the least recently used entries exceeding the maximum size.
+
+        Arguments:
+            key: Entry key.
+            value: Value to be cached. Values larger than the maximum size are not cached.
+        """
+        if len(value) > self.max_size:
+            return
+        with tempfile.NamedTemporaryFile(dir=self.directory, suffix=_TEMPORARY_SUFFIX, delete=False) as file:
+            file.write(value)
+        os.replace(file.name, self._path(key))
+        self._evict()
+
+    def _evict(self) -> None:
+        """Remove the least recently used entries until the total size is within the maximum size.
+
+        Temporary files left over by killed writers (e.g. a background refresh at the program exit) are removed.
+        """
+        entries = []
+        left_over_before = time.time() - _TEMPORARY_MAX_AGE
+        for entry in os.scandir(self.directory):
+            with contextlib.suppress(FileNotFoundError):
+                if entry.name.endswith(_ENTRY_SUFFIX):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                elif entry.name.endswith(_TEMPORARY_SUFFIX) and entry.stat().st_mtime < left_over_before:
+                    os.remove(entry.path)
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+            total_size -= size
+
+    def _path(self, key: str) -> str:
+        """Get the file path of an entry.
+
+        Arguments:
+            key: Entry key.
+
+        Returns:
+            str: File path.
+        """
+        return os.path.join(self.directory, f"{key}{_ENTRY_SUFFIX}")
+
+
+# ---- Functions -------------------------------------------------------------------------------------------------------
+
+
+def is_cacheable(config: dict) -> bool:
+    """Check if the result of a query can be cached.
+
+    Arguments:
+        config: Configuration hierarchy.
+
+    Returns:
+        bool: True if the result cache is enabled and the output is a single target without side effects.
+    """
+    return config.cache.dir is not None and not config.output.targets and config.output.format != OutputFormat.sqlite
+
+
+def cached_query(
+    calendar_strings: list[str],
+    config: dict,
+    query: Callable[[list[str], dict], int],
+    expand: Callable[[list[str], dict], tuple[Calendar, Iterable[Event], ExpansionLimits]],
+    version: str,
+    metrics: RunMetrics,
+) -> int:
+    """Run a query with the result cache.
+
+    The results are cached by the hash of the calendar contents, the normalized filter configuration and the output
+    settings. If a snap granularity is configured, the start date is snapped down to it: The expanded events of the
+    snapped date range are cached as superset (iCalendar, see dump_superset()), trimmed to the queried date range and
+    rendered (formats of SNAPPABLE_FORMATS). Results with warnings (e.g. truncated expansion) are not cached.
+
+    Arguments:
+        calendar_strings: Contents of the calendar and all merged calendars.
+        config: Configuration hierarchy.
+        query: Query function (parse, expand, filter and output).
+        expand: Expansion function (parse, expand and filter).
+        version: Program version. Results of other versions are not reused.
+        metrics: Run metrics (cache lookups and rendered events).
+
+    Returns:
+        Numeric exit code
+    """
+    cache = ResultCache(config.cache.dir, config.cache.max_size)
+    if config.cache.snap is not None and config.output.format in SNAPPABLE_FORMATS:
+        superset_config = config.clone()
+        superset_config.filter.start_date = snap_date(config.filter.start_date, config.cache.snap)
+
+        key = result_key(calendar_strings, superset_config, version, with_output=False)
+        superset = cache.get(key)
+        metrics.add("cache_requests_total", layer="superset", result="miss" if superset is None else "hit")
+        if superset is not None:
+            events = load_superset(superset)
+        else:
+            calendar, events, limits = expand(calendar_strings, superset_config)
+            events = list(events)
+            if limits.truncated:
+                return query(calendar_strings, config)
+            cache.put(key, dump_superset(calendar, events))
+        with metrics.stage("output"):
+            return _render_superset(events, config, metrics)
+
+    key = result_key(calendar_strings, config, version, with_output=True)
+    entry = cache.get(key)
+    metrics.add("cache_requests_total", layer="result", result="miss" if entry is None else "hit")
+    if entry is not None:
+        exit_code, output = entry.split(b"\n", 1)
+        _write_output(output, config)
+        return int(exit_code)
+
+    exit_code, output, warnings = _capture(query, calendar_strings, config)
+    _write_output(output, config)
+    sys.stderr.write(warnings)
+    if exit_code in _CACHEABLE_EXIT_CODES and not warnings:
+        cache.put(key, f"{exit_code}\n".encode() + output)
+    return exit_code
+
+
+def result_key(calendar_strings: list[str], config: dict, version: str, with_output: bool) -> str:
+    """Build the cache key of a query result.
+
+    Arguments:
+        calendar_strings: Contents of the calendar and all merged calendars.
+        config: Configuration hierarchy.
+        version: Program version.
+        with_output: Include the output settings (rendered results) or not (format-neutral event supersets).
+
+    Returns:
+        str: Cache key (SHA-256 hex digest).
+    """
+    key = {
+        "version": version,
+        "timezone": get_localzone().key,
+        "calendars": [
+            hashlib.sha256(calendar_string.encode("utf-8")).hexdigest() for calendar_string in calendar_strings
+        ],
+        "deduplicate": config.calendar.deduplicate.value,
+        "filter": {
+            "start_date": config.filter.start_date.astimezone(timezone.utc).isoformat(),
+            "end_date": config.filter.end_date.astimezone(timezone.utc).isoformat(),
+            "summary": config.filter.summary,
+            "description": config.filter.description,
+            "location": config.filter.location,
+            "max_occurrences": config.filter.max_occurrences,
+            "max_series_occurrences": config.filter.max_series_occurrences,
+            "min_duration": config.filter.min_duration,
+            "max_duration": config.filter.max_duration,
+            "all_day": config.filter.all_day,
+        },
+    }
+    if with_output:
+        key["output"] = {
+            "format": config.output.format.value,
+            "freebusy_format": config.output.freebusy_format.value,
+            "fields": config.output.fields,
+            "order": None if config.output.order is None else config.output.order.value,
+            "aggregate_bucket": config.output.aggregate_bucket.value,
+            "aggregate_timezone": config.output.aggregate_timezone,
+            "aggregate_group": config.output.aggregate_group,
+        }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def dump_superset(calendar: Calendar, events: list[Event]) -> bytes:
+    """Serialize a superset of expanded events as iCalendar.
+
+    Plain iCalendar data instead of pickled objects: Loading a cache entry cannot execute any code.
+
+    Arguments:
+        calendar: Calendar of the events (VTIMEZONE components).
+        events: Expanded events.
+
+    Returns:
+        bytes: iCalendar calendar with the events and the VTIMEZONE components they reference. Timezones not defined
+               by the calendar are generated from the timezone database.
+    """
+    tzids = set()
+    for event in events:
+        tzids |= event_tzids(event)
+    timezones = {str(component.get("TZID")): component for component in calendar.walk("VTIMEZONE")}
+
+    superset = Calendar()
+    for tzid in sorted(tzids):
+        superset.add_component(timezones[tzid] if tzid in timezones else Timezone.from_tzid(tzid))
+    for event in events:
+        superset.add_component(event)
+    return superset.to_ical()
+
+
+def load_superset(superset: bytes) -> list[Event]:
+    """Parse a superset of expanded events (see dump_superset()).
+
+    Arguments:
+        superset: iCalendar calendar.
+
+    Returns:
+        list[Event]: Expanded events (in the order of the superset).
+    """
+    return [component for component in Calendar.from_ical(superset).subcomponents if component.name == "VEVENT"]
+
+
+def snap_date(value: datetime, granularity: int) -> datetime:
+    """Snap a date-time down to a granularity.
+
+    Arguments:
+        value: Date-time.
+        granularity: Granularity in seconds (aligned to the UNIX epoch).
+
+    Returns:
+        datetime: Snapped UTC date-time.
+    """
+    return datetime.fromtimestamp(value.timestamp() // granularity * granularity, tz=timezone.utc)
+
+
+def _render_superset(superset: list[Event], config: dict, metrics: RunMetrics) -> int:
+    """Trim a superset of events to the queried date range and render it.
+
+    Arguments:
+        superset: Expanded and filtered events of a larger date range.
+        config: Configuration hierarchy.
+        metrics: Run metrics (rendered events).
+
+    Returns:
+        Numeric exit code
+    """
+    events = OccurrenceColumns(superset).in_window(config.filter.start_date, config.filter.end_date)
+    # The snappable formats do not render the calendar itself
+    return output_events(Calendar(), metrics.count_events("emitted", events), config)
+
+
+def _capture(query: Callable[[list[str], dict], int], calendar_strings: list[str], config: dict) -> tuple:
+    """Run a query and capture its rendered output.
+
+    Arguments:
+        query: Query function.
+        calendar_strings: Contents of the calendar and all merged calendars.
+        config: Configuration hierarchy.
+
+    Returns:
+        tuple[int, bytes, str]: Exit code, rendered output and the warnings written to stderr.
+    """
+    stdout, stderr = io.StringIO(), io.StringIO()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        exit_code = query(calendar_strings, config)
+
+    if config.output.file is None or config.output.format == OutputFormat.exists:
+        output = stdout.getvalue().encode("utf-8")
+    else:
+        with open(config.output.file, "rb") as file:
+            output = file.read()
+    return exit_code, output, stderr.getvalue()
+
+
+def _write_output(output: bytes, config: dict) -> None:
+    """Write a rendered output to stdout or the configured output file.
+
+    Arguments:
+        output: Rendered output.
+        config: Configuration hierarchy.
+    """
+    if config.output.file is None or config.output.format == OutputFormat.exists:
+        sys.stdout.write(output.decode("utf-8"))
+    else:
+        with open(config.output.file, "wb") as file:
+            file.write(output)
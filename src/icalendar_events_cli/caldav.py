@@ -0,0 +1,254 @@
+"""CalDAV calendar source: the server selects the events before the transfer (calendar-query REPORT, RFC 4791)."""
+
+# ---- Imports ---------------------------------------------------------------------------------------------------------
+from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
+from xml.etree import ElementTree
+
+import requests
+from icalendar import Calendar
+
+from .errors import DownloadError
+from .regex_analysis import literal_prefixes
+
+# ---- Globals ---------------------------------------------------------------------------------------------------------
+
+DAV_NAMESPACE = "DAV:"
+CALDAV_NAMESPACE = "urn:ietf:params:xml:ns:caldav"
+
+# Text filters sent as text-match. The description is only filtered locally (not indexed by most servers).
+TEXT_MATCH_PROPERTIES = (("SUMMARY", "summary"), ("LOCATION", "location"))
+
+_MULTI_STATUS = 207
+_OK_STATUS = " 200 "
+
+# The filter end date is inclusive, the end of a CalDAV time-range is exclusive
+_TIME_RANGE_END_SLACK = timedelta(seconds=1)
+
+ElementTree.register_namespace("D", DAV_NAMESPACE)
+ElementTree.register_namespace("C", CALDAV_NAMESPACE)
+
+# ---- Functions -------------------------------------------------------------------------------------------------------
+
+
+def query_calendar(session: requests.Session, url: str, filter_config: dict | None = None) -> str:
+    """Query the events of a CalDAV calendar collection.
+
+    The server selects all resources with events within the filtered date range (time-range) and, if supported,
+    matching the required literal prefixes of the summary / location filters (text-match). The server-side selection is
+    a superset of the filter result: All filters are still applied locally. Resources returned without their calendar
+    data are fetched by a single calendar-multiget REPORT. All requests share the pooled connection of the session.
+
+    Arguments:
+        session: HTTP session (authentication, SSL verification and connection pool).
+        url: URL of the calendar collection.
+        filter_config: Optional filter configuration hierarchy. If not set, all events are queried.
+
+    Returns:
+        str: iCalendar calendar combining all returned resources. Error responses are raised as DownloadError.
+    """
+    text_matches = [] if filter_config is None else caldav_text_matches(filter_config)
+    response = _report(session, url, calendar_query(filter_config, text_matches))
+    if response.status_code != _MULTI_STATUS and text_matches:
+        # Text matching (or its collation) not supported by the server: The text filters are only applied locally
+        response = _report(session, url, calendar_query(filter_config, []))
+    resources = _calendar_resources(response)
+
+    missing_hrefs = [href for href, calendar_data in resources if calendar_data is None]
+    if missing_hrefs:
+        fetched = dict(_calendar_resources(_report(session, url, calendar_multiget(missing_hrefs))))
+        resources = [(href, fetched.get(href) if data is None else data) for href, data in resources]
+
+    return combine_calendars(calendar_data for _, calendar_data in resources if calendar_data is not None)
+
+
+def calendar_query(filter_config: dict | None, text_matches: list[tuple[str, str, str]]) -> bytes:
+    """Build the body of a calendar-query REPORT.
+
+    Arguments:
+        filter_config: Optional filter configuration hierarchy. If not set, all events are queried.
+        text_matches: (property name, text, collation) of the text-match filters.
+
+    Returns:
+        bytes: XML request body.
+    """
+    query = ElementTree.Element(_caldav("calendar-query"))
+    ElementTree.SubElement(ElementTree.SubElement(query, _dav("prop")), _caldav("calendar-data"))
+    calendar_filter = ElementTree.SubElement(
+        ElementTree.SubElement(query, _caldav("filter")), _caldav("comp-filter"), name="VCALENDAR"
+    )
+    event_filter = ElementTree.SubElement(calendar_filter, _caldav("comp-filter"), name="VEVENT")
+    if filter_config is not None:
+        ElementTree.SubElement(
+            event_filter,
+            _caldav("time-range"),
+            start=_utc_date_time(filter_config.start_date),
+            end=_utc_date_time(filter_config.end_date + _TIME_RANGE_END_SLACK),
+        )
+    for property_name, text, collation in text_matches:
+        property_filter = ElementTree.SubElement(event_filter, _caldav("prop-filter"), name=property_name)
+        ElementTree.SubElement(property_filter, _caldav("text-match"), collation=collation).text = text
+    return ElementTree.tostring(query, encoding="utf-8", xml_declaration=True)
+
+
+def calendar_multiget(hrefs: list[str]) -> bytes:
+    """Build the body of a calendar-multiget REPORT.
+
+    Arguments:
+        hrefs: References of the calendar resources.
+
+    Returns:
+        bytes: XML request body.
+    """
+    multiget = ElementTree.Element(_caldav("calendar-multiget"))
+    ElementTree.SubElement(ElementTree.SubElement(multiget, _dav("prop")), _caldav("calendar-data"))
+    for href in hrefs:
+        ElementTree.SubElement(multiget, _dav("href")).text = href
+    return ElementTree.tostring(multiget, encoding="utf-8", xml_declaration=True)
+
+
+def caldav_text_matches(filter_config: dict) -> list[tuple[str, str, str]]:
+    """Derive the text-match filters from the summary / location RegEx filters.
+
+    CalDAV text-match is a substring match. The common literal prefix required by a RegEx anchored at the start is
+    therefore a necessary condition of the RegEx. The prefixes of case-insensitive RegExes only consist of case-fold
+    safe ASCII characters (i;ascii-casemap collation).
+
+    Arguments:
+        filter_config: Filter configuration hierarchy.
+
+    Returns:
+        list[tuple[str, str, str]]: (property name, text, collation) of all text-match filters.
+    """
+    text_matches = []
+    for property_name, filter_name in TEXT_MATCH_PROPERTIES:
+        pattern = getattr(filter_config, filter_name)
+        prefixes = None if pattern is None else literal_prefixes(pattern)
+        if prefixes is None:
+            continue
+        prefixes, ignore_case = prefixes
+        text = _common_prefix(prefixes)
+        if not text:
+            continue
+        text_matches.append((property_name, text, "i;ascii-casemap" if ignore_case else "i;octet"))
+    return text_matches
+
+
+def combine_calendars(calendar_resources: Iterable[str]) -> str:
+    """Combine the calendar resources of a CalDAV collection into one calendar.
+
+    Arguments:
+        calendar_resources: iCalendar calendars of the resources (one event series each).
+
+    Returns:
+        str: Combined iCalendar calendar. Timezones are only included once.
+    """
+    combined = Calendar()
+    combined.add("VERSION", "2.0")
+    combined.add("PRODID", "-//icalendar-events-cli//CalDAV//EN")
+    timezone_ids = set()
+    for calendar_resource in calendar_resources:
+        for component in Calendar.from_ical(calendar_resource).subcomponents:
+            if component.name == "VTIMEZONE":
+                if component.get("TZID") in timezone_ids:
+                    continue
+                timezone_ids.add(component.get("TZID"))
+            combined.add_component(component)
+    return combined.to_ical().decode("utf-8")
+
+
+def _report(session: requests.Session, url: str, body: bytes) -> requests.Response:
+    """Send a REPORT request to the calendar collection.
+
+    Arguments:
+        session: HTTP session.
+        url: URL of the calendar collection.
+        body: XML request body.
+
+    Returns:
+        requests.Response: Response.
+    """
+    return session.request(
+        "REPORT", url, data=body, headers={"Depth": "1", "Content-Type": "application/xml; charset=utf-8"}
+    )
+
+
+def _calendar_resources(response: requests.Response) -> list[tuple[str, str | None]]:
+    """Extract the calendar resources of a multi-status REPORT response.
+
+    Arguments:
+        response: REPORT response.
+
+    Returns:
+        list[tuple[str, str | None]]: Reference and calendar data (None if not returned) of all resources.
+
+    Raises:
+        DownloadError: No multi-status response.
+    """
+    if response.status_code != _MULTI_STATUS:
+        raise DownloadError(
+            f"Failed to query CalDAV calendar from URL '{response.url}'. "
+            + f"Response status: {response.reason} (status {response.status_code})"
+        )
+
+    resources = []
+    for resource in ElementTree.fromstring(response.content).iter(_dav("response")):
+        calendar_data = None
+        for propstat in resource.iter(_dav("propstat")):
+            data = propstat.find(f"{_dav('prop')}/{_caldav('calendar-data')}")
+            if data is not None and data.text and _OK_STATUS in propstat.findtext(_dav("status"), ""):
+                calendar_data = data.text
+        resources.append((resource.findtext(_dav("href"), "").strip(), calendar_data))
+    return resources
+
+
+def _common_prefix(texts: tuple[str, ...]) -> str:
+    """Get the longest common prefix of texts.
+
+    Arguments:
+        texts: Texts.
+
+    Returns:
+        str: Longest common prefix.
+    """
+    shortest, longest = min(texts), max(texts)
+    for index, character in enumerate(shortest):
+        if character != longest[index]:
+            return shortest[:index]
+    return shortest
+
+
+def _utc_date_time(value: datetime) -> str:
+    """Format a date-time as UTC date-time of a CalDAV time-range.
+
+    Arguments:
+        value: Date-time.
+
+    Returns:
+        str: UTC date-time (e.g. '20250101T000000Z').
+    """
+    return value.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _dav(name: str) -> str:
+    """Get the qualified name of a WebDAV element.
+
+    Arguments:
+        name: Local element name.
+
+    Returns:
+        str: Qualified element name.
+    """
+    return f"{{{DAV_NAMESPACE}}}{name}"
+
+
+def _caldav(name: str) -> str:
+    """Get the qualified name of a CalDAV element.
+
+    Arguments:
+        name: Local element name.
+
+    Returns:
+        str: Qualified element name.
+    """
+    return f"{{{CALDAV_NAMESPACE}}}{name}"
@@ -0,0 +1,301 @@
+"""Columnar arrays of expanded event occurrences: NumPy if installed (optional extra 'fast-arrays'), otherwise array."""
+
+# ---- Imports ---------------------------------------------------------------------------------------------------------
+import math
+from array import array
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from enum import Enum
+from itertools import compress, islice
+
+from icalendar.cal import Event
+from recurring_ical_events.util import time_span_contains_event
+
+from .icalendar import get_event_period
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+# ---- Globals ---------------------------------------------------------------------------------------------------------
+
+FIRST_BATCH_SIZE = 16  # Number of occurrences of the first batch of filter_occurrences(), doubled batch by batch
+BATCH_SIZE = 4096  # Maximum number of occurrences filtered per batch by filter_occurrences()
+
+
+class ArrayBackend(Enum):
+    """All supported array backends."""
+
+    array = "array"  # pylint: disable=invalid-name;reason=camel_case style wanted for cli param
+    numpy = "numpy"  # pylint: disable=invalid-name;reason=camel_case style wanted for cli param
+
+
+AVAILABLE_BACKENDS = [ArrayBackend.array] + ([ArrayBackend.numpy] if numpy is not None else [])
+
+_backend = AVAILABLE_BACKENDS[-1]  # Fastest available backend
+
+# ---- Classes ---------------------------------------------------------------------------------------------------------
+
+
+class OccurrenceColumns:
+    """Expanded event occurrences as columns: start / end epochs, durations and flags plus the event records.
+
+    Window, duration and all-day predicates are evaluated over whole columns and sorting is an argsort of the start
+    epochs instead of comparing timezone-aware date-times one by one.
+    """
+
+    def __init__(self, events: Iterable[Event]) -> None:
+        """Build the columns.
+
+        Arguments:
+            events: Calendar event occurrences.
+        """
+        self.events = list(events)
+        keys, starts, ends, durations, all_day, exact = [], [], [], [], [], []
+        for event in self.events:
+            # The values of the parsed properties: Much cheaper than decoding them
+            start = event["DTSTART"].dt
+            end = event["DTEND"].dt
+            if isinstance(start, datetime) and isinstance(end, datetime):
+                start_epoch, end_epoch = start.timestamp(), end.timestamp()
+                # Only timezone-aware date-times are exact instants. Floating date-times are interpreted in the
+                # timezone of the compared window.
+                is_exact = start.tzinfo is not None and end.tzinfo is not None
+            else:
+                period_start, period_end = get_event_period(event)
+                start_epoch, end_epoch = period_start.timestamp(), period_end.timestamp()
+                is_exact = False
+            keys.append(start_epoch)
+            durations.append(end_epoch - start_epoch)
+            all_day.append(not isinstance(start, datetime))
+            exact.append(is_exact)
+            starts.append(start_epoch if is_exact else math.nan)
+            ends.append(end_epoch if is_exact else math.nan)
+
+        self._keys = _floats(keys)  # Sort keys: start epochs (dates at local midnight, floating as local time)
+        self._starts = _floats(starts)  # Start epochs of the exact occurrences (NaN otherwise)
+        self._ends = _floats(ends)  # End epochs of the exact occurrences (NaN otherwise)
+        self._durations = _floats(durations)  # Durations in seconds (all-day events until the following midnight)
+        self._all_day = _flags(all_day)
+        self._exact = _flags(exact)
+
+    def __len__(self) -> int:
+        """Get the number of occurrences.
+
+        Returns:
+            int: Number of occurrences.
+        """
+        return len(self.events)
+
+    def filtered(
+        self, min_duration: float | None = None, max_duration: float | None = None, all_day: bool | None = None
+    ) -> list[Event]:
+        """Get the occurrences matching the duration and all-day predicates (in their original order).
+
+        Arguments:
+            min_duration: Optional minimum duration in seconds (inclusive).
+            max_duration: Optional maximum duration in seconds (inclusive).
+            all_day: Optional selection of all-day (True) or timed (False) occurrences.
+
+        Returns:
+            list[Event]: Matching occurrences.
+        """
+        if _backend is ArrayBackend.numpy:
+            mask = numpy.ones(len(self), dtype=bool)
+            if min_duration is not None:
+                mask &= self._durations >= min_duration
+            if max_duration is not None:
+                mask &= self._durations <= max_duration
+            if all_day is not None:
+                mask &= self._all_day == all_day
+            return self._select(numpy.flatnonzero(mask))
+
+        selectors = (
+            (min_duration is None or duration >= min_duration)
+            and (max_duration is None or duration <= max_duration)
+            and (all_day is None or bool(flag) == all_day)
+            for duration, flag in zip(self._durations, self._all_day, strict=True)
+        )
+        return list(compress(self.events, selectors))
+
+    def in_window(self, start_date: datetime, end_date: datetime) -> list[Event]:
+        """Get the occurrences within a date range (in their original order).
+
+        Same result as Occurrence.is_in_span() of recurring-ical-events: Occurrences overlapping the date range and
+        zero-length occurrences at its start. Dates, floating date-times and empty date ranges are compared one by one.
+
+        Arguments:
+            start_date: Start of the date range.
+            end_date: End of the date range (exclusive).
+
+        Returns:
+            list[Event]: Occurrences within the date range.
+        """
+        window_start, window_end = start_date.timestamp(), end_date.timestamp()
+        if window_start == window_end:
+            return [event for event in self.events if _contains(start_date, end_date, event)]
+        if _backend is ArrayBackend.numpy:
+            starts, ends = self._starts, self._ends
+            zero_length = starts == ends
+            inside = numpy.where(
+                zero_length,
+                (window_start <= starts) & (starts < window_end),
+                (starts < window_end) & (window_start < ends),
+            )
+            selected = set(numpy.flatnonzero(inside & self._exact).tolist())
+            inexact = numpy.flatnonzero(~self._exact).tolist()
+        else:
+            selected = {
+                index
+                for index, (exact, start, end) in enumerate(zip(self._exact, self._starts, self._ends, strict=True))
+                if exact
+                and (window_start <= start < window_end if start == end else start < window_end and window_start < end)
+            }
+            inexact = [index for index, exact in enumerate(self._exact) if not exact]
+
+        selected.update(index for index in inexact if _contains(start_date, end_date, self.events[index]))
+        return [self.events[index] for index in sorted(selected)]
+
+    def sorted(self) -> list[Event]:
+        """Get the occurrences sorted by start date (stable).
+
+        Returns:
+            list[Event]: Sorted occurrences.
+        """
+        if _backend is ArrayBackend.numpy:
+            return self._select(numpy.argsort(self._keys, kind="stable"))
+        return [self.events[index] for index in sorted(range(len(self)), key=self._keys.__getitem__)]
+
+    def _select(self, indices: object) -> list[Event]:
+        """Get the occurrences at positions.
+
+        Arguments:
+            indices: Positions (NumPy index array).
+
+        Returns:
+            list[Event]: Occurrences.
+        """
+        return [self.events[index] for index in indices.tolist()]
+
+
+# ---- Functions -------------------------------------------------------------------------------------------------------
+
+
+def get_backend() -> ArrayBackend:
+    """Get the active array backend.
+
+    Returns:
+        ArrayBackend: Active backend.
+    """
+    return _backend
+
+
+def set_backend(backend: ArrayBackend) -> None:
+    """Select the active array backend.
+
+    Arguments:
+        backend: Backend to be used.
+
+    Raises:
+        ValueError: if the backend is not installed.
+    """
+    global _backend  # pylint: disable=global-statement;reason=process wide backend selection
+    if backend not in AVAILABLE_BACKENDS:
+        raise ValueError(f"Array backend '{backend.value}' is not installed")
+    _backend = backend
+
+
+def has_occurrence_filters(filter_config: dict) -> bool:
+    """Check if any of the duration / all-day filters is configured.
+
+    Arguments:
+        filter_config: Filter configuration hierarchy.
+
+    Returns:
+        bool: True if filter_occurrences() filters the occurrences.
+    """
+    return (
+        filter_config.min_duration is not None
+        or filter_config.max_duration is not None
+        or filter_config.all_day is not None
+    )
+
+
+def filter_occurrences(events: Iterable[Event], filter_config: dict) -> Iterable[Event]:
+    """Filter the expanded occurrences by their duration and all-day flag.
+
+    The occurrences are filtered in columnar batches: The expansion stays lazy (e.g. for the 'exists' output) while
+    the predicates are evaluated over whole columns. The batches start small and grow geometrically: Consumers
+    stopping early (e.g. the 'exists' output, expansion limits) only pay for the expansion of a few occurrences.
+
+    Arguments:
+        events: Calendar event occurrences.
+        filter_config: Filter configuration hierarchy.
+
+    Returns:
+        Iterable[Event]: Lazily filtered occurrences. The passed events if no such filter is configured.
+    """
+    if not has_occurrence_filters(filter_config):
+        return events
+    return _filter_batches(iter(events), filter_config)
+
+
+def _filter_batches(events: Iterator[Event], filter_config: dict) -> Iterator[Event]:
+    """Filter the occurrences batch by batch.
+
+    Arguments:
+        events: Calendar event occurrences.
+        filter_config: Filter configuration hierarchy.
+
+    Yields:
+        Event: Matching occurrences.
+    """
+    batch_size = min(FIRST_BATCH_SIZE, BATCH_SIZE)
+    while batch := list(islice(events, batch_size)):
+        yield from OccurrenceColumns(batch).filtered(
+            filter_config.min_duration, filter_config.max_duration, filter_config.all_day
+        )
+        batch_size = min(2 * batch_size, BATCH_SIZE)
+
+
+def _contains(start_date: datetime, end_date: datetime, event: Event) -> bool:
+    """Check if an occurrence is within a date range (compared as date / date-time objects).
+
+    Arguments:
+        start_date: Start of the date range.
+        end_date: End of the date range (exclusive).
+        event: Calendar event occurrence.
+
+    Returns:
+        bool: True if the occurrence is within the date range.
+    """
+    return time_span_contains_event(start_date, end_date, event.decoded("DTSTART"), event.decoded("DTEND"))
+
+
+def _floats(values: list[float]) -> object:
+    """Build a column of floats.
+
+    Arguments:
+        values: Values.
+
+    Returns:
+        object: NumPy float64 array or array('d').
+    """
+    if _backend is ArrayBackend.numpy:
+        return numpy.array(values, dtype=numpy.float64)
+    return array("d", values)
+
+
+def _flags(values: list[bool]) -> object:
+    """Build a column of flags.
+
+    Arguments:
+        values: Flags.
+
+    Returns:
+        object: NumPy bool array or array('b').
+    """
+    if _backend is ArrayBackend.numpy:
+        return numpy.array(values, dtype=bool)
+    return array("b", values)
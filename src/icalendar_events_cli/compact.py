@@ -0,0 +1,176 @@
+"""Compact representation of event occurrences held in memory by the sorted outputs."""
+
+# ---- Imports ---------------------------------------------------------------------------------------------------------
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone, tzinfo
+
+from icalendar.cal import Event
+
+# ---- Globals ---------------------------------------------------------------------------------------------------------
+
+DATE_FIELDS = ("start-date", "end-date")
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+# ---- Classes ---------------------------------------------------------------------------------------------------------
+
+
+@dataclass(slots=True)
+class CompactOccurrence:
+    """Compact event occurrence: integer timestamps and the decoded text fields shared by all occurrences of a series.
+
+    Attributes:
+        start: Start date in microseconds since epoch (UTC for timezone-aware, wall-clock time for floating dates).
+        start_tz: Timezone of the start date (None for floating dates).
+        end: End date in microseconds since epoch (None if not requested).
+        end_tz: Timezone of the end date.
+        texts: Decoded non-date fields (in field order). Shared by all occurrences with the same property values.
+    """
+
+    start: int
+    start_tz: tzinfo | None
+    end: int | None
+    end_tz: tzinfo | None
+    texts: tuple
+
+
+class OccurrenceCompactor:
+    """Converter of event occurrences into compact occurrences.
+
+    The expanded occurrences of a series are shallow copies of the series' master event and share its property values.
+    The decoded text fields are therefore cached by the identity of the property values and shared by all occurrences.
+    Equal strings of different series (e.g. a LOCATION used by many series) are interned.
+    """
+
+    def __init__(self, fields: Iterable[str], field_getters: dict[str, Callable[[Event], object]]) -> None:
+        """Construct.
+
+        Arguments:
+            fields: Ordered fields of the occurrences (see output.EVENT_FIELDS).
+            field_getters: Getter of each field. Must include the date fields.
+        """
+        self._fields = tuple(fields)
+        self._text_fields = tuple(field for field in self._fields if field not in DATE_FIELDS)
+        self._get_start = field_getters["start-date"]
+        self._get_end = field_getters["end-date"] if "end-date" in self._fields else None
+        self._text_getters = tuple(field_getters[field] for field in self._text_fields)
+        self._property_names = tuple(field.upper() for field in self._text_fields)
+        self._texts = {}  # IDs of the property values -> (property values, decoded texts)
+        self._pool = {}  # Interned texts
+
+    def compact(self, event: Event) -> CompactOccurrence:
+        """Convert an event occurrence into a compact occurrence.
+
+        Arguments:
+            event: Calendar event occurrence.
+
+        Returns:
+            CompactOccurrence: Compact occurrence.
+        """
+        start, start_tz = _to_timestamp(self._get_start(event))
+        end, end_tz = (None, None) if self._get_end is None else _to_timestamp(self._get_end(event))
+
+        values = tuple(event.get(name) for name in self._property_names)
+        key = tuple(map(id, values))
+        cached = self._texts.get(key)
+        if cached is None:
+            # The property values are kept referenced: Their IDs cannot be reused by other objects.
+            cached = self._texts[key] = (values, tuple(self._intern(getter(event)) for getter in self._text_getters))
+        return CompactOccurrence(start, start_tz, end, end_tz, cached[1])
+
+    def sorted(self, events: Iterable[Event]) -> list[CompactOccurrence]:
+        """Convert event occurrences into compact occurrences sorted by start date.
+
+        The events are consumed as a stream. Only the compact occurrences are kept in memory.
+
+        Arguments:
+            events: Calendar event occurrences.
+
+        Returns:
+            list[CompactOccurrence]: Compact occurrences sorted by start date (stable). Floating dates are sorted by
+                                     their local time interpretation like the other outputs (see _start_key()).
+        """
+        return sorted((self.compact(event) for event in events), key=_start_key)
+
+    def values(self, occurrence: CompactOccurrence) -> tuple:
+        """Get the field values of a compact occurrence.
+
+        Arguments:
+            occurrence: Compact occurrence.
+
+        Returns:
+            tuple: Values of all fields (in field order). Date fields as date-time.
+        """
+        texts = iter(occurrence.texts)
+        return tuple(
+            _from_timestamp(occurrence.start, occurrence.start_tz)
+            if field == "start-date"
+            else _from_timestamp(occurrence.end, occurrence.end_tz)
+            if field == "end-date"
+            else next(texts)
+            for field in self._fields
+        )
+
+    def _intern(self, value: object) -> object:
+        """Intern a decoded text value.
+
+        Arguments:
+            value: Decoded value (text, list of texts or None).
+
+        Returns:
+            object: The interned value. Lists are converted into tuples of interned texts.
+        """
+        if isinstance(value, list):
+            value = tuple(self._intern(item) for item in value)
+        if value is None:
+            return None
+        return self._pool.setdefault(value, value)
+
+
+# ---- Functions -------------------------------------------------------------------------------------------------------
+
+
+def _start_key(occurrence: CompactOccurrence) -> int:
+    """Get the sort key of a compact occurrence.
+
+    Arguments:
+        occurrence: Compact occurrence.
+
+    Returns:
+        int: Start date in microseconds since epoch (UTC). Floating dates are interpreted in the local timezone.
+    """
+    if occurrence.start_tz is not None:
+        return occurrence.start
+    return (_from_timestamp(occurrence.start, None).astimezone(timezone.utc) - _EPOCH_UTC) // _MICROSECOND
+
+
+def _to_timestamp(value: datetime) -> tuple[int, tzinfo | None]:
+    """Convert a date-time into an integer timestamp.
+
+    Arguments:
+        value: Date-time.
+
+    Returns:
+        tuple[int, tzinfo | None]: Microseconds since epoch and the timezone of the date-time.
+    """
+    if value.tzinfo is None:
+        return (value - _EPOCH) // _MICROSECOND, None
+    return (value - _EPOCH_UTC) // _MICROSECOND, value.tzinfo
+
+
+def _from_timestamp(timestamp: int, timezone_info: tzinfo | None) -> datetime:
+    """Convert an integer timestamp back into a date-time.
+
+    Arguments:
+        timestamp: Microseconds since epoch.
+        timezone_info: Timezone of the date-time.
+
+    Returns:
+        datetime: Date-time (same value and UTC offset as the original date-time).
+    """
+    if timezone_info is None:
+        return _EPOCH + timestamp * _MICROSECOND
+    return (_EPOCH_UTC + timestamp * _MICROSECOND).astimezone(timezone_info)
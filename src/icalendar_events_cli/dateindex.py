@@ -0,0 +1,144 @@
+"""Sorted start / end date index over the non-recurring events of a parsed calendar."""
+
+# ---- Imports ---------------------------------------------------------------------------------------------------------
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterator
+from datetime import date, datetime, time, timedelta, timezone
+from itertools import accumulate
+
+import recurring_ical_events
+from icalendar import Calendar
+from icalendar.cal import Event
+from recurring_ical_events.occurrence import Occurrence
+from recurring_ical_events.series import Series
+
+from .limits import chunked_between
+
+# ---- Globals ---------------------------------------------------------------------------------------------------------
+
+# Largest possible UTC offset. Date-only and floating occurrences are indexed by their wall-clock time, which is
+# interpreted in the timezone of each query's date range.
+_OFFSET_SLACK = timedelta(days=1).total_seconds()
+
+_EPOCH = datetime(1970, 1, 1)
+
+# ---- Classes ---------------------------------------------------------------------------------------------------------
+
+
+class DateIndex:
+    """Index of the single occurrence of all non-recurring event series sorted by start date.
+
+    The index is built once per parsed calendar and can be reused for any number of date range queries.
+    The occurrence of each non-recurring series is computed once while building the index. A date range query is
+    reduced to two bisections over compact arrays of start dates and the running maximum of the end dates plus a short
+    scan. Only recurring series (RRULE, RDATE or modified occurrences) are expanded on every query.
+    """
+
+    def __init__(self, calendar: Calendar) -> None:
+        """Build the index.
+
+        Arguments:
+            calendar: Parsed iCalendar calendar.
+        """
+        query = recurring_ical_events.of(calendar, components=["VEVENT"])
+        self._keep_recurrence_attributes = query.keep_recurrence_attributes
+        self._recurring_series = []  # (position, series) in calendar order
+
+        entries = []  # (start key, end key, position, UID, occurrence)
+        for position, series in enumerate(query.series):
+            occurrences = _single_occurrence(series)
+            if occurrences is None:
+                self._recurring_series.append((position, series))
+            for occurrence in occurrences or ():
+                entries.append(
+                    (_sort_key(occurrence.start), _sort_key(occurrence.end), position, series.uid, occurrence)
+                )
+        entries.sort(key=lambda entry: entry[0])
+
+        self._starts = array("d", (entry[0] for entry in entries))
+        self._max_ends = array("d", accumulate((entry[1] for entry in entries), max))
+        self._entries = [entry[2:] for entry in entries]
+
+    def series_between(
+        self, start_date: datetime, end_date: datetime, uids: set | None = None, chunked: bool = False
+    ) -> Iterator[tuple[str, Iterator[Event]]]:
+        """Lazily get the event occurrences of all series within a date range.
+
+        Same result and order as the regular series by series expansion of the calendar.
+
+        Arguments:
+            start_date: Start of the date range.
+            end_date: End of the date range.
+            uids: Optional UIDs of the series to be returned. If not set all series are returned.
+            chunked: Expand the recurring series chunk by chunk (see limits.chunked_between()).
+
+        Yields:
+            tuple[str, Iterator[Event]]: UID and lazily expanded occurrences within the date range of each series.
+        """
+        first = bisect_right(self._max_ends, _sort_key(start_date) - _OFFSET_SLACK)
+        last = bisect_left(self._starts, _sort_key(end_date) + _OFFSET_SLACK)
+        hits = sorted(
+            (position, uid, [occurrence])
+            for position, uid, occurrence in self._entries[first:last]
+            if (uids is None or uid in uids) and occurrence.is_in_span(start_date, end_date)
+        )
+
+        recurring_series = (
+            (position, series.uid, series)
+            for position, series in self._recurring_series
+            if uids is None or series.uid in uids
+        )
+        for _, uid, item in heapq.merge(hits, recurring_series, key=lambda item: item[0]):
+            if isinstance(item, list):
+                occurrences = item
+            elif chunked:
+                occurrences = chunked_between(item, start_date, end_date)
+            else:
+                occurrences = item.between(start_date, end_date)
+            yield uid, (occurrence.as_component(self._keep_recurrence_attributes) for occurrence in occurrences)
+
+    def __len__(self) -> int:
+        """Get the number of indexed non-recurring occurrences.
+
+        Returns:
+            int: Number of indexed occurrences.
+        """
+        return len(self._entries)
+
+
+# ---- Functions -------------------------------------------------------------------------------------------------------
+
+
+def _single_occurrence(series: Series) -> list[Occurrence] | None:
+    """Compute the occurrence of a non-recurring series.
+
+    Arguments:
+        series: Event series.
+
+    Returns:
+        list[Occurrence] | None: The occurrence (empty if excluded by EXDATE) or None if the series is recurring.
+    """
+    if series.modifications or not series.recurrence.has_core:
+        return None
+    core = series.recurrence.core
+    if core.rrules or core.rdates:
+        return None
+    return list(series.between(core.start, core.end))  # Without RRULE / RDATE at most the start itself
+
+
+def _sort_key(value: date) -> float:
+    """Get the sort key of a date / date-time.
+
+    Arguments:
+        value: Date or date-time.
+
+    Returns:
+        float: Seconds since epoch. Timezone-aware date-times in UTC, dates and floating date-times by wall-clock time.
+    """
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, time())
+    elif value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH).total_seconds()
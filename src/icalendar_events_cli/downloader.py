@@ -1,33 +1,222 @@
 """Calender file downloader."""
 
 # ---- Imports ---------------------------------------------------------------------------------------------------------
+import codecs
 import sys
+import time
+from collections.abc import Callable, Iterator
+from enum import Enum
+from functools import partial
 
 import requests
+import urllib3
+from requests.adapters import HTTPAdapter, Retry
 from requests_file import FileAdapter
 
+from .caldav import query_calendar
+from .errors import DownloadError
+from .metrics import RunMetrics
+
+# ---- Globals ---------------------------------------------------------------------------------------------------------
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)  # Transient server errors retried with backoff
+RETRY_METHODS = frozenset({"GET", "REPORT"})  # Idempotent requests of the downloads / CalDAV queries
+STREAM_CHUNK_SIZE = 64 * 1024  # Size of the chunks of a streamed download in bytes
+
+# ---- Classes ---------------------------------------------------------------------------------------------------------
+
+
+class CalendarSource(str, Enum):
+    """Types of calendar sources."""
+
+    download = "download"  # pylint: disable=invalid-name;reason=camel_case style wanted for cli param
+    caldav = "caldav"  # pylint: disable=invalid-name;reason=camel_case style wanted for cli param
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTP adapter applying a default timeout to all requests without explicit timeout."""
+
+    def __init__(self, timeout: tuple[float, float], **kwargs: object) -> None:
+        """Construct.
+
+        Arguments:
+            timeout: Connect and read timeout in seconds.
+            kwargs: Further arguments of the HTTPAdapter (e.g. max_retries).
+        """
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(self, request: requests.PreparedRequest, **kwargs: object) -> requests.Response:
+        """Send a request.
+
+        Arguments:
+            request: Prepared request.
+            kwargs: Further arguments of HTTPAdapter.send().
+
+        Returns:
+            requests.Response: Response.
+        """
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
 # ---- Functions -------------------------------------------------------------------------------------------------------
 
 
-def download_calendar(calendard_config: dict) -> str:
+def download_calendar(
+    calendard_config: dict,
+    url: str | None = None,
+    filter_config: dict | None = None,
+    metrics: RunMetrics | None = None,
+    consume: Callable[[str], None] | None = None,
+) -> str:
     """Download calendar file from URL.
 
     Arguments:
         calendard_config: Calendar configuration hierarchy.
+        url: Optional URL overriding the configured calendar URL (e.g. of a merged calendar).
+        filter_config: Optional filter configuration hierarchy. CalDAV sources only transfer the events which may
+                       match the filters. If not set, all events are transferred.
+        metrics: Optional run metrics recording all responses.
+        consume: Optional consumer of the decoded chunks of a streamed download (see fetch_calendar()).
 
     Returns:
         str: Downloaded file content.
     """
+    try:
+        return fetch_calendar(calendard_config, url, filter_config, metrics, consume)
+    except DownloadError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+
+def fetch_calendar(
+    calendard_config: dict,
+    url: str | None = None,
+    filter_config: dict | None = None,
+    metrics: RunMetrics | None = None,
+    consume: Callable[[str], None] | None = None,
+) -> str:
+    """Download calendar file from URL. Failures are raised instead of terminating the program.
+
+    All HTTP(S) requests are limited by the configured connect / read timeouts. Connection errors, timeouts and
+    transient error responses (RETRY_STATUS_CODES) are retried with exponential backoff. The response is streamed and
+    aborted once the total timeout of the download (if configured) is exceeded, e.g. a server trickling the bytes
+    slower than the read timeout.
+
+    Arguments:
+        calendard_config: Calendar configuration hierarchy.
+        url: Optional URL overriding the configured calendar URL (e.g. of a merged calendar).
+        filter_config: Optional filter configuration hierarchy. CalDAV sources only transfer the events which may
+                       match the filters. If not set, all events are transferred.
+        metrics: Optional run metrics recording all responses.
+        consume: Optional consumer of the decoded chunks. If set, the response is streamed and each chunk is passed
+                 to the consumer as soon as it is received (not applied to CalDAV sources).
+
+    Returns:
+        str: Downloaded file content.
+
+    Raises:
+        DownloadError: Connection error, timeout or error response (after all retries).
+    """
+    total_timeout = calendard_config.total_timeout
+    deadline = None if total_timeout is None else time.monotonic() + total_timeout
+
     session = requests.Session()
     session.mount("file://", FileAdapter())
 
+    retry = Retry(
+        total=calendard_config.retries,
+        backoff_factor=calendard_config.retry_backoff,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=RETRY_METHODS,
+        respect_retry_after_header=False,  # The latency must stay bounded by the configured backoff
+        raise_on_status=False,  # The last error response is reported
+    )
+    # All requests of a download (CalDAV: query and fetch of the returned resources) over one kept-alive connection
+    adapter = TimeoutHTTPAdapter(
+        timeout=(calendard_config.connect_timeout, calendard_config.read_timeout),
+        max_retries=retry,
+        pool_connections=1,
+        pool_maxsize=1,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if metrics is not None:
+        session.hooks["response"].append(metrics.record_response)
+
     if calendard_config.user is not None and calendard_config.password is not None:
         session.auth = (calendard_config.user.get_secret_value(), calendard_config.password.get_secret_value())
-    response = session.get(url=calendard_config.url, verify=calendard_config.verify_url)
-    if response.status_code != 200:
-        print(
-            f"ERROR: Failed to download ical contents from URL '{response.url}'. "
-            + f"Response status: {response.reason} (status {response.status_code})",
-        )
-        sys.exit(1)
-    return response.text
+    session.verify = calendard_config.verify_url
+    url = calendard_config.url if url is None else url
+
+    try:
+        if calendard_config.source is CalendarSource.caldav:
+            return query_calendar(session, url, filter_config)
+        response = session.get(url=url, stream=True)
+        if response.status_code != 200:
+            raise DownloadError(
+                f"Failed to download ical contents from URL '{response.url}'. "
+                + f"Response status: {response.reason} (status {response.status_code})"
+            )
+        return _decode_text(response, _read_chunks(response, deadline, metrics), consume)
+    except (requests.RequestException, urllib3.exceptions.HTTPError) as e:
+        raise DownloadError(f"Failed to download ical contents from URL '{url}': {e}") from e
+    except TimeoutError:
+        raise DownloadError(
+            f"Failed to download ical contents from URL '{url}': Total timeout of {total_timeout} s exceeded"
+        ) from None
+
+
+def _read_chunks(response: requests.Response, deadline: float | None, metrics: RunMetrics | None) -> Iterator[bytes]:
+    """Read a streamed response chunk by chunk until the deadline of the download.
+
+    Arguments:
+        response: Streamed response.
+        deadline: Optional deadline of the download (time.monotonic()).
+        metrics: Optional run metrics (downloaded bytes).
+
+    Yields:
+        bytes: Received chunks (content decoding applied).
+
+    Raises:
+        TimeoutError: The deadline is exceeded.
+    """
+    if isinstance(response.raw, urllib3.HTTPResponse):
+        # Returns as soon as any data is received: iter_content() waits until a chunk is complete
+        chunks = iter(partial(response.raw.read1, STREAM_CHUNK_SIZE, decode_content=True), b"")
+    else:
+        chunks = response.iter_content(STREAM_CHUNK_SIZE)  # Local files
+    for data in chunks:
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError
+        if metrics is not None:
+            metrics.add("downloaded_bytes_total", len(data))
+        yield data
+
+
+def _decode_text(
+    response: requests.Response, chunks: Iterator[bytes], consume: Callable[[str], None] | None = None
+) -> str:
+    """Decode a streamed response chunk by chunk.
+
+    Arguments:
+        response: Streamed response.
+        chunks: Received chunks of the response.
+        consume: Optional consumer of the decoded chunks.
+
+    Returns:
+        str: Decoded response content. Decoded like requests.Response.text, UTF-8 if no encoding is declared.
+    """
+    decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+    texts = []
+    with response:
+        for data in chunks:
+            texts.append(decoder.decode(data))
+            if consume is not None:
+                consume(texts[-1])
+    texts.append(decoder.decode(b"", final=True))
+    if consume is not None:
+        consume(texts[-1])
+    return "".join(texts)
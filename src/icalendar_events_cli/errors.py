@@ -0,0 +1,7 @@
+"""Errors raised by the calendar sources."""
+
+# ---- Classes ---------------------------------------------------------------------------------------------------------
+
+
+class DownloadError(Exception):
+    """Download of a calendar failed (connection error, timeout or error response)."""
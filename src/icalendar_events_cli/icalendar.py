@@ -1,9 +1,10 @@
 """Access to icalendar objects and hierarchies."""
 
 # ---- Imports ---------------------------------------------------------------------------------------------------------
-import json
 import re
+from collections.abc import Callable, Iterable, Iterator
 from datetime import date, datetime, timedelta
+from itertools import chain
 
 import pytz
 import recurring_ical_events
@@ -14,6 +15,13 @@ from icalendar.cal import Event
 from recurring_ical_events import CalendarQuery
 from tzlocal import get_localzone
 
+from .dateindex import DateIndex
+from .jcal import prefilter_jcal
+from .jsoncodec import loads
+from .limits import ExpansionLimits, chunked_between
+from .regex_analysis import literal_prefixes
+from .textindex import TextIndex, candidate_uids
+
 # ---- Globals ---------------------------------------------------------------------------------------------------------
 __local_timezone = pytz.timezone(get_localzone().key)
 
@@ -21,94 +29,183 @@ __local_timezone = pytz.timezone(get_localzone().key)
 # ---- Functions -------------------------------------------------------------------------------------------------------
 
 
-def parse_calendar(calendar_string: str) -> Calendar:
+def parse_calendar(calendar_string: str, filter_config: dict | None = None) -> Calendar:
     """Parse the calendar.
 
     Arguments:
         calendar_string: Calendar RAW content string.
+        filter_config: Optional filter configuration hierarchy. If set, non-recurring events of jCal calendars which
+                       cannot match the filters are skipped while parsing (see prefilter_jcal()).
 
     Returns:
         Calendar: Parsed iCalendar Calendar.
     """
-    if has_jcal_format(calendar_string):
-        calendar = Calendar.from_jcal(calendar_string)
+    jcal = _load_jcal(calendar_string)
+    if jcal is not None:
+        if filter_config is not None:
+            jcal = prefilter_jcal(jcal, filter_config.start_date, filter_config.end_date, text_matchers(filter_config))
+        calendar = Calendar.from_jcal(jcal)  # Already decoded: no second JSON decoding pass
     else:
         calendar = Calendar.from_ical(calendar_string)
     return calendar
 
 
-def has_jcal_format(calendar_string: str) -> bool:
-    """Determine if the calendar raw content string contains a calendar in jCal format (RFC 7265).
+def _load_jcal(calendar_string: str) -> list | None:
+    """Decode the calendar raw content string if it is in JSON / jCal format (RFC 7265).
 
     Arguments:
         calendar_string: Calendar RAW content string.
 
     Returns:
-        bool: True if jcal format was detected.
+        Decoded jCal hierarchy or None if the content is no JSON.
     """
     try:
-        json.loads(calendar_string)
-        return True
-    except (json.JSONDecodeError, OSError):
-        return False
+        return loads(calendar_string)
+    except (ValueError, OSError):
+        return None
 
 
-def recurring_calendar(calendar: Calendar, filter_config: dict) -> CalendarQuery:
-    """Parse the calendar.
+def recurring_calendar(
+    calendar: Calendar,
+    filter_config: dict,
+    text_index: TextIndex | None = None,
+    date_index: DateIndex | None = None,
+    limits: ExpansionLimits | None = None,
+) -> Iterator[Event]:
+    """Expand all (recurring) events within the filtered date range.
+
+    The occurrences are expanded lazily series by series. Consumers which stop early (e.g. the 'exists' output)
+    do not pay for the expansion of the remaining series.
 
     Arguments:
         calendar: iCalendar calendar.
         filter_config: Filter configuration hierarchy.
+        text_index: Optional text index of the calendar. Series which cannot match the text filters are not expanded.
+        date_index: Optional date index of the calendar. Non-recurring events are looked up instead of expanded.
+        limits: Optional safety limits of the expansion. Truncated series are recorded in the limits.
 
     Returns:
-        CalendarQuery: Parsed CalendarQuery.
+        Iterator[Event]: Lazy iterator over all event occurrences (unsorted).
+    """
+    uids = candidate_uids(text_index, filter_config)
+    limited = limits is not None and limits.is_limited
+    if date_index is not None:
+        series = date_index.series_between(filter_config.start_date, filter_config.end_date, uids, limited)
+    else:
+        calendar_components = ["VEVENT"]  # Only events
+        query = recurring_ical_events.of(calendar, components=calendar_components)
+        series = _series_occurrences(query, filter_config.start_date, filter_config.end_date, uids, limited)
+
+    if not limited:
+        return chain.from_iterable(occurrences for _, occurrences in series)
+    return limits.apply(series)
+
+
+def _series_occurrences(
+    query: CalendarQuery, start_date: datetime, end_date: datetime, uids: set | None = None, chunked: bool = False
+) -> Iterator[tuple[str, Iterator[Event]]]:
+    """Lazily expand the occurrences of all series of a calendar query.
+
+    Same result as CalendarQuery.between() but without collecting all occurrences into a list upfront.
+
+    Arguments:
+        query: Calendar query.
+        start_date: Start of the date range.
+        end_date: End of the date range.
+        uids: Optional UIDs of the series to be expanded. If not set all series are expanded.
+        chunked: Expand the date range chunk by chunk (see limits.chunked_between()).
+
+    Yields:
+        tuple[str, Iterator[Event]]: UID and lazily expanded occurrences within the date range of each series.
     """
-    calendar_components = ["VEVENT"]  # Only events
-    return recurring_ical_events.of(calendar, components=calendar_components).between(
-        filter_config.start_date, filter_config.end_date
-    )
+    keep_recurrence_attributes = query.keep_recurrence_attributes
+    for series in query.series:
+        if uids is not None and series.uid not in uids:
+            continue
+        occurrences = chunked_between(series, start_date, end_date) if chunked else series.between(start_date, end_date)
+        yield series.uid, (occurrence.as_component(keep_recurrence_attributes) for occurrence in occurrences)
 
 
-def filter_events(events: CalendarQuery, filter_config: dict) -> CalendarQuery:
+def filter_events(events: Iterable[Event], filter_config: dict) -> Iterable[Event]:
     """Filter the calendar.
 
     Arguments:
-        events: Calendar to be filtered.
+        events: Calendar events to be filtered.
         filter_config: Filter config hierarchy
 
     Returns:
-        CalendarQuery: Filtered calendar.
+        Iterable[Event]: Lazily filtered calendar events.
     """
     if filter_config.summary is not None:
+        summary_matches = text_matcher(filter_config.summary)
         events = filter(
-            lambda event: (
-                (summary := get_event_summary(event)) is not None
-                and re.match(filter_config.summary, summary) is not None
-            ),
+            lambda event: (summary := get_event_summary(event)) is not None and summary_matches(summary),
             events,
         )
 
     if filter_config.description is not None:
+        description_matches = text_matcher(filter_config.description)
         events = filter(
             lambda event: (
-                (description := get_event_description(event)) is not None
-                and re.match(filter_config.description, description) is not None
+                (description := get_event_description(event)) is not None and description_matches(description)
             ),
             events,
         )
 
     if filter_config.location is not None:
+        location_matches = text_matcher(filter_config.location)
         events = filter(
-            lambda event: (
-                (location := get_event_location(event)) is not None
-                and re.match(filter_config.location, location) is not None
-            ),
+            lambda event: (location := get_event_location(event)) is not None and location_matches(location),
             events,
         )
 
     return events
 
 
+def text_matchers(filter_config: dict) -> list[tuple[str, Callable[[str], bool]]]:
+    """Build the match functions of all configured text filters.
+
+    Arguments:
+        filter_config: Filter configuration hierarchy.
+
+    Returns:
+        list[tuple[str, Callable[[str], bool]]]: (property name, match function) of all configured text filters.
+    """
+    return [
+        (name, text_matcher(pattern))
+        for name, pattern in (
+            ("SUMMARY", filter_config.summary),
+            ("DESCRIPTION", filter_config.description),
+            ("LOCATION", filter_config.location),
+        )
+        if pattern is not None
+    ]
+
+
+def text_matcher(pattern: str) -> Callable[[str], bool]:
+    """Build the match function of a text filter RegEx (anchored at the start like re.match).
+
+    If the RegEx requires literal prefixes, texts not starting with any of them are rejected by a plain
+    str.startswith() check without running the RegEx engine.
+
+    Arguments:
+        pattern: RegEx pattern of the filter.
+
+    Returns:
+        Callable[[str], bool]: Function checking if a text matches.
+    """
+    regex = re.compile(pattern)
+    prefixes = literal_prefixes(pattern)
+    if prefixes is None:
+        return lambda text: regex.match(text) is not None
+
+    prefixes, ignore_case = prefixes
+    if ignore_case:
+        max_length = max(len(prefix) for prefix in prefixes)
+        return lambda text: text[:max_length].lower().startswith(prefixes) and regex.match(text) is not None
+    return lambda text: text.startswith(prefixes) and regex.match(text) is not None
+
+
 def get_event_summary(event: Event) -> str:
     """Get 'SUMMARY' attribute of calendar event.
 
@@ -145,6 +242,75 @@ def get_event_location(event: Event) -> str:
     return event.decoded("LOCATION", default=None)
 
 
+def get_event_uid(event: Event) -> str:
+    """Get 'UID' attribute of calendar event.
+
+    Arguments:
+        event: Calendar Event.
+
+    Returns:
+        UID attribute.
+    """
+    return event.decoded("UID", default=None)
+
+
+def get_event_categories(event: Event) -> list[str] | None:
+    """Get 'CATEGORIES' attribute of calendar event.
+
+    Arguments:
+        event: Calendar Event.
+
+    Returns:
+        All categories of all 'CATEGORIES' properties.
+    """
+    categories = event.get("CATEGORIES")
+    if categories is None:
+        return None
+    return [
+        str(category)
+        for item in (categories if isinstance(categories, list) else [categories])
+        for category in item.cats
+    ]
+
+
+def get_event_status(event: Event) -> str:
+    """Get 'STATUS' attribute of calendar event.
+
+    Arguments:
+        event: Calendar Event.
+
+    Returns:
+        Status attribute.
+    """
+    return event.decoded("STATUS", default=None)
+
+
+def get_event_url(event: Event) -> str:
+    """Get 'URL' attribute of calendar event.
+
+    Arguments:
+        event: Calendar Event.
+
+    Returns:
+        URL attribute.
+    """
+    return event.decoded("URL", default=None)
+
+
+def is_event_busy(event: Event) -> bool:
+    """Check if a calendar event blocks time ('TRANSP' is not transparent and 'STATUS' is not cancelled).
+
+    Arguments:
+        event: Calendar Event.
+
+    Returns:
+        True if the event blocks time.
+    """
+    transparency = str(event.get("TRANSP", "OPAQUE")).upper()
+    status = str(event.get("STATUS", "")).upper()
+    return transparency != "TRANSPARENT" and status != "CANCELLED"
+
+
 def get_event_dtstart(event: Event) -> date:
     """Get 'DTSTART' start-date of calendar event.
 
@@ -179,3 +345,41 @@ def get_event_dtend(event: Event) -> date:
         end = datetime.combine(end, datetime.max.time()).replace(microsecond=0)
         end = __local_timezone.localize(end)
     return end
+
+
+def get_event_period(event: Event) -> tuple[datetime, datetime]:
+    """Get the half-open period [start, end) of calendar event.
+
+    In contrast to get_event_dtend() full-day events end at midnight of the following day.
+    Thereby adjacent events share the same boundary instead of being one second apart.
+
+    Arguments:
+        event: Calendar Event.
+
+    Returns:
+        Start and (exclusive) end date.
+    """
+    end = event.decoded("DTEND")
+    if not isinstance(end, datetime):
+        end = __local_timezone.localize(datetime.combine(end, datetime.min.time()))
+    return get_event_dtstart(event), end
+
+
+def get_event_instants(event: Event) -> tuple[datetime, datetime]:
+    """Get the half-open period [start, end) of calendar event as comparable instants.
+
+    Floating date-times (without timezone) are interpreted in the local timezone, like the sort keys of the
+    occurrences (see columnar.OccurrenceColumns). Thereby floating and timezone-aware events can be compared.
+
+    Arguments:
+        event: Calendar Event.
+
+    Returns:
+        Timezone-aware start and (exclusive) end date.
+    """
+    start, end = get_event_period(event)
+    if start.tzinfo is None:
+        start = __local_timezone.localize(start)
+    if end.tzinfo is None:
+        end = __local_timezone.localize(end)
+    return start, end
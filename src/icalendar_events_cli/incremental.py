@@ -0,0 +1,142 @@
+"""Incremental parser of iCalendar contents: components are parsed while later chunks are still downloaded."""
+
+# ---- Imports ---------------------------------------------------------------------------------------------------------
+import re
+
+from icalendar import Calendar
+from icalendar.cal.component import Component
+
+from .icalendar import parse_calendar
+
+# ---- Globals ---------------------------------------------------------------------------------------------------------
+
+FOLD = re.compile("(\r?\n)+[ \t]")  # Line break of a folded content line (same as the icalendar parser)
+
+# ---- Classes ---------------------------------------------------------------------------------------------------------
+
+
+class IncrementalCalendarParser:
+    """Parser of iCalendar contents fed chunk by chunk (e.g. by a streamed download).
+
+    The chunks are split into content lines (incl. folded continuation lines). As soon as a sub-component of the
+    calendar (VEVENT, VTIMEZONE, ...) is complete, it is parsed with the icalendar component parser. The parsed
+    calendar is identical to Calendar.from_ical() of the complete contents.
+
+    Contents not parseable component by component are parsed as a whole by calendar(): jCal contents, multiple
+    calendars, invalid components and VTIMEZONE components following other components (forward references of
+    timezones, see Calendar.from_ical()).
+    """
+
+    def __init__(self) -> None:
+        """Construct."""
+        self._fed = 0  # Number of fed characters
+        self._tail = ""  # Incomplete physical line of the last chunk
+        self._line = []  # Physical lines of the current content line (first line and continuation lines)
+        self._depth = 0  # Nesting depth of the components
+        self._calendar_lines = []  # Content lines of the calendar itself (BEGIN / properties / END)
+        self._component_lines = []  # Content lines of the current sub-component of the calendar
+        self._components = []  # Parsed sub-components of the calendar
+        self._timezones_only = True  # Only VTIMEZONE components parsed so far
+        self._whole = False  # Contents must be parsed as a whole
+
+    def feed(self, chunk: str) -> None:
+        """Feed the next chunk of the contents.
+
+        Arguments:
+            chunk: Next chunk of the contents.
+        """
+        self._fed += len(chunk)
+        if self._whole:
+            return
+        if self._fed == len(chunk) and chunk.lstrip()[:1] in ("[", "{"):
+            self._whole = True  # jCal
+            return
+
+        lines = (self._tail + chunk).split("\n")
+        self._tail = lines.pop()
+        for line in lines:
+            self._physical_line(line + "\n")
+
+    def calendar(self, contents: str, filter_config: dict | None = None) -> Calendar:
+        """Finish the parsing and get the parsed calendar.
+
+        Arguments:
+            contents: Complete contents. Parsed as a whole if they differ from the fed chunks (e.g. a stale copy was
+                      used instead of the download) or could not be parsed component by component.
+            filter_config: Optional filter configuration hierarchy (jCal contents only, see parse_calendar()).
+
+        Returns:
+            Calendar: Parsed calendar.
+        """
+        if not self._whole and self._fed == len(contents) and self._fed > 0:
+            self._physical_line(self._tail)
+            self._tail = ""
+            self._content_line()
+            if self._depth == 0 and self._calendar_lines:
+                try:
+                    calendar = Calendar.from_ical("".join(self._calendar_lines))
+                except ValueError:
+                    pass  # Reported by the parsing as a whole
+                else:
+                    for component in self._components:
+                        calendar.add_component(component)
+                    return calendar
+        return parse_calendar(contents, filter_config)
+
+    def _physical_line(self, line: str) -> None:
+        """Process a physical line.
+
+        Arguments:
+            line: Physical line (incl. line break).
+        """
+        if line[:1] in (" ", "\t") or not line.strip():
+            self._line.append(line)  # Continuation line (or empty line, skipped by the component parser)
+            return
+        self._content_line()
+        self._line = [line]
+
+    def _content_line(self) -> None:
+        """Process the completed content line."""
+        if not self._line or self._whole:
+            return
+        raw = "".join(self._line)
+        self._line = []
+        name, _, value = FOLD.sub("", raw).partition(":")
+        name, value = name.partition(";")[0].strip().upper(), value.strip().upper()
+        if not name:
+            return  # Empty lines at the beginning
+
+        if name == "BEGIN":
+            self._depth += 1
+            if self._depth == 1 and (value != "VCALENDAR" or self._calendar_lines):
+                self._whole = True  # No or multiple calendars
+                return
+        elif self._depth == 0:
+            self._whole = True  # Content line outside of the calendar
+            return
+
+        if self._depth >= 2:
+            self._component_lines.append(raw)
+        else:
+            self._calendar_lines.append(raw)
+
+        if name == "END":
+            self._depth -= 1
+            if self._depth == 1:
+                self._parse_component()
+
+    def _parse_component(self) -> None:
+        """Parse the completed sub-component of the calendar."""
+        try:
+            component = Component.from_ical("".join(self._component_lines))
+        except ValueError:
+            self._whole = True  # Reported by the parsing as a whole
+            return
+        finally:
+            self._component_lines = []
+        if component.name != "VTIMEZONE":
+            self._timezones_only = False
+        elif not self._timezones_only:
+            self._whole = True  # Forward reference: Components parsed before may have the wrong timezone attached
+            return
+        self._components.append(component)
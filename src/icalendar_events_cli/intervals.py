@@ -0,0 +1,77 @@
+"""Interval algorithms working on streams of events sorted by start date."""
+
+# ---- Imports ---------------------------------------------------------------------------------------------------------
+import heapq
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+
+from .icalendar import Event, get_event_instants, is_event_busy
+
+# ---- Functions -------------------------------------------------------------------------------------------------------
+
+
+def busy_intervals(sorted_events: Iterable[Event]) -> Iterator[tuple[datetime, datetime]]:
+    """Merge the events into non-overlapping busy intervals.
+
+    Single sweep over the events sorted by start date. Overlapping and adjacent events are merged.
+    Transparent and cancelled events do not block time and are skipped, as well as zero-length events (e.g. without
+    DTEND / DURATION). Floating events are interpreted in the local timezone.
+    Only the currently open interval is kept in memory.
+
+    Arguments:
+        sorted_events: Calendar events sorted by start date.
+
+    Yields:
+        tuple[datetime, datetime]: Busy interval [start, end).
+    """
+    current_start = None
+    current_end = None
+    for event in sorted_events:
+        if not is_event_busy(event):
+            continue
+        start, end = get_event_instants(event)
+        if start >= end:
+            continue
+        if current_end is not None and start <= current_end:
+            current_end = max(current_end, end)
+            continue
+        if current_end is not None:
+            yield current_start, current_end
+        current_start, current_end = start, end
+
+    if current_end is not None:
+        yield current_start, current_end
+
+
+def overlapping_events(sorted_events: Iterable[Event]) -> Iterator[tuple[Event, Event, datetime, datetime]]:
+    """Find all pairs of overlapping events.
+
+    Single sweep over the events sorted by start date. The events still active at the start of the current event
+    are kept in a min-heap ordered by their end date (and by start order in an insertion-ordered dict). Events ended
+    before the current start are removed from both, all remaining events overlap with the current event.
+    Runtime O(n log n + k) with k overlapping pairs.
+    Transparent and cancelled events do not block time and are skipped, as well as zero-length events (same as the
+    busy intervals). Adjacent events do not overlap. Floating events are interpreted in the local timezone.
+
+    Arguments:
+        sorted_events: Calendar events sorted by start date.
+
+    Yields:
+        tuple[Event, Event, datetime, datetime]: Earlier event, later event, overlap start and overlap end.
+    """
+    ends = []  # heap of (end, sequence number)
+    active = {}  # sequence number -> (end, event) in start order
+    for sequence_number, event in enumerate(sorted_events):
+        if not is_event_busy(event):
+            continue
+        start, end = get_event_instants(event)
+        if start >= end:
+            continue
+        while ends and ends[0][0] <= start:
+            del active[heapq.heappop(ends)[1]]
+
+        for active_end, active_event in active.values():
+            yield active_event, event, start, min(active_end, end)
+
+        heapq.heappush(ends, (end, sequence_number))
+        active[sequence_number] = (end, event)
@@ -0,0 +1,229 @@
+"""Fast path for jCal (RFC 7265) calendars: pre-selection of non-recurring events on the decoded jCal tree."""
+
+# ---- Imports ---------------------------------------------------------------------------------------------------------
+from collections import Counter
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+
+# ---- Globals ---------------------------------------------------------------------------------------------------------
+
+# Largest possible UTC offset. The date range check on the raw (timezone-less) jCal values must never reject an event
+# which overlaps the filtered date range in its timezone.
+_OFFSET_SLACK = timedelta(days=1)
+
+# Properties making an event part of a recurring series
+_RECURRENCE_PROPERTIES = ("rrule", "rdate", "recurrence-id")
+
+# Properties of an event read by the pre-selection
+_RECORD_PROPERTIES = ("uid", "dtstart", "dtend", "duration", "summary", "description", "location")
+
+# ---- Functions -------------------------------------------------------------------------------------------------------
+
+
+def prefilter_jcal(
+    jcal: list, start_date: datetime, end_date: datetime, matchers: list[tuple[str, Callable[[str], bool]]]
+) -> list:
+    """Remove all non-recurring events which cannot match the filters from a decoded jCal calendar.
+
+    Non-recurring events are read directly from the jCal arrays into lightweight property records and checked against
+    the filtered date range and the text filters. Only the remaining events are converted into icalendar components.
+    Recurring series, their modified occurrences and events sharing a UID with other events are always kept and
+    expanded / filtered by the regular icalendar / recurring_ical_events path.
+
+    The check is conservative: Events it cannot decide (e.g. unusual value types) are kept. The regular filtering
+    applied afterwards therefore produces exactly the same result as without the pre-selection.
+
+    Arguments:
+        jcal: Decoded jCal calendar hierarchy.
+        start_date: Start of the filtered date range.
+        end_date: End of the filtered date range.
+        matchers: (property name, match function) of all configured text filters (see icalendar.text_matchers()).
+
+    Returns:
+        list: jCal calendar hierarchy without the rejected events.
+              The unchanged hierarchy if it is no valid 'vcalendar'.
+    """
+    if not _is_vcalendar(jcal):
+        return jcal  # Let icalendar report the error
+
+    _, properties, components = jcal
+    uid_counts = Counter(_component_uid(component) for component in components if _is_vevent(component))
+    matchers = [(name.lower(), matches) for name, matches in matchers]
+    window_start = _naive_utc(start_date)
+    window_end = _naive_utc(end_date)
+
+    kept_components = []
+    for component in components:
+        if _is_vevent(component):
+            record = _event_record(component)
+            if (
+                record is not None
+                and uid_counts[_component_uid(component)] == 1
+                and not (_window_overlaps(record, window_start, window_end) and _texts_match(record, matchers))
+            ):
+                continue
+        kept_components.append(component)
+    return ["vcalendar", properties, kept_components]
+
+
+def _window_overlaps(record: dict, window_start: datetime, window_end: datetime) -> bool:
+    """Check if a non-recurring event might overlap the filtered date range.
+
+    Arguments:
+        record: Property record of the event (see _event_record()).
+        window_start: Start of the date range (naive UTC).
+        window_end: End of the date range (naive UTC).
+
+    Returns:
+        bool: False only if the event does definitely not overlap the date range.
+    """
+    start, is_date = _jcal_datetime(record.get("dtstart"))
+    if start is None:
+        return True
+
+    if "dtend" in record:
+        end, _ = _jcal_datetime(record["dtend"])
+    elif "duration" in record:
+        end = None  # Not evaluated: only the start is checked
+    else:
+        end = start + timedelta(days=1) if is_date else start  # RFC 5545: one day / zero duration
+
+    if start - _OFFSET_SLACK >= window_end:
+        return False
+    return end is None or max(start, end) + _OFFSET_SLACK > window_start
+
+
+def _texts_match(record: dict, matchers: list[tuple[str, Callable[[str], bool]]]) -> bool:
+    """Check if a non-recurring event might match all configured text filters.
+
+    Arguments:
+        record: Property record of the event (see _event_record()).
+        matchers: (jCal property name, match function) of all configured text filters.
+
+    Returns:
+        bool: False only if the event does definitely not match the text filters.
+    """
+    for name, matches in matchers:
+        if name not in record:
+            return False  # Property not set: never matches the filter
+        prop = record[name]
+        if prop is None or len(prop) != 4 or prop[2] != "text" or not isinstance(prop[3], str):
+            continue  # Multiple or unusual values: decided by the regular filtering
+        if not matches(prop[3]):
+            return False
+    return True
+
+
+def _event_record(component: list) -> dict | None:
+    """Read the properties of a non-recurring jCal 'vevent' into a lightweight record.
+
+    Arguments:
+        component: jCal component array.
+
+    Returns:
+        dict | None: jCal property name -> property array (None if the property is set multiple times).
+                     None if the event is part of a recurring series.
+    """
+    record = {}
+    for prop in component[1]:
+        name = prop[0]
+        if name in _RECURRENCE_PROPERTIES:
+            return None
+        if name in _RECORD_PROPERTIES:
+            record[name] = None if name in record else prop
+    return record
+
+
+def _jcal_datetime(prop: list | None) -> tuple[datetime | None, bool]:
+    """Read the (timezone-less) date / date-time value of a jCal property.
+
+    Arguments:
+        prop: jCal property array.
+
+    Returns:
+        tuple[datetime | None, bool]: Date-time value (None if not readable) and whether the value is a date.
+    """
+    if prop is None or len(prop) != 4 or prop[2] not in ("date", "date-time") or not isinstance(prop[3], str):
+        return None, False
+    value = prop[3].removesuffix("Z")
+    try:
+        return datetime.fromisoformat(value), prop[2] == "date"
+    except ValueError:
+        return None, False
+
+
+def _naive_utc(value: datetime) -> datetime:
+    """Convert a date-time into a naive UTC date-time.
+
+    Arguments:
+        value: Date-time (naive date-times are kept as they are).
+
+    Returns:
+        datetime: Naive UTC date-time.
+    """
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _component_uid(component: list) -> object:
+    """Get the UID of a jCal component.
+
+    Arguments:
+        component: jCal component array.
+
+    Returns:
+        object: UID value or the Python ID of the component if absent (same as recurring_ical_events).
+    """
+    for prop in component[1]:
+        if prop[0] == "uid" and len(prop) > 3 and isinstance(prop[3], str):
+            return prop[3]
+    return id(component)
+
+
+def _is_vcalendar(jcal: object) -> bool:
+    """Check if a decoded JSON object is a jCal 'vcalendar' hierarchy.
+
+    Arguments:
+        jcal: Decoded JSON object.
+
+    Returns:
+        bool: True if it is a jCal 'vcalendar' hierarchy with well-formed components.
+    """
+    return (
+        isinstance(jcal, list)
+        and len(jcal) == 3
+        and jcal[0] == "vcalendar"
+        and isinstance(jcal[2], list)
+        and all(_is_component(component) for component in jcal[2])
+    )
+
+
+def _is_component(component: object) -> bool:
+    """Check if a decoded JSON object is a well-formed jCal component.
+
+    Arguments:
+        component: Decoded JSON object.
+
+    Returns:
+        bool: True if it is a [name, properties, components] array with well-formed property arrays.
+    """
+    return (
+        isinstance(component, list)
+        and len(component) == 3
+        and isinstance(component[0], str)
+        and isinstance(component[1], list)
+        and all(isinstance(prop, list) and prop and isinstance(prop[0], str) for prop in component[1])
+    )
+
+
+def _is_vevent(component: list) -> bool:
+    """Check if a jCal component is a 'vevent'.
+
+    Arguments:
+        component: jCal component array.
+
+    Returns:
+        bool: True if it is a 'vevent'.
+    """
+    return component[0] == "vevent"
@@ -0,0 +1,101 @@
+"""Pluggable JSON codec: orjson if installed (optional extra 'fast-json'), otherwise the stdlib json module."""
+
+# ---- Imports ---------------------------------------------------------------------------------------------------------
+import json
+from datetime import date
+from enum import Enum
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# ---- Globals ---------------------------------------------------------------------------------------------------------
+
+
+class JsonBackend(Enum):
+    """All supported JSON backends."""
+
+    json = "json"  # pylint: disable=invalid-name;reason=camel_case style wanted for cli param
+    orjson = "orjson"  # pylint: disable=invalid-name;reason=camel_case style wanted for cli param
+
+
+AVAILABLE_BACKENDS = [JsonBackend.json] + ([JsonBackend.orjson] if orjson is not None else [])
+
+_backend = AVAILABLE_BACKENDS[-1]  # Fastest available backend
+
+# ---- Functions -------------------------------------------------------------------------------------------------------
+
+
+def get_backend() -> JsonBackend:
+    """Get the active JSON backend.
+
+    Returns:
+        JsonBackend: Active backend.
+    """
+    return _backend
+
+
+def set_backend(backend: JsonBackend) -> None:
+    """Select the active JSON backend.
+
+    Arguments:
+        backend: Backend to be used.
+
+    Raises:
+        ValueError: if the backend is not installed.
+    """
+    global _backend  # pylint: disable=global-statement;reason=process wide backend selection
+    if backend not in AVAILABLE_BACKENDS:
+        raise ValueError(f"JSON backend '{backend.value}' is not installed")
+    _backend = backend
+
+
+def dumps(obj: object) -> str:
+    """Serialize an object to a JSON string (indented by 2 spaces, non-ASCII characters not escaped).
+
+    Date and date-time values are serialized natively in ISO 8601 format.
+    All backends produce identical output.
+
+    Arguments:
+        obj: Object to be serialized.
+
+    Returns:
+        str: JSON string.
+    """
+    if _backend is JsonBackend.orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(obj, indent=2, ensure_ascii=False, default=_json_default)
+
+
+def loads(data: str) -> object:
+    """Deserialize a JSON string.
+
+    Invalid JSON raises json.JSONDecodeError (orjson.JSONDecodeError is a subclass of it).
+
+    Arguments:
+        data: JSON string.
+
+    Returns:
+        object: Deserialized object.
+    """
+    if _backend is JsonBackend.orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_default(value: object) -> str:
+    """Serialize objects not supported by the stdlib json module (same format as orjson).
+
+    Arguments:
+        value: Value to be serialized.
+
+    Returns:
+        str: ISO 8601 format of date and date-time values.
+
+    Raises:
+        TypeError: if the value is not serializable.
+    """
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,156 @@
+"""Safety limits and time budget of the event expansion."""
+
+# ---- Imports ---------------------------------------------------------------------------------------------------------
+import time
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timedelta
+
+from icalendar.cal import Event
+from recurring_ical_events.occurrence import Occurrence
+from recurring_ical_events.series import Series
+
+# ---- Globals ---------------------------------------------------------------------------------------------------------
+
+EXIT_CODE_TRUNCATED = 3  # Exit code if the expansion was truncated by a limit
+
+_FIRST_CHUNK = timedelta(days=1)  # Date range of the first expansion chunk of a series
+_CHUNK_OCCURRENCES = 1000  # The chunk is only enlarged while fewer occurrences are expanded per chunk
+
+# ---- Classes ---------------------------------------------------------------------------------------------------------
+
+
+class ExpansionLimits:
+    """Safety limits of the lazy expansion of the event series (e.g. unbounded FREQ=SECONDLY rules).
+
+    A limit which is hit stops the expansion cleanly: All occurrences expanded so far are still passed to the output.
+    The UIDs of the truncated series are recorded for the report.
+    """
+
+    def __init__(
+        self,
+        max_occurrences: int | None = None,
+        max_series_occurrences: int | None = None,
+        time_budget: float | None = None,
+    ) -> None:
+        """Construct.
+
+        Arguments:
+            max_occurrences: Maximum number of expanded occurrences of all series.
+            max_series_occurrences: Maximum number of expanded occurrences per series.
+            time_budget: Maximum wall-clock duration of the expansion in seconds.
+        """
+        self.max_occurrences = max_occurrences
+        self.max_series_occurrences = max_series_occurrences
+        self.time_budget = time_budget
+        self.truncated = {}  # Reason -> UIDs of the truncated series
+
+    @classmethod
+    def from_config(cls, filter_config: dict) -> "ExpansionLimits":
+        """Build the limits from the filter configuration.
+
+        Arguments:
+            filter_config: Filter configuration hierarchy.
+
+        Returns:
+            ExpansionLimits: Configured limits.
+        """
+        return cls(filter_config.max_occurrences, filter_config.max_series_occurrences, filter_config.time_budget)
+
+    @property
+    def is_limited(self) -> bool:
+        """Check if any limit is configured.
+
+        Returns:
+            bool: True if any limit is configured.
+        """
+        return any(limit is not None for limit in (self.max_occurrences, self.max_series_occurrences, self.time_budget))
+
+    def apply(self, series: Iterable[tuple[str, Iterable[Event]]]) -> Iterator[Event]:
+        """Lazily expand the occurrences of all series within the limits.
+
+        The time budget starts with the expansion of the first occurrence.
+
+        Arguments:
+            series: (UID, lazy occurrences) of all series.
+
+        Yields:
+            Event: Event occurrences.
+        """
+        deadline = None if self.time_budget is None else time.monotonic() + self.time_budget
+        total = 0
+        for uid, occurrences in series:
+            count = 0
+            for occurrence in occurrences:
+                if self.max_occurrences is not None and total >= self.max_occurrences:
+                    self._truncate(f"max-occurrences ({self.max_occurrences}) reached", uid)
+                    return
+                if deadline is not None and time.monotonic() > deadline:
+                    self._truncate(f"time-budget ({self.time_budget} s) exceeded", uid)
+                    return
+                if self.max_series_occurrences is not None and count >= self.max_series_occurrences:
+                    self._truncate(f"max-series-occurrences ({self.max_series_occurrences}) reached", uid)
+                    break
+                yield occurrence
+                total += 1
+                count += 1
+
+    def report(self) -> str:
+        """Build the report of all truncated series.
+
+        Returns:
+            str: Report (empty if nothing was truncated).
+        """
+        lines = []
+        for reason, uids in self.truncated.items():
+            skipped = "" if reason.startswith("max-series-occurrences") else ", all following series skipped"
+            lines.append(f"- {reason}: truncated series {', '.join(repr(uid) for uid in uids)}{skipped}")
+        if not lines:
+            return ""
+        return "\n".join(["WARNING: expansion of the events truncated, the output is incomplete:", *lines])
+
+    def _truncate(self, reason: str, uid: str) -> None:
+        """Record a truncated series.
+
+        Arguments:
+            reason: Limit which was hit.
+            uid: UID of the truncated series.
+        """
+        self.truncated.setdefault(reason, []).append(str(uid))
+
+
+# ---- Functions -------------------------------------------------------------------------------------------------------
+
+
+def chunked_between(series: Series, start_date: datetime, end_date: datetime) -> Iterator[Occurrence]:
+    """Lazily expand the occurrences of a series within a date range chunk by chunk.
+
+    Series.between() computes all recurrences of the date range upfront (dateutil's rrule.between() returns a list):
+    An unbounded FREQ=SECONDLY series queried over a year computes millions of recurrences before the first occurrence
+    is returned. Expanding the date range in growing chunks bounds this work to the actually consumed occurrences.
+    Only the IDs of the occurrences overlapping a chunk boundary are kept (returned once).
+
+    Arguments:
+        series: Event series.
+        start_date: Start of the date range.
+        end_date: End of the date range.
+
+    Yields:
+        Occurrence: Occurrences within the date range (same set as Series.between()).
+    """
+    returned = set()  # IDs of the occurrences overlapping the previous chunk boundary: already returned
+    chunk_start, chunk = start_date, _FIRST_CHUNK
+    while True:
+        chunk_end = min(chunk_start + chunk, end_date)
+        count = 0
+        overlapping = set()  # IDs of the occurrences overlapping the end of this chunk
+        for occurrence in series.between(chunk_start, chunk_end):
+            count += 1
+            if occurrence.id not in returned:
+                yield occurrence
+            if chunk_end < end_date and occurrence.is_in_span(chunk_end, end_date):
+                overlapping.add(occurrence.id)
+        if chunk_end >= end_date:
+            return
+        if count < _CHUNK_OCCURRENCES:
+            chunk *= 2
+        chunk_start, returned = chunk_end, overlapping
@@ -0,0 +1,229 @@
+"""Merging and de-duplication of calendars from multiple sources."""
+
+# ---- Imports ---------------------------------------------------------------------------------------------------------
+import hashlib
+from collections.abc import Iterable
+from datetime import datetime, timezone
+from enum import Enum
+
+from icalendar import Calendar
+from icalendar.cal import Component, Event
+from icalendar.prop import vDDDLists
+
+# ---- Globals ---------------------------------------------------------------------------------------------------------
+
+# Properties defining the normalized content of an event series (content de-duplication)
+_CONTENT_PROPERTIES = ("DTSTART", "DTEND", "DURATION", "RRULE", "RDATE", "EXDATE", "SUMMARY", "LOCATION", "DESCRIPTION")
+
+
+class Deduplication(str, Enum):
+    """De-duplication modes of merged events."""
+
+    uid = "uid"  # pylint: disable=invalid-name;reason=camel_case style wanted for cli param
+    content = "content"  # pylint: disable=invalid-name;reason=camel_case style wanted for cli param
+
+
+# ---- Classes ---------------------------------------------------------------------------------------------------------
+
+
+class MergedCalendar(Calendar):
+    """Calendar merged from multiple sources.
+
+    Attributes:
+        event_sources: (UID, RECURRENCE-ID) key of each merged event -> URL of the calendar it was taken from.
+    """
+
+    def __init__(self, *args: object, **kwargs: object) -> None:
+        """Construct.
+
+        Arguments:
+            args: Positional arguments of the calendar.
+            kwargs: Keyword arguments of the calendar.
+        """
+        super().__init__(*args, **kwargs)
+        self.event_sources = {}
+
+
+# ---- Functions -------------------------------------------------------------------------------------------------------
+
+
+def merge_calendars(
+    calendar: Calendar,
+    merged_calendars: Iterable[Calendar],
+    deduplication: Deduplication = Deduplication.uid,
+    urls: Iterable[str] | None = None,
+) -> Calendar:
+    """Merge the events of multiple calendars into one calendar and remove duplicate events.
+
+    Events are identified by (UID, RECURRENCE-ID). Of duplicate events the copy with the highest SEQUENCE is kept.
+    With content de-duplication also event series with different UIDs but the same normalized content
+    (dates, recurrence rules and whitespace / case normalized texts) are treated as duplicates.
+
+    The duplicates are removed before the series are expanded. The components are consumed as a stream and only
+    one entry per distinct (UID, RECURRENCE-ID) key is held in memory.
+
+    Arguments:
+        calendar: Main calendar. Its calendar properties are kept.
+        merged_calendars: Calendars whose components are merged into the main calendar.
+        deduplication: De-duplication mode.
+        urls: Optional URLs of the main calendar and the merged calendars. Recorded as source of the merged events
+              (see event_source()).
+
+    Returns:
+        Calendar: Merged calendar (MergedCalendar). The main calendar itself if there is nothing to merge or
+                  de-duplicate.
+    """
+    merged_calendars = list(merged_calendars)
+    if not merged_calendars and deduplication is Deduplication.uid:
+        # Events with the same UID of a single calendar are already merged into one series by the expansion
+        return calendar
+
+    sources = [calendar, *merged_calendars]
+    urls = [None] * len(sources) if urls is None else list(urls)
+    events = {}  # (UID, RECURRENCE-ID) -> event
+    event_sources = {}  # (UID, RECURRENCE-ID) -> URL of the kept event
+    timezones = {}  # TZID -> VTIMEZONE
+    others = []
+    for source, url in zip(sources, urls, strict=True):
+        for component in source.subcomponents:
+            if component.name == "VEVENT":
+                key = _event_key(component)
+                kept = events.get(key)
+                if kept is None or _sequence(component) > _sequence(kept):
+                    events[key] = component
+                    event_sources[key] = url
+            elif component.name == "VTIMEZONE":
+                timezones.setdefault(str(component.get("TZID")), component)
+            else:
+                others.append(component)
+
+    if deduplication is Deduplication.content:
+        events = _deduplicate_content(events)
+
+    merged = MergedCalendar()
+    merged.event_sources = {key: event_sources[key] for key in events}
+    for name, value in calendar.items():
+        merged[name] = value
+    for component in (*timezones.values(), *events.values(), *others):
+        merged.add_component(component)
+    return merged
+
+
+def event_source(calendar: Calendar, event: Event) -> str | None:
+    """Get the URL of the calendar an (expanded) event was taken from.
+
+    Arguments:
+        calendar: Calendar containing the event.
+        event: Calendar event (or an occurrence of it).
+
+    Returns:
+        str | None: URL recorded by merge_calendars() or None if the calendar is not merged. Occurrences of a series
+                    without own modified event are taken from the master event of the series.
+    """
+    if not isinstance(calendar, MergedCalendar):
+        return None
+    uid, recurrence_id = _event_key(event)
+    return calendar.event_sources.get((uid, recurrence_id), calendar.event_sources.get((uid, None)))
+
+
+def _deduplicate_content(events: dict[tuple, Event]) -> dict[tuple, Event]:
+    """Remove event series with the same normalized content but different UIDs.
+
+    Of duplicate series the one with the highest SEQUENCE is kept (first one if equal).
+    Modified occurrences (RECURRENCE-ID) of a removed series are removed as well.
+
+    Arguments:
+        events: (UID, RECURRENCE-ID) -> event mapping.
+
+    Returns:
+        dict[tuple, Event]: (UID, RECURRENCE-ID) -> event mapping without the duplicate series.
+    """
+    kept_keys = {}  # content hash -> (UID, None) key of the kept series
+    removed_uids = set()
+    for key, event in events.items():
+        uid, recurrence_id = key
+        if recurrence_id is not None:
+            continue
+
+        content = _content_hash(event)
+        kept_key = kept_keys.get(content)
+        if kept_key is None:
+            kept_keys[content] = key
+        elif _sequence(event) > _sequence(events[kept_key]):
+            removed_uids.add(kept_key[0])
+            kept_keys[content] = key
+        else:
+            removed_uids.add(uid)
+
+    return {key: event for key, event in events.items() if key[0] not in removed_uids}
+
+
+def _event_key(event: Event) -> tuple:
+    """Get the identification key of an event.
+
+    Arguments:
+        event: Calendar Event.
+
+    Returns:
+        tuple: (UID, RECURRENCE-ID). UID is the Python ID if absent (same as recurring_ical_events), RECURRENCE-ID
+               is None for the master event of a series.
+    """
+    uid = str(event.get("UID", id(event)))
+    recurrence_id = event.get("RECURRENCE-ID")
+    return uid, (None if recurrence_id is None else _normalized_value(recurrence_id))
+
+
+def _sequence(event: Event) -> int:
+    """Get the 'SEQUENCE' revision number of an event.
+
+    Arguments:
+        event: Calendar Event.
+
+    Returns:
+        int: Revision number (0 if not set).
+    """
+    return int(event.get("SEQUENCE", 0))
+
+
+def _content_hash(component: Component) -> bytes:
+    """Calculate the hash of the normalized content of a component.
+
+    Arguments:
+        component: Calendar component.
+
+    Returns:
+        bytes: 128 bit content hash.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for name in _CONTENT_PROPERTIES:
+        digest.update(_normalized_value(component.get(name)).encode())
+        digest.update(b"\x1f")
+    return digest.digest()
+
+
+def _normalized_value(value: object) -> str:
+    """Normalize a property value for comparison.
+
+    Texts are whitespace and case normalized, timezone-aware date-times are converted to UTC.
+
+    Arguments:
+        value: Property value (or list of property values).
+
+    Returns:
+        str: Normalized value.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return "\x1e".join(_normalized_value(item) for item in value)
+    if isinstance(value, vDDDLists):  # e.g. EXDATE
+        return _normalized_value(value.dts)
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+
+    decoded = getattr(value, "dt", None)
+    if isinstance(decoded, datetime) and decoded.tzinfo is not None:
+        return decoded.astimezone(timezone.utc).isoformat()
+    if decoded is not None:
+        return str(decoded)
+    return value.to_ical().decode()
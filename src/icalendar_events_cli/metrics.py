@@ -0,0 +1,313 @@
+"""Run metrics in the Prometheus text exposition format (e.g. for the textfile collector of the node_exporter)."""
+
+# ---- Imports ---------------------------------------------------------------------------------------------------------
+import contextlib
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterable, Iterator
+
+import requests
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # Windows
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None  # POSIX
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None  # Windows
+
+# ---- Globals ---------------------------------------------------------------------------------------------------------
+
+METRIC_PREFIX = "icalendar_events_cli_"
+
+# Metrics with suffix '_total' are counters accumulated over all runs, all others are gauges of the last run
+METRIC_HELP = {
+    "runs_total": "Number of runs by exit code.",
+    "stage_duration_seconds_total": "Accumulated duration of the run stages in seconds.",
+    "downloaded_bytes_total": "Accumulated size of the downloaded calendar data in bytes.",
+    "http_responses_total": "Number of HTTP(S) responses by status code.",
+    "events_total": "Number of events by processing stage (parsed, expanded, matched, emitted).",
+    "cache_requests_total": "Number of cache lookups by cache layer and result (hit, miss).",
+    "last_run_timestamp_seconds": "End time of the last run (UNIX epoch).",
+    "last_run_exit_code": "Exit code of the last run.",
+    "last_run_duration_seconds": "Duration of the run stages of the last run in seconds.",
+    "last_run_peak_rss_bytes": "Peak resident set size of the last run in bytes.",
+    "last_run_http_status": "Status code of the last HTTP(S) response of the last run.",
+}
+
+_SAMPLE_PATTERN = re.compile(r"^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{.*\})? (\S+)$")
+
+# ---- Classes ---------------------------------------------------------------------------------------------------------
+
+
+class RunMetrics:
+    """Metrics of a single run.
+
+    All recording methods are thread-safe (calendar copies are refreshed in background threads). If disabled,
+    nothing is recorded and the event iterators are not wrapped.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        """Construct.
+
+        Arguments:
+            enabled: Record the metrics.
+        """
+        self.enabled = enabled
+        self.samples = {}  # (name, labels) -> value. Labels as sorted tuple of (name, value).
+        self._lock = threading.Lock()
+        self._event_counts = Counter()  # Stage -> number of events. Counted by the main thread only.
+
+    def add(self, name: str, value: float = 1, **labels: str) -> None:
+        """Increase a counter.
+
+        Arguments:
+            name: Metric name (without prefix).
+            value: Increment.
+            labels: Labels of the sample.
+        """
+        if self.enabled:
+            key = (name, tuple(sorted(labels.items())))
+            with self._lock:
+                self.samples[key] = self.samples.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        """Set a gauge.
+
+        Arguments:
+            name: Metric name (without prefix).
+            value: Value.
+            labels: Labels of the sample.
+        """
+        if self.enabled:
+            with self._lock:
+                self.samples[(name, tuple(sorted(labels.items())))] = value
+
+    @contextlib.contextmanager
+    def stage(self, stage: str) -> Iterator[None]:
+        """Measure the duration of a run stage.
+
+        Arguments:
+            stage: Name of the stage.
+
+        Yields:
+            None
+        """
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - begin
+            self.add("stage_duration_seconds_total", duration, stage=stage)
+            self.add("last_run_duration_seconds", duration, stage=stage)
+
+    def count_events(self, stage: str, events: Iterable) -> Iterable:
+        """Count the events passing a processing stage.
+
+        Arguments:
+            stage: Name of the stage.
+            events: Events (consumed lazily).
+
+        Returns:
+            Iterable: The same events. Counted while they are consumed.
+        """
+        if not self.enabled:
+            return events
+        self._event_counts[stage] += 0
+        return self._counted(stage, events)
+
+    def record_response(self, response: requests.Response, *_: object, stream: bool = False, **__: object) -> None:
+        """Record an HTTP(S) response. Signature of a requests response hook.
+
+        Arguments:
+            response: Response.
+            stream: Streamed response. Its downloaded bytes are recorded while the content is read.
+        """
+        if not stream:
+            self.add("downloaded_bytes_total", len(response.content))
+        if response.url.startswith(("http://", "https://")):
+            self.add("http_responses_total", status=str(response.status_code))
+            self.set("last_run_http_status", response.status_code)
+
+    def write(self, path: str, exit_code: int) -> None:
+        """Merge the metrics of the run into a metrics file.
+
+        The counters are added to the counters of the file, the gauges replace the gauges of the file. The file is
+        updated under an exclusive lock (concurrent runs) and replaced atomically (concurrent readers).
+
+        Arguments:
+            path: Path of the metrics file.
+            exit_code: Exit code of the run.
+        """
+        for stage, count in self._event_counts.items():
+            self.add("events_total", count, stage=stage)
+        self.add("runs_total", exit_code=str(exit_code))
+        self.set("last_run_exit_code", exit_code)
+        self.set("last_run_timestamp_seconds", round(time.time(), 3))
+        peak_rss = _peak_rss()
+        if peak_rss is not None:
+            self.set("last_run_peak_rss_bytes", peak_rss)
+
+        directory = os.path.dirname(os.path.abspath(path))
+        with open(f"{path}.lock", "a+b") as lock_file:
+            _lock(lock_file)
+            samples = read_metrics(path)
+            for (name, labels), value in self.samples.items():
+                key = (f"{METRIC_PREFIX}{name}", labels)
+                samples[key] = samples.get(key, 0) + value if name.endswith("_total") else value
+
+            # Created with the permissions of the umask, e.g. readable by a collector (node_exporter) running as other
+            # user. A file left over by a killed run is replaced: only the holder of the lock writes it.
+            temporary_path = os.path.join(directory, f"{os.path.basename(path)}.tmp")
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(temporary_path)
+            descriptor = os.open(temporary_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+            with open(descriptor, "w", encoding="utf-8") as file:
+                file.write(format_metrics(samples))
+            os.replace(temporary_path, path)
+
+    def _counted(self, stage: str, events: Iterable) -> Iterator:
+        """Count events while they are consumed.
+
+        Arguments:
+            stage: Name of the stage.
+            events: Events.
+
+        Yields:
+            The events.
+        """
+        event_counts = self._event_counts
+        for event in events:
+            event_counts[stage] += 1
+            yield event
+
+
+# ---- Functions -------------------------------------------------------------------------------------------------------
+
+
+def read_metrics(path: str) -> dict:
+    """Read the samples of a metrics file.
+
+    Arguments:
+        path: Path of the metrics file.
+
+    Returns:
+        dict: Samples (full metric name, labels) -> value. Labels as sorted tuple of (name, value). Empty if the file
+              does not exist.
+    """
+    samples = {}
+    with contextlib.suppress(FileNotFoundError), open(path, encoding="utf-8") as file:
+        for line in file:
+            match = _SAMPLE_PATTERN.match(line.strip())
+            if match is not None:
+                name, labels, value = match.groups()
+                samples[(name, _parse_labels(labels))] = float(value)
+    return samples
+
+
+def format_metrics(samples: dict) -> str:
+    """Format samples in the Prometheus text exposition format.
+
+    Arguments:
+        samples: Samples (full metric name, labels) -> value.
+
+    Returns:
+        str: Text exposition format with HELP and TYPE lines of each metric.
+    """
+    lines = []
+    current_name = None
+    for (name, labels), value in sorted(samples.items()):
+        if name != current_name:
+            current_name = name
+            help_text = METRIC_HELP.get(name.removeprefix(METRIC_PREFIX))
+            if help_text is not None:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {'counter' if name.endswith('_total') else 'gauge'}")
+        label_text = ",".join(f'{label}="{_escape(label_value)}"' for label, label_value in labels)
+        lines.append(f"{name}{{{label_text}}} {_format_value(value)}" if labels else f"{name} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _parse_labels(labels: str | None) -> tuple:
+    """Parse the labels of a sample.
+
+    Arguments:
+        labels: Labels in braces (e.g. '{stage="parse"}') or None.
+
+    Returns:
+        tuple: Sorted tuple of (name, value).
+    """
+    if labels is None:
+        return ()
+    pairs = re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', labels)
+    return tuple(sorted((name, _unescape(value)) for name, value in pairs))
+
+
+def _escape(value: str) -> str:
+    """Escape a label value.
+
+    Arguments:
+        value: Label value.
+
+    Returns:
+        str: Escaped label value.
+    """
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _unescape(value: str) -> str:
+    """Unescape a label value.
+
+    Arguments:
+        value: Escaped label value.
+
+    Returns:
+        str: Label value.
+    """
+    return re.sub(r"\\(.)", lambda match: "\n" if match.group(1) == "n" else match.group(1), value)
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value.
+
+    Arguments:
+        value: Sample value.
+
+    Returns:
+        str: Integers without fraction, all other values with full precision.
+    """
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _peak_rss() -> int | None:
+    """Get the peak resident set size of the process.
+
+    Returns:
+        int | None: Peak RSS in bytes. None if not supported by the platform.
+    """
+    if resource is None:  # pragma: no cover
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024  # macOS: bytes, others: kilobytes
+
+
+def _lock(file: object) -> None:
+    """Lock a file exclusively until it is closed.
+
+    Arguments:
+        file: Opened file.
+    """
+    if fcntl is not None:
+        fcntl.flock(file, fcntl.LOCK_EX)
+    else:  # pragma: no cover
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
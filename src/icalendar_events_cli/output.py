@@ -1,21 +1,114 @@
 """Handling of different output target and formats."""
 
 # ---- Imports ---------------------------------------------------------------------------------------------------------
-import json
 import os
+import sqlite3
 import sys
+import textwrap
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import closing, nullcontext
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from enum import Enum
+from functools import partial
+from itertools import groupby, islice
 
-from recurring_ical_events import CalendarQuery
+import pytz
+from icalendar import FreeBusy, Timezone
+from icalendar.prop import vPeriod
+from tzlocal import get_localzone
 
+from .aggregate import aggregate_events
+from .columnar import OccurrenceColumns
+from .compact import CompactOccurrence, OccurrenceCompactor
 from .icalendar import (
     Calendar,
+    Event,
+    get_event_categories,
     get_event_description,
     get_event_dtend,
     get_event_dtstart,
     get_event_location,
+    get_event_status,
     get_event_summary,
+    get_event_uid,
+    get_event_url,
 )
+from .intervals import busy_intervals, overlapping_events
+from .jsoncodec import dumps
+from .merge import event_source
+
+# ---- Globals ---------------------------------------------------------------------------------------------------------
+
+EXIT_CODE_NO_MATCH = 1  # Exit code of the 'exists' output format if no event matches
+PRODID = "-//waldbaer//icalendar-events-cli//EN"  # Product identifier of generated iCalendar outputs
+
+# Fields of the JSON event records (--output.fields) and their getters
+EVENT_FIELD_GETTERS = {
+    "start-date": get_event_dtstart,
+    "end-date": get_event_dtend,
+    "summary": get_event_summary,
+    "description": get_event_description,
+    "location": get_event_location,
+    "uid": get_event_uid,
+    "categories": get_event_categories,
+    "status": get_event_status,
+    "url": get_event_url,
+}
+EVENT_FIELDS = tuple(EVENT_FIELD_GETTERS)
+DEFAULT_EVENT_FIELDS = ("start-date", "end-date", "summary", "description", "location")
+REQUIRED_EVENT_FIELDS = frozenset({"start-date", "end-date", "summary"})  # Part of the record even if not set
+
+SQLITE_BATCH_SIZE = 1000  # Number of rows inserted per executemany() call of the 'sqlite' output format
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS occurrences (
+    source TEXT NOT NULL,
+    uid TEXT NOT NULL,
+    recurrence_id TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    start_epoch INTEGER NOT NULL,
+    end_date TEXT NOT NULL,
+    end_epoch INTEGER NOT NULL,
+    summary TEXT,
+    description TEXT,
+    location TEXT,
+    PRIMARY KEY (source, uid, recurrence_id)
+);
+CREATE INDEX IF NOT EXISTS occurrences_start_end ON occurrences (start_epoch, end_epoch);
+CREATE INDEX IF NOT EXISTS occurrences_uid ON occurrences (uid);
+"""
+SQLITE_UPSERT = """
+INSERT INTO occurrences (
+    source, uid, recurrence_id, start_date, start_epoch, end_date, end_epoch, summary, description, location
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (source, uid, recurrence_id) DO UPDATE SET
+    start_date = excluded.start_date,
+    start_epoch = excluded.start_epoch,
+    end_date = excluded.end_date,
+    end_epoch = excluded.end_epoch,
+    summary = excluded.summary,
+    description = excluded.description,
+    location = excluded.location
+"""
+SQLITE_SEEN_SCHEMA = """
+CREATE TEMP TABLE IF NOT EXISTS seen (
+    source TEXT NOT NULL,
+    uid TEXT NOT NULL,
+    recurrence_id TEXT NOT NULL,
+    PRIMARY KEY (source, uid, recurrence_id)
+);
+DELETE FROM seen;
+"""
+SQLITE_SEEN_INSERT = "INSERT OR IGNORE INTO seen (source, uid, recurrence_id) VALUES (?, ?, ?)"
+SQLITE_DELETE_UNSEEN = """
+DELETE FROM occurrences
+WHERE source = ? AND end_epoch > ? AND start_epoch < ?
+    AND NOT EXISTS (
+        SELECT 1 FROM seen
+        WHERE seen.source = occurrences.source AND seen.uid = occurrences.uid
+            AND seen.recurrence_id = occurrences.recurrence_id
+    )
+"""
 
 # ---- Functions -------------------------------------------------------------------------------------------------------
 
@@ -26,70 +119,453 @@ class OutputFormat(Enum):
     human_readable = "human_readable"  # pylint: disable=invalid-name;reason=camel_case style wanted for cli param
     json = "json"  # pylint: disable=invalid-name;reason=camel_case style wanted for cli param
     jcal = "jcal"  # pylint: disable=invalid-name;reason=camel_case style wanted for cli param
+    count = "count"  # pylint: disable=invalid-name;reason=camel_case style wanted for cli param
+    exists = "exists"  # pylint: disable=invalid-name;reason=camel_case style wanted for cli param
+    freebusy = "freebusy"  # pylint: disable=invalid-name;reason=camel_case style wanted for cli param
+    conflicts = "conflicts"  # pylint: disable=invalid-name;reason=camel_case style wanted for cli param
+    sqlite = "sqlite"  # pylint: disable=invalid-name;reason=camel_case style wanted for cli param
+    ics = "ics"  # pylint: disable=invalid-name;reason=camel_case style wanted for cli param
+    aggregate = "aggregate"  # pylint: disable=invalid-name;reason=camel_case style wanted for cli param
+
+
+class OutputOrder(Enum):
+    """All possible orders of the output events."""
+
+    none = "none"  # pylint: disable=invalid-name;reason=camel_case style wanted for cli param
+    start = "start"  # pylint: disable=invalid-name;reason=camel_case style wanted for cli param
+    series = "series"  # pylint: disable=invalid-name;reason=camel_case style wanted for cli param
+
+
+class FreeBusyFormat(Enum):
+    """All possible formats of the 'freebusy' output."""
+
+    json = "json"  # pylint: disable=invalid-name;reason=camel_case style wanted for cli param
+    ical = "ical"  # pylint: disable=invalid-name;reason=camel_case style wanted for cli param
+
+
+# Formats which do not need the events sorted by start date
+STREAMING_FORMATS = frozenset(
+    {OutputFormat.exists, OutputFormat.count, OutputFormat.sqlite, OutputFormat.ics, OutputFormat.aggregate}
+)
+# Formats without any order of the events (--output.order is not applied)
+UNORDERED_FORMATS = frozenset({OutputFormat.exists, OutputFormat.count, OutputFormat.sqlite, OutputFormat.aggregate})
+# Formats always processing the events sorted by start date (--output.order is not applied)
+SORTED_FORMATS = frozenset({OutputFormat.freebusy, OutputFormat.conflicts})
 
 
-def output_events(calendar: Calendar, events: CalendarQuery, config: dict) -> None:
-    """Output the calendar.
+@dataclass
+class OutputTarget:
+    """Output target.
+
+    Attributes:
+        format: Output format.
+        file: Path of output file. If not set the output is written to console / stdout.
+    """
+
+    format: OutputFormat = OutputFormat.human_readable
+    file: str | None = None
+
+
+def output_events(calendar: Calendar, events: Iterable[Event], config: dict) -> int:
+    """Output the calendar to all configured output targets.
+
+    The events are expanded, filtered, ordered and converted to JSON records only once and shared by all targets.
 
     Arguments:
         calendar: The iCalendar calendar.
         events: Calendar events.
         config: Configuration hierarchy.
+
+    Returns:
+        Numeric exit code
+    """
+    targets = output_targets(config)
+    json_event = _shared_json_event(config)
+    if len(targets) == 1:
+        return _output_target(calendar, events, _target_config(config, targets[0]), json_event)
+
+    # Collect the events once and order them once per order needed by any of the targets
+    target_configs = [_target_config(config, target) for target in targets]
+    events = list(events)
+    ordered_events = {
+        order: list(order_events(events, order)) for order in {output_order(target) for target in target_configs}
+    }
+
+    exit_code = os.EX_OK
+    for target_config in target_configs:
+        target_exit_code = _output_target(
+            calendar, ordered_events[output_order(target_config)], target_config, json_event, is_ordered=True
+        )
+        exit_code = exit_code or target_exit_code
+    return exit_code
+
+
+def output_targets(config: dict) -> list[OutputTarget]:
+    """Get all configured output targets.
+
+    Arguments:
+        config: Configuration hierarchy.
+
+    Returns:
+        list[OutputTarget]: Output targets. Only the target of 'output.format' and 'output.file' if no list of targets
+                            is configured.
+    """
+    if config.output.targets:
+        return config.output.targets
+    return [OutputTarget(format=config.output.format, file=config.output.file)]
+
+
+def output_order(config: dict) -> OutputOrder:
+    """Get the order of the events of an output target.
+
+    Arguments:
+        config: Configuration hierarchy of the output target.
+
+    Returns:
+        OutputOrder: Configured order ('output.order'). Default: By start date, the streamed 'ics' output unordered.
+                     The events of UNORDERED_FORMATS are never ordered, the ones of SORTED_FORMATS always by start date.
+    """
+    if config.output.format in UNORDERED_FORMATS:
+        return OutputOrder.none
+    if config.output.format in SORTED_FORMATS:
+        return OutputOrder.start
+    if config.output.order is not None:
+        return config.output.order
+    return OutputOrder.none if config.output.format in STREAMING_FORMATS else OutputOrder.start
+
+
+def order_events(events: Iterable[Event], order: OutputOrder) -> Iterable[Event]:
+    """Order the events.
+
+    Arguments:
+        events: Calendar events in the order of the expansion: Series by series (order of the calendar).
+        order: Order of the events.
+
+    Returns:
+        Iterable[Event]: Events sorted by start date (list), lazily ordered series by series or the passed events.
     """
-    sorted_events = _sort_events(events)
+    if order == OutputOrder.start:
+        return _sort_events(events)
+    if order == OutputOrder.series:
+        return _series_events(events)
+    return events
+
+
+def _output_target(
+    calendar: Calendar,
+    events: Iterable[Event],
+    config: dict,
+    json_event: Callable[[Event], dict],
+    is_ordered: bool = False,
+) -> int:
+    """Output the calendar to a single output target.
+
+    Arguments:
+        calendar: The iCalendar calendar.
+        events: Calendar events.
+        config: Configuration hierarchy of the output target.
+        json_event: Function converting an event into its JSON record.
+        is_ordered: True if the events are already a list in the order of the output target (see output_order()).
+
+    Returns:
+        Numeric exit code
+    """
+    # Unordered streaming formats
+    if config.output.format == OutputFormat.exists:
+        return output_exists(events)
+    if config.output.format == OutputFormat.count:
+        output_count(events, config)
+        return os.EX_OK
+    if config.output.format == OutputFormat.sqlite:
+        output_sqlite(calendar, events, config)
+        return os.EX_OK
+    if config.output.format == OutputFormat.aggregate:
+        output_aggregate(events, config)
+        return os.EX_OK
+
+    order = output_order(config)
+    if config.output.format == OutputFormat.ics:
+        output_ics(calendar, events if is_ordered else order_events(events, order), config)
+        return os.EX_OK
+
+    if config.output.format == OutputFormat.json and not is_ordered:
+        if order != OutputOrder.start:
+            # Written as soon as the events (of a series) are produced. The records are not shared: The IDs of the
+            # written events are reused.
+            fields = config.output.fields or DEFAULT_EVENT_FIELDS
+            output_json(order_events(events, order), config, partial(_json_event, fields=fields))
+            return os.EX_OK
+        # Only the compact occurrences are kept in memory until all events are sorted
+        fields = config.output.fields or DEFAULT_EVENT_FIELDS
+        compactor = OccurrenceCompactor(fields, EVENT_FIELD_GETTERS)
+        output_json(
+            compactor.sorted(events), config, lambda occurrence: _json_record(fields, compactor.values(occurrence))
+        )
+        return os.EX_OK
+
+    ordered_events = events if is_ordered else list(order_events(events, order))
 
     if config.output.format == OutputFormat.json:
-        output_json(sorted_events, config)
+        output_json(ordered_events, config, json_event)
     elif config.output.format == OutputFormat.jcal:
-        output_jcal(calendar, sorted_events, config)
+        output_jcal(calendar, ordered_events, config)
+    elif config.output.format == OutputFormat.freebusy:
+        output_freebusy(ordered_events, config)
+    elif config.output.format == OutputFormat.conflicts:
+        output_conflicts(ordered_events, config, json_event)
     else:
-        output_human_readable(sorted_events, config)
+        output_human_readable(ordered_events, config)
+    return os.EX_OK
 
 
-def output_json(events: CalendarQuery, config: dict) -> None:
-    """Output the events in JSON format.
+def output_exists(events: Iterable[Event]) -> int:
+    """Check if at least one event matches. The result is reported only via the exit code.
+
+    The expansion and filtering of the events stops at the first match.
+
+    Arguments:
+        events: Calendar events.
+
+    Returns:
+        os.EX_OK if at least one event matches, otherwise EXIT_CODE_NO_MATCH.
+    """
+    return os.EX_OK if next(iter(events), None) is not None else EXIT_CODE_NO_MATCH
+
+
+def output_count(events: Iterable[Event], config: dict) -> None:
+    """Output the number of matching events.
+
+    The events are counted in a single streaming pass without sorting or building any per-event output.
 
     Arguments:
         events: Calendar events.
         config: Configuration hierarchy.
     """
-    filters = {"start-date": config.filter.start_date.isoformat(), "end-date": config.filter.end_date.isoformat()}
+    output = str(sum(1 for _ in events))
+
+    # Finally output to stdout or the configured file
+    if config.output.file is None:
+        print(output)
+    else:
+        with open(config.output.file, "w", encoding="utf-8") as file:
+            file.write(output)
+
+
+def output_sqlite(calendar: Calendar, events: Iterable[Event], config: dict) -> None:
+    """Write the events into the 'occurrences' table of a SQLite database file.
+
+    The events are streamed without sorting and inserted in batches within a single transaction.
+    Occurrences are identified by the URL of the calendar they were taken from (source), UID and RECURRENCE-ID
+    (empty for events which are not part of a series, i.e. moved events keep their row). Occurrences already stored
+    by a previous run are updated (upsert), stored occurrences of the sources within the queried date range which are
+    no longer part of the result are deleted in the same transaction.
+
+    Arguments:
+        calendar: The iCalendar calendar (source of the events and their series).
+        events: Calendar events.
+        config: Configuration hierarchy.
+    """
+    series_uids = {
+        str(component["UID"])
+        for component in calendar.subcomponents
+        if component.name == "VEVENT"
+        and "UID" in component
+        and any(name in component for name in ("RRULE", "RDATE", "RECURRENCE-ID"))
+    }
+    rows = (_sqlite_row(event, event_source(calendar, event) or config.calendar.url, series_uids) for event in events)
+    window = (int(config.filter.start_date.timestamp()), int(config.filter.end_date.timestamp()))
+
+    with closing(sqlite3.connect(config.output.file)) as connection:
+        connection.executescript(SQLITE_SCHEMA)
+        connection.executescript(SQLITE_SEEN_SCHEMA)
+        with connection:  # single transaction: commit on success, rollback on error
+            while batch := list(islice(rows, SQLITE_BATCH_SIZE)):
+                connection.executemany(SQLITE_UPSERT, batch)
+                connection.executemany(SQLITE_SEEN_INSERT, (row[:3] for row in batch))
+            for source in (config.calendar.url, *config.calendar.merge_urls):
+                connection.execute(SQLITE_DELETE_UNSEEN, (source, *window))
+
+
+def output_aggregate(events: Iterable[Event], config: dict) -> None:
+    """Output the number and the total duration of the events per time period and / or summary group as JSON.
+
+    The events are streamed without sorting. Only the totals of the buckets are kept in memory.
+
+    Arguments:
+        events: Calendar events.
+        config: Configuration hierarchy.
+    """
+    timezone_name = config.output.aggregate_timezone or get_localzone().key
+    aggregate = {"bucket": config.output.aggregate_bucket.value, "timezone": timezone_name}
+    if config.output.aggregate_group is not None:
+        aggregate["group"] = config.output.aggregate_group
+    buckets = aggregate_events(
+        events, config.output.aggregate_bucket, pytz.timezone(timezone_name), config.output.aggregate_group
+    )
+    output = dumps({"filter": _json_filters(config), "aggregate": aggregate, "buckets": buckets})
+
+    # Finally output to stdout or the configured file
+    if config.output.file is None:
+        print(output)
+    else:
+        with open(config.output.file, "w", encoding="utf-8") as file:
+            file.write(output)
+
+
+def output_ics(calendar: Calendar, events: Iterable[Event], config: dict) -> None:
+    """Output the events as iCalendar (https://datatracker.ietf.org/doc/html/rfc5545).
+
+    The events are streamed without sorting: Each VEVENT is written as soon as it is produced.
+    The VTIMEZONE components referenced by the written events follow after the last event. They are taken from the
+    calendar or generated from the timezone database if the calendar does not define them.
+
+    Arguments:
+        calendar: The iCalendar calendar.
+        events: Calendar events.
+        config: Configuration hierarchy.
+    """
+    header = Calendar()
+    for key, value in calendar.items():
+        header[key] = value
+
+    # Add custom filter rules as meta-data to the calendar properties
+    header.add(
+        "X-FILTER-DATE-RANGE",
+        vPeriod((config.filter.start_date.astimezone(timezone.utc), config.filter.end_date.astimezone(timezone.utc))),
+        parameters={"VALUE": "PERIOD"},
+    )
     if config.filter.summary:
-        filters["summary"] = config.filter.summary
+        header.add("X-FILTER-SUMMARY", config.filter.summary)
     if config.filter.description:
-        filters["description"] = config.filter.description
+        header.add("X-FILTER-DESCRIPTION", config.filter.description)
     if config.filter.location:
-        filters["location"] = config.filter.location
+        header.add("X-FILTER-LOCATION", config.filter.location)
 
-    # Detailed Events List
-    events_output = []
-    for event in events:
-        event_output = {
-            "start-date": get_event_dtstart(event).isoformat(),
-            "end-date": get_event_dtend(event).isoformat(),
-            "summary": get_event_summary(event),
-        }
-        description = get_event_description(event)
-        if description is not None:
-            event_output["description"] = description
+    referenced_tzids = set()
+    if config.output.file is None:
+        output_file = nullcontext(sys.stdout)
+    else:
+        # pylint: disable-next=consider-using-with;reason=Closed by the with statement below.
+        output_file = open(config.output.file, "w", encoding="utf-8", newline="")
+    with output_file as file:
+        file.write(header.to_ical().decode("utf-8").removesuffix("END:VCALENDAR\r\n"))
+        for event in events:
+            file.write(event.to_ical().decode("utf-8"))
+            referenced_tzids |= event_tzids(event)
+
+        timezones = {str(component.get("TZID")): component for component in calendar.walk("VTIMEZONE")}
+        for tzid in sorted(referenced_tzids):
+            timezone_component = timezones[tzid] if tzid in timezones else Timezone.from_tzid(tzid)
+            file.write(timezone_component.to_ical().decode("utf-8"))
+        file.write("END:VCALENDAR\r\n")
+
+
+def output_json(
+    events: list[Event] | list[CompactOccurrence], config: dict, json_event: Callable[[Event], dict] | None = None
+) -> None:
+    """Output the events in JSON format.
 
-        location = get_event_location(event)
-        if location is not None:
-            event_output["location"] = location
-        events_output.append(event_output)
+    The JSON records of the events are serialized and written one by one. Neither the list of all records nor the
+    complete output string is held in memory.
 
-    json_hierarchy = {"filter": filters, "events": events_output}
+    Arguments:
+        events: Calendar events (or their compact occurrences).
+        config: Configuration hierarchy.
+        json_event: Optional function converting an event into its JSON record.
+    """
+    json_event = json_event or _shared_json_event(config)
+
+    # Same formatting as dumps({"filter": ..., "events": [...]}): the events list is the last entry
+    head, tail = dumps({"filter": _json_filters(config), "events": []}).rsplit("[]", 1)
 
     # Finally output the JSON hierarchy to stdout or the configured file
     if config.output.file is None:
-        json.dump(json_hierarchy, fp=sys.stdout, indent=2, ensure_ascii=False)
+        output_file = nullcontext(sys.stdout)
+    else:
+        # pylint: disable-next=consider-using-with;reason=Closed by the with statement below.
+        output_file = open(config.output.file, "w", encoding="utf-8")
+    with output_file as file:
+        file.write(head)
+        separator = "[\n"
+        for event in events:
+            file.write(separator)
+            file.write(textwrap.indent(dumps(json_event(event)), "    "))
+            separator = ",\n"
+        file.write("[]" if separator == "[\n" else "\n  ]")
+        file.write(tail)
+
+
+def output_freebusy(events: list[Event], config: dict) -> None:
+    """Output the merged busy intervals of the events as JSON or iCalendar VFREEBUSY component.
+
+    Arguments:
+        events: Calendar events sorted by start date.
+        config: Configuration hierarchy.
+    """
+    # Merged busy intervals clipped to the filtered date range
+    intervals = (
+        (max(start, config.filter.start_date), min(end, config.filter.end_date))
+        for start, end in busy_intervals(events)
+    )
+
+    if config.output.freebusy_format == FreeBusyFormat.ical:
+        free_busy = FreeBusy()
+        free_busy.add("DTSTAMP", datetime.now(timezone.utc).replace(microsecond=0))
+        free_busy.add("DTSTART", config.filter.start_date.astimezone(timezone.utc))
+        free_busy.add("DTEND", config.filter.end_date.astimezone(timezone.utc))
+        for start, end in intervals:
+            free_busy.add(
+                "FREEBUSY",
+                (start.astimezone(timezone.utc), end.astimezone(timezone.utc)),
+                parameters={"FBTYPE": "BUSY"},
+            )
+        calendar = Calendar()
+        calendar.add("VERSION", "2.0")
+        calendar.add("PRODID", PRODID)
+        calendar.add_component(free_busy)
+        output = calendar.to_ical().decode("utf-8")
+
+    else:
+        busy = [{"start-date": start, "end-date": end} for start, end in intervals]
+        output = dumps({"filter": _json_filters(config), "busy": busy})
+
+    # Finally output to stdout or the configured file
+    if config.output.file is None:
+        print(output)
+    else:
+        with open(config.output.file, "w", encoding="utf-8", newline="") as file:
+            file.write(output)
+
+
+def output_conflicts(events: list[Event], config: dict, json_event: Callable[[Event], dict] | None = None) -> None:
+    """Output all pairs of overlapping (conflicting) events in JSON format.
+
+    Arguments:
+        events: Calendar events sorted by start date.
+        config: Configuration hierarchy.
+        json_event: Optional function converting an event into its JSON record.
+    """
+    json_event = json_event or _shared_json_event(config)
+    conflicts = [
+        {
+            "overlap-start-date": overlap_start,
+            "overlap-end-date": overlap_end,
+            "events": [json_event(event), json_event(other_event)],
+        }
+        for event, other_event, overlap_start, overlap_end in overlapping_events(events)
+    ]
+    json_hierarchy = {"filter": _json_filters(config), "conflicts": conflicts}
 
+    # Finally output the JSON hierarchy to stdout or the configured file
+    output = dumps(json_hierarchy)
+    if config.output.file is None:
+        sys.stdout.write(output)
     else:
         with open(config.output.file, "w", encoding="utf-8") as file:
-            json.dump(json_hierarchy, fp=file, indent=2, ensure_ascii=False)
+            file.write(output)
 
 
-def output_jcal(calendar: Calendar, events: CalendarQuery, config: dict) -> None:
+def output_jcal(calendar: Calendar, events: list[Event], config: dict) -> None:
     """Output the events in jCAL format (https://datatracker.ietf.org/doc/html/rfc7265).
 
     Arguments:
@@ -130,15 +606,15 @@ def output_jcal(calendar: Calendar, events: CalendarQuery, config: dict) -> None
     ]
 
     # Finally output the JSON hierarchy to stdout or the configured file
+    output = dumps(json_hierarchy)
     if config.output.file is None:
-        json.dump(json_hierarchy, fp=sys.stdout, indent=2, ensure_ascii=False)
-
+        sys.stdout.write(output)
     else:
         with open(config.output.file, "w", encoding="utf-8") as file:
-            json.dump(json_hierarchy, fp=file, indent=2, ensure_ascii=False)
+            file.write(output)
 
 
-def output_human_readable(events: CalendarQuery, config: dict) -> None:
+def output_human_readable(events: list[Event], config: dict) -> None:
     """Output the events in human readable format.
 
     Arguments:
@@ -182,13 +658,177 @@ def output_human_readable(events: CalendarQuery, config: dict) -> None:
             file.write(output)
 
 
-def _sort_events(events: CalendarQuery) -> CalendarQuery:
-    """Sort calendar.
+def _json_filters(config: dict) -> dict:
+    """Build the JSON representation of the applied filters.
 
     Arguments:
-       events: Calendar to be sorted.
+        config: Configuration hierarchy.
 
     Returns:
-        CalendarQuery: Sorted calendar.
+        dict: Applied filters.
+    """
+    filters = {"start-date": config.filter.start_date, "end-date": config.filter.end_date}
+    if config.filter.summary:
+        filters["summary"] = config.filter.summary
+    if config.filter.description:
+        filters["description"] = config.filter.description
+    if config.filter.location:
+        filters["location"] = config.filter.location
+    return filters
+
+
+def _json_event(event: Event, fields: Iterable[str] = DEFAULT_EVENT_FIELDS) -> dict:
+    """Build the JSON representation of an event.
+
+    Only the requested properties are decoded. Properties not set are omitted (except REQUIRED_EVENT_FIELDS).
+
+    Arguments:
+        event: Calendar event.
+        fields: Ordered fields of the JSON representation (see EVENT_FIELDS).
+
+    Returns:
+        dict: Event fields. Default: start- / end-date, summary, optional description and location.
+    """
+    return _json_record(fields, (EVENT_FIELD_GETTERS[field](event) for field in fields))
+
+
+def _json_record(fields: Iterable[str], values: Iterable[object]) -> dict:
+    """Build the JSON record of the field values of an event.
+
+    Arguments:
+        fields: Ordered fields of the JSON representation (see EVENT_FIELDS).
+        values: Values of the fields.
+
+    Returns:
+        dict: Event fields. Values not set are omitted (except REQUIRED_EVENT_FIELDS).
+    """
+    event_output = {}
+    for field, value in zip(fields, values, strict=True):
+        if value is not None or field in REQUIRED_EVENT_FIELDS:
+            event_output[field] = value
+    return event_output
+
+
+def _shared_json_event(config: dict) -> Callable[[Event], dict]:
+    """Build a function converting events into their JSON records which converts each event only once.
+
+    The records are shared by all output targets and by events reported multiple times (e.g. 'conflicts' output).
+
+    Arguments:
+        config: Configuration hierarchy.
+
+    Returns:
+        Callable[[Event], dict]: Caching variant of _json_event().
+    """
+    fields = config.output.fields or DEFAULT_EVENT_FIELDS
+    records = {}  # id(event) -> JSON record. The events are kept alive by the caller during the output.
+
+    def json_event(event: Event) -> dict:
+        """Get the JSON record of an event.
+
+        Arguments:
+            event: Calendar event.
+
+        Returns:
+            dict: JSON record.
+        """
+        record = records.get(id(event))
+        if record is None:
+            record = records[id(event)] = _json_event(event, fields)
+        return record
+
+    return json_event
+
+
+def _target_config(config: dict, target: OutputTarget) -> dict:
+    """Build the configuration hierarchy of a single output target.
+
+    Arguments:
+        config: Configuration hierarchy.
+        target: Output target.
+
+    Returns:
+        dict: Copy of the configuration hierarchy with 'output.format' and 'output.file' of the target.
+    """
+    target_config = config.clone()
+    target_config.output.format = target.format
+    target_config.output.file = target.file
+    return target_config
+
+
+def event_tzids(event: Event) -> set[str]:
+    """Get the IDs of all timezones referenced by the properties of an event.
+
+    Arguments:
+        event: Calendar event.
+
+    Returns:
+        set[str]: Referenced TZIDs.
+    """
+    tzids = set()
+    for value in event.values():
+        for item in value if isinstance(value, list) else [value]:
+            params = getattr(item, "params", None)
+            if params is not None and "TZID" in params:
+                tzids.add(params["TZID"])
+    return tzids
+
+
+def _sqlite_row(event: Event, source: str, series_uids: set[str]) -> tuple:
+    """Build the 'occurrences' table row of an event.
+
+    Arguments:
+        event: Calendar event.
+        source: Calendar URL.
+        series_uids: UIDs of the recurring events (series) of the calendar.
+
+    Returns:
+        tuple: Column values in the order of SQLITE_UPSERT.
+    """
+    start = get_event_dtstart(event)
+    end = get_event_dtend(event)
+    uid = str(event.get("UID", ""))
+    if uid and uid not in series_uids:
+        recurrence_id = ""  # Identified by the UID only: a moved event replaces its previous row
+    else:
+        recurrence_id = event.decoded("RECURRENCE-ID", default=None) or start
+        recurrence_id = recurrence_id.isoformat()
+    return (
+        source,
+        uid,
+        recurrence_id,
+        start.isoformat(),
+        int(start.timestamp()),
+        end.isoformat(),
+        int(end.timestamp()),
+        get_event_summary(event),
+        get_event_description(event),
+        get_event_location(event),
+    )
+
+
+def _sort_events(events: Iterable[Event]) -> list[Event]:
+    """Sort calendar by start date (argsort of the start epochs).
+
+    Arguments:
+       events: Calendar events to be sorted.
+
+    Returns:
+        list[Event]: Sorted calendar events.
+    """
+    return OccurrenceColumns(events).sorted()
+
+
+def _series_events(events: Iterable[Event]) -> Iterator[Event]:
+    """Lazily order the events series by series: The events of each series are sorted by start date.
+
+    Only the events of a single series are kept in memory.
+
+    Arguments:
+       events: Calendar events in the order of the expansion (the events of a series are consecutive).
+
+    Yields:
+        Event: Calendar events.
     """
-    return sorted(events, key=get_event_dtstart, reverse=False)
+    for _, series in groupby(events, key=get_event_uid):
+        yield from _sort_events(series)
@@ -0,0 +1,238 @@
+"""Query pipeline: download, parse, expand, filter and output the calendar events of a configuration."""
+
+# ---- Imports ---------------------------------------------------------------------------------------------------------
+import sys
+from collections.abc import Callable, Iterable
+from contextlib import ExitStack
+from functools import partial
+
+from .cache import cached_query, is_cacheable
+from .columnar import filter_occurrences
+from .dateindex import DateIndex
+from .icalendar import Calendar, Event, filter_events, parse_calendar, recurring_calendar
+from .incremental import IncrementalCalendarParser
+from .limits import EXIT_CODE_TRUNCATED, ExpansionLimits
+from .merge import Deduplication, merge_calendars
+from .metrics import RunMetrics
+from .output import output_events
+from .stale import StaleWhileRevalidate
+from .textindex import TextIndex
+from .timezones import transition_tables
+
+# ---- Functions -------------------------------------------------------------------------------------------------------
+
+
+def run_with_metrics(config: dict, run: Callable[[RunMetrics], int]) -> int:
+    """Run a query and write its run metrics (if configured).
+
+    Arguments:
+        config: Configuration hierarchy
+        run: Query. Called with the run metrics, returns the exit code.
+
+    Returns:
+        Numeric exit code
+    """
+    metrics = RunMetrics(enabled=config.metrics.file is not None)
+    exit_code = 1
+    try:
+        with metrics.stage("total"):
+            exit_code = run(metrics)
+    except SystemExit as e:  # E.g. failed download
+        exit_code = e.code
+    finally:
+        if metrics.enabled:
+            metrics.write(config.metrics.file, exit_code)
+    return exit_code
+
+
+def download_and_query(config: dict, metrics: RunMetrics, version: str) -> int:
+    """Download the calendars and run the query.
+
+    Arguments:
+        config: Configuration hierarchy
+        metrics: Run metrics
+        version: Program version (part of the result cache keys).
+
+    Returns:
+        Numeric exit code
+    """
+    downloader = StaleWhileRevalidate(config.calendar, config.cache, metrics)
+    with ExitStack() as stack:
+        if not config.calendar.pipelined:
+            with metrics.stage("download"):
+                calendar_strings = [downloader.download(filter_config=source_filter(config))]
+                calendar_strings += [downloader.download(url) for url in config.calendar.merge_urls]
+            parsed = None
+        else:
+            # The components are parsed while downloading: timezones with onset tables (see parse_calendars()) from
+            # the start until the parsed calendar is provided to the query
+            stack.enter_context(transition_tables(config.cache, config.filter.end_date))
+            parsers = [IncrementalCalendarParser() for _ in range(1 + len(config.calendar.merge_urls))]
+            with metrics.stage("download"):  # Includes the parsing of the received components
+                calendar_strings = [downloader.download(filter_config=source_filter(config), consume=parsers[0].feed)]
+                calendar_strings += [
+                    downloader.download(url, consume=parser.feed)
+                    for url, parser in zip(config.calendar.merge_urls, parsers[1:], strict=True)
+                ]
+            parsed = partial(pipelined_calendar, parsers, calendar_strings)
+        try:
+            return query_downloaded(calendar_strings, config, metrics, version, parsed)
+        finally:
+            downloader.finish()
+
+
+def query_downloaded(
+    calendar_strings: list[str],
+    config: dict,
+    metrics: RunMetrics,
+    version: str,
+    parsed: Callable[[dict], Calendar] | None = None,
+) -> int:
+    """Run the query of the downloaded calendars. Served from the result cache if possible.
+
+    Arguments:
+        calendar_strings: Contents of the calendar and all merged calendars.
+        config: Configuration hierarchy
+        metrics: Run metrics
+        version: Program version (part of the result cache keys).
+        parsed: Optional provider of the parsed and merged calendar contents (shared by multiple queries). Called with
+                the configuration hierarchy of the expansion (e.g. the snapped superset query of the result cache).
+
+    Returns:
+        Numeric exit code
+    """
+    if is_cacheable(config):
+        return cached_query(
+            calendar_strings,
+            config,
+            partial(query_calendars, metrics=metrics, parsed=parsed),
+            partial(expand_calendars, metrics=metrics, parsed=parsed),
+            version,
+            metrics,
+        )
+    return query_calendars(calendar_strings, config, metrics, parsed)
+
+
+def query_calendars(
+    calendar_strings: list[str], config: dict, metrics: RunMetrics, parsed: Callable[[dict], Calendar] | None = None
+) -> int:
+    """Parse, expand, filter and output the downloaded calendars.
+
+    Arguments:
+        calendar_strings: Contents of the calendar and all merged calendars.
+        config: Configuration hierarchy
+        metrics: Run metrics
+        parsed: Optional provider of the parsed and merged calendar contents.
+
+    Returns:
+        Numeric exit code
+    """
+    calendar, events, limits = expand_calendars(calendar_strings, config, metrics, parsed)
+    with metrics.stage("output"):  # Includes the lazy expansion and filtering of the events
+        exit_code = output_events(calendar, metrics.count_events("emitted", events), config)
+
+    if limits.truncated:
+        print(limits.report(), file=sys.stderr)
+        return exit_code or EXIT_CODE_TRUNCATED
+    return exit_code
+
+
+def expand_calendars(
+    calendar_strings: list[str], config: dict, metrics: RunMetrics, parsed: Callable[[dict], Calendar] | None = None
+) -> tuple[Calendar, Iterable[Event], ExpansionLimits]:
+    """Parse and merge the downloaded calendars, expand and filter the events.
+
+    Arguments:
+        calendar_strings: Contents of the calendar and all merged calendars.
+        config: Configuration hierarchy
+        metrics: Run metrics
+        parsed: Optional provider of the parsed and merged calendar contents. Used instead of parsing the contents,
+                called with the configuration hierarchy.
+
+    Returns:
+        tuple[Calendar, Iterable[Event], ExpansionLimits]: The merged calendar, the lazily expanded and filtered events
+                                                           and the expansion limits (truncation state).
+    """
+    with metrics.stage("parse"):
+        if parsed is None:
+            calendar = parse_calendars(calendar_strings, config, source_filter(config))
+        else:
+            calendar = parsed(config)
+        text_index = TextIndex(calendar) if config.filter.text_index else None
+        date_index = DateIndex(calendar) if config.filter.date_index else None
+    if metrics.enabled:
+        metrics.add(
+            "events_total", sum(1 for component in calendar.subcomponents if component.name == "VEVENT"), stage="parsed"
+        )
+
+    limits = ExpansionLimits.from_config(config.filter)
+    events = recurring_calendar(calendar, config.filter, text_index, date_index, limits)
+    events = filter_events(metrics.count_events("expanded", events), config.filter)
+    events = filter_occurrences(events, config.filter)
+    return calendar, metrics.count_events("matched", events), limits
+
+
+def parse_calendars(calendar_strings: list[str], config: dict, filter_config: dict | None = None) -> Calendar:
+    """Parse the downloaded calendars and merge them into one calendar.
+
+    With a cache directory, the timezones of custom VTIMEZONE components are created with onset tables covering the
+    query and cached.
+
+    Arguments:
+        calendar_strings: Contents of the calendar and all merged calendars.
+        config: Configuration hierarchy
+        filter_config: Optional filter configuration hierarchy applied while parsing the main calendar.
+
+    Returns:
+        Calendar: Merged calendar.
+    """
+    with transition_tables(config.cache, config.filter.end_date):
+        calendar = parse_calendar(calendar_strings[0], filter_config)
+        merged_calendars = [parse_calendar(calendar_string) for calendar_string in calendar_strings[1:]]
+    return merge_calendars(calendar, merged_calendars, config.calendar.deduplicate, calendar_urls(config))
+
+
+def pipelined_calendar(parsers: list[IncrementalCalendarParser], calendar_strings: list[str], config: dict) -> Calendar:
+    """Finish the parsing of the pipelined downloads and merge the calendars (see parse_calendars()).
+
+    Arguments:
+        parsers: Incremental parsers fed by the downloads of the calendar and all merged calendars.
+        calendar_strings: Contents of the calendar and all merged calendars.
+        config: Configuration hierarchy of the expansion. Its filter is applied while parsing jCal contents, e.g. the
+                snapped start date of the superset query of the result cache.
+
+    Returns:
+        Calendar: Merged calendar.
+    """
+    calendar = parsers[0].calendar(calendar_strings[0], source_filter(config))
+    merged_calendars = [
+        parser.calendar(calendar_string)
+        for parser, calendar_string in zip(parsers[1:], calendar_strings[1:], strict=True)
+    ]
+    return merge_calendars(calendar, merged_calendars, config.calendar.deduplicate, calendar_urls(config))
+
+
+def calendar_urls(config: dict) -> list[str]:
+    """Get the URLs of the calendar and all merged calendars.
+
+    Arguments:
+        config: Configuration hierarchy
+
+    Returns:
+        list[str]: URLs in the order of the downloaded calendar contents.
+    """
+    return [config.calendar.url, *config.calendar.merge_urls]
+
+
+def source_filter(config: dict) -> dict | None:
+    """Get the filter applied while downloading / parsing the calendar.
+
+    Arguments:
+        config: Configuration hierarchy
+
+    Returns:
+        Filter configuration hierarchy or None if all events must be downloaded / parsed.
+    """
+    # Skipping non-matching events while downloading / parsing is only exact if no other source may hold a duplicate
+    single_source = not config.calendar.merge_urls and config.calendar.deduplicate is Deduplication.uid
+    return config.filter if single_source else None
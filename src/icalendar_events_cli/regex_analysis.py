@@ -0,0 +1,164 @@
+"""Static analysis of filter RegExes."""
+
+# ---- Imports ---------------------------------------------------------------------------------------------------------
+try:
+    from re import _parser as sre_parse  # Python >= 3.11
+except ImportError:  # pragma: no cover
+    import sre_parse  # Python 3.10
+
+# ---- Globals ---------------------------------------------------------------------------------------------------------
+
+_REPEAT_OPS = {sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT} | (
+    {sre_parse.POSSESSIVE_REPEAT} if hasattr(sre_parse, "POSSESSIVE_REPEAT") else set()
+)
+
+_MAX_PREFIXES = 64  # Limit of alternative literal prefixes of a RegEx
+
+# Characters which are matched case-insensitively only by their ASCII upper / lower case counterpart.
+# Excluded: 'i', 'k', 's' which also match non-ASCII characters ('İ', 'ı', 'K', 'ſ')
+_CASE_FOLD_SAFE_CHARS = frozenset(
+    "abcdefghjlmnopqrtuvwxyzABCDEFGHJLMNOPQRTUVWXYZ0123456789 !\"#$%&'()*+,-./:;<=>?@[\\]^_`{|}~"
+)
+
+# ---- Functions -------------------------------------------------------------------------------------------------------
+
+
+def required_literals(pattern: str) -> tuple | None:
+    """Extract the literal substrings every match of a RegEx must contain.
+
+    The result is a tree of requirements:
+    - str: literal substring
+    - ("all", [...]): all child requirements must be fulfilled
+    - ("any", [...]): at least one child requirement must be fulfilled (alternation)
+
+    Case-insensitive parts of the RegEx do not contribute any literals.
+
+    Arguments:
+        pattern: RegEx pattern.
+
+    Returns:
+        Requirements tree or None if the RegEx is case-insensitive.
+    """
+    parsed = sre_parse.parse(pattern)
+    if parsed.state.flags & sre_parse.SRE_FLAG_IGNORECASE:
+        return None
+    return _sequence_literals(parsed)
+
+
+def _sequence_literals(items: list) -> tuple:
+    """Extract the required literals of a parsed RegEx sequence.
+
+    Arguments:
+        items: Parsed RegEx sequence of (opcode, argument) tuples.
+
+    Returns:
+        Requirements tree ("all", [...]).
+    """
+    requirements = []
+    run = []
+    for opcode, argument in items:
+        if opcode is sre_parse.LITERAL:
+            run.append(chr(argument))
+            continue
+
+        # Any other opcode terminates the current run of literal characters
+        if run:
+            requirements.append("".join(run))
+            run = []
+
+        if opcode is sre_parse.SUBPATTERN:
+            _, add_flags, _, sub_items = argument
+            if not add_flags & sre_parse.SRE_FLAG_IGNORECASE:
+                requirements.append(_sequence_literals(sub_items))
+        elif opcode in _REPEAT_OPS:
+            min_repeat, _, sub_items = argument
+            if min_repeat >= 1:
+                requirements.append(_sequence_literals(sub_items))
+        elif opcode is sre_parse.BRANCH:
+            _, branches = argument
+            requirements.append(("any", [_sequence_literals(branch) for branch in branches]))
+        # All other opcodes (character sets, anchors, lookarounds, ...) do not require a literal
+
+    if run:
+        requirements.append("".join(run))
+    return ("all", requirements)
+
+
+def literal_prefixes(pattern: str) -> tuple[tuple[str, ...], bool] | None:
+    """Extract the literal prefixes of a RegEx anchored at the start (re.match).
+
+    Every text matched by the RegEx starts with one of the returned prefixes.
+    Alternations result in multiple prefixes (e.g. '(Sommer|Herbst)ferien.*' -> 'Sommerferien', 'Herbstferien').
+    For case-insensitive RegExes the prefixes are lower case and must be compared to the lower case text.
+
+    Arguments:
+        pattern: RegEx pattern.
+
+    Returns:
+        Tuple of the prefixes and the case-insensitive flag or None if the RegEx has no literal prefix.
+    """
+    parsed = sre_parse.parse(pattern)
+    ignore_case = bool(parsed.state.flags & sre_parse.SRE_FLAG_IGNORECASE)
+    prefixes, _ = _sequence_prefixes(parsed, {""})
+
+    if ignore_case:
+        prefixes = {_case_fold_safe_prefix(prefix).lower() for prefix in prefixes}
+    if "" in prefixes:
+        return None
+    return tuple(sorted(prefixes)), ignore_case
+
+
+def _sequence_prefixes(items: list, prefixes: set[str]) -> tuple[set[str], bool]:
+    """Extend the literal prefixes by a parsed RegEx sequence.
+
+    Arguments:
+        items: Parsed RegEx sequence of (opcode, argument) tuples.
+        prefixes: Literal prefixes of everything before the sequence.
+
+    Returns:
+        Extended prefixes and flag if the complete sequence was literal (prefixes can be extended further).
+    """
+    for opcode, argument in items:
+        if opcode is sre_parse.LITERAL:
+            prefixes = {prefix + chr(argument) for prefix in prefixes}
+        elif opcode is sre_parse.AT and argument in {sre_parse.AT_BEGINNING, sre_parse.AT_BEGINNING_STRING}:
+            continue  # zero-width start anchor
+        elif opcode is sre_parse.IN and all(set_opcode is sre_parse.LITERAL for set_opcode, _ in argument):
+            extended = {prefix + chr(char) for prefix in prefixes for _, char in argument}
+            if len(extended) > _MAX_PREFIXES:
+                return prefixes, False
+            prefixes = extended
+        elif opcode is sre_parse.SUBPATTERN and not (argument[1] | argument[2]):  # no local flags
+            prefixes, complete = _sequence_prefixes(argument[3], prefixes)
+            if not complete:
+                return prefixes, False
+        elif opcode is sre_parse.BRANCH:
+            extended = set()
+            complete = True
+            for branch in argument[1]:
+                branch_prefixes, branch_complete = _sequence_prefixes(branch, prefixes)
+                extended |= branch_prefixes
+                complete &= branch_complete
+            if len(extended) > _MAX_PREFIXES:
+                return prefixes, False
+            prefixes = extended
+            if not complete:
+                return prefixes, False
+        else:
+            return prefixes, False
+    return prefixes, True
+
+
+def _case_fold_safe_prefix(prefix: str) -> str:
+    """Truncate a prefix at the first character not safely comparable in lower case.
+
+    Arguments:
+        prefix: Literal prefix.
+
+    Returns:
+        Truncated prefix.
+    """
+    for index, char in enumerate(prefix):
+        if char not in _CASE_FOLD_SAFE_CHARS:
+            return prefix[:index]
+    return prefix
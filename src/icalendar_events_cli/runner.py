@@ -0,0 +1,363 @@
+"""Run of multiple configuration files: shared calendar downloads and parses, queries spread across worker processes."""
+
+# ---- Imports ---------------------------------------------------------------------------------------------------------
+import io
+import math
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
+from dataclasses import dataclass, field
+from functools import partial
+
+from pydantic import SecretStr
+
+from .argparse import parse_config, parse_runner_config
+from .downloader import CalendarSource
+from .icalendar import Calendar
+from .metrics import RunMetrics
+from .query import parse_calendars, query_downloaded, run_with_metrics, source_filter
+from .stale import StaleWhileRevalidate
+
+# ---- Classes ---------------------------------------------------------------------------------------------------------
+
+
+@dataclass
+class ConfigRun:
+    """Result of the query of a single configuration."""
+
+    exit_code: int
+    duration: float = 0.0  # Duration of the query in seconds
+    stdout: str = ""
+    stderr: str = ""
+
+
+@dataclass
+class SourceGroup:
+    """Configurations using the same calendar source (same calendar and merged calendars)."""
+
+    download_keys: list[tuple]
+    configs: list[tuple[int, dict]] = field(default_factory=list)  # (index of the configuration file, configuration)
+    calendar_strings: list[str] | None = None  # None if a download failed
+    download_duration: float = 0.0
+    parse_duration: float = 0.0  # Accumulated over all worker processes parsing the source
+
+
+class SharedCalendar:
+    """Calendar parsed on first use and shared by the queries of the same source."""
+
+    def __init__(self, calendar_strings: list[str], config: dict, filtered: bool = False) -> None:
+        """Construct.
+
+        Arguments:
+            calendar_strings: Contents of the calendar and all merged calendars.
+            config: Configuration hierarchy of the first query.
+            filtered: Apply the filter of the expanded configuration while parsing (single query only).
+        """
+        self._calendar_strings = calendar_strings
+        self._config = config
+        self._filtered = filtered
+        self._filter_config = None  # Filter configuration hierarchy applied while parsing the calendar
+        self._calendar = None
+        self.duration = 0.0  # Parse duration in seconds. Zero if not parsed (e.g. all queries served by the cache).
+
+    def __call__(self, config: dict) -> Calendar:
+        """Get the parsed and merged calendar.
+
+        Arguments:
+            config: Configuration hierarchy of the expansion (e.g. the snapped superset query of the result cache).
+
+        Returns:
+            Calendar: Merged calendar. Parsed again if filtered by another configuration.
+        """
+        filter_config = source_filter(config) if self._filtered else None
+        if self._calendar is None or filter_config is not self._filter_config:
+            begin = time.perf_counter()
+            self._calendar = parse_calendars(self._calendar_strings, self._config, filter_config)
+            self._filter_config = filter_config
+            self.duration += time.perf_counter() - begin
+        return self._calendar
+
+
+# ---- Functions -------------------------------------------------------------------------------------------------------
+
+
+def run_configs(prog: str, version: str, copy_right: str, author: str, arg_list: list[str]) -> int:
+    """Run the queries of multiple configuration files.
+
+    The configurations are grouped by calendar source. Each calendar URL is downloaded once (concurrently) and each
+    source is parsed once per worker process running its queries. The groups are split into chunks spread across the
+    worker processes. The outputs to stdout and stderr are written in the order of the configuration files, followed
+    by the timing report on stderr.
+
+    Arguments:
+        prog: Program name.
+        version: Program version.
+        copy_right: Copyright info.
+        author: Author info.
+        arg_list: Command line arguments (without the command).
+
+    Returns:
+        Numeric exit code: The first non-zero exit code of the configurations (in the order of the files).
+    """
+    begin = time.perf_counter()
+    runner_config = parse_runner_config(prog, version, copy_right, author, arg_list)
+    workers = runner_config.workers or os.cpu_count() or 1
+
+    runs = {}  # Index of the configuration file -> ConfigRun
+    groups = {}  # Source key -> SourceGroup
+    for index, path in enumerate(runner_config.configs):
+        config = _parse_config(prog, version, copy_right, author, path)
+        if isinstance(config, ConfigRun):  # Invalid configuration
+            runs[index] = config
+            continue
+        keys = download_keys(config)
+        group = groups.setdefault((tuple(keys), config.calendar.deduplicate), SourceGroup(keys))
+        group.configs.append((index, config))
+
+    groups = list(groups.values())
+    downloaders = _download_sources(groups)
+    try:
+        chunks = _chunks(groups, workers)
+        for group, (parse_duration, chunk_runs) in zip(
+            (group for group, _ in chunks), _run_chunks(chunks, workers, version), strict=True
+        ):
+            group.parse_duration += parse_duration
+            runs.update(chunk_runs)
+        for group in groups:
+            if group.calendar_strings is None:
+                runs.update((index, ConfigRun(1)) for index, _ in group.configs)
+    finally:
+        for downloader in downloaders:
+            downloader.finish()
+
+    exit_code = os.EX_OK
+    for index in range(len(runner_config.configs)):
+        stdout = runs[index].stdout
+        if stdout and not stdout.endswith("\n"):  # Separate the outputs: Not all formats end with a line break
+            stdout += "\n"
+        sys.stdout.write(stdout)
+        sys.stderr.write(runs[index].stderr)
+        exit_code = exit_code or runs[index].exit_code
+
+    _print_timing(runner_config.configs, runs, groups, workers, time.perf_counter() - begin)
+    return exit_code
+
+
+def _parse_config(prog: str, version: str, copy_right: str, author: str, path: str) -> dict | ConfigRun:
+    """Parse a configuration file.
+
+    Arguments:
+        prog: Program name.
+        version: Program version.
+        copy_right: Copyright info.
+        author: Author info.
+        path: Path of the configuration file.
+
+    Returns:
+        dict | ConfigRun: Configuration hierarchy or the failed run of an invalid configuration (reported issues).
+    """
+    stdout, stderr = io.StringIO(), io.StringIO()
+    with redirect_stdout(stdout), redirect_stderr(stderr):
+        try:
+            return parse_config(prog, version, copy_right, author, ["--config", path])
+        except SystemExit as e:
+            exit_code = e.code
+        except Exception as e:  # pylint: disable=broad-exception-caught;reason=Invalid file must not stop the others.
+            _report_error(e)
+            exit_code = 1
+    return ConfigRun(exit_code, stdout=stdout.getvalue(), stderr=stderr.getvalue())
+
+
+def download_keys(config: dict) -> list[tuple]:
+    """Get the keys of the calendar downloads of a configuration.
+
+    Arguments:
+        config: Configuration hierarchy
+
+    Returns:
+        list[tuple]: Keys of the calendar and all merged calendars. Downloads with the same key have the same contents.
+    """
+    calendar_config = config.calendar
+    access = (calendar_config.source, _secret(calendar_config.user), _secret(calendar_config.password))
+    access += (calendar_config.verify_url,)
+    # The contents of filtered CalDAV queries depend on the filters of the configuration: never shared
+    filtered = calendar_config.source is CalendarSource.caldav and source_filter(config) is not None
+    keys = [(calendar_config.url, *access, id(config) if filtered else None)]
+    return keys + [(url, *access, None) for url in calendar_config.merge_urls]
+
+
+def _secret(value: SecretStr | None) -> str | None:
+    """Get the value of an optional secret.
+
+    Arguments:
+        value: Secret or None.
+
+    Returns:
+        str | None: Secret value or None.
+    """
+    return None if value is None else value.get_secret_value()
+
+
+def _download_sources(groups: list[SourceGroup]) -> list[StaleWhileRevalidate]:
+    """Download the calendars of all source groups. Each distinct calendar is downloaded once.
+
+    Arguments:
+        groups: Source groups. The calendar contents and download durations are stored in the groups.
+
+    Returns:
+        list[StaleWhileRevalidate]: Used downloaders (to be finished at the end of the run).
+    """
+    downloads = {}  # Download key -> (downloader, URL, filter configuration)
+    for group in groups:
+        config = group.configs[0][1]
+        for download_key in group.download_keys:
+            if download_key not in downloads:
+                downloader = StaleWhileRevalidate(config.calendar, config.cache, RunMetrics(enabled=False))
+                filtered = download_key[-1] is not None
+                downloads[download_key] = (downloader, download_key[0], source_filter(config) if filtered else None)
+
+    with ThreadPoolExecutor(max_workers=max(len(downloads), 1)) as executor:
+        futures = {
+            download_key: executor.submit(_timed_download, *download) for download_key, download in downloads.items()
+        }
+    for group in groups:
+        results = [futures[download_key] for download_key in group.download_keys]
+        if all(result.exception() is None for result in results):  # Failed downloads: error reported on stdout
+            group.calendar_strings = [result.result()[0] for result in results]
+            group.download_duration = max(result.result()[1] for result in results)
+    return [downloader for downloader, _, _ in downloads.values()]
+
+
+def _timed_download(downloader: StaleWhileRevalidate, url: str, filter_config: dict | None) -> tuple[str, float]:
+    """Download a calendar and measure the duration.
+
+    Arguments:
+        downloader: Downloader.
+        url: Calendar URL.
+        filter_config: Optional filter configuration hierarchy (filtered CalDAV sources only).
+
+    Returns:
+        tuple[str, float]: Calendar contents and download duration in seconds.
+    """
+    begin = time.perf_counter()
+    contents = downloader.download(url, filter_config)
+    return contents, time.perf_counter() - begin
+
+
+def _chunks(groups: list[SourceGroup], workers: int) -> list[tuple[SourceGroup, list[tuple[int, dict]]]]:
+    """Split the configurations of the downloaded source groups into chunks for the worker processes.
+
+    Arguments:
+        groups: Source groups.
+        workers: Number of worker processes.
+
+    Returns:
+        list[tuple[SourceGroup, list[tuple[int, dict]]]]: Chunks (source group, configurations), largest first.
+    """
+    downloaded = [group for group in groups if group.calendar_strings is not None]
+    chunk_size = math.ceil(sum(len(group.configs) for group in downloaded) / workers) or 1
+    chunks = [
+        (group, group.configs[start : start + chunk_size])
+        for group in downloaded
+        for start in range(0, len(group.configs), chunk_size)
+    ]
+    # Largest (most expensive) chunks first: Less idle workers at the end of the run
+    return sorted(chunks, key=lambda chunk: len(chunk[1]) * sum(map(len, chunk[0].calendar_strings)), reverse=True)
+
+
+def _run_chunks(
+    chunks: list[tuple[SourceGroup, list[tuple[int, dict]]]], workers: int, version: str
+) -> list[tuple[float, dict[int, ConfigRun]]]:
+    """Run the queries of all chunks.
+
+    Arguments:
+        chunks: Chunks (source group, configurations).
+        workers: Number of worker processes. With 1 worker (or a single chunk) the chunks are run in this process.
+        version: Program version (part of the result cache keys).
+
+    Returns:
+        list[tuple[float, dict[int, ConfigRun]]]: Parse duration and query results of each chunk.
+    """
+    tasks = [(group.calendar_strings, configs, version) for group, configs in chunks]
+    if workers == 1 or len(tasks) <= 1:
+        return [run_chunk(*task) for task in tasks]
+
+    # Spawned workers on all platforms: The main process may run download threads (no fork of threads)
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(tasks)), mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        return list(executor.map(run_chunk, *zip(*tasks, strict=True)))
+
+
+def run_chunk(
+    calendar_strings: list[str], configs: list[tuple[int, dict]], version: str
+) -> tuple[float, dict[int, ConfigRun]]:
+    """Run the queries of a chunk of configurations using the same calendar source (worker process).
+
+    Arguments:
+        calendar_strings: Contents of the calendar and all merged calendars.
+        configs: Configurations (index of the configuration file, configuration).
+        version: Program version (part of the result cache keys).
+
+    Returns:
+        tuple[float, dict[int, ConfigRun]]: Parse duration and query results by index of the configuration file.
+    """
+    first_config = configs[0][1]
+    calendar = SharedCalendar(calendar_strings, first_config, filtered=len(configs) == 1)  # Filtered if not shared
+    runs = {}
+    for index, config in configs:
+        stdout, stderr = io.StringIO(), io.StringIO()
+        begin = time.perf_counter() - calendar.duration  # The shared parse is not part of the query duration
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                exit_code = run_with_metrics(
+                    config, partial(query_downloaded, calendar_strings, config, version=version, parsed=calendar)
+                )
+            except Exception as e:  # pylint: disable=broad-exception-caught;reason=Failed query must not stop the others.
+                _report_error(e)
+                exit_code = 1
+        duration = time.perf_counter() - calendar.duration - begin
+        runs[index] = ConfigRun(exit_code, duration, stdout.getvalue(), stderr.getvalue())
+    return calendar.duration, runs
+
+
+def _report_error(error: Exception) -> None:
+    """Report an unexpected error of a configuration on stdout (as a single run would do).
+
+    Arguments:
+        error: Error.
+    """
+    print(f"ERROR: Any error has occurred!{os.linesep}{os.linesep}Exception: {str(error)}")
+
+
+def _print_timing(
+    paths: list[str], runs: dict[int, ConfigRun], groups: list[SourceGroup], workers: int, duration: float
+) -> None:
+    """Print the timing report of the run on stderr.
+
+    Arguments:
+        paths: Paths of the configuration files.
+        runs: Query results by index of the configuration file.
+        groups: Source groups.
+        workers: Number of used worker processes.
+        duration: Total duration of the run in seconds.
+    """
+    sources = {index: group for group in groups for index, _ in group.configs}
+    print(
+        f"Timing of {len(paths)} configurations (calendar sources: {len(groups)}, workers: {workers}):"
+        + f" {duration:.3f} s",
+        file=sys.stderr,
+    )
+    for index, path in enumerate(paths):
+        run = runs[index]
+        line = f"- {path}: exit code {run.exit_code}, query {run.duration:.3f} s"
+        group = sources.get(index)
+        if group is not None:  # Not for invalid configurations
+            line += (
+                f" (source: download {group.download_duration:.3f} s, parse {group.parse_duration:.3f} s,"
+                + f" configurations {len(group.configs)})"
+            )
+        print(line, file=sys.stderr)
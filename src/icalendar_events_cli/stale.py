@@ -0,0 +1,144 @@
+"""Stale-while-revalidate copies of the downloaded calendars: bounded latency whatever the calendar server does."""
+
+# ---- Imports ---------------------------------------------------------------------------------------------------------
+import hashlib
+import json
+import sys
+import threading
+import time
+from collections.abc import Callable
+
+from .cache import ResultCache
+from .downloader import CalendarSource, DownloadError, download_calendar, fetch_calendar
+from .metrics import RunMetrics
+
+# ---- Classes ---------------------------------------------------------------------------------------------------------
+
+
+class StaleWhileRevalidate:
+    """Calendar downloader answering from a recent copy of a calendar while it is refreshed in the background.
+
+    The copies are kept in the cache directory (same LRU eviction as the cached results). If a copy younger than the
+    maximum staleness exists, it is returned right away. If it is older than the refresh age, a refresh of the copy is
+    started in a background thread. The refreshes are awaited at the end of the run within the refresh budget.
+    Refreshes not finished by then are dropped: the refresh is deferred to the next run. Without a (recent enough)
+    copy the calendar is downloaded.
+
+    Only downloaded calendars (source 'download') are kept. The contents of CalDAV sources depend on the filters.
+    """
+
+    def __init__(self, calendar_config: dict, cache_config: dict, metrics: RunMetrics) -> None:
+        """Construct.
+
+        Arguments:
+            calendar_config: Calendar configuration hierarchy.
+            cache_config: Cache configuration hierarchy. Copies are only kept if the cache directory and the maximum
+                          staleness are configured.
+            metrics: Run metrics (downloads and copy lookups).
+        """
+        self._calendar_config = calendar_config
+        self._metrics = metrics
+        self._max_stale = cache_config.max_stale
+        self._refresh_after = cache_config.refresh_after
+        self._refresh_budget = cache_config.refresh_budget
+        self._cache = None
+        if (
+            cache_config.dir is not None
+            and cache_config.max_stale is not None
+            and calendar_config.source is CalendarSource.download
+        ):
+            self._cache = ResultCache(cache_config.dir, cache_config.max_size)
+        self._refreshes = []  # Started refreshes: (URL, start time, thread)
+        self._failures = []  # Messages of failed refreshes (appended by the refresh threads)
+
+    def download(
+        self, url: str | None = None, filter_config: dict | None = None, consume: Callable[[str], None] | None = None
+    ) -> str:
+        """Get the contents of a calendar: a recent copy (refreshed in the background) or downloaded.
+
+        Arguments:
+            url: Optional URL overriding the configured calendar URL (e.g. of a merged calendar).
+            filter_config: Optional filter configuration hierarchy (CalDAV sources only, see download_calendar).
+            consume: Optional consumer of the chunks of a streamed download (not called for a copy).
+
+        Returns:
+            str: Calendar contents.
+        """
+        if self._cache is None:
+            return download_calendar(self._calendar_config, url, filter_config, self._metrics, consume)
+
+        url = self._calendar_config.url if url is None else url
+        key = copy_key(url, self._calendar_config)
+        entry = self._cache.get(key)
+        if entry is not None:
+            downloaded, contents = entry.split(b"\n", 1)
+            age = time.time() - float(downloaded)
+            if age <= self._max_stale:
+                self._metrics.add("cache_requests_total", layer="calendar_copy", result="hit")
+                if age >= self._refresh_after:
+                    self._start_refresh(url, key)
+                return contents.decode("utf-8")
+
+        self._metrics.add("cache_requests_total", layer="calendar_copy", result="miss")
+        contents = download_calendar(self._calendar_config, url, metrics=self._metrics, consume=consume)
+        self._store(key, contents)
+        return contents
+
+    def finish(self) -> None:
+        """Wait for the started refreshes within the refresh budget and report the failed refreshes on stderr."""
+        for _, started, thread in self._refreshes:
+            thread.join(max(0.0, started + self._refresh_budget - time.monotonic()))
+
+        for failure in self._failures:
+            print(f"WARNING: refresh of the calendar copy failed, the stale copy is used: {failure}", file=sys.stderr)
+
+    def _start_refresh(self, url: str, key: str) -> None:
+        """Start the refresh of a calendar copy in a background thread.
+
+        Arguments:
+            url: Calendar URL.
+            key: Cache key of the copy.
+        """
+        # Daemon thread: A refresh still running at the end of the run does not delay the program exit
+        thread = threading.Thread(target=self._refresh, args=(url, key), daemon=True)
+        self._refreshes.append((url, time.monotonic(), thread))
+        thread.start()
+
+    def _refresh(self, url: str, key: str) -> None:
+        """Download a calendar and replace its copy.
+
+        Arguments:
+            url: Calendar URL.
+            key: Cache key of the copy.
+        """
+        try:
+            self._store(key, fetch_calendar(self._calendar_config, url, metrics=self._metrics))
+        except DownloadError as e:
+            self._failures.append(str(e))
+
+    def _store(self, key: str, contents: str) -> None:
+        """Store a calendar copy together with its download time.
+
+        Arguments:
+            key: Cache key of the copy.
+            contents: Calendar contents.
+        """
+        self._cache.put(key, f"{time.time()}\n".encode() + contents.encode("utf-8"))
+
+
+# ---- Functions -------------------------------------------------------------------------------------------------------
+
+
+def copy_key(url: str, calendar_config: dict) -> str:
+    """Build the cache key of a calendar copy.
+
+    Arguments:
+        url: Calendar URL.
+        calendar_config: Calendar configuration hierarchy.
+
+    Returns:
+        str: Cache key (SHA-256 hex digest). Different users may get different contents of the same URL.
+    """
+    user = None if calendar_config.user is None else calendar_config.user.get_secret_value()
+    key = {"copy": url, "user": user}
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
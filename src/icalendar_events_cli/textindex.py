@@ -0,0 +1,127 @@
+"""Trigram text index over the event text properties of a parsed calendar."""
+
+# ---- Imports ---------------------------------------------------------------------------------------------------------
+from collections import defaultdict
+
+from icalendar import Calendar
+
+from .regex_analysis import required_literals
+
+# ---- Globals ---------------------------------------------------------------------------------------------------------
+
+INDEXED_PROPERTIES = ("SUMMARY", "DESCRIPTION", "LOCATION")
+
+# ---- Classes ---------------------------------------------------------------------------------------------------------
+
+
+class TextIndex:
+    """Trigram index mapping the text properties of all VEVENT components to the UIDs of their series.
+
+    The index is built once per parsed calendar and can be reused for any number of filter queries.
+    It only narrows down the candidate series. The final RegEx match is still done by filter_events().
+    """
+
+    def __init__(self, calendar: Calendar) -> None:
+        """Build the index.
+
+        Arguments:
+            calendar: Parsed iCalendar calendar.
+        """
+        self._postings = {name: defaultdict(set) for name in INDEXED_PROPERTIES}
+
+        for component in calendar.walk("VEVENT"):
+            # Same series identification as recurring_ical_events: UID or the Python ID if absent
+            uid = component.get("UID", str(id(component)))
+            for name in INDEXED_PROPERTIES:
+                text = component.decoded(name, default=None)
+                if not isinstance(text, str):
+                    continue  # Property not set: Never matches the filter
+                postings = self._postings[name]
+                for trigram in _trigrams(text):
+                    postings[trigram].add(uid)
+
+    def candidate_uids(self, name: str, pattern: str) -> set | None:
+        """Get the UIDs of all series which might match the RegEx filter of a text property.
+
+        Arguments:
+            name: Name of the text property (e.g. 'SUMMARY').
+            pattern: RegEx pattern of the filter.
+
+        Returns:
+            Set of candidate UIDs or None if the RegEx has no usable literals (full scan needed).
+        """
+        requirements = required_literals(pattern)
+        if requirements is None:
+            return None
+        return self._candidates(self._postings[name], requirements)
+
+    def _candidates(self, postings: dict, requirements: str | tuple) -> set | None:
+        """Evaluate a requirements tree against the postings of a text property.
+
+        Arguments:
+            postings: Trigram -> UIDs mapping of a text property.
+            requirements: Requirements tree (see required_literals()).
+
+        Returns:
+            Set of candidate UIDs or None if unconstrained.
+        """
+        if isinstance(requirements, str):
+            trigrams = _trigrams(requirements)
+            if not trigrams:
+                return None
+            uid_sets = sorted((postings.get(trigram, set()) for trigram in trigrams), key=len)
+            return set.intersection(*uid_sets)
+
+        kind, children = requirements
+        results = [self._candidates(postings, child) for child in children]
+        if kind == "any":
+            if any(result is None for result in results):
+                return None
+            return set().union(*results)
+
+        constrained = sorted((result for result in results if result is not None), key=len)
+        if not constrained:
+            return None
+        return set.intersection(*constrained)
+
+
+# ---- Functions -------------------------------------------------------------------------------------------------------
+
+
+def candidate_uids(text_index: TextIndex | None, filter_config: dict) -> set | None:
+    """Get the UIDs of all series which might match all configured text filters.
+
+    Arguments:
+        text_index: Optional text index of the calendar.
+        filter_config: Filter configuration hierarchy.
+
+    Returns:
+        Set of candidate UIDs or None if all series must be scanned.
+    """
+    if text_index is None:
+        return None
+
+    candidates = None
+    for name, pattern in (
+        ("SUMMARY", filter_config.summary),
+        ("DESCRIPTION", filter_config.description),
+        ("LOCATION", filter_config.location),
+    ):
+        if pattern is None:
+            continue
+        property_candidates = text_index.candidate_uids(name, pattern)
+        if property_candidates is not None:
+            candidates = property_candidates if candidates is None else candidates & property_candidates
+    return candidates
+
+
+def _trigrams(text: str) -> set[str]:
+    """Get all trigrams of a text.
+
+    Arguments:
+        text: Text.
+
+    Returns:
+        Set of all trigrams.
+    """
+    return {text[index : index + 3] for index in range(len(text) - 2)}
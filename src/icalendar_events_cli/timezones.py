@@ -0,0 +1,282 @@
+"""Timezones of VTIMEZONE components with precomputed transition tables, cached across runs."""
+
+# ---- Imports ---------------------------------------------------------------------------------------------------------
+import contextlib
+import hashlib
+import json
+import operator
+from bisect import bisect_right
+from collections.abc import Iterator
+from datetime import MAXYEAR, datetime, timedelta, tzinfo
+from functools import partial
+from itertools import islice, takewhile
+
+from dateutil.tz.tz import _tzicalvtz, _tzicalvtzcomp
+from icalendar import Timezone
+from icalendar.timezone import tzp
+from icalendar.timezone.zoneinfo import ZONEINFO
+
+from .cache import ResultCache
+
+# ---- Globals ---------------------------------------------------------------------------------------------------------
+
+MAX_ONSETS = 10000  # Maximum number of precomputed onsets of a STANDARD / DAYLIGHT sub-component
+
+_ZERO = timedelta(0)
+
+# ---- Classes ---------------------------------------------------------------------------------------------------------
+
+
+class TransitionTableTimezone(_tzicalvtz):
+    """Timezone of a VTIMEZONE component with precomputed onset tables.
+
+    The timezone of a VTIMEZONE component (dateutil) searches the recurrence rules of all STANDARD / DAYLIGHT
+    sub-components for every UTC offset lookup. Here the onsets of each sub-component are expanded once up to a
+    horizon and every lookup is a bisection per sub-component. The selected sub-component (and therefore the UTC
+    offset, DST offset and name) is the same as of the dateutil timezone. Lookups beyond the horizon are answered
+    by the dateutil timezone.
+    """
+
+    def __init__(
+        self, tzid: str, comps: list[_tzicalvtzcomp], onsets: list[list[datetime]], until: datetime, vtimezone: str
+    ) -> None:
+        """Construct.
+
+        Arguments:
+            tzid: Timezone identifier (TZID).
+            comps: STANDARD / DAYLIGHT sub-components (offsets, DST flag and name, without recurrence rules).
+            onsets: Sorted local onset times of each sub-component up to the horizon.
+            until: Horizon (local time) of the onset tables.
+            vtimezone: VTIMEZONE component (iCalendar) the timezone is created from beyond the horizon.
+        """
+        super().__init__(tzid, comps)
+        self._onsets = onsets
+        self._until = until
+        self._vtimezone = vtimezone
+        self._fallback = None
+
+        # Merged onset table of all sub-components: The first sub-component wins onsets at the same time
+        self._table_onsets = []
+        self._table_comps = []
+        for onset, index in sorted((onset, index) for index, comp_onsets in enumerate(onsets) for onset in comp_onsets):
+            if not self._table_onsets or self._table_onsets[-1] != onset:
+                self._table_onsets.append(onset)
+                self._table_comps.append(comps[index])
+
+    @classmethod
+    def from_timezone(cls, timezone: _tzicalvtz, until: datetime, vtimezone: str) -> "TransitionTableTimezone":
+        """Precompute the onset tables of a timezone of a VTIMEZONE component.
+
+        Arguments:
+            timezone: Timezone of the VTIMEZONE component (dateutil).
+            until: Horizon (local time) of the onset tables.
+            vtimezone: VTIMEZONE component (iCalendar).
+
+        Returns:
+            TransitionTableTimezone: Timezone with onset tables.
+        """
+        comps = []
+        onsets = []
+        for comp in timezone._comps:  # pylint: disable=protected-access;reason=Sub-components of the dateutil timezone.
+            comps.append(
+                _tzicalvtzcomp(
+                    comp.tzoffsetfrom.total_seconds(), comp.tzoffsetto.total_seconds(), comp.isdst, comp.tzname
+                )
+            )
+            comp_onsets = list(islice(takewhile(partial(operator.ge, until), comp.rrule), MAX_ONSETS))
+            if len(comp_onsets) == MAX_ONSETS:  # Truncated: The table is complete up to its last onset only
+                until = comp_onsets[-1]
+            onsets.append(comp_onsets)
+        table = cls(timezone._tzid, comps, onsets, until, vtimezone)  # pylint: disable=protected-access
+        table._fallback = timezone
+        return table
+
+    def _find_comp(self, dt: datetime) -> _tzicalvtzcomp:
+        """Find the sub-component in effect at a local time (same selection as the dateutil timezone).
+
+        Arguments:
+            dt: Local time.
+
+        Returns:
+            _tzicalvtzcomp: Sub-component in effect.
+        """
+        if len(self._comps) == 1:
+            return self._comps[0]
+
+        dt = dt.replace(tzinfo=None)
+        if not dt.fold:  # All sub-components compare their onsets to the same local time: Single bisection
+            if dt > self._until:
+                return self._resolved()._find_comp(dt)  # pylint: disable=protected-access
+            index = bisect_right(self._table_onsets, dt)
+            return self._table_comps[index - 1] if index else self._standard_comp()
+
+        # Second occurrence of an ambiguous local time: The onsets of the sub-components with a negative offset
+        # difference are compared to the shifted local time
+        last_onset = None
+        last_comp = None
+        for comp, onsets in zip(self._comps, self._onsets, strict=True):
+            comp_dt = dt - comp.tzoffsetdiff if comp.tzoffsetdiff < _ZERO else dt
+            if comp_dt > self._until:
+                return self._resolved()._find_comp(dt)  # pylint: disable=protected-access
+            index = bisect_right(onsets, comp_dt)
+            if index and (last_onset is None or last_onset < onsets[index - 1]):
+                last_onset = onsets[index - 1]
+                last_comp = comp
+
+        return self._standard_comp() if last_comp is None else last_comp
+
+    def _standard_comp(self) -> _tzicalvtzcomp:
+        """Get the sub-component in effect before the first onset: The first standard sub-component.
+
+        Returns:
+            _tzicalvtzcomp: Sub-component in effect.
+        """
+        return next((comp for comp in self._comps if not comp.isdst), self._comps[0])
+
+    def _resolved(self) -> _tzicalvtz:
+        """Get the timezone of the VTIMEZONE component (dateutil). Created on first use.
+
+        Returns:
+            _tzicalvtz: Timezone without onset tables.
+        """
+        if self._fallback is None:
+            self._fallback = ZONEINFO().create_timezone(Timezone.from_ical(self._vtimezone))
+        return self._fallback
+
+    def dumps(self) -> bytes:
+        """Serialize the onset tables (JSON), not the dateutil timezone.
+
+        Returns:
+            bytes: Cache entry.
+        """
+        entry = {
+            "tzid": self._tzid,
+            "comps": [
+                [int(comp.tzoffsetfrom.total_seconds()), int(comp.tzoffsetto.total_seconds()), comp.isdst, comp.tzname]
+                for comp in self._comps
+            ],
+            "onsets": [[onset.isoformat() for onset in onsets] for onsets in self._onsets],
+            "until": self._until.isoformat(),
+            "vtimezone": self._vtimezone,
+        }
+        return json.dumps(entry).encode("utf-8")
+
+    @classmethod
+    def loads(cls, entry: bytes) -> "TransitionTableTimezone":
+        """Deserialize the onset tables (see dumps()).
+
+        Arguments:
+            entry: Cache entry.
+
+        Returns:
+            TransitionTableTimezone: Timezone with onset tables.
+        """
+        entry = json.loads(entry)
+        return cls(
+            entry["tzid"],
+            [_tzicalvtzcomp(*comp) for comp in entry["comps"]],
+            [[datetime.fromisoformat(onset) for onset in onsets] for onsets in entry["onsets"]],
+            datetime.fromisoformat(entry["until"]),
+            entry["vtimezone"],
+        )
+
+
+class TransitionTableProvider(ZONEINFO):
+    """Timezone provider (zoneinfo) creating the timezones of VTIMEZONE components with onset tables.
+
+    Standard timezone identifiers are resolved by zoneinfo. Only custom VTIMEZONE components (e.g. of Exchange /
+    Outlook feeds) are turned into timezones. These are fingerprinted by their content, shared by all calendars of
+    the process and kept in the cache directory: Following runs load the onset tables instead of creating the
+    timezones again.
+    """
+
+    def __init__(self) -> None:
+        """Construct."""
+        self.cache = None  # Cache of the timezones (ResultCache)
+        self.until = datetime(MAXYEAR, 1, 1)  # Horizon of the onset tables
+        self._timezones = {}  # Timezones created by this process. Key: Cache key (content and horizon).
+
+    def create_timezone(self, tz: Timezone) -> tzinfo:
+        """Create the timezone of a VTIMEZONE component.
+
+        Arguments:
+            tz: VTIMEZONE component.
+
+        Returns:
+            tzinfo: Timezone with onset tables.
+        """
+        vtimezone = tz.to_ical().decode("utf-8", "replace")
+        key = timezone_key(vtimezone, self.until)
+        timezone = self._timezones.get(key)
+        if timezone is None:
+            timezone = self._load_or_create(tz, key, vtimezone)
+            self._timezones[key] = timezone
+        return timezone
+
+    def _load_or_create(self, tz: Timezone, key: str, vtimezone: str) -> TransitionTableTimezone:
+        """Load a timezone from the cache or create it.
+
+        Arguments:
+            tz: VTIMEZONE component.
+            key: Cache key.
+            vtimezone: VTIMEZONE component (iCalendar).
+
+        Returns:
+            TransitionTableTimezone: Timezone with onset tables.
+        """
+        entry = self.cache.get(key)
+        if entry is not None:
+            return TransitionTableTimezone.loads(entry)
+
+        timezone = TransitionTableTimezone.from_timezone(super().create_timezone(tz), self.until, vtimezone)
+        self.cache.put(key, timezone.dumps())
+        return timezone
+
+
+# ---- Functions -------------------------------------------------------------------------------------------------------
+
+_provider = TransitionTableProvider()
+
+
+@contextlib.contextmanager
+def transition_tables(cache_config: dict, end_date: datetime) -> Iterator[None]:
+    """Create the timezones of the VTIMEZONE components parsed within the context with onset tables.
+
+    Only used with a cache directory: The timezones are kept there for the following runs. Otherwise the timezone
+    provider of icalendar is not changed. The previous provider is restored when leaving the context.
+
+    Arguments:
+        cache_config: Cache configuration hierarchy.
+        end_date: End date of the query. The onset tables reach until the end of the following year.
+
+    Yields:
+        None
+    """
+    if cache_config.dir is None:
+        yield
+        return
+
+    _provider.cache = ResultCache(cache_config.dir, cache_config.max_size)
+    _provider.until = datetime(min(end_date.year + 2, MAXYEAR), 1, 1)
+    previous = tzp.name
+    # (Re-)installing a provider drops the timezones icalendar keeps by their TZID. A calendar must not use the
+    # timezone of another calendar with the same TZID, the provider returns the timezones of the same content.
+    tzp.use(_provider)
+    try:
+        yield
+    finally:
+        tzp.use(previous)
+
+
+def timezone_key(vtimezone: str, until: datetime) -> str:
+    """Build the cache key of a timezone.
+
+    Arguments:
+        vtimezone: VTIMEZONE component (iCalendar).
+        until: Horizon of the onset tables.
+
+    Returns:
+        str: Cache key (SHA-256 hex digest).
+    """
+    key = {"vtimezone": hashlib.sha256(vtimezone.encode("utf-8")).hexdigest(), "until": until.isoformat()}
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
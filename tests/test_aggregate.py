@@ -0,0 +1,235 @@
+"""Test of the aggregate output: counts and durations of the events per time period and summary group."""
+
+import os
+from datetime import date
+
+import pytest
+import pytz
+import recurring_ical_events
+from icalendar import Calendar
+
+from icalendar_events_cli.aggregate import AggregateBucket, _period_label, _period_start, aggregate_events
+from tests.util_runner import calendar_example_url, run_cli, run_cli_json
+
+# ---- Testcases -------------------------------------------------------------------------------------------------------
+
+AGGREGATE_QUERY = (
+    f"--calendar.url {calendar_example_url('aggregate_events.ics')} --output.format aggregate"
+    + " --filter.start-date 2025-01-01T00:00:00+01:00 --filter.end-date 2025-03-31T23:59:59+02:00"
+)
+
+
+@pytest.mark.parametrize("output_file", [None, "icalendar_events_cli_test.json"])
+def test_ct_aggregate_month(output_file: str | None, tmp_path: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test the counts and durations per month.
+
+    Arguments:
+        output_file: Output file name. If not set output is written to console / stdout.
+        tmp_path: Temporary unique file path provided by built-in fixture.
+        capsys: System capture
+    """
+    output_path = f"{tmp_path}/{output_file}" if output_file else None
+    args = AGGREGATE_QUERY + " --output.aggregate-bucket month --output.aggregate-timezone Europe/Berlin"
+    args += f" --output.file {output_path}" if output_path else ""
+
+    cli_result = run_cli_json(args, capsys, output_path)
+    assert cli_result.exit_code == os.EX_OK
+
+    json_output = cli_result.stdout_as_json if output_path is None else cli_result.fileout_as_json
+    assert json_output["filter"] == {"start-date": "2025-01-01T00:00:00+01:00", "end-date": "2025-03-31T23:59:59+02:00"}
+    assert json_output["aggregate"] == {"bucket": "month", "timezone": "Europe/Berlin"}
+    assert json_output["buckets"] == [
+        # 2 weekly meetings and the floating focus time
+        {"period": "2025-01", "start-date": "2025-01-01", "count": 3, "duration": 14400},
+        # 4 weekly meetings, the meeting starting on Feb 1st in Berlin and the full-day holiday
+        {"period": "2025-02", "start-date": "2025-02-01", "count": 6, "duration": 104400},
+        # Event without summary
+        {"period": "2025-03", "start-date": "2025-03-01", "count": 1, "duration": 1800},
+    ]
+
+
+@pytest.mark.parametrize(
+    ("timezone", "expected_buckets"),
+    [
+        (
+            "Europe/Berlin",
+            [
+                ("2025-01-23", 1, 3600),
+                ("2025-01-27", 1, 7200),  # Floating focus time
+                ("2025-01-30", 1, 3600),
+                ("2025-02-01", 1, 3600),  # 2025-01-31 23:30 UTC
+                ("2025-02-03", 1, 86400),  # Full-day holiday
+                ("2025-02-06", 1, 3600),
+                ("2025-02-13", 1, 3600),
+                ("2025-02-20", 1, 3600),
+                ("2025-02-27", 1, 3600),
+                ("2025-03-03", 1, 1800),
+            ],
+        ),
+        (
+            "UTC",
+            [
+                ("2025-01-23", 1, 3600),
+                ("2025-01-27", 1, 7200),
+                ("2025-01-30", 1, 3600),
+                ("2025-01-31", 1, 3600),
+                ("2025-02-03", 1, 86400),
+                ("2025-02-06", 1, 3600),
+                ("2025-02-13", 1, 3600),
+                ("2025-02-20", 1, 3600),
+                ("2025-02-27", 1, 3600),
+                ("2025-03-03", 1, 1800),
+            ],
+        ),
+    ],
+)
+def test_ct_aggregate_day(
+    timezone: str, expected_buckets: list[tuple[str, int, int]], capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test the counts and durations per day in different timezones.
+
+    Arguments:
+        timezone: Timezone of the periods.
+        expected_buckets: Expected period, count and duration of the buckets.
+        capsys: System capture
+    """
+    cli_result = run_cli_json(f"{AGGREGATE_QUERY} --output.aggregate-timezone {timezone}", capsys)
+    assert cli_result.exit_code == os.EX_OK
+
+    assert [
+        (bucket["period"], bucket["count"], bucket["duration"]) for bucket in cli_result.stdout_as_json["buckets"]
+    ] == expected_buckets
+    assert all(bucket["period"] == bucket["start-date"] for bucket in cli_result.stdout_as_json["buckets"])
+
+
+def test_ct_aggregate_week_group(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test the counts and durations per ISO week and summary group (local timezone).
+
+    Arguments:
+        capsys: System capture
+    """
+    cli_result = run_cli_json(
+        f"{AGGREGATE_QUERY} --output.aggregate-bucket week --output.aggregate-group 'Meeting: (\\w+)'", capsys
+    )
+    assert cli_result.exit_code == os.EX_OK
+
+    json_output = cli_result.stdout_as_json
+    assert json_output["aggregate"] == {"bucket": "week", "timezone": "Europe/Berlin", "group": "Meeting: (\\w+)"}
+    assert [
+        (bucket["period"], bucket["start-date"], bucket["group"], bucket["count"], bucket["duration"])
+        for bucket in json_output["buckets"]
+    ] == [
+        ("2025-W04", "2025-01-20", "Alpha", 1, 3600),
+        ("2025-W05", "2025-01-27", None, 1, 7200),  # Not matching events first
+        ("2025-W05", "2025-01-27", "Alpha", 1, 3600),
+        ("2025-W05", "2025-01-27", "Beta", 1, 3600),
+        ("2025-W06", "2025-02-03", None, 1, 86400),
+        ("2025-W06", "2025-02-03", "Alpha", 1, 3600),
+        ("2025-W07", "2025-02-10", "Alpha", 1, 3600),
+        ("2025-W08", "2025-02-17", "Alpha", 1, 3600),
+        ("2025-W09", "2025-02-24", "Alpha", 1, 3600),
+        ("2025-W10", "2025-03-03", None, 1, 1800),  # Event without summary
+    ]
+
+
+@pytest.mark.parametrize(
+    ("group", "expected_buckets"),
+    [
+        (
+            "Meeting: (\\w+)",
+            [
+                {"group": None, "count": 3, "duration": 95400},
+                {"group": "Alpha", "count": 6, "duration": 21600},
+                {"group": "Beta", "count": 1, "duration": 3600},
+            ],
+        ),
+        (
+            "Meeting",  # Whole match without capture group
+            [
+                {"group": None, "count": 3, "duration": 95400},
+                {"group": "Meeting", "count": 7, "duration": 25200},
+            ],
+        ),
+    ],
+)
+def test_ct_aggregate_group_only(group: str, expected_buckets: list[dict], capsys: pytest.CaptureFixture[str]) -> None:
+    """Test the counts and durations per summary group without time periods.
+
+    Arguments:
+        group: Group RegEx.
+        expected_buckets: Expected buckets.
+        capsys: System capture
+    """
+    cli_result = run_cli_json(
+        f"{AGGREGATE_QUERY} --output.aggregate-bucket none --output.aggregate-group '{group}'", capsys
+    )
+    assert cli_result.exit_code == os.EX_OK
+
+    assert cli_result.stdout_as_json["buckets"] == expected_buckets
+
+
+def test_ct_aggregate_no_events(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test the aggregate output without any matching event.
+
+    Arguments:
+        capsys: System capture
+    """
+    cli_result = run_cli_json(f"{AGGREGATE_QUERY} --filter.summary Unknown --output.aggregate-bucket none", capsys)
+    assert cli_result.exit_code == os.EX_OK
+
+    assert cli_result.stdout_as_json["filter"]["summary"] == "Unknown"
+    assert cli_result.stdout_as_json["buckets"] == []
+
+
+def test_ct_aggregate_cache(tmp_path: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test the aggregate output rendered from cached event supersets and with different aggregate settings.
+
+    Arguments:
+        tmp_path: Temporary unique file path provided by built-in fixture.
+        capsys: System capture
+    """
+    args = f"{AGGREGATE_QUERY} --cache.dir {tmp_path} --cache.snap 86400"
+
+    expected = run_cli(AGGREGATE_QUERY, capsys)
+    uncached = run_cli(args, capsys)
+    cached = run_cli(args, capsys)
+    other_bucket = run_cli(f"{args} --output.aggregate-bucket month", capsys)
+
+    assert expected.stdout == uncached.stdout == cached.stdout
+    assert other_bucket.stdout == run_cli(f"{AGGREGATE_QUERY} --output.aggregate-bucket month", capsys).stdout
+    assert other_bucket.stdout != cached.stdout
+
+
+def test_ut_aggregate_streamed() -> None:
+    """Test that the events are consumed as a stream and only the buckets are kept."""
+    with open("tests/calendar_examples/aggregate_events.ics", encoding="utf-8") as file:
+        calendar = Calendar.from_ical(file.read())
+    events = (event for event in recurring_ical_events.of(calendar).between(date(2025, 1, 1), date(2025, 4, 1)))
+
+    buckets = aggregate_events(events, AggregateBucket.none, pytz.UTC)
+
+    assert buckets == [{"count": 10, "duration": 120600}]
+
+
+@pytest.mark.parametrize(
+    ("day", "bucket", "expected_start", "expected_label"),
+    [
+        (date(2024, 12, 31), AggregateBucket.day, date(2024, 12, 31), "2024-12-31"),
+        (date(2024, 12, 31), AggregateBucket.week, date(2024, 12, 30), "2025-W01"),  # ISO week of the next year
+        (date(2021, 1, 3), AggregateBucket.week, date(2020, 12, 28), "2020-W53"),  # ISO week of the previous year
+        (date(2024, 12, 31), AggregateBucket.month, date(2024, 12, 1), "2024-12"),
+    ],
+)
+def test_ut_aggregate_periods(day: date, bucket: AggregateBucket, expected_start: date, expected_label: str) -> None:
+    """Test the periods of the buckets at year boundaries.
+
+    Arguments:
+        day: Start date of an event.
+        bucket: Time period.
+        expected_start: Expected first day of the period.
+        expected_label: Expected label of the period.
+    """
+    period_start = _period_start(day, bucket)  # pylint: disable=protected-access
+
+    assert period_start == expected_start
+    assert _period_label(period_start, bucket) == expected_label  # pylint: disable=protected-access
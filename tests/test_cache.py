@@ -0,0 +1,343 @@
+"""Test of the result cache."""
+
+import os
+import re
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+import icalendar_events_cli.query as query_module
+from icalendar_events_cli.argparse import parse_config
+from icalendar_events_cli.cache import ResultCache, is_cacheable, result_key, snap_date
+from icalendar_events_cli.limits import EXIT_CODE_TRUNCATED
+from icalendar_events_cli.output import OutputFormat, OutputTarget
+from tests.util_runner import calendar_example_url, run_cli
+
+# ---- Utilities -------------------------------------------------------------------------------------------------------
+
+END_DATE = " --filter.end-date 2026-01-01T00:00:00+01:00"
+
+
+def disable_query(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Replace the query function: Runs which are not served by the cache fail.
+
+    Arguments:
+        monkeypatch: Monkeypatch fixture.
+    """
+
+    def query_not_expected(*_: object) -> int:
+        raise AssertionError("result not served from the cache")
+
+    monkeypatch.setattr(query_module, "query_calendars", query_not_expected)
+
+
+def without_dtstamp(output: str) -> str:
+    """Remove the creation time stamps (DTSTAMP) of a rendered output.
+
+    Arguments:
+        output: Rendered output.
+
+    Returns:
+        str: Output without the time stamps.
+    """
+    return re.sub(r"DTSTAMP:\w+", "DTSTAMP:", output)
+
+
+def cache_entries(cache_dir: str) -> list[str]:
+    """Get the entries of a cache directory.
+
+    Arguments:
+        cache_dir: Cache directory.
+
+    Returns:
+        list[str]: File names of the entries.
+    """
+    return sorted(name for name in os.listdir(cache_dir) if name.endswith(".entry"))
+
+
+# ---- Testcases -------------------------------------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize(
+    "output_args",
+    [
+        "--output.format json",
+        "--output.format json --output.fields '[summary, uid]'",
+        "--output.format json --output.order none",
+        "--output.format human_readable",
+        "--output.format jcal",
+        "--output.format ics",
+        "--output.format count",
+        "--output.format exists",
+        "--output.format exists --filter.summary 'Never.*'",
+        "--output.format freebusy --output.freebusy-format ical",
+        "--output.format conflicts",
+    ],
+)
+def test_ct_cache_hit(
+    output_args: str, tmp_path: str, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that a repeated query is served from the cache with the same output and exit code.
+
+    Arguments:
+        output_args: Output command line arguments.
+        tmp_path: Temporary unique file path provided by built-in fixture.
+        monkeypatch: Monkeypatch fixture.
+        capsys: System capture
+    """
+    cli_args = (
+        f"--calendar.url {calendar_example_url('recurring_events.ics')} {output_args}"
+        + " --filter.start-date 2025-01-01T00:00:00+01:00"
+        + END_DATE
+    )
+    expected = run_cli(cli_args, capsys)
+
+    cached_args = f"{cli_args} --cache.dir {tmp_path}/cache"
+    first = run_cli(cached_args, capsys)
+    assert len(cache_entries(f"{tmp_path}/cache")) == 1
+
+    disable_query(monkeypatch)
+    second = run_cli(cached_args, capsys)
+
+    for cli_result in (first, second):
+        assert cli_result.exit_code == expected.exit_code
+        assert without_dtstamp(cli_result.stdout) == without_dtstamp(expected.stdout)
+        assert cli_result.stderr == ""
+
+
+def test_ct_cache_output_file(
+    tmp_path: str, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that a cached result is written to the output file.
+
+    Arguments:
+        tmp_path: Temporary unique file path provided by built-in fixture.
+        monkeypatch: Monkeypatch fixture.
+        capsys: System capture
+    """
+    cli_args = (
+        f"--calendar.url {calendar_example_url('GermanHolidays.ics')} --output.format json"
+        + f" --filter.start-date 2025-01-01T00:00:00+01:00{END_DATE}"
+    )
+    run_cli(f"{cli_args} --output.file {tmp_path}/expected.json", capsys)
+    run_cli(f"{cli_args} --output.file {tmp_path}/first.json --cache.dir {tmp_path}/cache", capsys)
+
+    disable_query(monkeypatch)
+    cli_result = run_cli(f"{cli_args} --output.file {tmp_path}/second.json --cache.dir {tmp_path}/cache", capsys)
+
+    assert cli_result.exit_code == os.EX_OK
+    assert cli_result.stdout == ""
+    for output_file in ("first.json", "second.json"):
+        with open(f"{tmp_path}/expected.json", "rb") as expected, open(f"{tmp_path}/{output_file}", "rb") as output:
+            assert output.read() == expected.read()
+
+
+@pytest.mark.parametrize(
+    "output_format",
+    ["json", "human_readable", "count", "exists", "freebusy", "conflicts", "json --output.fields '[uid]'"],
+)
+@pytest.mark.parametrize(
+    "calendar_file,start_dates",
+    [
+        ("recurring_events.ics", ["2025-03-05T10:17:00+01:00", "2025-03-05T10:43:10+01:00"]),
+        ("GermanHolidays.ics", ["2024-12-27T09:00:00+01:00", "2024-12-31T23:59:59+01:00"]),
+        ("date_index_edge_cases.ics", ["2025-06-05T09:30:00+02:00", "2025-06-07T00:00:00+02:00"]),
+        ("ics_timezones.ics", ["2025-03-30T01:00:00+01:00", "2025-03-30T03:30:00+02:00"]),
+        ("prefilter_events.json", ["2025-06-01T10:30:00+02:00", "2025-06-02T08:00:00+02:00"]),
+        ("exchange_timezones.ics", ["2025-03-25T10:00:00+01:00", "2025-03-26T23:00:00+01:00"]),
+    ],
+)
+def test_ct_cache_snapped_superset(
+    calendar_file: str,
+    start_dates: list[str],
+    output_format: str,
+    tmp_path: str,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Test that queries with moving start dates within the snap granularity are rendered from the cached superset.
+
+    Arguments:
+        calendar_file: Calendar example.
+        start_dates: Start dates of the subsequent queries (within the same snap granularity).
+        output_format: Output format.
+        tmp_path: Temporary unique file path provided by built-in fixture.
+        monkeypatch: Monkeypatch fixture.
+        capsys: System capture
+    """
+    cli_args = f"--calendar.url {calendar_example_url(calendar_file)} --output.format {output_format}{END_DATE}"
+    expected = [run_cli(f"{cli_args} --filter.start-date {start_date}", capsys) for start_date in start_dates]
+
+    cached_args = f"{cli_args} --cache.dir {tmp_path}/cache --cache.snap {7 * 24 * 3600}"
+    for index, start_date in enumerate(start_dates):
+        cli_result = run_cli(f"{cached_args} --filter.start-date {start_date}", capsys)
+
+        assert cli_result.exit_code == expected[index].exit_code
+        assert cli_result.stdout == expected[index].stdout
+        if index == 0:
+            entries = cache_entries(f"{tmp_path}/cache")  # Superset and timezones of custom VTIMEZONE components
+        assert cache_entries(f"{tmp_path}/cache") == entries
+        disable_query(monkeypatch)
+
+    # The superset is stored as iCalendar data, the timezones as JSON, not as pickled objects
+    contents = [Path(tmp_path, "cache", entry).read_bytes() for entry in entries]
+    assert sum(1 for content in contents if content.startswith(b"BEGIN:VCALENDAR")) == 1
+    assert all(content.startswith((b"BEGIN:VCALENDAR", b"{")) for content in contents)
+
+
+def test_ct_cache_snap_exact_formats(
+    tmp_path: str, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that the jcal / ics formats are cached by the exact start date even if snapping is configured.
+
+    Arguments:
+        tmp_path: Temporary unique file path provided by built-in fixture.
+        monkeypatch: Monkeypatch fixture.
+        capsys: System capture
+    """
+    cli_args = (
+        f"--calendar.url {calendar_example_url('recurring_events.ics')} --output.format ics{END_DATE}"
+        + f" --cache.dir {tmp_path}/cache --cache.snap 3600"
+    )
+    run_cli(f"{cli_args} --filter.start-date 2025-03-05T10:17:00+01:00", capsys)
+    run_cli(f"{cli_args} --filter.start-date 2025-03-05T10:43:00+01:00", capsys)
+    assert len(cache_entries(f"{tmp_path}/cache")) == 2
+
+    disable_query(monkeypatch)
+    cli_result = run_cli(f"{cli_args} --filter.start-date 2025-03-05T10:17:00+01:00", capsys)
+    assert cli_result.exit_code == os.EX_OK
+    assert "X-FILTER-DATE-RANGE;VALUE=PERIOD:20250305T091700Z/" in cli_result.stdout
+
+
+@pytest.mark.parametrize("cache_args", ["", " --cache.snap 3600"])
+def test_ct_cache_truncated_not_cached(cache_args: str, tmp_path: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that truncated results are reported but not cached.
+
+    Arguments:
+        cache_args: Further cache command line arguments.
+        tmp_path: Temporary unique file path provided by built-in fixture.
+        capsys: System capture
+    """
+    cli_args = (
+        f"--calendar.url {calendar_example_url('pathological_rrules.ics')} --output.format count"
+        + " --filter.start-date 2025-06-01T00:00:00+02:00 --filter.end-date 2025-07-01T00:00:00+02:00"
+        + f" --filter.max-series-occurrences 10 --cache.dir {tmp_path}/cache{cache_args}"
+    )
+
+    for _ in range(2):
+        cli_result = run_cli(cli_args, capsys)
+        assert cli_result.exit_code == EXIT_CODE_TRUNCATED
+        assert cli_result.stdout == str(4 + 10 + 1 + 10 + 10)
+        assert cli_result.stderr.count("max-series-occurrences (10) reached") == 1
+        assert cache_entries(f"{tmp_path}/cache") == []
+
+
+def test_ut_cache_lru_eviction(tmp_path: str) -> None:
+    """Test the eviction of the least recently used entries by total size.
+
+    Arguments:
+        tmp_path: Temporary unique file path provided by built-in fixture.
+    """
+    cache = ResultCache(str(tmp_path), max_size=250)
+    cache.put("first", b"1" * 100)
+    cache.put("second", b"2" * 100)
+    os.utime(os.path.join(tmp_path, "first.entry"), ns=(1, 1))
+    os.utime(os.path.join(tmp_path, "second.entry"), ns=(2, 2))
+    assert cache.get("first") == b"1" * 100  # Most recently used
+
+    cache.put("third", b"3" * 100)
+    assert cache_entries(str(tmp_path)) == ["first.entry", "third.entry"]
+    assert cache.get("second") is None
+
+    cache.put("oversized", b"4" * 251)
+    assert cache.get("oversized") is None
+    assert cache_entries(str(tmp_path)) == ["first.entry", "third.entry"]
+
+
+def test_ut_cache_left_over_temporary_files(tmp_path: str) -> None:
+    """Test that temporary files left over by killed writers are removed, the ones of running writers are kept.
+
+    Arguments:
+        tmp_path: Temporary unique file path provided by built-in fixture.
+    """
+    left_over = os.path.join(tmp_path, "left_over.tmp")
+    in_progress = os.path.join(tmp_path, "in_progress.tmp")
+    for path in (left_over, in_progress):
+        with open(path, "wb") as file:
+            file.write(b"partial")
+    os.utime(left_over, (time.time() - 2 * 3600, time.time() - 2 * 3600))
+
+    ResultCache(str(tmp_path), max_size=250).put("entry", b"1" * 100)
+
+    assert sorted(os.listdir(tmp_path)) == ["entry.entry", "in_progress.tmp"]
+
+
+def test_ut_cache_key(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test the normalization of the cache key.
+
+    Arguments:
+        capsys: System capture
+    """
+    config = parse_config(
+        prog="test",
+        version="",
+        copy_right="",
+        author="",
+        arg_list=["--calendar.url", "dummy", "--filter.start-date", "2025-03-05T10:17:00+01:00"],
+    )
+    key = result_key(["calendar"], config, "1.0", with_output=True)
+
+    # Same date range in another UTC offset
+    same_config = config.clone()
+    same_config.filter.start_date = snap_date(config.filter.start_date, 1)
+    assert result_key(["calendar"], same_config, "1.0", with_output=True) == key
+
+    # Different calendar contents, program version and output settings
+    assert result_key(["calendar changed"], config, "1.0", with_output=True) != key
+    assert result_key(["calendar"], config, "1.1", with_output=True) != key
+    assert result_key(["calendar"], config, "1.0", with_output=False) != key
+    other_config = config.clone()
+    other_config.output.format = OutputFormat.count
+    assert result_key(["calendar"], other_config, "1.0", with_output=True) != key
+    assert capsys.readouterr().out == ""
+
+
+def test_ut_cache_snap_date() -> None:
+    """Test snapping of the start date."""
+    config = parse_config(
+        prog="test",
+        version="",
+        copy_right="",
+        author="",
+        arg_list=["--calendar.url", "dummy", "--filter.start-date", "2025-03-05T10:17:42+01:00"],
+    )
+    assert snap_date(config.filter.start_date, 3600).isoformat() == "2025-03-05T09:00:00+00:00"
+    assert snap_date(config.filter.start_date, 24 * 3600).isoformat() == "2025-03-05T00:00:00+00:00"
+
+
+@pytest.mark.parametrize(
+    "cache_dir,output_format,targets,expected",
+    [
+        (None, OutputFormat.json, None, False),
+        ("cache", OutputFormat.json, None, True),
+        ("cache", OutputFormat.sqlite, None, False),
+        ("cache", OutputFormat.json, [OutputTarget(format=OutputFormat.json)], False),
+    ],
+)
+def test_ut_cache_cacheable(
+    cache_dir: str | None, output_format: OutputFormat, targets: list | None, expected: bool
+) -> None:
+    """Test which queries are cached.
+
+    Arguments:
+        cache_dir: Cache directory.
+        output_format: Output format.
+        targets: Output targets.
+        expected: Expected result.
+    """
+    config = SimpleNamespace(
+        cache=SimpleNamespace(dir=cache_dir), output=SimpleNamespace(format=output_format, targets=targets)
+    )
+    assert is_cacheable(config) is expected
@@ -0,0 +1,457 @@
+"""Test of the CalDAV calendar source (calendar-query REPORT)."""
+
+import json
+import os
+import re
+from base64 import b64encode
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from xml.etree import ElementTree
+
+import pytest
+import recurring_ical_events
+import requests
+from icalendar import Calendar
+from pytest_httpserver import HTTPServer
+from werkzeug import Request, Response
+
+from icalendar_events_cli.caldav import CALDAV_NAMESPACE, DAV_NAMESPACE, caldav_text_matches, query_calendar
+from icalendar_events_cli.errors import DownloadError
+from tests.util_runner import calendar_example_url, run_cli
+
+# ---- Utilities -------------------------------------------------------------------------------------------------------
+
+COLLECTION_PATH = "/calendars/user/events/"
+
+
+def dav(name: str) -> str:
+    """Get the qualified name of a WebDAV element.
+
+    Arguments:
+        name: Local element name.
+
+    Returns:
+        str: Qualified element name.
+    """
+    return f"{{{DAV_NAMESPACE}}}{name}"
+
+
+def caldav(name: str) -> str:
+    """Get the qualified name of a CalDAV element.
+
+    Arguments:
+        name: Local element name.
+
+    Returns:
+        str: Qualified element name.
+    """
+    return f"{{{CALDAV_NAMESPACE}}}{name}"
+
+
+class CalDavStandIn:
+    """Minimal CalDAV server stand-in serving a calendar example as collection with one resource per UID.
+
+    The time-range and text-match filters of calendar-query REPORTs are evaluated like a real server.
+    """
+
+    def __init__(self, calendar_file: str, text_match: bool = True, inline_data: bool = True) -> None:
+        """Construct.
+
+        Arguments:
+            calendar_file: Calendar example served as collection.
+            text_match: Support text-match filters. If not supported, queries with text-match are rejected (403).
+            inline_data: Return the calendar data within the calendar-query response. Otherwise only the references
+                         are returned and the calendar data must be fetched by calendar-multiget.
+        """
+        self.text_match = text_match
+        self.inline_data = inline_data
+        self.requests = []  # Parsed XML request bodies
+
+        with open(os.path.join("tests", "calendar_examples", calendar_file), encoding="utf-8") as file:
+            calendar = Calendar.from_ical(file.read())
+        timezones = [component for component in calendar.subcomponents if component.name == "VTIMEZONE"]
+        self.resources = {}  # href -> resource calendar
+        for event in calendar.walk("VEVENT"):
+            href = f"{COLLECTION_PATH}{event.get('UID')}.ics"
+            if href not in self.resources:
+                self.resources[href] = Calendar()
+                self.resources[href].add("VERSION", "2.0")
+                self.resources[href].add("PRODID", "-//stand-in//EN")
+                for timezone_component in timezones:
+                    self.resources[href].add_component(timezone_component)
+            self.resources[href].add_component(event)
+
+    def handle(self, request: Request) -> Response:
+        """Handle a REPORT request.
+
+        Arguments:
+            request: HTTP request.
+
+        Returns:
+            Response: Multi-status response.
+        """
+        query = ElementTree.fromstring(request.data)
+        self.requests.append(query)
+        if query.tag == caldav("calendar-multiget"):
+            return self._multi_status([href.text for href in query.iter(dav("href"))], inline_data=True)
+
+        text_matches = [
+            (property_filter.get("name"), text_match.text, text_match.get("collation"))
+            for property_filter in query.iter(caldav("prop-filter"))
+            for text_match in property_filter.iter(caldav("text-match"))
+        ]
+        if text_matches and not self.text_match:
+            return Response(status=403)
+        time_range = query.find(f".//{caldav('time-range')}")
+        hrefs = [
+            href
+            for href, resource in self.resources.items()
+            if _in_time_range(resource, time_range) and _text_matches(resource, text_matches)
+        ]
+        return self._multi_status(hrefs, self.inline_data)
+
+    def _multi_status(self, hrefs: list[str], inline_data: bool) -> Response:
+        """Build a multi-status response.
+
+        Arguments:
+            hrefs: References of the returned resources.
+            inline_data: Include the calendar data.
+
+        Returns:
+            Response: Multi-status response.
+        """
+        multi_status = ElementTree.Element(dav("multistatus"))
+        for href in hrefs:
+            response = ElementTree.SubElement(multi_status, dav("response"))
+            ElementTree.SubElement(response, dav("href")).text = href
+            propstat = ElementTree.SubElement(response, dav("propstat"))
+            prop = ElementTree.SubElement(propstat, dav("prop"))
+            ElementTree.SubElement(prop, dav("getetag")).text = '"1"'
+            if inline_data:
+                ElementTree.SubElement(prop, caldav("calendar-data")).text = self.resources[href].to_ical().decode()
+            ElementTree.SubElement(propstat, dav("status")).text = "HTTP/1.1 200 OK"
+        return Response(
+            ElementTree.tostring(multi_status, encoding="utf-8"), status=207, content_type="application/xml"
+        )
+
+
+def _in_time_range(resource: Calendar, time_range: ElementTree.Element | None) -> bool:
+    """Check if any event occurrence of a resource is within a CalDAV time-range.
+
+    Arguments:
+        resource: Resource calendar.
+        time_range: time-range element.
+
+    Returns:
+        bool: True if within the time-range (or no time-range set).
+    """
+    if time_range is None:
+        return True
+    start, end = (
+        datetime.strptime(time_range.get(name), "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc)
+        for name in ("start", "end")
+    )
+    return bool(recurring_ical_events.of(resource).between(start, end))
+
+
+def _text_matches(resource: Calendar, text_matches: list[tuple[str, str, str]]) -> bool:
+    """Check if any event of a resource matches all CalDAV text-match filters (substring match).
+
+    Arguments:
+        resource: Resource calendar.
+        text_matches: (property name, text, collation) of the text-match filters.
+
+    Returns:
+        bool: True if matching.
+    """
+    return any(
+        all(
+            (text.lower() in str(event.get(name, "")).lower())
+            if collation == "i;ascii-casemap"
+            else (text in str(event.get(name, "")))
+            for name, text, collation in text_matches
+        )
+        for event in resource.walk("VEVENT")
+    )
+
+
+def serve_collection(httpserver: HTTPServer, stand_in: CalDavStandIn, headers: dict | None = None) -> str:
+    """Serve a CalDAV stand-in collection.
+
+    Arguments:
+        httpserver: Mocked HTTP server.
+        stand_in: CalDAV stand-in.
+        headers: Optional expected request headers.
+
+    Returns:
+        str: URL of the collection.
+    """
+    httpserver.expect_request(
+        COLLECTION_PATH,
+        method="REPORT",
+        headers={"Depth": "1", "Content-Type": "application/xml; charset=utf-8", **(headers or {})},
+    ).respond_with_handler(stand_in.handle)
+    return httpserver.url_for(COLLECTION_PATH)
+
+
+def sorted_events(stdout: str) -> list[str]:
+    """Get the events of a JSON output in a canonical order (independent of the order of equal start dates).
+
+    Arguments:
+        stdout: JSON output.
+
+    Returns:
+        list[str]: Serialized events.
+    """
+    return sorted(json.dumps(event, sort_keys=True) for event in json.loads(stdout)["events"])
+
+
+# ---- Testcases -------------------------------------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize(
+    "calendar_file,filter_args,expected_text_matches",
+    [
+        (
+            "recurring_events.ics",
+            " --filter.start-date 2024-01-01T00:00:00+01:00 --filter.end-date 2026-01-01T00:00:00+01:00",
+            [],
+        ),
+        (
+            "recurring_events.ics",
+            " --filter.start-date 2025-02-01T00:00:00+01:00 --filter.end-date 2025-02-02T00:00:00+01:00",
+            [],
+        ),
+        (
+            "recurring_events.ics",
+            " --filter.start-date 2024-01-01T00:00:00+01:00 --filter.end-date 2026-01-01T00:00:00+01:00"
+            + " --filter.summary 'recurring_event_(daily|weekly).*'",
+            [("SUMMARY", "recurring_event_", "i;octet")],
+        ),
+        (
+            "GermanHolidays.ics",
+            " --filter.start-date 2024-01-01T00:00:00+01:00 --filter.end-date 2026-01-01T00:00:00+01:00"
+            + " --filter.summary '(?i)tag der deutschen.*' --filter.location '.*'",
+            [("SUMMARY", "tag der deut", "i;ascii-casemap")],
+        ),
+        (
+            "GermanHolidays.ics",
+            " --filter.start-date 2024-12-24T00:00:00+01:00 --filter.end-date 2024-12-24T00:00:00+01:00",
+            [],
+        ),
+        (
+            "ics_timezones.ics",
+            " --filter.start-date 2025-01-01T00:00:00+01:00 --filter.end-date 2026-01-01T00:00:00+01:00",
+            [],
+        ),
+    ],
+)
+def test_ct_caldav_identical_output(
+    calendar_file: str,
+    filter_args: str,
+    expected_text_matches: list[tuple[str, str, str]],
+    httpserver: HTTPServer,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Test that the CalDAV source produces the same events as the download of the complete calendar.
+
+    Arguments:
+        calendar_file: Calendar example.
+        filter_args: Filter command line arguments.
+        expected_text_matches: Expected text-match filters of the query.
+        httpserver: Mocked HTTP server
+        capsys: System capture
+    """
+    stand_in = CalDavStandIn(calendar_file)
+    collection_url = serve_collection(httpserver, stand_in)
+
+    expected = run_cli(
+        f"--calendar.url {calendar_example_url(calendar_file)}{filter_args} --output.format json", capsys
+    )
+    cli_result = run_cli(
+        f"--calendar.url {collection_url} --calendar.source caldav{filter_args} --output.format json", capsys
+    )
+
+    assert cli_result.exit_code == expected.exit_code == os.EX_OK
+    assert json.loads(cli_result.stdout)["filter"] == json.loads(expected.stdout)["filter"]
+    assert sorted_events(cli_result.stdout) == sorted_events(expected.stdout)
+
+    # Single query filtered by the server
+    assert len(stand_in.requests) == 1
+    assert stand_in.requests[0].find(f".//{caldav('time-range')}") is not None
+    assert [
+        (property_filter.get("name"), text_match.text, text_match.get("collation"))
+        for property_filter in stand_in.requests[0].iter(caldav("prop-filter"))
+        for text_match in property_filter.iter(caldav("text-match"))
+    ] == expected_text_matches
+
+
+def test_ct_caldav_time_range(httpserver: HTTPServer, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test the UTC time-range of the query (the inclusive filter end date is extended by one second).
+
+    Arguments:
+        httpserver: Mocked HTTP server
+        capsys: System capture
+    """
+    stand_in = CalDavStandIn("GermanHolidays.ics")
+    collection_url = serve_collection(httpserver, stand_in)
+
+    cli_result = run_cli(
+        f"--calendar.url {collection_url} --calendar.source caldav --output.format count"
+        + " --filter.start-date 2024-10-03T00:00:00+02:00 --filter.end-date 2024-10-03T23:59:59+02:00",
+        capsys,
+    )
+
+    assert cli_result.exit_code == os.EX_OK
+    assert cli_result.stdout == "1"
+    time_range = stand_in.requests[0].find(f".//{caldav('time-range')}")
+    assert time_range.attrib == {"start": "20241002T220000Z", "end": "20241003T220000Z"}
+
+
+def test_ct_caldav_text_match_not_supported(httpserver: HTTPServer, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that the query is repeated without text-match filters if the server rejects them.
+
+    Arguments:
+        httpserver: Mocked HTTP server
+        capsys: System capture
+    """
+    stand_in = CalDavStandIn("recurring_events.ics", text_match=False)
+    collection_url = serve_collection(httpserver, stand_in)
+    filter_args = (
+        " --filter.start-date 2024-01-01T00:00:00+01:00 --filter.end-date 2026-01-01T00:00:00+01:00"
+        + " --filter.summary 'recurring_event_daily.*'"
+    )
+
+    expected = run_cli(f"--calendar.url {calendar_example_url('recurring_events.ics')}{filter_args}", capsys)
+    cli_result = run_cli(f"--calendar.url {collection_url} --calendar.source caldav{filter_args}", capsys)
+
+    assert cli_result.exit_code == os.EX_OK
+    assert cli_result.stdout == expected.stdout
+    assert [len(list(request.iter(caldav("text-match")))) for request in stand_in.requests] == [1, 0]
+
+
+def test_ct_caldav_multiget(httpserver: HTTPServer, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that resources returned without calendar data are fetched by a single calendar-multiget REPORT.
+
+    Arguments:
+        httpserver: Mocked HTTP server
+        capsys: System capture
+    """
+    stand_in = CalDavStandIn("recurring_events.ics", inline_data=False)
+    collection_url = serve_collection(httpserver, stand_in)
+    filter_args = " --filter.start-date 2024-01-01T00:00:00+01:00 --filter.end-date 2026-01-01T00:00:00+01:00"
+
+    expected = run_cli(f"--calendar.url {calendar_example_url('recurring_events.ics')}{filter_args}", capsys)
+    cli_result = run_cli(f"--calendar.url {collection_url} --calendar.source caldav{filter_args}", capsys)
+
+    assert cli_result.exit_code == os.EX_OK
+    assert cli_result.stdout == expected.stdout
+    assert [request.tag for request in stand_in.requests] == [caldav("calendar-query"), caldav("calendar-multiget")]
+    assert len(list(stand_in.requests[1].iter(dav("href")))) > 1
+
+
+def test_ct_caldav_merge_basic_auth(httpserver: HTTPServer, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test merged CalDAV collections with basic authentication: the events are queried without filters.
+
+    Arguments:
+        httpserver: Mocked HTTP server
+        capsys: System capture
+    """
+    stand_in = CalDavStandIn("dedup_feed_a.ics")
+    authorization = {"Authorization": f"Basic {b64encode(b'user:secret').decode('ascii')}"}
+    collection_url = serve_collection(httpserver, stand_in, authorization)
+    merged_path = "/calendars/user/holidays/"
+    httpserver.expect_request(merged_path, method="REPORT", headers=authorization).respond_with_handler(
+        CalDavStandIn("dedup_feed_b.ics").handle
+    )
+    cli_args = " --filter.start-date 2025-01-01T00:00:00+01:00 --filter.end-date 2026-01-01T00:00:00+01:00"
+
+    expected = run_cli(
+        f"--calendar.url {calendar_example_url('dedup_feed_a.ics')}"
+        + f" --calendar.merge-urls '[{calendar_example_url('dedup_feed_b.ics')}]'{cli_args}",
+        capsys,
+    )
+    cli_result = run_cli(
+        f"--calendar.url {collection_url} --calendar.merge-urls '[{httpserver.url_for(merged_path)}]'"
+        + f" --calendar.source caldav --calendar.user user --calendar.password secret{cli_args}",
+        capsys,
+    )
+
+    assert cli_result.exit_code == os.EX_OK
+    assert sorted(cli_result.stdout_lines) == sorted(expected.stdout_lines)
+    assert stand_in.requests[0].find(f".//{caldav('time-range')}") is None
+
+
+def test_ct_caldav_empty_collection(httpserver: HTTPServer, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test a query without any returned resource.
+
+    Arguments:
+        httpserver: Mocked HTTP server
+        capsys: System capture
+    """
+    collection_url = serve_collection(httpserver, CalDavStandIn("GermanHolidays.ics"))
+
+    cli_result = run_cli(
+        f"--calendar.url {collection_url} --calendar.source caldav --output.format count"
+        + " --filter.start-date 2099-01-01T00:00:00+01:00 --filter.end-date 2099-01-02T00:00:00+01:00",
+        capsys,
+    )
+
+    assert cli_result.exit_code == os.EX_OK
+    assert cli_result.stdout == "0"
+
+
+def test_ct_caldav_server_error(httpserver: HTTPServer, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test the error handling of a failed query.
+
+    Arguments:
+        httpserver: Mocked HTTP server
+        capsys: System capture
+    """
+    httpserver.expect_request(COLLECTION_PATH, method="REPORT").respond_with_data("Not a calendar", status=404)
+
+    cli_result = run_cli(
+        f"--calendar.url {httpserver.url_for(COLLECTION_PATH)} --calendar.source caldav --filter.summary 'Ferien.*'",
+        capsys,
+    )
+
+    assert cli_result.exit_code == 1
+    assert re.search(r"ERROR: Failed to query CalDAV calendar from URL '.*'.*\(status 404\)", cli_result.stdout)
+
+
+def test_ut_caldav_server_error_raised(httpserver: HTTPServer) -> None:
+    """Test that a failed query raises a DownloadError instead of terminating the program.
+
+    Arguments:
+        httpserver: Mocked HTTP server
+    """
+    httpserver.expect_request(COLLECTION_PATH, method="REPORT").respond_with_data("Forbidden", status=403)
+
+    with requests.Session() as session, pytest.raises(DownloadError, match=r"\(status 403\)"):
+        query_calendar(session, httpserver.url_for(COLLECTION_PATH))
+
+
+@pytest.mark.parametrize(
+    "summary,location,expected_text_matches",
+    [
+        (None, None, []),
+        ("Ferien.*", "Schule", [("SUMMARY", "Ferien", "i;octet"), ("LOCATION", "Schule", "i;octet")]),
+        ("(Sommer|Herbst)ferien", None, []),  # No common prefix
+        ("(Sommerferien|Sommerpause)", None, [("SUMMARY", "Sommer", "i;octet")]),
+        ("(?i)Mariä.*", None, [("SUMMARY", "mar", "i;ascii-casemap")]),  # Truncated before case-fold unsafe chars
+        ("(?i)GEBURTSTAG", None, [("SUMMARY", "geburt", "i;ascii-casemap")]),
+        (".*Ferien", "[Ss]chule", []),
+    ],
+)
+def test_ut_caldav_text_matches(
+    summary: str | None, location: str | None, expected_text_matches: list[tuple[str, str, str]]
+) -> None:
+    """Test the text-match filters derived from the RegEx filters.
+
+    Arguments:
+        summary: Summary RegEx filter.
+        location: Location RegEx filter.
+        expected_text_matches: Expected (property name, text, collation) of the text-match filters.
+    """
+    filter_config = SimpleNamespace(summary=summary, description="Ignored.*", location=location)
+    assert caldav_text_matches(filter_config) == expected_text_matches
@@ -0,0 +1,228 @@
+"""Test of the columnar filtering and sorting of the expanded event occurrences."""
+
+import json
+import os
+from collections.abc import Iterator
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+import pytest
+import recurring_ical_events
+from icalendar import Calendar
+from icalendar.cal import Event
+from recurring_ical_events.adapters.event import EventAdapter
+from recurring_ical_events.occurrence import Occurrence
+
+from icalendar_events_cli import columnar
+from icalendar_events_cli.columnar import (
+    AVAILABLE_BACKENDS,
+    ArrayBackend,
+    OccurrenceColumns,
+    get_backend,
+    set_backend,
+)
+from icalendar_events_cli.icalendar import get_event_dtstart
+from tests.util_runner import calendar_example_url, run_cli
+
+# ---- Utilities -------------------------------------------------------------------------------------------------------
+
+BERLIN = ZoneInfo("Europe/Berlin")
+QUERY = (
+    f"--calendar.url {calendar_example_url('duration_events.ics')}"
+    + " --filter.start-date 2025-01-01T00:00:00+01:00 --filter.end-date 2025-01-31T00:00:00+01:00"
+    + " --output.format json --output.fields '[summary]'"
+)
+
+
+def occurrences(calendar_file: str) -> list[Event]:
+    """Expand all occurrences of a calendar example in January 2025.
+
+    Arguments:
+        calendar_file: Calendar example.
+
+    Returns:
+        list[Event]: Expanded occurrences.
+    """
+    calendar = Calendar.from_ical(Path("tests", "calendar_examples", calendar_file).read_bytes())
+    return list(recurring_ical_events.of(calendar).between(date(2025, 1, 1), date(2025, 2, 1)))
+
+
+def summaries(output: str) -> list[str]:
+    """Get the summaries of the events of a JSON output.
+
+    Arguments:
+        output: JSON output.
+
+    Returns:
+        list[str]: Summary of each event.
+    """
+    return [event["summary"] for event in json.loads(output)["events"]]
+
+
+# ---- Fixtures --------------------------------------------------------------------------------------------------------
+
+
+@pytest.fixture(params=AVAILABLE_BACKENDS, ids=lambda backend: backend.value)
+def backend(request: pytest.FixtureRequest) -> Iterator[ArrayBackend]:
+    """Activate each installed array backend and restore the active one after the test.
+
+    Arguments:
+        request: Fixture request (backend).
+
+    Yields:
+        ArrayBackend: Active backend.
+    """
+    active_backend = get_backend()
+    set_backend(request.param)
+    yield request.param
+    set_backend(active_backend)
+
+
+# ---- Testcases -------------------------------------------------------------------------------------------------------
+
+
+def test_ut_fastest_backend_active() -> None:
+    """Test that the fastest installed backend is active by default."""
+    assert AVAILABLE_BACKENDS[0] is ArrayBackend.array
+    assert get_backend() is AVAILABLE_BACKENDS[-1]
+
+
+@pytest.mark.parametrize(
+    ("filter_args", "expected_summaries"),
+    [
+        ("", ["Standup", "Workshop", "Holiday", "Standup", "Trip", "Standup", "Floating", "Deadline"]),
+        ("--filter.min-duration 3600", ["Workshop", "Holiday", "Trip", "Floating"]),
+        ("--filter.max-duration 900", ["Standup", "Standup", "Standup", "Deadline"]),
+        ("--filter.min-duration 900 --filter.max-duration 900", ["Standup", "Standup", "Standup"]),
+        ("--filter.all-day true", ["Holiday", "Trip"]),
+        ("--filter.all-day false --filter.min-duration 3600", ["Workshop", "Floating"]),
+        ("--filter.min-duration 86400 --filter.summary 'T.*'", ["Trip"]),
+    ],
+)
+@pytest.mark.usefixtures("backend")
+def test_ct_occurrence_filters(
+    filter_args: str, expected_summaries: list[str], capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test the duration and all-day filters.
+
+    Arguments:
+        filter_args: Filter command line arguments.
+        expected_summaries: Expected summaries of the output events.
+        capsys: System capture
+    """
+    cli_result = run_cli(f"{QUERY} {filter_args}", capsys)
+
+    assert cli_result.exit_code == os.EX_OK
+    assert summaries(cli_result.stdout) == expected_summaries
+
+
+@pytest.mark.usefixtures("backend")
+def test_ct_occurrence_filters_batches(monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that the filtered batches keep the order of the expansion and stop early for the 'exists' output.
+
+    Arguments:
+        monkeypatch: Monkeypatch fixture.
+        capsys: System capture
+    """
+    monkeypatch.setattr(columnar, "BATCH_SIZE", 2)
+
+    cli_result = run_cli(f"{QUERY} --filter.max-duration 3600 --output.order none", capsys)
+    exists_result = run_cli(f"{QUERY.replace('json', 'exists')} --filter.all-day true", capsys)
+
+    assert summaries(cli_result.stdout) == ["Standup", "Standup", "Standup", "Floating", "Deadline"]
+    assert exists_result.exit_code == os.EX_OK
+
+
+def test_ut_occurrence_filters_growing_batches() -> None:
+    """Test that the first batches are small: Consumers stopping at the first match expand only a few occurrences."""
+    expanded = []
+
+    def expansion() -> Iterator[Event]:
+        for index in range(20000):
+            event = Event()
+            event.add("DTSTART", datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(hours=index))
+            event.add("DTEND", datetime(2025, 1, 1, 1, tzinfo=timezone.utc) + timedelta(hours=index))
+            expanded.append(event)
+            yield event
+
+    filter_config = SimpleNamespace(min_duration=None, max_duration=3600, all_day=None)
+    matches = columnar.filter_occurrences(expansion(), filter_config)
+
+    assert next(matches) is expanded[0]
+    assert len(expanded) == columnar.FIRST_BATCH_SIZE
+    assert len(list(matches)) == 20000 - 1
+    assert len(expanded) == 20000
+
+
+@pytest.mark.parametrize(
+    ("start_date", "end_date"),
+    [
+        (datetime(2025, 1, 1, tzinfo=BERLIN), datetime(2025, 2, 1, tzinfo=BERLIN)),
+        (datetime(2025, 1, 6, 9, 15, tzinfo=BERLIN), datetime(2025, 1, 6, 10, tzinfo=BERLIN)),
+        (datetime(2025, 1, 6, 9, 14, tzinfo=BERLIN), datetime(2025, 1, 6, 10, 1, tzinfo=BERLIN)),
+        (datetime(2025, 1, 8, tzinfo=BERLIN), datetime(2025, 1, 9, 15, tzinfo=BERLIN)),
+        (datetime(2025, 1, 9, 16, tzinfo=timezone.utc), datetime(2025, 1, 9, 17, tzinfo=timezone.utc)),
+        (datetime(2025, 1, 9, 15, tzinfo=timezone.utc), datetime(2025, 1, 9, 16, tzinfo=timezone.utc)),
+        (datetime(2025, 1, 9, 14, tzinfo=timezone.utc), datetime(2025, 1, 9, 14, tzinfo=timezone.utc)),  # Empty
+        (datetime(2025, 1, 9, 16, tzinfo=timezone.utc), datetime(2025, 1, 9, 16, tzinfo=timezone.utc)),  # Empty
+    ],
+)
+@pytest.mark.usefixtures("backend")
+def test_ut_in_window(start_date: datetime, end_date: datetime) -> None:
+    """Test that the window clipping selects the same occurrences as recurring-ical-events.
+
+    Arguments:
+        start_date: Start of the window.
+        end_date: End of the window.
+    """
+    events = occurrences("duration_events.ics")
+    expected = [event for event in events if Occurrence(EventAdapter(event)).is_in_span(start_date, end_date)]
+
+    assert OccurrenceColumns(events).in_window(start_date, end_date) == expected
+
+
+@pytest.mark.parametrize("calendar_file", ["order_events.ics", "GermanHolidays.ics", "recurring_events.ics"])
+@pytest.mark.usefixtures("backend")
+def test_ut_sorted(calendar_file: str) -> None:
+    """Test that the argsort of the start epochs is a stable sort by start date.
+
+    Arguments:
+        calendar_file: Calendar example.
+    """
+    events = occurrences(calendar_file)
+    events = events + [event.copy() for event in events[::2]]  # Equal start dates
+
+    assert [id(event) for event in OccurrenceColumns(events).sorted()] == [
+        id(event) for event in sorted(events, key=get_event_dtstart)
+    ]
+    assert OccurrenceColumns([]).sorted() == []
+
+
+@pytest.mark.usefixtures("backend")
+def test_ut_filtered() -> None:
+    """Test the duration predicates on the boundaries (all-day events last until midnight of the following day)."""
+    columns = OccurrenceColumns(occurrences("duration_events.ics"))
+
+    assert len(columns) == 8
+    assert [event["SUMMARY"] for event in columns.filtered(min_duration=timedelta(days=1).total_seconds())] == [
+        "Holiday",
+        "Trip",
+    ]
+    assert [event["SUMMARY"] for event in columns.filtered(max_duration=0)] == ["Deadline"]
+    assert columns.filtered() == columns.events
+
+
+def test_ut_backend_not_installed(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test the selection of a backend which is not installed.
+
+    Arguments:
+        monkeypatch: Monkeypatch fixture.
+    """
+    monkeypatch.setattr(columnar, "_backend", get_backend())  # Restored after the test
+    monkeypatch.setattr(columnar, "AVAILABLE_BACKENDS", [ArrayBackend.array])
+    with pytest.raises(ValueError, match="Array backend 'numpy' is not installed"):
+        set_backend(ArrayBackend.numpy)
+    set_backend(ArrayBackend.array)
+    assert get_backend() is ArrayBackend.array
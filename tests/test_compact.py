@@ -0,0 +1,131 @@
+"""Test of the compact occurrence representation."""
+
+import os
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from icalendar.cal import Event
+
+from icalendar_events_cli.compact import OccurrenceCompactor
+from icalendar_events_cli.icalendar import parse_calendar, recurring_calendar
+from icalendar_events_cli.output import EVENT_FIELD_GETTERS, EVENT_FIELDS
+
+# ---- Utilities -------------------------------------------------------------------------------------------------------
+
+
+def expand_calendar(file_name: str) -> list[Event]:
+    """Expand all event occurrences of a calendar example (2020 - 2030).
+
+    Arguments:
+        file_name: File name of the calendar example.
+
+    Returns:
+        list[Event]: Event occurrences.
+    """
+    with open(os.path.join("tests", "calendar_examples", file_name), encoding="utf-8") as file:
+        calendar = parse_calendar(file.read())
+    filter_config = SimpleNamespace(
+        start_date=datetime(2020, 1, 1, tzinfo=timezone.utc),
+        end_date=datetime(2030, 1, 1, tzinfo=timezone.utc),
+        summary=None,
+        description=None,
+        location=None,
+    )
+    return list(recurring_calendar(calendar, filter_config))
+
+
+# ---- Testcases -------------------------------------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize(
+    "calendar_file",
+    ["recurring_events.ics", "GermanHolidays.ics", "fields_events.ics", "ics_timezones.ics", "prefilter_events.json"],
+)
+@pytest.mark.parametrize("fields", [EVENT_FIELDS, ("summary", "start-date"), ("end-date", "uid")])
+def test_ut_compact_values(calendar_file: str, fields: tuple[str, ...]) -> None:
+    """Test that compact occurrences reproduce the values of all fields (incl. the UTC offsets of the dates).
+
+    Arguments:
+        calendar_file: Calendar example.
+        fields: Fields of the occurrences.
+    """
+    compactor = OccurrenceCompactor(fields, EVENT_FIELD_GETTERS)
+    for event in expand_calendar(calendar_file):
+        occurrence = compactor.compact(event)
+        expected = tuple(EVENT_FIELD_GETTERS[field](event) for field in fields)
+        values = compactor.values(occurrence)
+
+        assert [list(value) if isinstance(value, tuple) else value for value in values] == list(expected)
+        assert [value.isoformat() for value in values if isinstance(value, datetime)] == [
+            value.isoformat() for value in expected if isinstance(value, datetime)
+        ]
+        if "end-date" not in fields:
+            assert occurrence.end is None
+
+
+def test_ut_compact_shared_texts() -> None:
+    """Test that the occurrences of a series share the decoded texts and equal texts are interned."""
+    compactor = OccurrenceCompactor(("start-date", "summary", "description", "location"), EVENT_FIELD_GETTERS)
+    occurrences = {}
+    for event in expand_calendar("recurring_events.ics"):
+        occurrences.setdefault(str(event.get("UID")), []).append(compactor.compact(event))
+
+    series = [occurrences_of_series for occurrences_of_series in occurrences.values() if len(occurrences_of_series) > 1]
+    assert series
+    for occurrences_of_series in series:
+        assert all(occurrence.texts is occurrences_of_series[0].texts for occurrence in occurrences_of_series)
+
+    # Independent events with equal texts: interned
+    first, second = Event(), Event()
+    for event in (first, second):
+        event.add("DTSTART", datetime(2025, 1, 1, 10, tzinfo=timezone.utc))
+        event.add("SUMMARY", "Boilerplate")
+        event.add("DESCRIPTION", "Boilerplate " * 100)
+    first_texts = compactor.compact(first).texts
+    second_texts = compactor.compact(second).texts
+    assert first_texts is not second_texts
+    assert all(text is other_text for text, other_text in zip(first_texts, second_texts, strict=True))
+
+
+def test_ut_compact_sorted_floating() -> None:
+    """Test sorting and round trip of floating (timezone-less) dates."""
+    events = []
+    for day in (3, 1, 2, 1):
+        event = Event()
+        event.add("DTSTART", datetime(2025, 1, day, 10, 30, 15, 250))
+        event.add("DTEND", datetime(2025, 1, day, 11))
+        event.add("SUMMARY", f"Day {day}")
+        events.append(event)
+
+    compactor = OccurrenceCompactor(("start-date", "end-date", "summary"), EVENT_FIELD_GETTERS)
+    values = [compactor.values(occurrence) for occurrence in compactor.sorted(events)]
+
+    assert values == [
+        (datetime(2025, 1, 1, 10, 30, 15, 250), datetime(2025, 1, 1, 11), "Day 1"),
+        (datetime(2025, 1, 1, 10, 30, 15, 250), datetime(2025, 1, 1, 11), "Day 1"),
+        (datetime(2025, 1, 2, 10, 30, 15, 250), datetime(2025, 1, 2, 11), "Day 2"),
+        (datetime(2025, 1, 3, 10, 30, 15, 250), datetime(2025, 1, 3, 11), "Day 3"),
+    ]
+
+
+def test_ut_compact_sorted_floating_and_aware() -> None:
+    """Test that floating dates are sorted by their local time among timezone-aware dates (TZ=Europe/Berlin)."""
+    events = []
+    for summary, start in (
+        ("Floating 09:00 (08:00Z)", datetime(2025, 3, 10, 9)),
+        ("Aware 08:30Z", datetime(2025, 3, 10, 8, 30, tzinfo=timezone.utc)),
+        ("Aware 07:30Z", datetime(2025, 3, 10, 7, 30, tzinfo=timezone.utc)),
+    ):
+        event = Event()
+        event.add("DTSTART", start)
+        event.add("SUMMARY", summary)
+        events.append(event)
+
+    compactor = OccurrenceCompactor(("start-date", "summary"), EVENT_FIELD_GETTERS)
+
+    assert [compactor.values(occurrence)[1] for occurrence in compactor.sorted(events)] == [
+        "Aware 07:30Z",
+        "Floating 09:00 (08:00Z)",
+        "Aware 08:30Z",
+    ]
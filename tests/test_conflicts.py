@@ -0,0 +1,97 @@
+"""Test of the conflicts output."""
+
+import os
+
+import pytest
+
+from tests.util_runner import calendar_example_url, run_cli_json
+
+# ---- Testcases -------------------------------------------------------------------------------------------------------
+
+CONFLICTS_QUERY = (
+    f"--calendar.url {calendar_example_url('freebusy_events.ics')} --output.format conflicts"
+    + " --filter.start-date 2025-03-01T00:00:00+01:00 --filter.end-date 2025-03-05T00:00:00+01:00"
+)
+
+
+@pytest.mark.parametrize("output_file", [None, "icalendar_events_cli_test.json"])
+def test_ct_conflicts(output_file: str | None, tmp_path: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test detection of all overlapping event pairs.
+
+    Arguments:
+        output_file: Output file name. If not set output is written to console / stdout.
+        tmp_path: Temporary unique file path provided by built-in fixture.
+        capsys: System capture
+    """
+    output_path = f"{tmp_path}/{output_file}" if output_file else None
+    args = CONFLICTS_QUERY + (f" --output.file {output_path}" if output_path else "")
+
+    cli_result = run_cli_json(args, capsys, output_path)
+    assert cli_result.exit_code == os.EX_OK
+
+    json_output = cli_result.stdout_as_json if output_path is None else cli_result.fileout_as_json
+    assert json_output["filter"] == {
+        "start-date": "2025-03-01T00:00:00+01:00",
+        "end-date": "2025-03-05T00:00:00+01:00",
+    }
+
+    # Adjacent, zero-length, transparent, cancelled and full-day events on consecutive days are no conflicts
+    conflicts = [
+        (
+            conflict["overlap-start-date"],
+            conflict["overlap-end-date"],
+            conflict["events"][0]["summary"],
+            conflict["events"][1]["summary"],
+        )
+        for conflict in json_output["conflicts"]
+    ]
+    assert conflicts == [
+        ("2025-03-01T10:30:00+01:00", "2025-03-01T11:00:00+01:00", "busy_overlap_1", "busy_overlap_2"),
+        ("2025-03-01T10:30:00+01:00", "2025-03-01T10:45:00+01:00", "busy_overlap_1", "busy_contained"),
+        ("2025-03-01T10:30:00+01:00", "2025-03-01T10:45:00+01:00", "busy_overlap_2", "busy_contained"),
+    ]
+    assert json_output["conflicts"][0]["events"][0] == {
+        "start-date": "2025-03-01T10:00:00+01:00",
+        "end-date": "2025-03-01T11:00:00+01:00",
+        "summary": "busy_overlap_1",
+    }
+
+
+def test_ct_conflicts_filtered(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that the summary filter is applied before the conflict detection.
+
+    Arguments:
+        capsys: System capture
+    """
+    cli_result = run_cli_json(CONFLICTS_QUERY + " --filter.summary busy_overlap_.*", capsys)
+    assert cli_result.exit_code == os.EX_OK
+
+    json_output = cli_result.stdout_as_json
+    assert json_output["filter"]["summary"] == "busy_overlap_.*"
+    assert len(json_output["conflicts"]) == 1
+    assert [event["summary"] for event in json_output["conflicts"][0]["events"]] == ["busy_overlap_1", "busy_overlap_2"]
+
+
+def test_ct_conflicts_floating(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test conflicts of floating events (local timezone) with timezone-aware events.
+
+    Arguments:
+        capsys: System capture
+    """
+    args = (
+        f"--calendar.url {calendar_example_url('freebusy_floating_events.ics')} --output.format conflicts"
+        + " --filter.start-date 2025-03-10T00:00:00+01:00 --filter.end-date 2025-03-11T00:00:00+01:00"
+    )
+
+    cli_result = run_cli_json(args, capsys)
+    assert cli_result.exit_code == os.EX_OK
+    conflicts = [
+        (
+            conflict["overlap-start-date"],
+            conflict["overlap-end-date"],
+            conflict["events"][0]["summary"],
+            conflict["events"][1]["summary"],
+        )
+        for conflict in cli_result.stdout_as_json["conflicts"]
+    ]
+    assert conflicts == [("2025-03-10T09:30:00+01:00", "2025-03-10T10:00:00+01:00", "zoned", "floating_overlap")]
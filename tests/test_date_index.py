@@ -0,0 +1,150 @@
+"""Test of the sorted start / end date index of the non-recurring events."""
+
+import os
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from icalendar_events_cli.dateindex import DateIndex
+from icalendar_events_cli.icalendar import parse_calendar, recurring_calendar
+from icalendar_events_cli.textindex import TextIndex
+from tests.util_runner import calendar_example_url, run_cli
+
+# ---- Utilities -------------------------------------------------------------------------------------------------------
+
+CET = timezone(timedelta(hours=1))
+CEST = timezone(timedelta(hours=2))
+
+
+def load_calendar(file_name: str) -> object:
+    """Parse a calendar example.
+
+    Arguments:
+        file_name: File name of the calendar example.
+
+    Returns:
+        Parsed calendar.
+    """
+    with open(os.path.join("tests", "calendar_examples", file_name), encoding="utf-8") as file:
+        return parse_calendar(file.read())
+
+
+def filter_config(start_date: datetime, end_date: datetime, summary: str | None = None) -> SimpleNamespace:
+    """Build a filter configuration hierarchy.
+
+    Arguments:
+        start_date: Start of the date range.
+        end_date: End of the date range.
+        summary: Optional summary RegEx filter.
+
+    Returns:
+        Filter configuration hierarchy.
+    """
+    return SimpleNamespace(start_date=start_date, end_date=end_date, summary=summary, description=None, location=None)
+
+
+# ---- Testcases -------------------------------------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("output_format", ["json", "ics"])
+@pytest.mark.parametrize(
+    "calendar_file,filter_args",
+    [
+        (
+            "date_index_edge_cases.ics",
+            " --filter.start-date 2025-06-01T00:00:00+02:00 --filter.end-date 2025-06-30T00:00:00+02:00",
+        ),
+        (
+            "date_index_edge_cases.ics",
+            " --filter.start-date 2025-06-05T00:00:00+02:00 --filter.end-date 2025-06-06T00:00:00+02:00",
+        ),
+        (
+            "date_index_edge_cases.ics",
+            " --filter.start-date 2025-06-07T00:00:00+02:00 --filter.end-date 2025-06-07T12:00:00+02:00",
+        ),
+        (
+            "date_index_edge_cases.ics",
+            " --filter.start-date 2025-08-01T00:00:00+02:00 --filter.end-date 2025-08-02T00:00:00+02:00",
+        ),
+        (
+            "GermanHolidays.ics",
+            " --filter.start-date 2024-03-01T00:00:00+01:00 --filter.end-date 2024-06-01T00:00:00+02:00",
+        ),
+        (
+            "recurring_events.ics",
+            " --filter.start-date 2024-01-01T00:00:00+01:00 --filter.end-date 2026-01-01T00:00:00+01:00",
+        ),
+        (
+            "recurring_events.ics",
+            " --filter.start-date 2024-01-01T00:00:00+01:00 --filter.end-date 2026-01-01T00:00:00+01:00"
+            + " --filter.summary 'recurring_event_(daily|weekly).*' --filter.text-index true",
+        ),
+        (
+            "prefilter_events.json",
+            " --filter.start-date 2025-06-01T00:00:00+02:00 --filter.end-date 2025-07-01T00:00:00+02:00",
+        ),
+        (
+            "ics_timezones.ics",
+            " --filter.start-date 2025-01-01T00:00:00+01:00 --filter.end-date 2026-01-01T00:00:00+01:00",
+        ),
+    ],
+)
+def test_ct_date_index_identical_output(
+    calendar_file: str, filter_args: str, output_format: str, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that the date index produces the same output (incl. order of the streamed events) as the expansion.
+
+    Arguments:
+        calendar_file: Calendar example.
+        filter_args: Filter command line arguments.
+        output_format: Output format.
+        capsys: System capture
+    """
+    cli_args = f"--calendar.url {calendar_example_url(calendar_file)}{filter_args} --output.format {output_format}"
+
+    expected = run_cli(cli_args, capsys)
+    cli_result = run_cli(f"{cli_args} --filter.date-index true", capsys)
+
+    assert expected.exit_code == os.EX_OK
+    assert cli_result.exit_code == expected.exit_code
+    assert cli_result.stdout == expected.stdout
+
+
+def test_ut_date_index_reused(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test multiple queries of different date ranges and text filters on the same index.
+
+    Arguments:
+        capsys: System capture
+    """
+    calendar = load_calendar("GermanHolidays.ics")
+    date_index = DateIndex(calendar)
+    text_index = TextIndex(calendar)
+    assert len(date_index) > 0
+
+    for start_date, end_date, summary in [
+        (datetime(2024, 1, 1, tzinfo=CET), datetime(2024, 1, 2, tzinfo=CET), None),
+        (datetime(2024, 5, 1, tzinfo=CEST), datetime(2024, 6, 1, tzinfo=CEST), None),
+        (datetime(2024, 12, 24, tzinfo=CET), datetime(2025, 1, 7, tzinfo=CET), None),
+        (datetime(2024, 1, 1, tzinfo=CET), datetime(2026, 1, 1, tzinfo=CET), ".*Oster.*"),
+        (datetime(2023, 1, 1, tzinfo=CET), datetime(2023, 12, 31, tzinfo=CET), None),
+        (datetime(2024, 10, 3, 12, tzinfo=CEST), datetime(2024, 10, 3, 12, tzinfo=CEST), None),
+    ]:
+        config = filter_config(start_date, end_date, summary)
+        expected = [event.to_ical() for event in recurring_calendar(calendar, config, text_index)]
+        indexed = [event.to_ical() for event in recurring_calendar(calendar, config, text_index, date_index)]
+        assert indexed == expected
+    assert capsys.readouterr().out == ""
+
+
+def test_ut_date_index_recurring_series() -> None:
+    """Test that only non-recurring series without modifications are indexed."""
+    date_index = DateIndex(load_calendar("date_index_edge_cases.ics"))
+
+    # Indexed: zero duration, all-day, DURATION, end before start. Excluded by EXDATE: neither indexed nor expanded.
+    # Expanded on every query: orphan modification, RDATE
+    assert len(date_index) == 4
+    assert [series.uid for _, series in date_index._recurring_series] == [
+        "date-index-orphan-modification",
+        "date-index-rdate",
+    ]
@@ -0,0 +1,260 @@
+"""Test of the calendar download: timeouts, retries and stale-while-revalidate copies."""
+
+import os
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from pytest_httpserver import HTTPServer
+from werkzeug import Request, Response
+
+from icalendar_events_cli.stale import copy_key
+from tests.util_runner import calendar_example_url, run_cli
+
+# ---- Utilities -------------------------------------------------------------------------------------------------------
+
+CALENDAR_PATH = "/calendar.ics"
+QUERY_ARGS = (
+    " --output.format count --filter.start-date 2025-01-01T00:00:00+01:00 --filter.end-date 2025-12-31T23:59:59+01:00"
+)
+
+
+def calendar_example(file_name: str) -> str:
+    """Read a calendar example.
+
+    Arguments:
+        file_name: File name of the calendar example.
+
+    Returns:
+        str: Calendar contents.
+    """
+    return Path("tests", "calendar_examples", file_name).read_text(encoding="utf-8")
+
+
+def slow_handler(release: threading.Event, contents: str) -> callable:
+    """Build a request handler responding only after a release (or a timeout of 10 seconds).
+
+    Arguments:
+        release: Event releasing the response.
+        contents: Response contents.
+
+    Returns:
+        callable: Request handler.
+    """
+
+    def handler(_: Request) -> Response:
+        release.wait(10)
+        return Response(contents)
+
+    return handler
+
+
+def wait_for_requests(httpserver: HTTPServer, count: int) -> None:
+    """Wait until the server has answered a number of requests (at most 5 seconds).
+
+    Arguments:
+        httpserver: Mocked HTTP server
+        count: Number of requests.
+    """
+    deadline = time.monotonic() + 5
+    while len(httpserver.log) < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+# ---- Testcases -------------------------------------------------------------------------------------------------------
+
+
+def test_ct_download_read_timeout(httpserver: HTTPServer, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that a download from a stalled server fails after the read timeout.
+
+    Arguments:
+        httpserver: Mocked HTTP server
+        capsys: System capture
+    """
+    release = threading.Event()
+    httpserver.expect_request(CALENDAR_PATH).respond_with_handler(slow_handler(release, ""))
+
+    begin = time.monotonic()
+    cli_result = run_cli(
+        f"--calendar.url {httpserver.url_for(CALENDAR_PATH)} --calendar.read-timeout 0.2 --calendar.retries 0"
+        + QUERY_ARGS,
+        capsys,
+    )
+    duration = time.monotonic() - begin
+    release.set()
+    wait_for_requests(httpserver, 1)  # The stalled request must not be logged by the following tests
+
+    assert duration < 5
+    assert cli_result.exit_code == 1
+    assert "ERROR: Failed to download ical contents from URL" in cli_result.stdout
+    assert "Read timed out" in cli_result.stdout
+
+
+@pytest.mark.parametrize("pipelined", [False, True])
+def test_ct_download_total_timeout(pipelined: bool, httpserver: HTTPServer, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that a download from a server trickling the data fails after the total timeout.
+
+    Arguments:
+        pipelined: Pipelined download (response parsed while streaming) or not.
+        httpserver: Mocked HTTP server
+        capsys: System capture
+    """
+    release = threading.Event()
+    contents = calendar_example("GermanHolidays.ics").encode("utf-8")
+
+    def trickled_chunks() -> Iterator[bytes]:
+        for index in range(0, len(contents), 100):
+            yield contents[index : index + 100]
+            if release.wait(0.1):  # Each chunk within the read timeout
+                return
+
+    httpserver.expect_request(CALENDAR_PATH).respond_with_handler(lambda _: Response(trickled_chunks()))
+
+    begin = time.monotonic()
+    cli_result = run_cli(
+        f"--calendar.url {httpserver.url_for(CALENDAR_PATH)} --calendar.read-timeout 1 --calendar.total-timeout 0.5"
+        + f" --calendar.retries 0 --calendar.pipelined {str(pipelined).lower()}{QUERY_ARGS}",
+        capsys,
+    )
+    duration = time.monotonic() - begin
+    release.set()
+    wait_for_requests(httpserver, 1)
+
+    assert duration < 2
+    assert cli_result.exit_code == 1
+    assert "ERROR: Failed to download ical contents from URL" in cli_result.stdout
+    assert "Total timeout of 0.5 s exceeded" in cli_result.stdout
+
+
+@pytest.mark.parametrize("num_failures,expected_exit_code", [(2, os.EX_OK), (3, 1)])
+def test_ct_download_retries(
+    num_failures: int, expected_exit_code: int, httpserver: HTTPServer, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that transient error responses are retried.
+
+    Arguments:
+        num_failures: Number of error responses before the calendar is served.
+        expected_exit_code: Expected exit code.
+        httpserver: Mocked HTTP server
+        capsys: System capture
+    """
+    for _ in range(num_failures):
+        httpserver.expect_ordered_request(CALENDAR_PATH).respond_with_data("unavailable", status=503)
+    httpserver.expect_ordered_request(CALENDAR_PATH).respond_with_data(calendar_example("GermanHolidays.ics"))
+
+    cli_result = run_cli(
+        f"--calendar.url {httpserver.url_for(CALENDAR_PATH)} --calendar.retries 2 --calendar.retry-backoff 0"
+        + QUERY_ARGS,
+        capsys,
+    )
+
+    assert cli_result.exit_code == expected_exit_code
+    assert len(httpserver.log) == 3
+    if expected_exit_code == os.EX_OK:
+        assert cli_result.stdout == "20"
+    else:
+        assert "Response status: SERVICE UNAVAILABLE (status 503)" in cli_result.stdout
+
+
+def test_ct_stale_while_revalidate(tmp_path: str, httpserver: HTTPServer, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that a recent calendar copy is used right away and refreshed in the background.
+
+    Arguments:
+        tmp_path: Temporary unique file path provided by built-in fixture.
+        httpserver: Mocked HTTP server
+        capsys: System capture
+    """
+    cli_args = (
+        f"--calendar.url {httpserver.url_for(CALENDAR_PATH)} --cache.dir {tmp_path} --cache.max-stale 3600"
+        + " --cache.refresh-after 0 --calendar.retries 0"
+        + QUERY_ARGS
+    )
+    refreshed_count = run_cli(f"--calendar.url {calendar_example_url('recurring_events.ics')}{QUERY_ARGS}", capsys)
+
+    # No copy: downloaded
+    httpserver.expect_oneshot_request(CALENDAR_PATH).respond_with_data(calendar_example("GermanHolidays.ics"))
+    assert run_cli(cli_args, capsys).stdout == "20"
+
+    # Stalled server: The copy is used right away, the refresh is deferred
+    release = threading.Event()
+    httpserver.expect_oneshot_request(CALENDAR_PATH).respond_with_handler(
+        slow_handler(release, calendar_example("recurring_events.ics"))
+    )
+    begin = time.monotonic()
+    cli_result = run_cli(f"{cli_args} --cache.refresh-budget 0.1", capsys)
+    assert time.monotonic() - begin < 5
+    assert cli_result.exit_code == os.EX_OK
+    assert cli_result.stdout == "20"
+    assert cli_result.stderr == ""
+
+    # The deferred refresh completes in the background
+    release.set()
+    entry_path = Path(tmp_path, f"{copy_key(httpserver.url_for(CALENDAR_PATH), SimpleNamespace(user=None))}.entry")
+    deadline = time.monotonic() + 5
+    while b"Neujahrstag" in entry_path.read_bytes() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    # Failing refresh: The refreshed copy is used and the failure reported
+    httpserver.expect_request(CALENDAR_PATH).respond_with_data("not found", status=404)
+    cli_result = run_cli(cli_args, capsys)
+    assert cli_result.exit_code == os.EX_OK
+    assert cli_result.stdout == refreshed_count.stdout
+    assert "WARNING: refresh of the calendar copy failed, the stale copy is used" in cli_result.stderr
+    assert "(status 404)" in cli_result.stderr
+
+
+def test_ct_stale_copy_refresh_after(tmp_path: str, httpserver: HTTPServer, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that copies younger than the refresh age are used without refreshing them.
+
+    Arguments:
+        tmp_path: Temporary unique file path provided by built-in fixture.
+        httpserver: Mocked HTTP server
+        capsys: System capture
+    """
+    cli_args = (
+        f"--calendar.url {httpserver.url_for(CALENDAR_PATH)} --cache.dir {tmp_path} --cache.max-stale 3600"
+        + " --cache.refresh-after 600"
+        + QUERY_ARGS
+    )
+    httpserver.expect_request(CALENDAR_PATH).respond_with_data(calendar_example("GermanHolidays.ics"))
+    for _ in range(3):
+        assert run_cli(cli_args, capsys).stdout == "20"
+    assert len(httpserver.log) == 1
+
+    # Age the copy beyond the refresh age: refreshed in the background
+    entry_path = Path(tmp_path, f"{copy_key(httpserver.url_for(CALENDAR_PATH), SimpleNamespace(user=None))}.entry")
+    downloaded, contents = entry_path.read_bytes().split(b"\n", 1)
+    entry_path.write_bytes(f"{float(downloaded) - 1200}\n".encode() + contents)
+
+    assert run_cli(cli_args, capsys).stdout == "20"
+    assert len(httpserver.log) == 2
+
+
+def test_ct_stale_copy_expired(tmp_path: str, httpserver: HTTPServer, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that copies older than the maximum staleness are not used.
+
+    Arguments:
+        tmp_path: Temporary unique file path provided by built-in fixture.
+        httpserver: Mocked HTTP server
+        capsys: System capture
+    """
+    cli_args = (
+        f"--calendar.url {httpserver.url_for(CALENDAR_PATH)} --cache.dir {tmp_path} --cache.max-stale 3600"
+        + " --calendar.retries 0"
+        + QUERY_ARGS
+    )
+    httpserver.expect_oneshot_request(CALENDAR_PATH).respond_with_data(calendar_example("GermanHolidays.ics"))
+    assert run_cli(cli_args, capsys).stdout == "20"
+
+    # Age the copy by two hours
+    entry_path = Path(tmp_path, f"{copy_key(httpserver.url_for(CALENDAR_PATH), SimpleNamespace(user=None))}.entry")
+    downloaded, contents = entry_path.read_bytes().split(b"\n", 1)
+    entry_path.write_bytes(f"{float(downloaded) - 7200}\n".encode() + contents)
+
+    httpserver.expect_request(CALENDAR_PATH).respond_with_data("not found", status=404)
+    cli_result = run_cli(cli_args, capsys)
+    assert cli_result.exit_code == 1
+    assert "ERROR: Failed to download ical contents from URL" in cli_result.stdout
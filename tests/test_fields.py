@@ -0,0 +1,91 @@
+"""Test of the field projection of the JSON outputs."""
+
+import os
+
+import pytest
+
+from tests.util_runner import calendar_example_url, run_cli_json
+
+# ---- Testcases -------------------------------------------------------------------------------------------------------
+
+QUERY = (
+    f"--calendar.url {calendar_example_url('fields_events.ics')}"
+    + " --filter.start-date 2025-06-01T00:00:00+02:00 --filter.end-date 2025-06-02T00:00:00+02:00"
+)
+
+
+@pytest.mark.parametrize(
+    ("fields", "expected_events"),
+    [
+        # Default fields
+        (
+            None,
+            [
+                {
+                    "start-date": "2025-06-01T10:00:00+02:00",
+                    "end-date": "2025-06-01T11:00:00+02:00",
+                    "summary": "event_all_properties",
+                    "description": "<p>Long <b>HTML</b> description</p>",
+                    "location": "location_all_properties",
+                },
+                {
+                    "start-date": "2025-06-01T10:30:00+02:00",
+                    "end-date": "2025-06-01T11:30:00+02:00",
+                    "summary": "event_minimal",
+                },
+            ],
+        ),
+        # Projection in requested order
+        (
+            "[summary, start-date]",
+            [
+                {"summary": "event_all_properties", "start-date": "2025-06-01T10:00:00+02:00"},
+                {"summary": "event_minimal", "start-date": "2025-06-01T10:30:00+02:00"},
+            ],
+        ),
+        # Extra properties (omitted if not set)
+        (
+            "[uid, categories, status, url]",
+            [
+                {
+                    "uid": "fields-all-properties",
+                    "categories": ["Holiday", "School", "Family"],
+                    "status": "CONFIRMED",
+                    "url": "https://example.org/events/all-properties",
+                },
+                {"uid": "fields-minimal"},
+            ],
+        ),
+    ],
+)
+def test_ct_fields_json(fields: str | None, expected_events: list[dict], capsys: pytest.CaptureFixture[str]) -> None:
+    """Test the field projection of the JSON output.
+
+    Arguments:
+        fields: Value of --output.fields. Default fields if not set.
+        expected_events: Expected JSON event records.
+        capsys: System capture
+    """
+    args = QUERY + " --output.format json" + (f" --output.fields '{fields}'" if fields else "")
+
+    cli_result = run_cli_json(args, capsys)
+    assert cli_result.exit_code == os.EX_OK
+    assert [list(event) for event in cli_result.stdout_as_json["events"]] == [list(event) for event in expected_events]
+    assert cli_result.stdout_as_json["events"] == expected_events
+
+
+def test_ct_fields_conflicts(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test the field projection of the conflicts output.
+
+    Arguments:
+        capsys: System capture
+    """
+    cli_result = run_cli_json(QUERY + " --output.format conflicts --output.fields '[uid]'", capsys)
+    assert cli_result.exit_code == os.EX_OK
+    assert cli_result.stdout_as_json["conflicts"] == [
+        {
+            "overlap-start-date": "2025-06-01T10:30:00+02:00",
+            "overlap-end-date": "2025-06-01T11:00:00+02:00",
+            "events": [{"uid": "fields-all-properties"}, {"uid": "fields-minimal"}],
+        }
+    ]
@@ -0,0 +1,118 @@
+"""Test of the free/busy output."""
+
+import os
+
+import pytest
+from icalendar import Calendar
+
+from tests.util_runner import calendar_example_url, run_cli, run_cli_json
+
+# ---- Testcases -------------------------------------------------------------------------------------------------------
+
+FREEBUSY_QUERY = (
+    f"--calendar.url {calendar_example_url('freebusy_events.ics')} --output.format freebusy"
+    + " --filter.start-date 2025-03-01T00:00:00+01:00 --filter.end-date 2025-03-05T00:00:00+01:00"
+)
+
+
+@pytest.mark.parametrize("output_file", [None, "icalendar_events_cli_test.json"])
+def test_ct_freebusy_json(output_file: str | None, tmp_path: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test merged busy intervals in JSON format.
+
+    Arguments:
+        output_file: Output file name. If not set output is written to console / stdout.
+        tmp_path: Temporary unique file path provided by built-in fixture.
+        capsys: System capture
+    """
+    output_path = f"{tmp_path}/{output_file}" if output_file else None
+    args = FREEBUSY_QUERY + (f" --output.file {output_path}" if output_path else "")
+
+    cli_result = run_cli_json(args, capsys, output_path)
+    assert cli_result.exit_code == os.EX_OK
+
+    json_output = cli_result.stdout_as_json if output_path is None else cli_result.fileout_as_json
+    assert json_output["filter"] == {
+        "start-date": "2025-03-01T00:00:00+01:00",
+        "end-date": "2025-03-05T00:00:00+01:00",
+    }
+    assert json_output["busy"] == [
+        # clipped to filter start date
+        {"start-date": "2025-03-01T00:00:00+01:00", "end-date": "2025-03-01T01:00:00+01:00"},
+        # overlapping, contained and adjacent events merged
+        {"start-date": "2025-03-01T10:00:00+01:00", "end-date": "2025-03-01T13:00:00+01:00"},
+        # transparent and cancelled events skipped
+        {"start-date": "2025-03-01T16:00:00+01:00", "end-date": "2025-03-01T17:00:00+01:00"},
+        # recurring full-day events merged
+        {"start-date": "2025-03-02T00:00:00+01:00", "end-date": "2025-03-04T00:00:00+01:00"},
+    ]
+
+
+@pytest.mark.parametrize("output_file", [None, "icalendar_events_cli_test.ics"])
+def test_ct_freebusy_ical(output_file: str | None, tmp_path: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test merged busy intervals as iCalendar VFREEBUSY component.
+
+    Arguments:
+        output_file: Output file name. If not set output is written to console / stdout.
+        tmp_path: Temporary unique file path provided by built-in fixture.
+        capsys: System capture
+    """
+    output_path = f"{tmp_path}/{output_file}" if output_file else None
+    args = FREEBUSY_QUERY + " --output.freebusy-format ical" + (f" --output.file {output_path}" if output_path else "")
+
+    cli_result = run_cli(args, capsys, output_path)
+    assert cli_result.exit_code == os.EX_OK
+
+    if output_path is None:
+        output = cli_result.stdout
+    else:
+        with open(output_path, encoding="utf-8") as file:
+            output = file.read()
+    calendar = Calendar.from_ical(output)
+    free_busy = calendar.walk("VFREEBUSY")[0]
+    assert free_busy["DTSTART"].to_ical() == b"20250228T230000Z"
+    assert free_busy["DTEND"].to_ical() == b"20250304T230000Z"
+    periods = [prop.to_ical().decode() for prop in free_busy["FREEBUSY"]]
+    assert periods == [
+        "20250228T230000Z/20250301T000000Z",
+        "20250301T090000Z/20250301T120000Z",
+        "20250301T150000Z/20250301T160000Z",
+        "20250301T230000Z/20250303T230000Z",
+    ]
+    assert all(prop.params["FBTYPE"] == "BUSY" for prop in free_busy["FREEBUSY"])
+
+
+def test_ct_freebusy_no_busy_time(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that transparent events (public holidays) do not block any time.
+
+    Arguments:
+        capsys: System capture
+    """
+    args = (
+        f"--calendar.url {calendar_example_url('GermanHolidays.ics')} --output.format freebusy"
+        + " --filter.start-date 2025-01-01T00:00:00+01:00 --filter.end-date 2025-12-31T00:00:00+01:00"
+    )
+
+    cli_result = run_cli_json(args, capsys)
+    assert cli_result.exit_code == os.EX_OK
+    assert cli_result.stdout_as_json["busy"] == []
+
+
+def test_ct_freebusy_floating_and_zero_length(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test floating events (local timezone) merged with timezone-aware events and zero-length events skipped.
+
+    Arguments:
+        capsys: System capture
+    """
+    args = (
+        f"--calendar.url {calendar_example_url('freebusy_floating_events.ics')} --output.format freebusy"
+        + " --filter.start-date 2025-03-10T00:00:00+01:00 --filter.end-date 2025-03-11T00:00:00+01:00"
+    )
+
+    cli_result = run_cli_json(args, capsys)
+    assert cli_result.exit_code == os.EX_OK
+    assert cli_result.stdout_as_json["busy"] == [
+        # timezone-aware event merged with overlapping floating event
+        {"start-date": "2025-03-10T09:00:00+01:00", "end-date": "2025-03-10T11:00:00+01:00"},
+        # event without DTEND skipped (zero-length), floating event in the local timezone
+        {"start-date": "2025-03-10T16:00:00+01:00", "end-date": "2025-03-10T17:00:00+01:00"},
+    ]
@@ -67,6 +67,79 @@ def test_ct_version(capsys: pytest.CaptureFixture[str]) -> None:
             "--filter.summary [ --calendar.url=dummy",
             r"--filter\.summary.*invalid RegEx value '\['",
         ),
+        # sqlite output without database file
+        (
+            "--output.format sqlite --calendar.url=dummy",
+            r"output\.file .*required for output\.format 'sqlite'",
+        ),
+        # unknown event field
+        (
+            "--output.fields '[summary, foo]' --calendar.url=dummy",
+            r"--output\.fields[\s\S]*Given value: \['summary', 'foo'\]",
+        ),
+        (
+            """--output.targets '[{"format": "json"}, {"format": "sqlite"}]' --calendar.url=dummy""",
+            r"output\.file .*required for output\.format 'sqlite'",
+        ),
+        # CalDAV source requires HTTP(S) URLs
+        (
+            "--calendar.source caldav --calendar.url file:///tmp/calendar.ics",
+            r"calendar\.source 'caldav' requires HTTP\(S\) URLs \(configured: file:///tmp/calendar\.ics\)",
+        ),
+        # result cache
+        (
+            "--cache.max-size 0 --cache.snap -60 --calendar.url=dummy",
+            r"cache\.max-size must be greater than 0 \(configured: 0\)[\s\S]*cache\.snap must be greater than 0",
+        ),
+        (
+            "--cache.max-stale 0 --cache.refresh-after -5 --cache.refresh-budget -1 --calendar.url=dummy",
+            r"cache\.max-stale must be greater than 0[\s\S]*cache\.dir is required for cache\.max-stale"
+            + r"[\s\S]*cache\.refresh-after must not be negative \(configured: -5\.0\)"
+            + r"[\s\S]*cache\.refresh-budget must not be negative \(configured: -1\.0\)",
+        ),
+        # download timeouts / retries
+        (
+            "--calendar.connect-timeout 0 --calendar.read-timeout -1 --calendar.retries -1"
+            + " --calendar.retry-backoff -0.5 --calendar.url=dummy",
+            r"calendar\.connect-timeout must be greater than 0[\s\S]*calendar\.read-timeout must be greater than 0"
+            + r"[\s\S]*calendar\.retries must not be negative[\s\S]*calendar\.retry-backoff must not be negative",
+        ),
+        (
+            "--calendar.total-timeout 0 --calendar.url=dummy",
+            r"calendar\.total-timeout must be greater than 0 \(configured: 0\.0\)",
+        ),
+        # expansion limits
+        (
+            "--filter.max-occurrences 0 --calendar.url=dummy",
+            r"filter\.max-occurrences must be greater than 0 \(configured: 0\)",
+        ),
+        (
+            "--filter.max-series-occurrences -5 --filter.time-budget 0 --calendar.url=dummy",
+            r"filter\.max-series-occurrences must be greater than 0[\s\S]*filter\.time-budget must be greater than 0",
+        ),
+        # duration filters
+        (
+            "--filter.min-duration -1 --calendar.url=dummy",
+            r"filter\.min-duration must not be negative \(configured: -1\.0\)",
+        ),
+        (
+            "--filter.min-duration 3600 --filter.max-duration 60 --calendar.url=dummy",
+            r"filter\.max-duration must not be less than filter\.min-duration \(configured: 3600\.0 -> 60\.0\)",
+        ),
+        # aggregate output
+        (
+            "--output.aggregate-timezone Mars/Olympus --calendar.url=dummy",
+            r"unknown timezone 'Mars/Olympus'",
+        ),
+        (
+            "--output.aggregate-group '(unclosed' --calendar.url=dummy",
+            r"invalid RegEx value '\(unclosed'",
+        ),
+        # run of multiple configuration files
+        (
+            "run --workers 0 config.json",
+            r"workers must be greater than 0 \(configured: 0\)",
+        ),
     ],
 )
 def test_ct_invalid_arguments(cli_args: str, expected_output: str, capsys: pytest.CaptureFixture[str]) -> None:
@@ -0,0 +1,86 @@
+"""Test of the iCalendar (ICS) output."""
+
+import os
+
+import pytest
+from icalendar import Calendar
+
+from tests.util_runner import calendar_example_url, run_cli
+
+# ---- Testcases -------------------------------------------------------------------------------------------------------
+
+ICS_FILTER = " --filter.start-date 2025-01-01T00:00:00+01:00 --filter.end-date 2025-01-07T23:59:59+01:00"
+
+
+@pytest.mark.parametrize("output_file", [None, "icalendar_events_cli_test.ics"])
+def test_ct_ics(output_file: str | None, tmp_path: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test the iCalendar output of the filtered events.
+
+    Arguments:
+        output_file: Output file name. If not set output is written to console / stdout.
+        tmp_path: Temporary unique file path provided by built-in fixture.
+        capsys: System capture
+    """
+    output_path = f"{tmp_path}/{output_file}" if output_file else None
+    query = (
+        f"--calendar.url {calendar_example_url('recurring_events.ics')}"
+        + ICS_FILTER
+        + " --filter.summary .*daily.*"
+        + " --filter.description description_.* --filter.location location_.*"
+    )
+    args = query + " --output.format ics" + (f" --output.file {output_path}" if output_path else "")
+
+    cli_result = run_cli(args, capsys, output_path)
+    assert cli_result.exit_code == os.EX_OK
+
+    output = cli_result.stdout if output_path is None else "".join(cli_result.fileout_lines)
+    calendar = Calendar.from_ical(output)
+
+    # Calendar properties and filter meta-data
+    assert calendar["VERSION"] == "2.0"
+    assert calendar["X-FILTER-DATE-RANGE"] == "20241231T230000Z/20250107T225959Z"
+    assert calendar["X-FILTER-SUMMARY"] == ".*daily.*"
+    assert calendar["X-FILTER-DESCRIPTION"] == "description_.*"
+    assert calendar["X-FILTER-LOCATION"] == "location_.*"
+
+    # Same events as the other output formats
+    count_result = run_cli(query + " --output.format count", capsys)
+    events = calendar.walk("VEVENT")
+    assert len(events) == int(count_result.stdout)
+    assert {str(event["SUMMARY"]) for event in events} == {"recurring_event_daily_until_3days"}
+
+    # Referenced timezone generated (not defined by the calendar)
+    assert [str(timezone["TZID"]) for timezone in calendar.walk("VTIMEZONE")] == ["Europe/Berlin"]
+
+
+@pytest.mark.parametrize(
+    ("summary_filter", "expected_tzids"),
+    [
+        # Full-day event: no timezone referenced
+        ("event_full_day", []),
+        # VTIMEZONE of the calendar and generated from timezone database
+        ("event_.*_timezone", ["Custom/Defined", "Europe/Paris"]),
+    ],
+)
+def test_ct_ics_referenced_timezones(
+    summary_filter: str, expected_tzids: list[str], capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that only the timezones referenced by the selected events are written.
+
+    Arguments:
+        summary_filter: Summary filter selecting the events.
+        expected_tzids: Expected TZIDs of the written VTIMEZONE components.
+        capsys: System capture
+    """
+    cli_result = run_cli(
+        f"--calendar.url {calendar_example_url('ics_timezones.ics')} --output.format ics"
+        + " --filter.start-date 2025-06-01T00:00:00+02:00 --filter.end-date 2025-06-03T00:00:00+02:00"
+        + f" --filter.summary '{summary_filter}'",
+        capsys,
+    )
+    assert cli_result.exit_code == os.EX_OK
+
+    calendar = Calendar.from_ical(cli_result.stdout)
+    assert calendar["PRODID"] == "-//ics_timezones//EN"
+    assert calendar.walk("VEVENT")
+    assert [str(timezone["TZID"]) for timezone in calendar.walk("VTIMEZONE")] == expected_tzids
@@ -0,0 +1,222 @@
+"""Test of the jCal fast path (pre-selection of non-recurring events on the decoded jCal tree)."""
+
+import json
+import os
+import shlex
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from icalendar_events_cli.argparse import parse_config
+from icalendar_events_cli.downloader import download_calendar
+from icalendar_events_cli.icalendar import filter_events, parse_calendar, recurring_calendar, text_matcher
+from icalendar_events_cli.jcal import prefilter_jcal
+from icalendar_events_cli.output import output_events
+from tests.util_runner import calendar_example_url, run_cli
+
+# ---- Utilities -------------------------------------------------------------------------------------------------------
+
+CEST = timezone(timedelta(hours=2))
+JUNE_FILTER = " --filter.start-date 2025-06-01T00:00:00+02:00 --filter.end-date 2025-07-01T00:00:00+02:00"
+
+
+def run_without_prefilter(cli_args: str, capsys: pytest.CaptureFixture[str]) -> tuple[int, str]:
+    """Run the complete processing chain without the jCal pre-selection.
+
+    Arguments:
+        cli_args: The command line arguments string.
+        capsys: System capture
+
+    Returns:
+        tuple[int, str]: Exit code and captured stdout.
+    """
+    config = parse_config(prog="test", version="", copy_right="", author="", arg_list=shlex.split(cli_args))
+    calendar = parse_calendar(download_calendar(config.calendar))
+    events = filter_events(recurring_calendar(calendar, config.filter), config.filter)
+    exit_code = output_events(calendar, events, config)
+    return exit_code, capsys.readouterr().out.rstrip()
+
+
+def load_prefilter_events() -> list:
+    """Load the decoded jCal hierarchy of the pre-selection calendar example.
+
+    Returns:
+        list: Decoded jCal hierarchy.
+    """
+    with open(os.path.join("tests", "calendar_examples", "prefilter_events.json"), encoding="utf-8") as file:
+        return json.load(file)
+
+
+def vevent_uids(jcal: list) -> list:
+    """Get the UIDs of all 'vevent' components of a jCal hierarchy.
+
+    Arguments:
+        jcal: Decoded jCal hierarchy.
+
+    Returns:
+        list: UIDs (None if absent) in component order.
+    """
+    return [
+        next((prop[3] for prop in component[1] if prop[0] == "uid"), None)
+        for component in jcal[2]
+        if component[0] == "vevent"
+    ]
+
+
+def jcal_event(*properties: list) -> list:
+    """Build a jCal calendar with a single 'vevent'.
+
+    Arguments:
+        properties: jCal property arrays of the event.
+
+    Returns:
+        list: jCal hierarchy.
+    """
+    return ["vcalendar", [], [["vevent", [["uid", {}, "text", "event"], *properties], []]]]
+
+
+# ---- Testcases -------------------------------------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("output_format", ["json", "jcal", "ics", "count", "human_readable"])
+@pytest.mark.parametrize(
+    "calendar_file,filter_args",
+    [
+        ("prefilter_events.json", JUNE_FILTER),
+        ("prefilter_events.json", JUNE_FILTER + " --filter.summary 'Meeting.*'"),
+        ("prefilter_events.json", JUNE_FILTER + " --filter.location 'Room 1'"),
+        ("prefilter_events.json", JUNE_FILTER + " --filter.description '.*planning' --filter.text-index true"),
+        (
+            "prefilter_events.json",
+            " --filter.start-date 2025-06-10T00:00:00+02:00 --filter.end-date 2025-06-11T00:00:00+02:00",
+        ),
+        (
+            "prefilter_events.json",
+            " --filter.start-date 2025-07-01T00:00:00+02:00 --filter.end-date 2025-12-31T00:00:00+01:00",
+        ),
+        (
+            "GermanHolidays.json",
+            " --filter.start-date 2024-03-01T00:00:00+01:00 --filter.end-date 2024-06-01T00:00:00+02:00",
+        ),
+        (
+            "GermanHolidays.json",
+            " --filter.start-date 2024-01-01T00:00:00+01:00 --filter.end-date 2025-12-31T00:00:00+01:00"
+            + " --filter.summary '.*(tag|Tag).*'",
+        ),
+    ],
+)
+def test_ct_prefilter_identical_output(
+    calendar_file: str, filter_args: str, output_format: str, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that the jCal pre-selection produces the same output as the regular processing chain.
+
+    Arguments:
+        calendar_file: jCal calendar example.
+        filter_args: Filter command line arguments.
+        output_format: Output format.
+        capsys: System capture
+    """
+    cli_args = f"--calendar.url {calendar_example_url(calendar_file)}{filter_args} --output.format {output_format}"
+
+    cli_result = run_cli(cli_args, capsys)
+    expected_exit_code, expected_stdout = run_without_prefilter(cli_args, capsys)
+
+    assert cli_result.exit_code == expected_exit_code
+    assert cli_result.stdout == expected_stdout
+
+
+@pytest.mark.parametrize(
+    "start_date,end_date,matchers,expected_uids",
+    [
+        (
+            datetime(2025, 6, 10, tzinfo=CEST),
+            datetime(2025, 6, 11, tzinfo=CEST),
+            [],
+            # DURATION is not evaluated, series and events with a non-unique UID are always kept
+            ["prefilter-duration", "prefilter-no-summary", "prefilter-duplicate", "prefilter-duplicate"]
+            + ["prefilter-series", "prefilter-series"],
+        ),
+        (
+            datetime(2025, 6, 1, tzinfo=CEST),
+            datetime(2025, 7, 1, tzinfo=CEST),
+            [("SUMMARY", text_matcher("Meeting.*"))],
+            ["prefilter-timed", "prefilter-utc", "prefilter-duration", "prefilter-duplicate", "prefilter-duplicate"]
+            + ["prefilter-series", "prefilter-series", None],
+        ),
+    ],
+)
+def test_ut_prefilter_selected_events(
+    start_date: datetime, end_date: datetime, matchers: list, expected_uids: list
+) -> None:
+    """Test which events are kept by the pre-selection.
+
+    Arguments:
+        start_date: Start of the date range.
+        end_date: End of the date range.
+        matchers: Text filter match functions.
+        expected_uids: UIDs of the kept events.
+    """
+    jcal = load_prefilter_events()
+    prefiltered = prefilter_jcal(jcal, start_date, end_date, matchers)
+
+    assert vevent_uids(prefiltered) == expected_uids
+    assert prefiltered[1] == jcal[1]
+    assert [component for component in prefiltered[2] if component[0] == "vtimezone"] == [
+        component for component in jcal[2] if component[0] == "vtimezone"
+    ]
+
+
+@pytest.mark.parametrize(
+    "properties,matchers,expected_kept",
+    [
+        # Undecidable values are kept
+        ([["dtstart", {}, "date-time", "not-a-date"]], [], True),
+        ([["dtstart", {}, "date-time", "2020-01-01T10:00:00Z"], ["dtend", {}, "date-time", "invalid"]], [], True),
+        ([["summary", {}, "text", "a"], ["summary", {}, "text", "b"]], [("SUMMARY", text_matcher("x"))], True),
+        ([["summary", {}, "unknown", "a"]], [("SUMMARY", text_matcher("x"))], True),
+        ([["summary", {}, "text", "a", "b"]], [("SUMMARY", text_matcher("x"))], True),
+        # Decidable values
+        ([["summary", {}, "text", "a"]], [("SUMMARY", text_matcher("x"))], False),
+        ([["summary", {}, "text", "x"]], [("SUMMARY", text_matcher("x"))], True),
+        ([["summary", {}, "text", "x"]], [("LOCATION", text_matcher("x"))], False),
+        ([["dtstart", {}, "date-time", "2025-06-15T10:00:00Z"]], [], True),
+        ([["dtstart", {}, "date-time", "2020-01-01T10:00:00Z"]], [], False),
+        ([["dtstart", {}, "date-time", "2030-01-01T10:00:00Z"]], [], False),
+        ([["dtstart", {}, "date", "2020-01-01"], ["duration", {}, "duration", "P1D"]], [], True),
+        ([["dtstart", {}, "date", "2030-01-01"], ["duration", {}, "duration", "P1D"]], [], False),
+        # Recurring
+        ([["dtstart", {}, "date", "2020-01-01"], ["rrule", {}, "recur", {"freq": "YEARLY"}]], [], True),
+    ],
+)
+def test_ut_prefilter_single_event(properties: list, matchers: list, expected_kept: bool) -> None:
+    """Test the pre-selection of single events with unusual or edge case property values.
+
+    Arguments:
+        properties: jCal property arrays of the event.
+        matchers: Text filter match functions.
+        expected_kept: Whether the event is expected to be kept.
+    """
+    prefiltered = prefilter_jcal(
+        jcal_event(*properties), datetime(2025, 6, 1), datetime(2025, 7, 1, tzinfo=CEST), matchers
+    )
+    assert (len(prefiltered[2]) == 1) == expected_kept
+
+
+@pytest.mark.parametrize(
+    "jcal",
+    [
+        {"vcalendar": []},
+        ["vcalendar", []],
+        ["vevent", [], []],
+        ["vcalendar", [], {}],
+        ["vcalendar", [], [["vevent", [["uid", {}, "text", "a"]]]]],
+        ["vcalendar", [], [["vevent", ["uid"], []]]],
+    ],
+)
+def test_ut_prefilter_invalid_hierarchy(jcal: object) -> None:
+    """Test that invalid jCal hierarchies are returned unchanged (error reported by icalendar).
+
+    Arguments:
+        jcal: Decoded JSON object.
+    """
+    assert prefilter_jcal(jcal, datetime(2025, 6, 1), datetime(2025, 7, 1), []) is jcal
@@ -0,0 +1,130 @@
+"""Test of the pluggable JSON codec."""
+
+from collections.abc import Iterator
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from icalendar_events_cli import jsoncodec
+from icalendar_events_cli.jsoncodec import AVAILABLE_BACKENDS, JsonBackend, dumps, get_backend, loads, set_backend
+from tests.util_runner import calendar_example_url, run_cli
+
+# ---- Strategies ------------------------------------------------------------------------------------------------------
+
+timezones = st.one_of(
+    st.none(),
+    st.integers(min_value=-14 * 60, max_value=14 * 60).map(lambda minutes: timezone(timedelta(minutes=minutes))),
+)
+json_scalars = st.one_of(
+    st.none(),
+    st.booleans(),
+    st.integers(min_value=-(2**63), max_value=2**63 - 1),
+    st.text(),
+    st.dates(),
+    st.datetimes(min_value=datetime(1900, 1, 1), timezones=timezones),
+)
+json_values = st.recursive(
+    json_scalars,
+    lambda children: st.one_of(st.lists(children, max_size=4), st.dictionaries(st.text(), children, max_size=4)),
+    max_leaves=20,
+)
+
+# ---- Fixtures --------------------------------------------------------------------------------------------------------
+
+
+@pytest.fixture
+def restore_backend() -> Iterator[None]:
+    """Restore the active JSON backend after the test.
+
+    Yields:
+        None
+    """
+    backend = get_backend()
+    yield
+    set_backend(backend)
+
+
+# ---- Testcases -------------------------------------------------------------------------------------------------------
+
+
+def test_ut_fastest_backend_active() -> None:
+    """Test that the fastest installed backend is active by default."""
+    assert AVAILABLE_BACKENDS[0] is JsonBackend.json
+    assert get_backend() is AVAILABLE_BACKENDS[-1]
+
+
+@settings(max_examples=300, deadline=None)
+@given(value=json_values)
+def test_ut_backends_identical(value: object) -> None:
+    """Test that all backends produce identical JSON and decode it identically.
+
+    Arguments:
+        value: Serialized object.
+    """
+    backend = get_backend()
+    outputs = {}
+    try:
+        for available_backend in AVAILABLE_BACKENDS:
+            set_backend(available_backend)
+            outputs[available_backend] = dumps(value)
+            assert loads(outputs[available_backend]) == loads(outputs[JsonBackend.json])
+    finally:
+        set_backend(backend)
+    assert len(set(outputs.values())) == 1
+
+
+@pytest.mark.parametrize(
+    "cli_args",
+    [
+        "--output.format json --output.fields '[start-date, end-date, summary, description, uid, categories]'",
+        "--output.format conflicts",
+        "--output.format freebusy",
+        "--output.format jcal",
+    ],
+)
+@pytest.mark.parametrize("calendar_file", ["GermanHolidays.ics", "GermanHolidays.json"])
+@pytest.mark.usefixtures("restore_backend")
+def test_ct_backends_identical_output(cli_args: str, calendar_file: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that the JSON outputs and the jCal input are independent of the backend.
+
+    Arguments:
+        cli_args: Output arguments.
+        calendar_file: Calendar example (iCalendar or jCal format).
+        capsys: System capture
+    """
+    args = (
+        f"--calendar.url {calendar_example_url(calendar_file)} {cli_args}"
+        + " --filter.start-date 2025-01-01T00:00:00+01:00 --filter.end-date 2025-12-31T23:59:59+01:00"
+    )
+    outputs = set()
+    for backend in AVAILABLE_BACKENDS:
+        set_backend(backend)
+        cli_result = run_cli(args, capsys)
+        assert cli_result.exit_code == 0
+        outputs.add(cli_result.stdout)
+    assert len(outputs) == 1
+
+
+@pytest.mark.usefixtures("restore_backend")
+def test_ut_backend_not_installed(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test the selection of a backend which is not installed.
+
+    Arguments:
+        monkeypatch: Monkeypatch fixture.
+    """
+    monkeypatch.setattr(jsoncodec, "AVAILABLE_BACKENDS", [JsonBackend.json])
+    with pytest.raises(ValueError, match="JSON backend 'orjson' is not installed"):
+        set_backend(JsonBackend.orjson)
+    set_backend(JsonBackend.json)
+    assert get_backend() is JsonBackend.json
+
+
+@pytest.mark.usefixtures("restore_backend")
+def test_ut_stdlib_not_serializable() -> None:
+    """Test that the stdlib backend rejects unsupported objects like orjson."""
+    set_backend(JsonBackend.json)
+    with pytest.raises(TypeError, match="Object of type object is not JSON serializable"):
+        dumps(object())
+    assert dumps({"date": date(2025, 1, 1)}) == '{\n  "date": "2025-01-01"\n}'
@@ -0,0 +1,226 @@
+"""Test of the safety limits and the time budget of the event expansion."""
+
+import os
+import re
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+import recurring_ical_events
+
+from icalendar_events_cli.icalendar import parse_calendar, recurring_calendar
+from icalendar_events_cli.limits import EXIT_CODE_TRUNCATED, ExpansionLimits, chunked_between
+from tests.util_runner import calendar_example_url, run_cli
+
+# ---- Utilities -------------------------------------------------------------------------------------------------------
+
+# One year of the unbounded series: 525600 minutely and 3153600 secondly occurrences
+WIDE_WINDOW = " --filter.start-date 2025-06-01T00:00:00+02:00 --filter.end-date 2026-06-01T00:00:00+02:00"
+
+
+def limits_cli_args(limit_args: str, output_format: str = "count") -> str:
+    """Build the command line arguments of a query of the pathological calendar example.
+
+    Arguments:
+        limit_args: Limit command line arguments.
+        output_format: Output format.
+
+    Returns:
+        str: Command line arguments.
+    """
+    return (
+        f"--calendar.url {calendar_example_url('pathological_rrules.ics')}{WIDE_WINDOW}"
+        + f" --output.format {output_format} {limit_args}"
+    )
+
+
+def load_pathological_calendar() -> object:
+    """Parse the pathological calendar example.
+
+    Returns:
+        Parsed calendar.
+    """
+    with open(os.path.join("tests", "calendar_examples", "pathological_rrules.ics"), encoding="utf-8") as file:
+        return parse_calendar(file.read())
+
+
+# ---- Testcases -------------------------------------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("date_index", [False, True])
+def test_ct_limits_max_series_occurrences(date_index: bool, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that the unbounded series are truncated while all other series are expanded completely.
+
+    Arguments:
+        date_index: Use the date index.
+        capsys: System capture
+    """
+    cli_result = run_cli(
+        limits_cli_args(f"--filter.max-series-occurrences 100 --filter.date-index {str(date_index).lower()}"), capsys
+    )
+
+    assert cli_result.exit_code == EXIT_CODE_TRUNCATED
+    assert cli_result.stdout == str(4 + 100 + 1 + 100 + 12)
+    assert re.search(
+        r"WARNING: expansion of the events truncated.*\n"
+        + r"- max-series-occurrences \(100\) reached: truncated series 'limits-minutely', 'limits-secondly'$",
+        cli_result.stderr,
+    )
+
+
+def test_ct_limits_max_occurrences(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that the expansion stops if the maximum number of occurrences of all series is reached.
+
+    Arguments:
+        capsys: System capture
+    """
+    cli_result = run_cli(limits_cli_args("--filter.max-occurrences 1000 --filter.max-series-occurrences 2000"), capsys)
+
+    assert cli_result.exit_code == EXIT_CODE_TRUNCATED
+    assert cli_result.stdout == "1000"
+    assert re.search(
+        r"- max-occurrences \(1000\) reached: truncated series 'limits-minutely', all following series skipped",
+        cli_result.stderr,
+    )
+    assert "max-series-occurrences" not in cli_result.stderr
+
+
+def test_ct_limits_time_budget(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that the expansion of the unbounded series stops within the time budget.
+
+    Arguments:
+        capsys: System capture
+    """
+    cli_result = run_cli(limits_cli_args("--filter.time-budget 0.2", output_format="json"), capsys)
+
+    assert cli_result.exit_code == EXIT_CODE_TRUNCATED
+    assert re.search(
+        r"- time-budget \(0\.2 s\) exceeded: truncated series 'limits-minutely', all following series skipped",
+        cli_result.stderr,
+    )
+    assert "Weekly meeting" in cli_result.stdout  # Expanded before the budget was exceeded
+
+
+def test_ct_limits_not_reached(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that limits which are exactly reached but not exceeded do not truncate.
+
+    Arguments:
+        capsys: System capture
+    """
+    cli_args = (
+        f"--calendar.url {calendar_example_url('pathological_rrules.ics')} --output.format count"
+        + " --filter.start-date 2025-06-01T02:00:30+02:00 --filter.end-date 2025-06-01T02:02:00+02:00"
+        + " --filter.max-series-occurrences 9 --filter.max-occurrences 11 --filter.time-budget 60"
+    )
+    cli_result = run_cli(cli_args, capsys)
+
+    assert cli_result.exit_code == os.EX_OK
+    assert cli_result.stdout == str(1 + 9 + 1)
+    assert cli_result.stderr == ""
+
+
+@pytest.mark.parametrize("date_index", [False, True])
+@pytest.mark.parametrize(
+    "calendar_file,filter_args",
+    [
+        (
+            "recurring_events.ics",
+            " --filter.start-date 2024-01-01T00:00:00+01:00 --filter.end-date 2026-01-01T00:00:00+01:00",
+        ),
+        (
+            "GermanHolidays.ics",
+            " --filter.start-date 2020-01-01T00:00:00+01:00 --filter.end-date 2030-01-01T00:00:00+01:00",
+        ),
+        (
+            "date_index_edge_cases.ics",
+            " --filter.start-date 2025-06-01T00:00:00+02:00 --filter.end-date 2025-06-30T00:00:00+02:00",
+        ),
+        (
+            "date_index_edge_cases.ics",
+            " --filter.start-date 2025-06-07T00:00:00+02:00 --filter.end-date 2025-06-07T00:00:00+02:00",
+        ),
+        (
+            "ics_timezones.ics",
+            " --filter.start-date 2025-01-01T00:00:00+01:00 --filter.end-date 2026-01-01T00:00:00+01:00",
+        ),
+    ],
+)
+def test_ct_limits_chunked_expansion_identical(
+    calendar_file: str, filter_args: str, date_index: bool, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that the chunked expansion of limited queries returns the same occurrences as the regular expansion.
+
+    Arguments:
+        calendar_file: Calendar example.
+        filter_args: Filter command line arguments.
+        date_index: Use the date index.
+        capsys: System capture
+    """
+    cli_args = (
+        f"--calendar.url {calendar_example_url(calendar_file)}{filter_args} --output.format json"
+        + f" --filter.date-index {str(date_index).lower()}"
+    )
+
+    expected = run_cli(cli_args, capsys)
+    cli_result = run_cli(f"{cli_args} --filter.max-occurrences 1000000", capsys)
+
+    assert cli_result.exit_code == expected.exit_code == os.EX_OK
+    assert cli_result.stdout == expected.stdout
+    assert cli_result.stderr == ""
+
+
+def test_ct_limits_exists_no_match(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that the 'exists' output keeps its exit code if no event matched before the truncation.
+
+    Arguments:
+        capsys: System capture
+    """
+    cli_result = run_cli(
+        limits_cli_args("--filter.summary 'Never' --filter.max-occurrences 10", output_format="exists"), capsys
+    )
+
+    assert cli_result.exit_code == 1
+    assert "max-occurrences (10) reached" in cli_result.stderr
+
+
+@pytest.mark.parametrize(
+    "start_date,end_date",
+    [
+        (datetime(2025, 5, 1, tzinfo=timezone.utc), datetime(2025, 9, 1, tzinfo=timezone.utc)),
+        (datetime(2025, 6, 2, 23, tzinfo=timezone.utc), datetime(2025, 6, 23, tzinfo=timezone.utc)),
+        (datetime(2025, 6, 3, tzinfo=timezone.utc), datetime(2025, 6, 3, tzinfo=timezone.utc)),
+    ],
+)
+def test_ut_limits_chunked_between(start_date: datetime, end_date: datetime) -> None:
+    """Test that the chunked expansion returns each occurrence overlapping multiple chunks exactly once.
+
+    Arguments:
+        start_date: Start of the date range.
+        end_date: End of the date range.
+    """
+    query = recurring_ical_events.of(load_pathological_calendar(), components=["VEVENT"])
+    for series in query.series:
+        if series.uid not in ("limits-weekly", "limits-single", "limits-multiday"):
+            continue  # Unbounded series
+        chunked = [occurrence.id for occurrence in chunked_between(series, start_date, end_date)]
+        expected = {occurrence.id for occurrence in series.between(start_date, end_date)}
+
+        assert len(chunked) == len(set(chunked))
+        assert set(chunked) == expected
+
+
+def test_ut_limits_unlimited() -> None:
+    """Test that the expansion is not wrapped if no limit is configured."""
+    calendar = load_pathological_calendar()
+    filter_config = SimpleNamespace(
+        start_date=datetime(2025, 6, 1, tzinfo=timezone.utc),
+        end_date=datetime(2025, 6, 1, 0, 10, tzinfo=timezone.utc),
+        summary=None,
+        description=None,
+        location=None,
+    )
+    limits = ExpansionLimits()
+
+    assert not limits.is_limited
+    assert len(list(recurring_calendar(calendar, filter_config, limits=limits))) == 10 + 60 + 1
+    assert limits.report() == ""
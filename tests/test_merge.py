@@ -0,0 +1,108 @@
+"""Test of merging and de-duplication of calendars."""
+
+import os
+
+import pytest
+
+from tests.util_runner import calendar_example_url, run_cli_json
+
+# ---- Testcases -------------------------------------------------------------------------------------------------------
+
+MERGE_FILTER = " --filter.start-date 2025-05-01T00:00:00+02:00 --filter.end-date 2025-05-31T00:00:00+02:00"
+
+
+def _summaries_and_starts(json_output: dict) -> list[tuple[str, str]]:
+    """Extract the (start-date, summary) pairs of the JSON output.
+
+    Arguments:
+        json_output: Parsed JSON output.
+
+    Returns:
+        list[tuple[str, str]]: (start-date, summary) of all events.
+    """
+    return [(event["start-date"], event["summary"]) for event in json_output["events"]]
+
+
+@pytest.mark.parametrize(
+    ("main_feed", "merged_feed"),
+    [("dedup_feed_a.ics", "dedup_feed_b.ics"), ("dedup_feed_b.ics", "dedup_feed_a.ics")],
+)
+def test_ct_merge_deduplicate_uid(main_feed: str, merged_feed: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test merging of calendars with de-duplication by UID / RECURRENCE-ID (highest SEQUENCE wins).
+
+    Arguments:
+        main_feed: Calendar example passed as main calendar URL.
+        merged_feed: Calendar example merged into the main calendar.
+        capsys: System capture
+    """
+    cli_result = run_cli_json(
+        f"--calendar.url {calendar_example_url(main_feed)}"
+        + f" --calendar.merge-urls '[\"{calendar_example_url(merged_feed)}\"]'"
+        + MERGE_FILTER
+        + " --output.format json",
+        capsys,
+    )
+    assert cli_result.exit_code == os.EX_OK
+
+    events = _summaries_and_starts(cli_result.stdout_as_json)
+    # Same UID: higher SEQUENCE kept independent of the source order
+    assert ("2025-05-01T00:00:00+02:00", "Tag der Arbeit") in events
+    assert ("2025-05-01T00:00:00+02:00", "Tag der Arbeit (outdated)") not in events
+    # Same UID and RECURRENCE-ID (different TZ representation): modified occurrence with higher SEQUENCE kept
+    assert ("2025-05-12T11:00:00+02:00", "Ferienbetreuung") in events
+    assert ("2025-05-12T10:00:00+02:00", "Ferienbetreuung") not in events
+    # Different UIDs are not merged
+    assert ("2025-05-29T00:00:00+02:00", "Christi Himmelfahrt") in events
+    assert ("2025-05-29T00:00:00+02:00", "  christi   HIMMELFAHRT") in events
+    assert len(events) == 9
+
+
+def test_ct_merge_deduplicate_content(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test merging of calendars with de-duplication by the normalized content.
+
+    Arguments:
+        capsys: System capture
+    """
+    cli_result = run_cli_json(
+        f"--calendar.url {calendar_example_url('dedup_feed_a.ics')}"
+        + f" --calendar.merge-urls '[\"{calendar_example_url('dedup_feed_b.ics')}\"]'"
+        + " --calendar.deduplicate content"
+        + MERGE_FILTER
+        + " --output.format json",
+        capsys,
+    )
+    assert cli_result.exit_code == os.EX_OK
+
+    assert _summaries_and_starts(cli_result.stdout_as_json) == [
+        ("2025-05-01T00:00:00+02:00", "Tag der Arbeit"),
+        # Same series with different UID (and UTC instead of Europe/Berlin dates) including its modified occurrence
+        # is removed
+        ("2025-05-05T10:00:00+02:00", "Ferienbetreuung"),
+        ("2025-05-12T11:00:00+02:00", "Ferienbetreuung"),
+        ("2025-05-19T10:00:00+02:00", "Ferienbetreuung"),
+        # Whitespace / case normalized duplicate with higher SEQUENCE is kept
+        ("2025-05-29T00:00:00+02:00", "  christi   HIMMELFAHRT"),
+    ]
+
+
+def test_ct_deduplicate_content_single_calendar(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test de-duplication by the normalized content within a single calendar.
+
+    Arguments:
+        capsys: System capture
+    """
+    cli_result = run_cli_json(
+        f"--calendar.url {calendar_example_url('dedup_feed_b.ics')} --calendar.deduplicate content"
+        + MERGE_FILTER
+        + " --output.format json",
+        capsys,
+    )
+    assert cli_result.exit_code == os.EX_OK
+
+    assert _summaries_and_starts(cli_result.stdout_as_json) == [
+        ("2025-05-01T00:00:00+02:00", "Tag der Arbeit"),
+        ("2025-05-05T10:00:00+02:00", "Ferienbetreuung"),
+        ("2025-05-12T10:00:00+02:00", "Ferienbetreuung"),
+        ("2025-05-19T10:00:00+02:00", "Ferienbetreuung"),
+        ("2025-05-29T00:00:00+02:00", "  christi   HIMMELFAHRT"),
+    ]
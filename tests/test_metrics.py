@@ -0,0 +1,206 @@
+"""Test of the run metrics (Prometheus text exposition format)."""
+
+import multiprocessing
+import os
+import stat
+from pathlib import Path
+
+import pytest
+from pytest_httpserver import HTTPServer
+
+from icalendar_events_cli.metrics import METRIC_PREFIX, RunMetrics, format_metrics, read_metrics
+from tests.util_runner import calendar_example_url, run_cli
+
+# ---- Utilities -------------------------------------------------------------------------------------------------------
+
+CALENDAR_PATH = "/calendar.ics"
+QUERY_ARGS = (
+    " --filter.start-date 2025-01-01T00:00:00+01:00 --filter.end-date 2025-12-31T23:59:59+01:00"
+    + " --filter.summary '.*tag'"
+)
+NUM_WRITERS = 4
+NUM_WRITES = 25
+
+
+def sample(samples: dict, name: str, **labels: str) -> float | None:
+    """Get the value of a sample.
+
+    Arguments:
+        samples: Samples read by read_metrics().
+        name: Metric name (without prefix).
+        labels: Labels of the sample.
+
+    Returns:
+        float | None: Value or None if the sample does not exist.
+    """
+    return samples.get((f"{METRIC_PREFIX}{name}", tuple(sorted(labels.items()))))
+
+
+def write_runs(path: str) -> None:
+    """Write the metrics of multiple runs (concurrent writer process).
+
+    Arguments:
+        path: Path of the metrics file.
+    """
+    for _ in range(NUM_WRITES):
+        metrics = RunMetrics()
+        metrics.add("downloaded_bytes_total", 10)
+        metrics.write(path, os.EX_OK)
+
+
+# ---- Testcases -------------------------------------------------------------------------------------------------------
+
+
+def test_ct_metrics_file(tmp_path: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test the metrics of multiple runs accumulated in a metrics file.
+
+    Arguments:
+        tmp_path: Temporary unique file path provided by built-in fixture.
+        capsys: System capture
+    """
+    metrics_file = f"{tmp_path}/metrics.prom"
+    cli_args = f"--calendar.url {calendar_example_url('GermanHolidays.ics')}{QUERY_ARGS} --metrics.file {metrics_file}"
+
+    Path(f"{metrics_file}.tmp").write_text("left over by a killed run", encoding="utf-8")
+    os.chmod(f"{metrics_file}.tmp", 0o600)
+
+    umask = os.umask(0o022)
+    try:
+        assert run_cli(f"{cli_args} --output.format count", capsys).stdout == "12"
+        assert run_cli(f"{cli_args} --output.format exists", capsys).exit_code == os.EX_OK
+    finally:
+        os.umask(umask)
+
+    samples = read_metrics(metrics_file)
+    assert sample(samples, "runs_total", exit_code="0") == 2
+    assert sample(samples, "last_run_exit_code") == 0
+    assert (
+        sample(samples, "downloaded_bytes_total")
+        == 2 * Path("tests/calendar_examples/GermanHolidays.ics").stat().st_size
+    )
+    assert sample(samples, "events_total", stage="parsed") == 2 * 60
+    assert sample(samples, "events_total", stage="emitted") == 12 + 1  # The 'exists' output stops at the first match
+    assert sample(samples, "events_total", stage="matched") == 12 + 1
+    assert sample(samples, "events_total", stage="expanded") > sample(samples, "events_total", stage="matched")
+    for stage in ("total", "download", "parse", "output"):
+        assert sample(samples, "stage_duration_seconds_total", stage=stage) > 0
+        assert sample(samples, "last_run_duration_seconds", stage=stage) > 0
+    assert sample(samples, "last_run_peak_rss_bytes") > 1024 * 1024
+    assert sample(samples, "http_responses_total", status="200") is None  # Local file
+
+    assert stat.S_IMODE(os.stat(metrics_file).st_mode) == 0o644  # Readable by the collector
+    assert not os.path.exists(f"{metrics_file}.tmp")
+
+    with open(metrics_file, encoding="utf-8") as file:
+        contents = file.read()
+    assert f"# HELP {METRIC_PREFIX}runs_total Number of runs by exit code.\n" in contents
+    assert f"# TYPE {METRIC_PREFIX}runs_total counter\n" in contents
+    assert f'{METRIC_PREFIX}runs_total{{exit_code="0"}} 2\n' in contents
+    assert f"# TYPE {METRIC_PREFIX}last_run_exit_code gauge\n{METRIC_PREFIX}last_run_exit_code 0\n" in contents
+
+
+def test_ct_metrics_http_and_caches(tmp_path: str, httpserver: HTTPServer, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test the metrics of the HTTP responses and the cache layers.
+
+    Arguments:
+        tmp_path: Temporary unique file path provided by built-in fixture.
+        httpserver: Mocked HTTP server
+        capsys: System capture
+    """
+    metrics_file = f"{tmp_path}/metrics.prom"
+    calendar_contents = Path("tests/calendar_examples/GermanHolidays.ics").read_bytes()
+    httpserver.expect_request(CALENDAR_PATH).respond_with_data(calendar_contents)
+    cli_args = (
+        f"--calendar.url {httpserver.url_for(CALENDAR_PATH)}{QUERY_ARGS} --output.format json"
+        + f" --cache.dir {tmp_path}/cache --cache.max-stale 3600 --cache.refresh-after 0"
+        + f" --metrics.file {metrics_file}"
+    )
+
+    for _ in range(2):
+        run_cli(cli_args, capsys)
+    run_cli(f"{cli_args} --cache.snap 3600", capsys)
+
+    samples = read_metrics(metrics_file)
+    assert sample(samples, "runs_total", exit_code="0") == 3
+    assert sample(samples, "cache_requests_total", layer="calendar_copy", result="miss") == 1
+    assert sample(samples, "cache_requests_total", layer="calendar_copy", result="hit") == 2
+    assert sample(samples, "cache_requests_total", layer="result", result="miss") == 1
+    assert sample(samples, "cache_requests_total", layer="result", result="hit") == 1
+    assert sample(samples, "cache_requests_total", layer="superset", result="miss") == 1
+    assert sample(samples, "http_responses_total", status="200") == 3  # Download and the refreshes of the copy
+    assert sample(samples, "downloaded_bytes_total") == 3 * len(calendar_contents)
+    assert sample(samples, "last_run_http_status") == 200
+    assert sample(samples, "events_total", stage="emitted") == 12 + 12
+
+
+def test_ct_metrics_failed_download(tmp_path: str, httpserver: HTTPServer, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test the metrics of a failed download.
+
+    Arguments:
+        tmp_path: Temporary unique file path provided by built-in fixture.
+        httpserver: Mocked HTTP server
+        capsys: System capture
+    """
+    metrics_file = f"{tmp_path}/metrics.prom"
+    httpserver.expect_request(CALENDAR_PATH).respond_with_data("not found", status=404)
+
+    cli_result = run_cli(
+        f"--calendar.url {httpserver.url_for(CALENDAR_PATH)}{QUERY_ARGS} --metrics.file {metrics_file}", capsys
+    )
+    assert cli_result.exit_code == 1
+
+    samples = read_metrics(metrics_file)
+    assert sample(samples, "runs_total", exit_code="1") == 1
+    assert sample(samples, "last_run_exit_code") == 1
+    assert sample(samples, "http_responses_total", status="404") == 1
+    assert sample(samples, "last_run_http_status") == 404
+    assert sample(samples, "events_total", stage="parsed") is None
+
+
+def test_ut_metrics_concurrent_writers(tmp_path: str) -> None:
+    """Test that the counters of concurrent writer processes are accumulated without lost updates.
+
+    Arguments:
+        tmp_path: Temporary unique file path provided by built-in fixture.
+    """
+    metrics_file = f"{tmp_path}/metrics.prom"
+    with multiprocessing.get_context("spawn").Pool(NUM_WRITERS) as pool:
+        pool.map(write_runs, [metrics_file] * NUM_WRITERS)
+
+    samples = read_metrics(metrics_file)
+    assert sample(samples, "runs_total", exit_code="0") == NUM_WRITERS * NUM_WRITES
+    assert sample(samples, "downloaded_bytes_total") == NUM_WRITERS * NUM_WRITES * 10
+    assert [name for name in os.listdir(tmp_path) if name.endswith(".tmp")] == []
+
+
+def test_ut_metrics_format(tmp_path: str) -> None:
+    """Test the formatting and parsing of the text exposition format.
+
+    Arguments:
+        tmp_path: Temporary unique file path provided by built-in fixture.
+    """
+    samples = {
+        ("custom_metric", (("name", 'quote " backslash \\ newline \n'),)): 0.25,
+        (f"{METRIC_PREFIX}runs_total", (("exit_code", "0"),)): 3.0,
+        (f"{METRIC_PREFIX}last_run_peak_rss_bytes", ()): 1048576.0,
+    }
+    contents = format_metrics(samples)
+    assert contents == (
+        "# TYPE custom_metric gauge\n"
+        + 'custom_metric{name="quote \\" backslash \\\\ newline \\n"} 0.25\n'
+        + f"# HELP {METRIC_PREFIX}last_run_peak_rss_bytes Peak resident set size of the last run in bytes.\n"
+        + f"# TYPE {METRIC_PREFIX}last_run_peak_rss_bytes gauge\n"
+        + f"{METRIC_PREFIX}last_run_peak_rss_bytes 1048576\n"
+        + f"# HELP {METRIC_PREFIX}runs_total Number of runs by exit code.\n"
+        + f"# TYPE {METRIC_PREFIX}runs_total counter\n"
+        + f'{METRIC_PREFIX}runs_total{{exit_code="0"}} 3\n'
+    )
+
+    # Samples of other metrics are kept by the following runs
+    metrics_file = f"{tmp_path}/metrics.prom"
+    Path(metrics_file).write_text(contents, encoding="utf-8")
+    assert read_metrics(metrics_file) == samples
+    RunMetrics().write(metrics_file, os.EX_OK)
+    samples = read_metrics(metrics_file)
+    assert sample(samples, "runs_total", exit_code="0") == 4
+    assert samples[("custom_metric", (("name", 'quote " backslash \\ newline \n'),))] == 0.25
@@ -0,0 +1,148 @@
+"""Test of the order of the output events (--output.order)."""
+
+import json
+import os
+import re
+
+import pytest
+
+from tests.util_runner import calendar_example_url, run_cli
+
+# ---- Utilities -------------------------------------------------------------------------------------------------------
+
+QUERY = (
+    f"--calendar.url {calendar_example_url('order_events.ics')}"
+    + " --filter.start-date 2025-01-01T00:00:00+01:00 --filter.end-date 2025-01-07T23:59:59+01:00"
+)
+
+# Events in the order of the expansion: Series by series, the moved occurrence of series A after its regular ones
+EXPANSION_ORDER = [
+    ("2025-01-02T10:00:00+01:00", "Series A"),
+    ("2025-01-03T10:00:00+01:00", "Series A"),
+    ("2025-01-01T08:00:00+01:00", "Series A (moved to the first day)"),
+    ("2025-01-01T12:00:00+01:00", "Single"),
+    ("2025-01-01T09:00:00+01:00", "Series B"),
+    ("2025-01-02T09:00:00+01:00", "Series B"),
+    ("2025-01-03T09:00:00+01:00", "Series B"),
+]
+SERIES_ORDER = [EXPANSION_ORDER[index] for index in (2, 0, 1, 3, 4, 5, 6)]
+START_ORDER = sorted(EXPANSION_ORDER)
+
+
+def json_events(output: str) -> list[tuple[str, str]]:
+    """Get the start dates and summaries of the events of a JSON output.
+
+    Arguments:
+        output: JSON output.
+
+    Returns:
+        list[tuple[str, str]]: Start date and summary of each event.
+    """
+    return [(event["start-date"], event["summary"]) for event in json.loads(output)["events"]]
+
+
+def ics_events(output: str) -> list[str]:
+    """Get the summaries of the events of an iCalendar output.
+
+    Arguments:
+        output: iCalendar output.
+
+    Returns:
+        list[str]: Summary of each event.
+    """
+    return re.findall(r"^SUMMARY:(.*?)\r?$", output, flags=re.MULTILINE)
+
+
+# ---- Testcases -------------------------------------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize(
+    ("order_args", "expected_events"),
+    [
+        ("", START_ORDER),
+        ("--output.order start", START_ORDER),
+        ("--output.order series", SERIES_ORDER),
+        ("--output.order none", EXPANSION_ORDER),
+        ("--output.order none --filter.date-index true", EXPANSION_ORDER),
+    ],
+)
+def test_ct_output_order_json(
+    order_args: str, expected_events: list[tuple[str, str]], capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test the order of the events of the 'json' output.
+
+    Arguments:
+        order_args: Order command line arguments.
+        expected_events: Expected start dates and summaries.
+        capsys: System capture
+    """
+    cli_result = run_cli(f"{QUERY} --output.format json {order_args}", capsys)
+
+    assert cli_result.exit_code == os.EX_OK
+    assert json_events(cli_result.stdout) == expected_events
+
+
+@pytest.mark.parametrize(
+    ("order_args", "expected_events"),
+    [
+        ("", EXPANSION_ORDER),
+        ("--output.order start", START_ORDER),
+        ("--output.order series", SERIES_ORDER),
+    ],
+)
+def test_ct_output_order_ics(
+    order_args: str, expected_events: list[tuple[str, str]], capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test the order of the events of the streamed 'ics' output (default: order of the expansion).
+
+    Arguments:
+        order_args: Order command line arguments.
+        expected_events: Expected start dates and summaries.
+        capsys: System capture
+    """
+    cli_result = run_cli(f"{QUERY} --output.format ics {order_args}", capsys)
+
+    assert cli_result.exit_code == os.EX_OK
+    assert ics_events(cli_result.stdout) == [summary for _, summary in expected_events]
+
+
+def test_ct_output_order_human_readable(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test the order of the events of the 'human_readable' output.
+
+    Arguments:
+        capsys: System capture
+    """
+    cli_result = run_cli(f"{QUERY} --output.order series", capsys)
+
+    assert cli_result.exit_code == os.EX_OK
+    assert "Number of Events:   7" in cli_result.stdout
+    assert [line.split("| ")[1] for line in cli_result.stdout_lines if "->" in line] == [
+        summary for _, summary in SERIES_ORDER
+    ]
+
+
+def test_ct_output_order_targets(tmp_path: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that the targets of a run share the order, except the formats always sorted by start date.
+
+    Arguments:
+        tmp_path: Temporary unique file path provided by built-in fixture.
+        capsys: System capture
+    """
+    targets = [
+        {"format": "json", "file": f"{tmp_path}/events.json"},
+        {"format": "ics", "file": f"{tmp_path}/events.ics"},
+        {"format": "count"},
+        {"format": "freebusy", "file": f"{tmp_path}/freebusy.json"},
+    ]
+
+    cli_result = run_cli(f"{QUERY} --output.order none --output.targets '{json.dumps(targets)}'", capsys)
+
+    assert cli_result.exit_code == os.EX_OK
+    assert cli_result.stdout == "7"
+    with open(f"{tmp_path}/events.json", encoding="utf-8") as file:
+        assert json_events(file.read()) == EXPANSION_ORDER
+    with open(f"{tmp_path}/events.ics", encoding="utf-8", newline="") as file:
+        assert ics_events(file.read()) == [summary for _, summary in EXPANSION_ORDER]
+    with open(f"{tmp_path}/freebusy.json", encoding="utf-8") as file:
+        busy = json.load(file)["busy"]
+    assert busy[0] == {"start-date": "2025-01-01T08:00:00+01:00", "end-date": "2025-01-01T09:30:00+01:00"}
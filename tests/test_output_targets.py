@@ -0,0 +1,77 @@
+"""Test of multiple output targets."""
+
+import json
+import os
+
+import pytest
+
+from tests.util_runner import calendar_example_url, run_cli
+
+# ---- Testcases -------------------------------------------------------------------------------------------------------
+
+QUERY = (
+    f"--calendar.url {calendar_example_url('recurring_events.ics')}"
+    + " --filter.start-date 2025-01-01T00:00:00+01:00 --filter.end-date 2025-01-07T23:59:59+01:00"
+)
+
+
+def _read_file(path: str) -> str:
+    """Read the content of an output file.
+
+    Arguments:
+        path: Path of the output file.
+
+    Returns:
+        str: File content.
+    """
+    with open(path, encoding="utf-8", newline="") as file:
+        return file.read()
+
+
+def test_ct_output_targets(tmp_path: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that multiple output targets of a single run are identical to the outputs of separate runs.
+
+    Arguments:
+        tmp_path: Temporary unique file path provided by built-in fixture.
+        capsys: System capture
+    """
+    formats = ["json", "human_readable", "jcal", "conflicts", "freebusy"]
+    targets = [{"format": output_format, "file": f"{tmp_path}/targets.{output_format}"} for output_format in formats]
+
+    cli_result = run_cli(f"{QUERY} --output.targets '{json.dumps(targets)}'", capsys)
+    assert cli_result.exit_code == os.EX_OK
+    assert cli_result.stdout == ""
+
+    for output_format in formats:
+        single_path = f"{tmp_path}/single.{output_format}"
+        assert run_cli(f"{QUERY} --output.format {output_format} --output.file {single_path}", capsys).exit_code == 0
+        assert _read_file(f"{tmp_path}/targets.{output_format}") == _read_file(single_path)
+
+
+@pytest.mark.parametrize(
+    ("end_date", "expected_exit_code", "expected_count"),
+    [
+        ("2025-01-07T23:59:59+01:00", os.EX_OK, "6"),
+        ("2025-01-01T00:00:01+01:00", 1, "0"),
+    ],
+)
+def test_ct_output_targets_streaming(
+    end_date: str, expected_exit_code: int, expected_count: str, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test multiple streaming output targets and the combined exit code.
+
+    Arguments:
+        end_date: End date of the filter.
+        expected_exit_code: Expected exit code ('exists' output).
+        expected_count: Expected output of the 'count' target.
+        capsys: System capture
+    """
+    targets = [{"format": "exists"}, {"format": "count"}]
+    cli_result = run_cli(
+        f"--calendar.url {calendar_example_url('recurring_events.ics')}"
+        + f" --filter.start-date 2025-01-01T00:00:00+01:00 --filter.end-date {end_date}"
+        + f" --output.targets '{json.dumps(targets)}'",
+        capsys,
+    )
+    assert cli_result.exit_code == expected_exit_code
+    assert cli_result.stdout == expected_count
@@ -0,0 +1,324 @@
+"""Test of the pipelined download: incremental parsing of the calendar components while downloading."""
+
+import json
+import os
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from icalendar import Calendar
+from pytest_httpserver import HTTPServer
+from werkzeug import Request, Response
+
+from icalendar_events_cli.icalendar import parse_calendar
+from icalendar_events_cli.incremental import IncrementalCalendarParser
+from icalendar_events_cli.metrics import METRIC_PREFIX, read_metrics
+from tests.util_runner import calendar_example_url, run_cli
+
+# ---- Utilities -------------------------------------------------------------------------------------------------------
+
+CALENDAR_PATH = "/calendar.ics"
+QUERY_ARGS = (
+    " --output.format json --filter.start-date 2025-01-01T00:00:00+01:00 --filter.end-date 2025-12-31T23:59:59+01:00"
+)
+ICS_EXAMPLES = sorted(path.name for path in Path("tests", "calendar_examples").glob("*.ics"))
+
+TIMEZONE = """BEGIN:VTIMEZONE
+TZID:Custom
+BEGIN:STANDARD
+DTSTART:19700101T000000
+TZOFFSETFROM:+0300
+TZOFFSETTO:+0300
+END:STANDARD
+END:VTIMEZONE
+"""
+EVENT = """BEGIN:VEVENT
+UID:event
+DTSTAMP:20250101T000000Z
+DTSTART;TZID=Custom:20250101T100000
+DTEND;TZID=Custom:20250101T110000
+SUMMARY:Event
+END:VEVENT
+"""
+
+
+def calendar_of(*components: str) -> str:
+    """Build a calendar of components.
+
+    Arguments:
+        components: Components (content lines).
+
+    Returns:
+        str: Calendar contents.
+    """
+    return (
+        "BEGIN:VCALENDAR\nVERSION:2.0\nPRODID:-//icalendar-events-cli//tests//EN\n"
+        + "".join(components)
+        + "END:VCALENDAR\n"
+    )
+
+
+def parse_chunks(contents: str, chunk_size: int) -> IncrementalCalendarParser:
+    """Feed contents chunk by chunk into an incremental parser.
+
+    Arguments:
+        contents: Calendar contents.
+        chunk_size: Size of the chunks.
+
+    Returns:
+        IncrementalCalendarParser: Fed parser.
+    """
+    parser = IncrementalCalendarParser()
+    for index in range(0, len(contents), chunk_size):
+        parser.feed(contents[index : index + chunk_size])
+    return parser
+
+
+def large_calendar(num_events: int) -> str:
+    """Build a calendar with many events.
+
+    Arguments:
+        num_events: Number of events.
+
+    Returns:
+        str: Calendar contents.
+    """
+    return calendar_of(
+        *(
+            EVENT.replace("UID:event", f"UID:event-{index}").replace("TZID=Custom", "TZID=UTC")
+            for index in range(num_events)
+        )
+    )
+
+
+# ---- Testcases -------------------------------------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("chunk_size", [1, 64, 1000000])
+@pytest.mark.parametrize("calendar_file", ICS_EXAMPLES)
+def test_ut_incremental_identical(calendar_file: str, chunk_size: int) -> None:
+    """Test that the incrementally parsed calendar is identical to the calendar parsed as a whole.
+
+    Arguments:
+        calendar_file: Calendar example.
+        chunk_size: Size of the fed chunks.
+    """
+    contents = Path("tests", "calendar_examples", calendar_file).read_text(encoding="utf-8")
+
+    assert parse_chunks(contents, chunk_size).calendar(contents) == Calendar.from_ical(contents)
+
+
+@pytest.mark.parametrize(
+    ("contents", "incremental"),
+    [
+        (calendar_of(TIMEZONE, EVENT), True),
+        (calendar_of(TIMEZONE, EVENT).replace("BEGIN:VEVENT", "BEGIN:VEV\r\n ENT"), True),  # Folded line
+        ("\n\n" + calendar_of(TIMEZONE, EVENT), True),  # Leading empty lines
+        (calendar_of(EVENT, TIMEZONE), False),  # Forward reference of the timezone
+        (calendar_of(EVENT) + "X-COMMENT:trailing comment\n", False),
+        ('["vcalendar", [], []]', False),  # jCal
+    ],
+)
+def test_ut_incremental_whole(contents: str, incremental: bool) -> None:
+    """Test the contents parsed as a whole instead of component by component.
+
+    Arguments:
+        contents: Calendar contents.
+        incremental: Parsed component by component or not.
+    """
+    parser = parse_chunks(contents, 5)
+
+    assert parser.calendar(contents) == parse_calendar(contents)
+    assert parser._whole is not incremental  # pylint: disable=protected-access
+
+
+@pytest.mark.parametrize(
+    "contents",
+    [
+        calendar_of(EVENT) + calendar_of(EVENT),  # Multiple calendars
+        calendar_of("BEGIN:X-COMPONENT\nbroken line\nEND:X-COMPONENT\n"),
+        calendar_of(EVENT, 'X-PROPERTY;PARAM="broken:value\n'),
+    ],
+)
+def test_ut_incremental_invalid(contents: str) -> None:
+    """Test that invalid contents raise the same errors as the parsing as a whole.
+
+    Arguments:
+        contents: Calendar contents.
+    """
+    with pytest.raises(ValueError) as expected:
+        Calendar.from_ical(contents)
+    with pytest.raises(ValueError, match=str(expected.value)[:20]):
+        parse_chunks(contents, 7).calendar(contents)
+
+
+def test_ut_incremental_other_contents() -> None:
+    """Test that contents differing from the fed chunks (e.g. a calendar copy) are parsed as a whole."""
+    contents = calendar_of(TIMEZONE, EVENT)
+
+    assert IncrementalCalendarParser().calendar(contents) == Calendar.from_ical(contents)
+    assert parse_chunks(contents[:-10], 7).calendar(contents) == Calendar.from_ical(contents)
+
+
+def test_ct_pipelined_overlap(
+    httpserver: HTTPServer, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that components are parsed while the rest of the calendar is still downloaded.
+
+    Arguments:
+        httpserver: Mocked HTTP server
+        monkeypatch: Monkeypatch fixture.
+        capsys: System capture
+    """
+    contents = large_calendar(2000).encode("utf-8")
+    parsed = threading.Event()
+    parsed_before_end = []
+
+    parse_component = IncrementalCalendarParser._parse_component  # pylint: disable=protected-access
+
+    def recording_parse_component(parser: IncrementalCalendarParser) -> None:
+        parse_component(parser)
+        parsed.set()
+
+    monkeypatch.setattr(IncrementalCalendarParser, "_parse_component", recording_parse_component)
+
+    def throttled_chunks() -> Iterator[bytes]:
+        yield contents[: 2 * 64 * 1024]
+        parsed_before_end.append(parsed.wait(5))
+        yield contents[2 * 64 * 1024 :]
+
+    def handler(_: Request) -> Response:
+        return Response(throttled_chunks(), content_type="text/calendar; charset=utf-8")
+
+    httpserver.expect_request(CALENDAR_PATH).respond_with_handler(handler)
+
+    cli_result = run_cli(
+        f"--calendar.url {httpserver.url_for(CALENDAR_PATH)} --calendar.pipelined true --output.format count"
+        + " --filter.start-date 2025-01-01T00:00:00+01:00 --filter.end-date 2025-12-31T23:59:59+01:00",
+        capsys,
+    )
+
+    assert cli_result.exit_code == os.EX_OK
+    assert cli_result.stdout == "2000"
+    assert parsed_before_end == [True]
+
+
+@pytest.mark.parametrize(
+    "cli_args",
+    [
+        f"--calendar.url {calendar_example_url('exchange_timezones.ics')}",
+        f"--calendar.url {calendar_example_url('GermanHolidays.json')} --filter.summary '.*tag'",
+        f"--calendar.url {calendar_example_url('dedup_feed_a.ics')}"
+        + f" --calendar.merge-urls '[\"{calendar_example_url('dedup_feed_b.ics')}\"]'",
+    ],
+)
+def test_ct_pipelined_identical(cli_args: str, tmp_path: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that the pipelined download yields the same output and counts all downloaded bytes.
+
+    Arguments:
+        cli_args: Calendar command line arguments.
+        tmp_path: Temporary unique file path provided by built-in fixture.
+        capsys: System capture
+    """
+    metrics_file = f"{tmp_path}/metrics.prom"
+    expected = run_cli(f"{cli_args}{QUERY_ARGS}", capsys)
+
+    cli_result = run_cli(f"{cli_args}{QUERY_ARGS} --calendar.pipelined true --metrics.file {metrics_file}", capsys)
+
+    assert cli_result.exit_code == os.EX_OK
+    assert cli_result.stdout == expected.stdout
+    downloaded_bytes = read_metrics(metrics_file)[(f"{METRIC_PREFIX}downloaded_bytes_total", ())]
+    calendar_files = [part.split("/")[-1].strip("\"']") for part in cli_args.split() if "file://" in part]
+    assert downloaded_bytes == sum(Path("tests", "calendar_examples", name).stat().st_size for name in calendar_files)
+
+
+def test_ct_pipelined_calendar_copy(httpserver: HTTPServer, tmp_path: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test the pipelined download with a calendar copy used instead of the download.
+
+    Arguments:
+        httpserver: Mocked HTTP server
+        tmp_path: Temporary unique file path provided by built-in fixture.
+        capsys: System capture
+    """
+    httpserver.expect_request(CALENDAR_PATH).respond_with_data(
+        Path("tests", "calendar_examples", "GermanHolidays.ics").read_bytes(), content_type="text/calendar"
+    )
+    cli_args = (
+        f"--calendar.url {httpserver.url_for(CALENDAR_PATH)} --calendar.pipelined true --cache.dir {tmp_path}"
+        + f" --cache.max-stale 3600{QUERY_ARGS.replace('json', 'count')}"
+    )
+
+    downloaded = run_cli(cli_args, capsys)
+    copy = run_cli(cli_args, capsys)
+
+    assert downloaded.stdout == copy.stdout == "20"
+
+
+def test_ct_pipelined_errors(httpserver: HTTPServer, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test the failures of a pipelined download: error response and stalled server in the middle of the download.
+
+    Arguments:
+        httpserver: Mocked HTTP server
+        capsys: System capture
+    """
+    release = threading.Event()
+
+    def stalled_chunks() -> Iterator[bytes]:
+        yield calendar_of(EVENT).encode("utf-8")
+        release.wait(10)
+
+    httpserver.expect_oneshot_request(CALENDAR_PATH).respond_with_data("not found", status=404)
+    httpserver.expect_oneshot_request(CALENDAR_PATH).respond_with_handler(lambda _: Response(stalled_chunks()))
+    cli_args = (
+        f"--calendar.url {httpserver.url_for(CALENDAR_PATH)} --calendar.pipelined true --calendar.retries 0"
+        + f" --calendar.read-timeout 0.2{QUERY_ARGS}"
+    )
+
+    not_found = run_cli(cli_args, capsys)
+    stalled = run_cli(cli_args, capsys)
+    release.set()
+
+    assert not_found.exit_code == 1
+    assert "Response status: NOT FOUND (status 404)" in not_found.stdout
+    assert stalled.exit_code == 1
+    assert "Read timed out" in stalled.stdout
+
+
+def test_ct_pipelined_snapped_cache(tmp_path: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that the pre-filtered jCal contents of a pipelined download cover the snapped superset of the cache.
+
+    Arguments:
+        tmp_path: Temporary unique file path provided by built-in fixture.
+        capsys: System capture
+    """
+    events = [
+        [
+            "vevent",
+            [
+                ["uid", {}, "text", f"event-{day}"],
+                ["dtstamp", {}, "date-time", "2025-01-01T00:00:00Z"],
+                ["dtstart", {}, "date-time", f"2025-01-{day}T10:00:00Z"],
+                ["dtend", {}, "date-time", f"2025-01-{day}T11:00:00Z"],
+                ["summary", {}, "text", "Event"],
+            ],
+            [],
+        ]
+        for day in ("06", "10")
+    ]
+    calendar_path = Path(tmp_path, "calendar.json")
+    calendar_path.write_text(
+        json.dumps(["vcalendar", [["version", {}, "text", "2.0"], ["prodid", {}, "text", "tests"]], events]),
+        encoding="utf-8",
+    )
+    cli_args = (
+        f"--calendar.url file://{calendar_path} --calendar.pipelined true --output.format count"
+        + f" --cache.dir {tmp_path}/cache --cache.snap {28 * 24 * 3600}"
+        + " --filter.end-date 2025-01-31T00:00:00+01:00 --filter.start-date"
+    )
+
+    later_start = run_cli(f"{cli_args} 2025-01-09T00:00:00+01:00", capsys)
+    earlier_start = run_cli(f"{cli_args} 2025-01-05T00:00:00+01:00", capsys)
+
+    assert later_start.stdout == "1"
+    assert earlier_start.stdout == "2"
@@ -11,7 +11,7 @@ import pytz
 from pytest_httpserver import HTTPServer
 from tzlocal import get_localzone
 
-from tests.util_runner import run_cli, run_cli_json
+from tests.util_runner import calendar_example_url, run_cli, run_cli_json
 
 
 # ---- Utilities -------------------------------------------------------------------------------------------------------
@@ -772,6 +772,136 @@ def test_ct_valid_query_outputformat_humanreadable(
             assert re.match(f".*| {expected_event.location} |.*", events_output_lines[events_index])
 
 
+@pytest.mark.parametrize(
+    "calendar_url,start_date,end_date,filter_summary,filter_description,filter_location,"
+    + "expected_events,username,password",
+    test_queries,
+)
+@pytest.mark.parametrize("output_file", [None, "icalendar_events_cli_test.txt"])
+def test_ct_valid_query_outputformat_count(
+    calendar_url: str,
+    start_date: datetime,
+    end_date: datetime,
+    filter_summary: str,
+    filter_description: str,
+    filter_location: str,
+    expected_events: list[ExpectedEvent],
+    username: str,
+    password: str,
+    output_file: str | None,
+    httpserver: HTTPServer,
+    tmp_path: str,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Test calendar queries with output format 'count'.
+
+    Arguments:
+        calendar_url: calendar URL
+        start_date: Start Date
+        end_date: End Date
+        filter_summary: summary filter
+        filter_description: description filter
+        filter_location: location filter
+        expected_events: List of expected events
+        username: Username for basicAuth
+        password: Password for basicAuth
+        output_file: Output file name. If not set output is written to console / stdout.
+        httpserver: Mocked HTTP server
+        tmp_path: Temporary unique file path provided by built-in fixture.
+        capsys: System capture
+    """
+    prepare_local_httpserver_mock(calendar_url, username, password, httpserver)
+
+    # Run icalendar-events-cli
+    calendar_url = httpserver.url_for(calendar_url)
+    output_path = f"{tmp_path}/{output_file}" if output_file else None
+    args = (
+        f"--output.format count --calendar.url {calendar_url}"
+        + build_basicauth_cli_arg(username, password)
+        + f" --filter.start-date {start_date.isoformat()} --filter.end-date {end_date.isoformat()}"
+        + build_filter_cli_arg(filter_summary, filter_description, filter_location)
+        + build_output_file_cli_arg(output_path)
+    )
+
+    cli_result = run_cli(args, capsys, output_path)
+    assert cli_result.exit_code == os.EX_OK
+
+    output = cli_result.stdout if output_path is None else cli_result.fileout
+    assert output == str(len(expected_events))
+
+
+@pytest.mark.parametrize(
+    "calendar_url,start_date,end_date,filter_summary,filter_description,filter_location,"
+    + "expected_events,username,password",
+    test_queries,
+)
+def test_ct_valid_query_outputformat_exists(
+    calendar_url: str,
+    start_date: datetime,
+    end_date: datetime,
+    filter_summary: str,
+    filter_description: str,
+    filter_location: str,
+    expected_events: list[ExpectedEvent],
+    username: str,
+    password: str,
+    httpserver: HTTPServer,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Test calendar queries with output format 'exists'.
+
+    Arguments:
+        calendar_url: calendar URL
+        start_date: Start Date
+        end_date: End Date
+        filter_summary: summary filter
+        filter_description: description filter
+        filter_location: location filter
+        expected_events: List of expected events
+        username: Username for basicAuth
+        password: Password for basicAuth
+        httpserver: Mocked HTTP server
+        capsys: System capture
+    """
+    prepare_local_httpserver_mock(calendar_url, username, password, httpserver)
+
+    # Run icalendar-events-cli
+    calendar_url = httpserver.url_for(calendar_url)
+    args = (
+        f"--output.format exists --calendar.url {calendar_url}"
+        + build_basicauth_cli_arg(username, password)
+        + f" --filter.start-date {start_date.isoformat()} --filter.end-date {end_date.isoformat()}"
+        + build_filter_cli_arg(filter_summary, filter_description, filter_location)
+    )
+
+    cli_result = run_cli(args, capsys)
+    assert cli_result.exit_code == (os.EX_OK if expected_events else 1)
+    assert cli_result.stdout == ""
+
+
+def test_ct_outputformat_exists_no_match(httpserver: HTTPServer, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test output format 'exists' without any matching event.
+
+    Arguments:
+        httpserver: Mocked HTTP server
+        capsys: System capture
+    """
+    calendar_url = "/recurring_events.ics"
+    prepare_local_httpserver_mock(calendar_url, "", "", httpserver)
+    calendar_url = httpserver.url_for(calendar_url)
+
+    start_date = localized_date_time(year=2025, month=1, day=1, hour=0, minute=0, second=0).isoformat()
+    end_date = localized_date_time(year=2025, month=2, day=1, hour=0, minute=0, second=0).isoformat()
+    args = (
+        f"--calendar.url {calendar_url} --filter.start-date {start_date} --filter.end-date {end_date}"
+        + " --filter.summary not_existing --output.format exists"
+    )
+
+    cli_result = run_cli(args, capsys)
+    assert cli_result.exit_code == 1
+    assert cli_result.stdout == ""
+
+
 # ---- Negative Tests -----------------------------------------------------------------------------
 
 
@@ -817,3 +947,22 @@ def test_ct_failing_server_response(httpserver: HTTPServer, capsys: pytest.Captu
     assert cli_result.exit_code != os.EX_OK
 
     assert "Failed to download ical contents from URL" in cli_result.stdout
+
+
+def test_ct_unexpected_error(tmp_path: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that unexpected errors (e.g. not writable output file) are reported.
+
+    Arguments:
+        tmp_path: Temporary unique file path provided by built-in fixture.
+        capsys: System capture
+    """
+    args = (
+        f"--calendar.url {calendar_example_url('GermanHolidays.ics')} --output.format json"
+        + f" --output.file {tmp_path}/not_existing_dir/events.json"
+    )
+
+    cli_result = run_cli(args, capsys)
+    assert cli_result.exit_code == 1
+
+    assert "ERROR: Any error has occurred!" in cli_result.stdout
+    assert "No such file or directory" in cli_result.stdout
@@ -0,0 +1,97 @@
+"""Test of the literal-prefix prefilter of the text filters."""
+
+import re
+
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from icalendar_events_cli.icalendar import text_matcher
+from icalendar_events_cli.regex_analysis import literal_prefixes
+
+# ---- Strategies ------------------------------------------------------------------------------------------------------
+
+# Including characters which are matched case-insensitively by non-ASCII characters
+ALPHABET = "abAB iIkKsS-İıKſäÄ"
+
+literal_chunks = st.text(alphabet=ALPHABET, min_size=1, max_size=4).map(re.escape)
+regex_atoms = st.one_of(
+    literal_chunks,
+    st.sampled_from([".*", ".", "[ab]", "[aI]", "[^a]", "\\s", "a?", "(?i:a)", "(?:k|K)"]),
+    st.lists(literal_chunks, min_size=2, max_size=3).map(lambda branches: f"({'|'.join(branches)})"),
+)
+regex_patterns = st.builds(
+    lambda flags, anchor, atoms: flags + anchor + "".join(atoms),
+    st.sampled_from(["", "(?i)"]),
+    st.sampled_from(["", "^"]),
+    st.lists(regex_atoms, min_size=1, max_size=5),
+)
+
+
+# ---- Testcases -------------------------------------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize(
+    "pattern,expected_prefixes",
+    [
+        ("Sommer.*", (("Sommer",), False)),
+        ("Abfall Bio.*", (("Abfall Bio",), False)),
+        ("^Abfall (Bio|Rest).*", (("Abfall Bio", "Abfall Rest"), False)),
+        ("(Sommer|Herbst)ferien.*", (("Herbstferien", "Sommerferien"), False)),
+        ("[ab]c", (("ac", "bc"), False)),
+        ("a(b|.c)d", (("a", "ab"), False)),
+        ("(?i)Abfall Bio.*", (("abfall b",), True)),
+        ("(?i)Sommer", None),
+        ("(?i:ab)c", None),
+        (".*Oster(sonntag|montag).*", None),
+        ("x?y", None),
+        ("[a-z]+", None),
+    ],
+)
+def test_ut_literal_prefixes(pattern: str, expected_prefixes: tuple | None) -> None:
+    """Test the extraction of literal prefixes from RegExes.
+
+    Arguments:
+        pattern: RegEx pattern.
+        expected_prefixes: Expected prefixes and case-insensitive flag.
+    """
+    assert literal_prefixes(pattern) == expected_prefixes
+
+
+def test_ut_literal_prefixes_limit() -> None:
+    """Test that the number of alternative prefixes is limited."""
+    assert literal_prefixes("x[abcdefgh][abcdefgh][abcdefgh]") == (
+        tuple(sorted(f"x{first}{second}" for first in "abcdefgh" for second in "abcdefgh")),
+        False,
+    )
+    assert literal_prefixes("x[ab]" + "(" + "|".join(f"{index:02d}" for index in range(40)) + ")") == (
+        ("xa", "xb"),
+        False,
+    )
+
+
+@settings(max_examples=500, deadline=None)
+@given(pattern=regex_patterns, texts=st.lists(st.text(alphabet=ALPHABET, max_size=8), max_size=10))
+def test_ut_text_matcher_same_as_re_match(pattern: str, texts: list[str]) -> None:
+    """Test that the prefiltered match gives the same result as re.match for random texts.
+
+    Arguments:
+        pattern: Random RegEx pattern.
+        texts: Random texts.
+    """
+    matches = text_matcher(pattern)
+    for text in texts:
+        assert matches(text) == (re.match(pattern, text) is not None)
+
+
+@settings(max_examples=500, deadline=None)
+@given(data=st.data(), pattern=regex_patterns)
+def test_ut_text_matcher_matching_texts(data: st.DataObject, pattern: str) -> None:
+    """Test that the prefiltered match accepts texts generated from the RegEx.
+
+    Arguments:
+        data: Hypothesis data object for interactive drawing.
+        pattern: Random RegEx pattern.
+    """
+    text = data.draw(st.from_regex(pattern))
+    assert text_matcher(pattern)(text) == (re.match(pattern, text) is not None)
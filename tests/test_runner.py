@@ -0,0 +1,206 @@
+"""Test of the run of multiple configuration files."""
+
+import json
+import os
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from pytest_httpserver import HTTPServer
+
+from icalendar_events_cli.downloader import CalendarSource
+from icalendar_events_cli.merge import Deduplication
+from icalendar_events_cli.metrics import METRIC_PREFIX, read_metrics
+from icalendar_events_cli.runner import download_keys
+from tests.util_runner import calendar_example_url, run_cli
+
+# ---- Utilities -------------------------------------------------------------------------------------------------------
+
+CALENDAR_PATH = "/calendar.ics"
+FILTER = {"start_date": "2025-01-01T00:00:00+01:00", "end_date": "2025-12-31T23:59:59+01:00"}
+
+
+def write_config(tmp_path: str, name: str, url: str, output: dict, **filters: str) -> str:
+    """Write a JSON configuration file.
+
+    Arguments:
+        tmp_path: Directory of the configuration file.
+        name: File name.
+        url: Calendar URL.
+        output: Output configuration.
+        filters: Additional filter options.
+
+    Returns:
+        str: Path of the configuration file.
+    """
+    path = f"{tmp_path}/{name}"
+    config = {"calendar": {"url": url, "retries": 0}, "filter": {**FILTER, **filters}, "output": output}
+    Path(path).write_text(json.dumps(config), encoding="utf-8")
+    return path
+
+
+def single_run(path: str, capsys: pytest.CaptureFixture[str]) -> str:
+    """Run a single configuration file.
+
+    Arguments:
+        path: Path of the configuration file.
+        capsys: System capture
+
+    Returns:
+        str: Captured stdout
+    """
+    return run_cli(f"--config {path}", capsys).stdout
+
+
+# ---- Testcases -------------------------------------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_ct_runner_shared_sources(
+    workers: int, tmp_path: str, httpserver: HTTPServer, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that configurations using the same calendar share its download and yield the single run outputs.
+
+    Arguments:
+        workers: Number of worker processes.
+        tmp_path: Temporary unique file path provided by built-in fixture.
+        httpserver: Mocked HTTP server
+        capsys: System capture
+    """
+    calendar_contents = Path("tests/calendar_examples/GermanHolidays.ics").read_bytes()
+    httpserver.expect_request(CALENDAR_PATH).respond_with_data(calendar_contents)
+    url = httpserver.url_for(CALENDAR_PATH)
+    paths = [
+        write_config(tmp_path, "count.json", url, {"format": "count"}, summary=".*tag"),
+        write_config(tmp_path, "json.json", url, {"format": "json"}, summary="Oster.*"),
+        write_config(tmp_path, "other.json", calendar_example_url("recurring_events.ics"), {"format": "json"}),
+        write_config(tmp_path, "file.json", url, {"format": "json", "file": f"{tmp_path}/output.json"}),
+    ]
+    expected_stdout = "\n".join(single_run(path, capsys) for path in paths[:3])
+    httpserver.clear_log()
+
+    cli_result = run_cli(f"run --workers {workers} {' '.join(paths)}", capsys)
+
+    assert cli_result.exit_code == os.EX_OK
+    assert cli_result.stdout == expected_stdout
+    assert len(httpserver.log) == 1
+    assert len(json.loads(Path(f"{tmp_path}/output.json").read_text(encoding="utf-8"))["events"]) == 20
+    timing = cli_result.stderr.splitlines()
+    assert timing[0].startswith(f"Timing of 4 configurations (calendar sources: 2, workers: {workers}): ")
+    assert timing[1].startswith(f"- {paths[0]}: exit code 0, query ")
+    assert timing[1].endswith(", configurations 3)")
+    assert timing[3].endswith(", configurations 1)")
+
+
+def test_ct_runner_failures(tmp_path: str, httpserver: HTTPServer, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that failing configurations are reported without stopping the others.
+
+    Arguments:
+        tmp_path: Temporary unique file path provided by built-in fixture.
+        httpserver: Mocked HTTP server
+        capsys: System capture
+    """
+    httpserver.expect_request(CALENDAR_PATH).respond_with_data("not found", status=404)
+    unknown_path = f"{tmp_path}/unknown.json"
+    Path(unknown_path).write_text(json.dumps({"calendar": {"url": "dummy", "unknown": 1}}), "utf-8")
+    invalid_path = f"{tmp_path}/invalid.json"
+    Path(invalid_path).write_text(json.dumps({"calendar": {"url": "dummy"}, "filter": {"summary": "["}}), "utf-8")
+    metrics_file = f"{tmp_path}/metrics.prom"
+    paths = [
+        write_config(tmp_path, "ok.json", calendar_example_url("GermanHolidays.ics"), {"format": "count"}),
+        unknown_path,
+        invalid_path,
+        write_config(tmp_path, "download.json", httpserver.url_for(CALENDAR_PATH), {"format": "count"}),
+        write_config(
+            tmp_path, "output.json", calendar_example_url("GermanHolidays.ics"), {"file": f"{tmp_path}/missing/out"}
+        ),
+    ]
+    Path(paths[0]).write_text(
+        json.dumps({**json.loads(Path(paths[0]).read_text("utf-8")), "metrics": {"file": metrics_file}}), "utf-8"
+    )
+
+    cli_result = run_cli(f"run --workers 1 {' '.join(paths)}", capsys)
+
+    assert cli_result.exit_code == 2  # First failing configuration: unknown option
+    # Download errors are reported right away, all other outputs in the order of the configuration files
+    assert cli_result.stdout_lines[0].startswith("ERROR: Failed to download ical contents from URL")
+    assert cli_result.stdout_lines[1] == "20"
+    assert cli_result.stdout_lines[2] == "ERROR: Any error has occurred!"
+    assert "Exception: invalid RegEx value '['" in cli_result.stdout
+    assert "ERROR: Any error has occurred!" in cli_result.stdout.split("invalid RegEx value")[1]  # Missing directory
+    assert f"- {paths[1]}: exit code 2, query 0.000 s\n" in cli_result.stderr
+    assert f"- {paths[2]}: exit code 1, query 0.000 s\n" in cli_result.stderr
+    assert f"- {paths[3]}: exit code 1, query 0.000 s (source: download 0.000 s, parse 0.000 s," in cli_result.stderr
+    assert f"- {paths[4]}: exit code 1, query " in cli_result.stderr
+    assert read_metrics(metrics_file)[(f"{METRIC_PREFIX}runs_total", (("exit_code", "0"),))] == 1
+
+
+def test_ct_runner_snapped_cache(tmp_path: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that the jCal contents pre-filtered for a single configuration cover the snapped superset of the cache.
+
+    Arguments:
+        tmp_path: Temporary unique file path provided by built-in fixture.
+        capsys: System capture
+    """
+    events = [
+        [
+            "vevent",
+            [
+                ["uid", {}, "text", f"event-{day}"],
+                ["dtstamp", {}, "date-time", "2025-01-01T00:00:00Z"],
+                ["dtstart", {}, "date-time", f"2025-01-{day}T10:00:00Z"],
+                ["dtend", {}, "date-time", f"2025-01-{day}T11:00:00Z"],
+                ["summary", {}, "text", "Event"],
+            ],
+            [],
+        ]
+        for day in ("06", "10")
+    ]
+    calendar_path = Path(tmp_path, "calendar.json")
+    calendar_path.write_text(
+        json.dumps(["vcalendar", [["version", {}, "text", "2.0"], ["prodid", {}, "text", "tests"]], events]),
+        encoding="utf-8",
+    )
+    paths = []
+    for name, start_date in (
+        ("later.json", "2025-01-09T00:00:00+01:00"),
+        ("earlier.json", "2025-01-05T00:00:00+01:00"),
+    ):
+        path = write_config(tmp_path, name, f"file://{calendar_path}", {"format": "count"}, start_date=start_date)
+        config = json.loads(Path(path).read_text("utf-8"))
+        Path(path).write_text(
+            json.dumps({**config, "cache": {"dir": f"{tmp_path}/cache", "snap": 28 * 24 * 3600}}), "utf-8"
+        )
+        paths.append(path)
+
+    later_start = run_cli(f"run --workers 1 {paths[0]}", capsys)
+    earlier_start = run_cli(f"run --workers 1 {paths[1]}", capsys)
+
+    assert later_start.stdout == "1"
+    assert earlier_start.stdout == "2"
+
+
+def test_ut_runnerdownload_keys() -> None:
+    """Test that only the downloads with the same contents share their keys."""
+
+    def config(source: CalendarSource, merge_urls: list | None = None) -> SimpleNamespace:
+        calendar = SimpleNamespace(
+            url="https://example.org/calendar",
+            source=source,
+            user=None,
+            password=None,
+            verify_url=True,
+            merge_urls=merge_urls or [],
+            deduplicate=Deduplication.uid,
+        )
+        return SimpleNamespace(calendar=calendar, filter=SimpleNamespace())
+
+    download = download_keys(config(CalendarSource.download))
+    assert download_keys(config(CalendarSource.download)) == download
+    assert download_keys(config(CalendarSource.download, merge_urls=["https://example.org/other"]))[:1] == download
+    assert download_keys(config(CalendarSource.caldav, merge_urls=["https://example.org/other"])) == download_keys(
+        config(CalendarSource.caldav, merge_urls=["https://example.org/other"])
+    )
+    # Filtered CalDAV queries are never shared
+    caldav_configs = [config(CalendarSource.caldav), config(CalendarSource.caldav)]
+    assert download_keys(caldav_configs[0]) != download_keys(caldav_configs[1])
@@ -0,0 +1,174 @@
+"""Test of the SQLite output."""
+
+import os
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+
+import pytest
+
+from tests.util_runner import calendar_example_url, run_cli
+
+# ---- Testcases -------------------------------------------------------------------------------------------------------
+
+CALENDAR_URL = calendar_example_url("recurring_events.ics")
+SQLITE_QUERY = (
+    f"--calendar.url {CALENDAR_URL} --output.format sqlite"
+    + " --filter.start-date 2025-01-01T00:00:00+01:00 --filter.end-date 2025-01-07T23:59:59+01:00"
+)
+
+
+def _query(database_path: str, sql: str) -> list[tuple]:
+    """Run a SQL query against the database file.
+
+    Arguments:
+        database_path: Path of the SQLite database file.
+        sql: SQL query.
+
+    Returns:
+        list[tuple]: All result rows.
+    """
+    with closing(sqlite3.connect(database_path)) as connection:
+        return connection.execute(sql).fetchall()
+
+
+def test_ct_sqlite(tmp_path: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test writing the occurrences into a SQLite database.
+
+    Arguments:
+        tmp_path: Temporary unique file path provided by built-in fixture.
+        capsys: System capture
+    """
+    database_path = f"{tmp_path}/events.sqlite"
+
+    cli_result = run_cli(f"{SQLITE_QUERY} --output.file {database_path}", capsys)
+    assert cli_result.exit_code == os.EX_OK
+    assert cli_result.stdout == ""
+
+    count_result = run_cli(SQLITE_QUERY.replace("sqlite", "count"), capsys)
+    assert _query(database_path, "SELECT COUNT(*) FROM occurrences") == [(int(count_result.stdout),)]
+
+    assert _query(
+        database_path,
+        "SELECT source, uid, recurrence_id, start_date, start_epoch, end_date, end_epoch,"
+        + " summary, description, location FROM occurrences"
+        + " WHERE summary = 'recurring_event_daily_until_3days' ORDER BY start_epoch LIMIT 1",
+    ) == [
+        (
+            CALENDAR_URL,
+            "b1bc06fa-a3ad-4afb-90ae-6a228fd5a401",
+            "2025-01-01T19:00:00+01:00",
+            "2025-01-01T19:00:00+01:00",
+            1735754400,
+            "2025-01-01T20:00:00+01:00",
+            1735758000,
+            "recurring_event_daily_until_3days",
+            "description_recurring_event_daily_until_3days",
+            "location_recurring_event_daily_until_3days",
+        )
+    ]
+
+    # Indexes on start / end and uid
+    indexes = _query(database_path, "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'occurrences'")
+    assert {"occurrences_start_end", "occurrences_uid"} <= {name for (name,) in indexes}
+
+
+def test_ct_sqlite_rerun_upsert(tmp_path: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that a re-run over the same window updates the stored occurrences instead of duplicating them.
+
+    Arguments:
+        tmp_path: Temporary unique file path provided by built-in fixture.
+        capsys: System capture
+    """
+    database_path = f"{tmp_path}/events.sqlite"
+    args = f"{SQLITE_QUERY} --output.file {database_path}"
+
+    assert run_cli(args, capsys).exit_code == os.EX_OK
+    rows = _query(database_path, "SELECT * FROM occurrences ORDER BY start_epoch, uid")
+
+    with closing(sqlite3.connect(database_path)) as connection, connection:
+        connection.execute("UPDATE occurrences SET summary = 'outdated'")
+
+    assert run_cli(args, capsys).exit_code == os.EX_OK
+    assert _query(database_path, "SELECT * FROM occurrences ORDER BY start_epoch, uid") == rows
+
+
+SYNC_CALENDAR = """BEGIN:VCALENDAR
+VERSION:2.0
+PRODID:-//test//EN
+BEGIN:VEVENT
+UID:single
+SUMMARY:Single event
+DTSTART:{single_start}
+DTEND:{single_end}
+END:VEVENT
+BEGIN:VEVENT
+UID:series
+SUMMARY:Daily event
+DTSTART:20250101T080000Z
+DTEND:20250101T090000Z
+RRULE:FREQ=DAILY;COUNT={series_count}
+END:VEVENT
+END:VCALENDAR
+"""
+
+
+def test_ct_sqlite_rerun_sync(tmp_path: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that a re-run replaces moved events and deletes occurrences removed from the calendar.
+
+    Arguments:
+        tmp_path: Temporary unique file path provided by built-in fixture.
+        capsys: System capture
+    """
+    calendar_path = Path(tmp_path, "calendar.ics")
+    database_path = f"{tmp_path}/events.sqlite"
+    args = (
+        f"--calendar.url {calendar_path.as_uri()} --output.format sqlite --output.file {database_path}"
+        + " --filter.start-date 2025-01-01T00:00:00+00:00 --filter.end-date 2025-01-07T00:00:00+00:00"
+    )
+    sql = "SELECT uid, recurrence_id, start_date FROM occurrences ORDER BY start_epoch"
+
+    calendar_path.write_text(
+        SYNC_CALENDAR.format(single_start="20250102T120000Z", single_end="20250102T130000Z", series_count=3)
+    )
+    assert run_cli(args, capsys).exit_code == os.EX_OK
+    assert _query(database_path, sql) == [
+        ("series", "2025-01-01T08:00:00+00:00", "2025-01-01T08:00:00+00:00"),
+        ("series", "2025-01-02T08:00:00+00:00", "2025-01-02T08:00:00+00:00"),
+        ("single", "", "2025-01-02T12:00:00+00:00"),
+        ("series", "2025-01-03T08:00:00+00:00", "2025-01-03T08:00:00+00:00"),
+    ]
+
+    # Single event moved, last occurrence of the series removed
+    calendar_path.write_text(
+        SYNC_CALENDAR.format(single_start="20250104T120000Z", single_end="20250104T130000Z", series_count=2)
+    )
+    assert run_cli(args, capsys).exit_code == os.EX_OK
+    assert _query(database_path, sql) == [
+        ("series", "2025-01-01T08:00:00+00:00", "2025-01-01T08:00:00+00:00"),
+        ("series", "2025-01-02T08:00:00+00:00", "2025-01-02T08:00:00+00:00"),
+        ("single", "", "2025-01-04T12:00:00+00:00"),
+    ]
+
+
+def test_ct_sqlite_merged_sources(tmp_path: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that the occurrences of merged calendars are stored with the URL of the calendar they were taken from.
+
+    Arguments:
+        tmp_path: Temporary unique file path provided by built-in fixture.
+        capsys: System capture
+    """
+    database_path = f"{tmp_path}/events.sqlite"
+    feed_a = calendar_example_url("dedup_feed_a.ics")
+    feed_b = calendar_example_url("dedup_feed_b.ics")
+    args = (
+        f"--calendar.url {feed_a} --calendar.merge-urls '[\"{feed_b}\"]' --output.format sqlite"
+        + f" --output.file {database_path}"
+        + " --filter.start-date 2025-05-01T00:00:00+02:00 --filter.end-date 2025-06-30T00:00:00+02:00"
+    )
+
+    assert run_cli(args, capsys).exit_code == os.EX_OK
+    sources = dict(_query(database_path, "SELECT DISTINCT uid, source FROM occurrences"))
+    assert sources["holiday-1"] == feed_b  # Higher SEQUENCE in the merged calendar
+    assert sources["holiday-2"] == feed_a
+    assert sources["vacation-2"] == feed_b
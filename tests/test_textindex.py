@@ -0,0 +1,146 @@
+"""Test of the trigram text index."""
+
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from icalendar_events_cli.icalendar import parse_calendar
+from icalendar_events_cli.regex_analysis import required_literals
+from icalendar_events_cli.textindex import TextIndex, candidate_uids
+from tests.util_runner import calendar_example_url, run_cli
+
+# ---- Utilities -------------------------------------------------------------------------------------------------------
+
+UID_DAILY = "b1bc06fa-a3ad-4afb-90ae-6a228fd5a401"
+UID_SECOND_DAY = "b1bc06fa-a3ad-4afb-90ae-6a228fd5a402"
+UID_WEEKLY = "b1bc06fa-a3ad-4afb-90ae-6a228fd5a403"
+UID_MONTHLY = "b1bc06fa-a3ad-4afb-90ae-6a228fd5a404"
+UID_YEARLY = "b1bc06fa-a3ad-4afb-90ae-6a228fd5a405"
+
+
+def build_text_index(file_name: str) -> TextIndex:
+    """Build the text index of a calendar example.
+
+    Arguments:
+        file_name: File name of the calendar example.
+
+    Returns:
+        Text index of the calendar.
+    """
+    with open(os.path.join("tests", "calendar_examples", file_name), encoding="utf-8") as file:
+        return TextIndex(parse_calendar(file.read()))
+
+
+# ---- Testcases -------------------------------------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize(
+    "pattern,expected_literals",
+    [
+        ("Sommer.*", ("all", ["Sommer"])),
+        (
+            ".*Oster(sonntag|montag).*",
+            ("all", ["Oster", ("all", [("any", [("all", ["sonntag"]), ("all", ["montag"])])])]),
+        ),
+        ("a(?i:bc)d", ("all", ["a", "d"])),
+        ("(ab)+c?x{2}", ("all", [("all", [("all", ["ab"])]), ("all", ["x"])])),
+        ("[ab].*$", ("all", [])),
+        ("(?i)abc", None),
+    ],
+)
+def test_ut_required_literals(pattern: str, expected_literals: tuple | None) -> None:
+    """Test the extraction of required literals from RegExes.
+
+    Arguments:
+        pattern: RegEx pattern.
+        expected_literals: Expected requirements tree.
+    """
+    assert required_literals(pattern) == expected_literals
+
+
+@pytest.mark.parametrize(
+    "name,pattern,expected_uids",
+    [
+        ("SUMMARY", "recurring_event_daily.*", {UID_DAILY}),
+        ("SUMMARY", ".*(daily|weekly).*", {UID_DAILY, UID_WEEKLY}),
+        ("SUMMARY", "recurring_event_.*", {UID_DAILY, UID_SECOND_DAY, UID_WEEKLY, UID_MONTHLY, UID_YEARLY}),
+        ("DESCRIPTION", ".*weekly.*", {UID_WEEKLY}),
+        ("LOCATION", ".*weekly.*", set()),
+        ("SUMMARY", "not_existing", set()),
+        # No usable literals: full scan
+        ("SUMMARY", ".*", None),
+        ("SUMMARY", "ab.*", None),
+        ("SUMMARY", "(ab|recurring_event_daily).*", None),
+        ("SUMMARY", "(?i)recurring_event_daily", None),
+    ],
+)
+def test_ut_text_index_candidates(name: str, pattern: str, expected_uids: set | None) -> None:
+    """Test the candidate series of a single text filter.
+
+    Arguments:
+        name: Name of the text property.
+        pattern: RegEx pattern of the filter.
+        expected_uids: Expected candidate UIDs.
+    """
+    text_index = build_text_index("recurring_events.ics")
+    assert text_index.candidate_uids(name, pattern) == expected_uids
+
+
+@pytest.mark.parametrize(
+    "summary,description,location,expected_uids",
+    [
+        (None, None, None, None),
+        (".*", None, "location_recurring_event_monthly.*", {UID_MONTHLY}),
+        ("recurring_event_.*", "description_recurring_event_weekly.*", None, {UID_WEEKLY}),
+        ("recurring_event_daily.*", "description_recurring_event_weekly.*", None, set()),
+    ],
+)
+def test_ut_candidate_uids(summary: str, description: str, location: str, expected_uids: set | None) -> None:
+    """Test the candidate series of combined text filters.
+
+    Arguments:
+        summary: Summary filter.
+        description: Description filter.
+        location: Location filter.
+        expected_uids: Expected candidate UIDs.
+    """
+    text_index = build_text_index("recurring_events.ics")
+    filter_config = SimpleNamespace(summary=summary, description=description, location=location)
+    assert candidate_uids(text_index, filter_config) == expected_uids
+    assert candidate_uids(None, filter_config) is None
+
+
+@pytest.mark.parametrize(
+    "file_name,filter_args",
+    [
+        ("recurring_events.ics", "--filter.summary recurring_event_daily.*"),
+        ("recurring_events.ics", "--filter.summary .*(daily|weekly).*"),
+        ("recurring_events.ics", "--filter.summary github_issue_#6"),
+        ("recurring_events.ics", "--filter.description .*second_day.* --filter.location location_.*"),
+        ("recurring_events.ics", "--filter.summary (?i)RECURRING.*"),
+        ("GermanHolidays.ics", "--filter.summary .*Oster(sonntag|montag).*"),
+        ("GermanHolidays.ics", "--filter.description .*Feiertag.*"),
+        ("GermanHolidays.json", "--filter.summary .*Einheit.*"),
+    ],
+)
+def test_ct_text_index_same_result(file_name: str, filter_args: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that queries with text index return the same result as without.
+
+    Arguments:
+        file_name: File name of the calendar example.
+        filter_args: Filter command line arguments.
+        capsys: System capture
+    """
+    args = (
+        f"--calendar.url {calendar_example_url(file_name)} --output.format json {filter_args}"
+        + " --filter.start-date 2024-01-01T00:00:00+01:00 --filter.end-date 2026-12-31T00:00:00+01:00"
+    )
+
+    cli_result = run_cli(args, capsys)
+    cli_result_with_index = run_cli(args + " --filter.text-index true", capsys)
+
+    assert cli_result.exit_code == os.EX_OK
+    assert cli_result_with_index.exit_code == os.EX_OK
+    assert '"events": []' not in cli_result.stdout
+    assert cli_result_with_index.stdout == cli_result.stdout
@@ -0,0 +1,185 @@
+"""Test of the timezones of VTIMEZONE components with precomputed transition tables."""
+
+import json
+import os
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import pytest
+from icalendar import Calendar, Timezone
+from icalendar.timezone import tzp
+from icalendar.timezone.zoneinfo import ZONEINFO
+
+import icalendar_events_cli.timezones as timezones_module
+from icalendar_events_cli.cache import ResultCache
+from icalendar_events_cli.timezones import TransitionTableTimezone, timezone_key
+from tests.util_runner import calendar_example_url, run_cli
+
+# ---- Utilities -------------------------------------------------------------------------------------------------------
+
+EXCHANGE_CALENDAR = Path("tests", "calendar_examples", "exchange_timezones.ics")
+
+
+def vtimezone_of(name: str) -> Timezone:
+    """Build the VTIMEZONE component of an IANA timezone with a custom TZID.
+
+    Arguments:
+        name: IANA timezone name.
+
+    Returns:
+        Timezone: VTIMEZONE component.
+    """
+    return Timezone.from_tzinfo(
+        ZoneInfo(name), tzid=f"Custom {name}", first_date=date(2015, 1, 1), last_date=date(2030, 1, 1)
+    )
+
+
+def assert_same_timezone(expected: object, actual: object, start: datetime, end: datetime) -> None:
+    """Assert that two timezones yield the same offsets and names (both folds) and UTC conversions.
+
+    Arguments:
+        expected: Expected timezone.
+        actual: Actual timezone.
+        start: First local time.
+        end: End of the local times (exclusive).
+    """
+    dt = start
+    while dt < end:
+        for fold in (0, 1):
+            expected_dt = dt.replace(fold=fold, tzinfo=expected)
+            actual_dt = dt.replace(fold=fold, tzinfo=actual)
+            assert (actual_dt.utcoffset(), actual_dt.dst(), actual_dt.tzname()) == (
+                expected_dt.utcoffset(),
+                expected_dt.dst(),
+                expected_dt.tzname(),
+            ), dt
+        expected_utc = expected.fromutc(dt.replace(tzinfo=expected))
+        actual_utc = actual.fromutc(dt.replace(tzinfo=actual))
+        assert (actual_utc.replace(tzinfo=None), actual_utc.fold) == (
+            expected_utc.replace(tzinfo=None),
+            expected_utc.fold,
+        )
+        dt += timedelta(hours=1)
+
+
+def transition_table(vtimezone: Timezone, until: datetime) -> TransitionTableTimezone:
+    """Create the timezone with onset tables of a VTIMEZONE component (serialized and loaded again).
+
+    Arguments:
+        vtimezone: VTIMEZONE component.
+        until: Horizon of the onset tables.
+
+    Returns:
+        TransitionTableTimezone: Timezone with onset tables.
+    """
+    timezone = TransitionTableTimezone.from_timezone(
+        ZONEINFO().create_timezone(vtimezone), until, vtimezone.to_ical().decode("utf-8")
+    )
+    return TransitionTableTimezone.loads(timezone.dumps())
+
+
+# ---- Testcases -------------------------------------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("name", ["Europe/Berlin", "Australia/Lord_Howe", "America/Sao_Paulo", "Asia/Tokyo"])
+def test_ut_transition_table_equivalence(name: str) -> None:
+    """Test that the onset tables yield the same results as the dateutil timezone, also beyond the horizon.
+
+    Arguments:
+        name: IANA timezone name.
+    """
+    vtimezone = vtimezone_of(name)
+    assert_same_timezone(
+        ZONEINFO().create_timezone(vtimezone),
+        transition_table(vtimezone, datetime(2020, 1, 1)),
+        datetime(2019, 1, 15),
+        datetime(2020, 4, 30),
+    )
+
+
+def test_ut_transition_table_truncated(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that onset tables of recurrence rules without end are truncated and the horizon is reduced.
+
+    Arguments:
+        monkeypatch: Monkeypatch fixture.
+    """
+    monkeypatch.setattr(timezones_module, "MAX_ONSETS", 5)
+    # VTIMEZONE component as embedded by Exchange / Outlook: Recurrence rules without end
+    vtimezone = Calendar.from_ical(EXCHANGE_CALENDAR.read_bytes()).walk("VTIMEZONE")[0]
+    timezone = transition_table(vtimezone, datetime(2030, 1, 1))
+
+    # Fifth onset of the DAYLIGHT sub-component (the first is its DTSTART)
+    assert timezone._until == datetime(1604, 3, 28, 2)  # pylint: disable=protected-access
+    expected = ZONEINFO().create_timezone(vtimezone)
+    assert_same_timezone(expected, timezone, datetime(1600, 12, 31), datetime(1601, 1, 2))  # Before the first onset
+    assert_same_timezone(expected, timezone, datetime(1604, 1, 1), datetime(1604, 11, 1))
+
+
+def test_ct_timezone_cache(tmp_path: str, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that the timezones of custom VTIMEZONE components are loaded from the cache by following runs.
+
+    Arguments:
+        tmp_path: Temporary unique file path provided by built-in fixture.
+        monkeypatch: Monkeypatch fixture.
+        capsys: System capture
+    """
+    cache_dir = f"{tmp_path}/cache"
+    args = (
+        f"--calendar.url {calendar_example_url(EXCHANGE_CALENDAR.name)} --filter.start-date 2025-03-25T00:00:00+01:00 "
+        "--filter.end-date 2025-04-05T00:00:00+02:00 --output.format json --output.fields '[start-date]'"
+    )
+    vtimezone = Calendar.from_ical(EXCHANGE_CALENDAR.read_bytes()).walk("VTIMEZONE")[0].to_ical().decode("utf-8")
+
+    monkeypatch.setattr(timezones_module._provider, "_timezones", {})  # pylint: disable=protected-access
+    first_run = run_cli(f"{args} --cache.dir {cache_dir}", capsys)
+    entry = json.loads(ResultCache(cache_dir, 1000000).get(timezone_key(vtimezone, datetime(2027, 1, 1))))
+    assert (entry["tzid"], entry["until"], entry["vtimezone"]) == (
+        "W. Europe Standard Time",
+        "2027-01-01T00:00:00",
+        vtimezone,
+    )
+    # The previous timezone provider is restored
+    assert not isinstance(tzp.create_timezone(Timezone.from_ical(vtimezone)), TransitionTableTimezone)
+
+    # Following run (new process, other query): The timezone is loaded, not created
+    monkeypatch.setattr(timezones_module._provider, "_timezones", {})  # pylint: disable=protected-access
+    with monkeypatch.context() as patch:
+        patch.setattr(TransitionTableTimezone, "from_timezone", None)
+        second_run = run_cli(f"{args} --cache.dir {cache_dir} --filter.summary 'Daily.*'", capsys)
+
+    assert first_run.exit_code == os.EX_OK
+    starts = [event["start-date"] for event in json.loads(first_run.stdout)["events"]]
+    assert starts[4:6] == ["2025-03-29T09:00:00+01:00", "2025-03-30T09:00:00+02:00"]
+    assert json.loads(second_run.stdout)["events"] == json.loads(first_run.stdout)["events"]
+    assert run_cli(args, capsys).stdout == first_run.stdout
+
+
+@pytest.mark.parametrize("pipelined", [False, True])
+def test_ct_timezone_provider_unchanged(
+    pipelined: bool, tmp_path: str, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that the timezone provider is only switched with a cache directory and restored afterwards.
+
+    Arguments:
+        pipelined: Pipelined download (components parsed while downloading) or not.
+        tmp_path: Temporary unique file path provided by built-in fixture.
+        monkeypatch: Monkeypatch fixture.
+        capsys: System capture
+    """
+    args = (
+        f"--calendar.url {calendar_example_url(EXCHANGE_CALENDAR.name)} --filter.start-date 2025-03-25T00:00:00+01:00 "
+        "--filter.end-date 2025-04-05T00:00:00+02:00 --output.format json"
+        f" --calendar.pipelined {str(pipelined).lower()}"
+    )
+    monkeypatch.setattr(timezones_module._provider, "_timezones", {})  # pylint: disable=protected-access
+    monkeypatch.setattr(TransitionTableTimezone, "from_timezone", None)
+    without_cache = run_cli(args, capsys)  # Not created with onset tables
+    monkeypatch.undo()
+
+    with_cache = run_cli(f"{args} --cache.dir {tmp_path}", capsys)
+
+    assert without_cache.exit_code == os.EX_OK
+    assert with_cache.stdout == without_cache.stdout
+    vtimezone = Calendar.from_ical(EXCHANGE_CALENDAR.read_bytes()).walk("VTIMEZONE")[0]
+    assert not isinstance(tzp.create_timezone(vtimezone), TransitionTableTimezone)
@@ -4,6 +4,7 @@ import json
 import os
 import shlex
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Dict, List
 
 import pytest
@@ -59,6 +60,18 @@ class CliResult:
         self.fileout_as_json = fileout_as_json
 
 
+def calendar_example_url(file_name: str) -> str:
+    """Build the local file URL of a calendar example.
+
+    Arguments:
+        file_name: File name of the calendar example.
+
+    Returns:
+        str: file:// URL of the calendar example
+    """
+    return Path("tests", "calendar_examples", file_name).absolute().as_uri()
+
+
 def run_cli(cli_args: str, capsys: pytest.CaptureFixture, output_path: str | None = None) -> CliResult:
     """Run the command line util with the passed arguments.
 